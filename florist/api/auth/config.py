@@ -0,0 +1,34 @@
+"""Authentication configuration parameters."""
+
+import os
+
+
+class AuthConfig:
+    """Authentication configuration parameters."""
+
+    bcrypt_rounds = 12
+    password_hash_max_workers = 4
+
+    @classmethod
+    def get_bcrypt_rounds(cls) -> int:
+        """
+        Return the cost factor (log2 of the number of rounds) used by bcrypt to hash new passwords.
+
+        Passwords that have already been hashed keep the cost factor they were hashed with.
+
+        :return: (int) the bcrypt cost factor.
+        """
+        if os.getenv("BCRYPT_ROUNDS"):
+            return int(str(os.getenv("BCRYPT_ROUNDS")))
+        return cls.bcrypt_rounds
+
+    @classmethod
+    def get_password_hash_max_workers(cls) -> int:
+        """
+        Return the maximum number of threads hashing and verifying passwords at the same time.
+
+        :return: (int) the maximum number of password hashing threads.
+        """
+        if os.getenv("PASSWORD_HASH_MAX_WORKERS"):
+            return int(str(os.getenv("PASSWORD_HASH_MAX_WORKERS")))
+        return cls.password_hash_max_workers
@@ -1,9 +1,12 @@
 """Module for handling token and user creation."""
 
+import asyncio
 import hashlib
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any, Union
+from typing import Annotated, Any, Dict, Optional, Union
 
 import bcrypt
 import jwt
@@ -12,6 +15,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import BaseModel
 
+from florist.api.auth.config import AuthConfig
 from florist.api.db.client_entities import UserDAO
 from florist.api.db.server_entities import User
 
@@ -20,6 +24,18 @@ ENCRYPTION_ALGORITHM = "HS256"
 DEFAULT_USERNAME = "admin"
 DEFAULT_PASSWORD = "admin"
 TOKEN_EXPIRATION_TIMEDELTA = timedelta(days=7)
+# Maximum amount of hashed passwords to cache the result of the default password check for
+DEFAULT_PASSWORD_CHECK_CACHE_SIZE = 128
+
+# Results of the default password check, by hashed password. Read without the lock so the check
+# can be done on the event loop, and evicted in insertion order when full.
+DEFAULT_PASSWORD_CHECKS: Dict[str, bool] = {}
+DEFAULT_PASSWORD_CHECKS_LOCK = threading.Lock()
+
+# Thread pools to run the bcrypt hashing and verification in. bcrypt releases the GIL while
+# hashing, so threads are enough to keep it from blocking the event loop. Keyed by maximum number of threads.
+PASSWORD_HASH_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
+PASSWORD_HASH_EXECUTORS_LOCK = threading.Lock()
 
 
 class Token(BaseModel):
@@ -42,6 +58,25 @@ class Token(BaseModel):
         }
 
 
+class CachedClientToken(BaseModel):
+    """Define a client's token cached by the server, along with its expiration time."""
+
+    token: Token
+    expires_at: Optional[datetime] = None
+
+    def is_expiring(self, margin: timedelta) -> bool:
+        """
+        Check if the token has expired or is going to expire soon.
+
+        :param margin: (timedelta) how long before the expiration time the token is considered to be expiring.
+        :return: (bool) True if the token is going to expire in less than `margin`, False otherwise.
+            Tokens without an expiration time never expire.
+        """
+        if self.expires_at is None:
+            return False
+        return datetime.now(timezone.utc) + margin >= self.expires_at
+
+
 class AuthUser(BaseModel):
     """Define the User model to be returned by the API."""
 
@@ -127,7 +162,7 @@ def _password_hash(password: str) -> str:
     """
     _check_valid_word(password)
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=AuthConfig.get_bcrypt_rounds())
     hashed_password = bcrypt.hashpw(password=password_bytes, salt=salt)
     return hashed_password.decode("utf-8")
 
@@ -143,6 +178,103 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def is_default_password(hashed_password: str) -> bool:
+    """
+    Check if a hashed password is the hash of the default password.
+
+    The results are cached by hashed password in `DEFAULT_PASSWORD_CHECKS` so the expensive bcrypt
+    check only runs once per hashed password. Changing the password changes the hashed password,
+    so the cached result for the old one is never used for the new one.
+
+    :param hashed_password: (str) the hashed password to check.
+    :return: (bool) True if the hashed password is the hash of the default password, False otherwise.
+    """
+    cached_result = DEFAULT_PASSWORD_CHECKS.get(hashed_password)
+    if cached_result is not None:
+        return cached_result
+
+    result = verify_password(_simple_hash(DEFAULT_PASSWORD), hashed_password)
+    with DEFAULT_PASSWORD_CHECKS_LOCK:
+        if (
+            hashed_password not in DEFAULT_PASSWORD_CHECKS
+            and len(DEFAULT_PASSWORD_CHECKS) >= DEFAULT_PASSWORD_CHECK_CACHE_SIZE
+        ):
+            del DEFAULT_PASSWORD_CHECKS[next(iter(DEFAULT_PASSWORD_CHECKS))]
+        DEFAULT_PASSWORD_CHECKS[hashed_password] = result
+    return result
+
+
+def clear_default_password_checks() -> None:
+    """Clear the cached results of the default password check."""
+    with DEFAULT_PASSWORD_CHECKS_LOCK:
+        DEFAULT_PASSWORD_CHECKS.clear()
+
+
+def get_password_hash_executor() -> ThreadPoolExecutor:
+    """
+    Return the thread pool to run the password hashing and verification in, creating it if it doesn't exist yet.
+
+    :return: (ThreadPoolExecutor) the password hashing thread pool, with at most
+        `AuthConfig.get_password_hash_max_workers()` threads.
+    """
+    max_workers = AuthConfig.get_password_hash_max_workers()
+    with PASSWORD_HASH_EXECUTORS_LOCK:
+        executor = PASSWORD_HASH_EXECUTORS.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="florist-password-hash")
+            PASSWORD_HASH_EXECUTORS[max_workers] = executor
+        return executor
+
+
+def shutdown_password_hash_executor() -> None:
+    """Shut down the password hashing thread pools that have been created."""
+    with PASSWORD_HASH_EXECUTORS_LOCK:
+        for executor in PASSWORD_HASH_EXECUTORS.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        PASSWORD_HASH_EXECUTORS.clear()
+
+
+async def password_hash_async(password: str) -> str:
+    """
+    Hash a password with bcrypt in the password hashing thread pool without blocking the event loop.
+
+    :param password: (str) the password to hash.
+    :return: (str) the hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_hash_executor(), _password_hash, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in the password hashing thread pool without blocking the event loop.
+
+    :param password: (str) the password to verify.
+    :param hashed_password: (str) the hashed password to verify against.
+    :return: (bool) True if the password matches the hashed password, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_hash_executor(), verify_password, password, hashed_password)
+
+
+async def is_default_password_async(hashed_password: str) -> bool:
+    """
+    Check if a hashed password is the hash of the default password without blocking the event loop.
+
+    Cached results are returned right away, so requests don't wait behind the hashing of logins and
+    password changes. Otherwise, runs `is_default_password` in the password hashing thread pool.
+
+    :param hashed_password: (str) the hashed password to check.
+    :return: (bool) True if the hashed password is the hash of the default password, False otherwise.
+    """
+    cached_result = DEFAULT_PASSWORD_CHECKS.get(hashed_password)
+    if cached_result is not None:
+        return cached_result
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_hash_executor(), is_default_password, hashed_password)
+
+
 async def make_default_server_user(database: AsyncIOMotorDatabase[Any]) -> User:
     """
     Make a default server user.
@@ -150,7 +282,7 @@ async def make_default_server_user(database: AsyncIOMotorDatabase[Any]) -> User:
     :param database: (AsyncIOMotorDatabase[Any]) the database to create the user in.
     :return: (User) the default server user.
     """
-    hashed_password = _password_hash(_simple_hash(DEFAULT_PASSWORD))
+    hashed_password = await password_hash_async(_simple_hash(DEFAULT_PASSWORD))
     user = User(username=DEFAULT_USERNAME, hashed_password=hashed_password)
     await user.create(database)
     return user
@@ -196,3 +328,19 @@ def decode_access_token(token: str, secret_key: str) -> dict[str, Any]:
     data = jwt.decode(token, secret_key, algorithms=[ENCRYPTION_ALGORITHM])
     assert isinstance(data, dict)
     return data
+
+
+def get_access_token_expiration(token: str) -> Optional[datetime]:
+    """
+    Read the expiration time of an access token without verifying it.
+
+    Used to know when the tokens issued by other services expire, as their secret keys are not known.
+    It MUST NOT be used to authenticate a token.
+
+    :param token: (str) the token to read the expiration time from.
+    :return: (Optional[datetime]) the expiration time of the token, or None if the token does not expire.
+    """
+    data = jwt.decode(token, options={"verify_signature": False})
+    if data.get("exp") is None:
+        return None
+    return datetime.fromtimestamp(data["exp"], timezone.utc)
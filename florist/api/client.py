@@ -5,23 +5,43 @@ import os
 import signal
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Optional
 from uuid import uuid4
 
 import torch
-from fastapi import Depends, FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fl4health.metrics import Accuracy
 
-from florist.api.auth.token import DEFAULT_USERNAME, make_default_client_user
+from florist.api.auth.token import DEFAULT_USERNAME, make_default_client_user, shutdown_password_hash_executor
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
-from florist.api.db.client_entities import ClientDAO, UserDAO
+from florist.api.db.client_entities import (
+    ClientDAO,
+    UserDAO,
+    close_connections,
+    create_schema,
+    shutdown_sqlite_executors,
+)
 from florist.api.launchers.local import launch_client
 from florist.api.models.models import Model
-from florist.api.monitoring.logs import get_client_log_file_path
-from florist.api.monitoring.metrics import RedisMetricsReporter, get_from_redis, get_host_and_port_from_address
+from florist.api.monitoring.config import MetricsConfig
+from florist.api.monitoring.logs import (
+    get_client_log_file_path,
+    get_log_tail_offset,
+    make_log_range_response,
+    make_log_tail_response,
+    read_log_file,
+)
+from florist.api.monitoring.metrics import (
+    RedisMetricsReporter,
+    close_async_connection_pools,
+    close_connection_pools,
+    get_from_redis_async,
+    get_host_and_port_from_address,
+)
 from florist.api.routes.client.auth import check_default_user_token
 from florist.api.routes.client.auth import router as auth_router
 
@@ -32,12 +52,28 @@ LOGGER = logging.getLogger("uvicorn.error")
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     """Set up function for app startup and shutdown."""
+    # Create the database tables if they do not exist
+    create_schema()
+
     # Create default user if it does not exist
     if not UserDAO.exists(DEFAULT_USERNAME):
         make_default_client_user()
 
     yield
 
+    # Disconnect the shared redis connection pools
+    close_connection_pools()
+
+    # Stop the password hashing threads
+    shutdown_password_hash_executor()
+
+    # Close the asyncio redis connection pools
+    await close_async_connection_pools()
+
+    # Close the database connections once the pending database operations are done
+    shutdown_sqlite_executors()
+    close_connections()
+
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router, tags=["auth"], prefix="/api/client/auth")
@@ -45,7 +81,7 @@ app.mount("/change-password", StaticFiles(directory="florist/app/assets/static/c
 
 
 @app.get("/api/client/connect", dependencies=[Depends(check_default_user_token)])
-def connect() -> JSONResponse:
+async def connect() -> JSONResponse:
     """
     Confirm the client is up and ready to accept instructions.
 
@@ -55,7 +91,7 @@ def connect() -> JSONResponse:
 
 
 @app.get("/api/client/start", dependencies=[Depends(check_default_user_token)])
-def start(
+async def start(
     server_address: str,
     client: Client,
     model: Model,
@@ -84,28 +120,23 @@ def start(
     """
     try:
         client_uuid = str(uuid4())
-        redis_host, redis_port = get_host_and_port_from_address(redis_address)
-        metrics_reporter = RedisMetricsReporter(host=redis_host, port=str(redis_port), run_id=client_uuid)
-
-        device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+        log_file_path = str(get_client_log_file_path(client_uuid))
 
-        client_class = client.get_client_class()
-        client_obj = client_class(
-            data_path=Path(data_path),
-            metrics=[Accuracy()],
-            device=device,
-            reporters=[metrics_reporter],
+        # Setting up the client and spawning its process are blocking, so they run in the threadpool
+        client_pid = await run_in_threadpool(
+            _launch_client,
+            client_uuid,
+            server_address,
+            client,
+            model,
+            optimizer,
+            data_path,
+            redis_address,
+            log_file_path,
         )
 
-        model_class = model.get_model_class()
-        client_obj.set_model(model_class())
-        client_obj.set_optimizer_type(optimizer)
-
-        log_file_path = str(get_client_log_file_path(client_uuid))
-        client_process = launch_client(client_obj, server_address, log_file_path)
-
-        db_entity = ClientDAO(uuid=client_uuid, log_file_path=log_file_path, pid=client_process.pid)
-        db_entity.save()
+        db_entity = ClientDAO(uuid=client_uuid, log_file_path=log_file_path, pid=client_pid)
+        await db_entity.save_async()
 
         return JSONResponse({"uuid": client_uuid})
 
@@ -114,8 +145,62 @@ def start(
         return JSONResponse({"error": str(ex)}, status_code=500)
 
 
+def _launch_client(
+    client_uuid: str,
+    server_address: str,
+    client: Client,
+    model: Model,
+    optimizer: Optimizer,
+    data_path: str,
+    redis_address: str,
+    log_file_path: str,
+) -> Optional[int]:
+    """
+    Set up a client and launch it in a new process.
+
+    :param client_uuid: (str) the UUID of the client.
+    :param server_address: (str) the address of the FL server the FL client should report to.
+    :param client: (Client) the client to be used for training.
+    :param model: (Model) the model to be trained by the client.
+    :param optimizer: (Optimizer) the optimizer to be used by the client.
+    :param data_path: (str) the path where the training data is located.
+    :param redis_address: (str) the address for the Redis instance for metrics reporting.
+    :param log_file_path: (str) the path of the file the client's process will log to.
+    :return: (Optional[int]) the PID of the client's process.
+    """
+    redis_host, redis_port = get_host_and_port_from_address(redis_address)
+    metrics_reporter = RedisMetricsReporter(
+        host=redis_host,
+        port=str(redis_port),
+        run_id=client_uuid,
+        publish_deltas=MetricsConfig.get_publish_deltas(),
+        flush_interval_seconds=MetricsConfig.get_flush_interval_seconds(),
+        flush_every_n_reports=MetricsConfig.get_flush_every_n_reports(),
+        background_flush=MetricsConfig.get_background_flush(),
+        publish_payload=MetricsConfig.get_publish_payload(),
+        use_streams=MetricsConfig.get_use_streams(),
+    )
+
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+
+    client_class = client.get_client_class()
+    client_obj = client_class(
+        data_path=Path(data_path),
+        metrics=[Accuracy()],
+        device=device,
+        reporters=[metrics_reporter],
+    )
+
+    model_class = model.get_model_class()
+    client_obj.set_model(model_class())
+    client_obj.set_optimizer_type(optimizer)
+
+    client_process = launch_client(client_obj, server_address, log_file_path)
+    return client_process.pid
+
+
 @app.get("/api/client/check_status/{client_uuid}", dependencies=[Depends(check_default_user_token)])
-def check_status(client_uuid: str, redis_address: str) -> JSONResponse:
+async def check_status(client_uuid: str, redis_address: str) -> JSONResponse:
     """
     Retrieve value at key client_uuid in redis if it exists.
 
@@ -127,7 +212,7 @@ def check_status(client_uuid: str, redis_address: str) -> JSONResponse:
             {"error": <error message>}
     """
     try:
-        client_metrics = get_from_redis(client_uuid, redis_address)
+        client_metrics = await get_from_redis_async(client_uuid, redis_address)
 
         if client_metrics is not None:
             return JSONResponse(client_metrics)
@@ -140,7 +225,7 @@ def check_status(client_uuid: str, redis_address: str) -> JSONResponse:
 
 
 @app.get("/api/client/get_log/{uuid}", dependencies=[Depends(check_default_user_token)])
-def get_log(uuid: str) -> JSONResponse:
+async def get_log(uuid: str) -> JSONResponse:
     """
     Return the contents of the logs for the given client uuid.
 
@@ -151,13 +236,74 @@ def get_log(uuid: str) -> JSONResponse:
             {"error": <error message>}
     """
     try:
-        client = ClientDAO.find(uuid)
+        client = await ClientDAO.find_async(uuid)
+
+        assert client.log_file_path, "Client log file path is None or empty"
+
+        content = await read_log_file(client.log_file_path)
+        return JSONResponse(content)
+
+    except AssertionError as err:
+        return JSONResponse(content={"error": str(err)}, status_code=400)
+    except Exception as ex:
+        LOGGER.exception(ex)
+        return JSONResponse({"error": str(ex)}, status_code=500)
+
+
+@app.get("/api/client/get_log_range/{uuid}", dependencies=[Depends(check_default_user_token)])
+async def get_log_range(uuid: str, offset: int = 0, length: Optional[int] = None) -> Response:
+    """
+    Stream a range of bytes of the logs for the given client uuid.
+
+    To tail the logs, call it again with the offset returned in the `X-Log-Next-Offset` header.
+
+    :param uuid: (str) the uuid of the client.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param length: (Optional[int]) the maximum number of bytes to return. If None, returns up to the end of the file.
+
+    :return: (Response) If successful, returns a StreamingResponse with the requested range of the file
+        as plain text, described by the `X-Log-Offset`, `X-Log-Next-Offset` and `X-Log-Size` headers.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        client = await ClientDAO.find_async(uuid)
+
+        assert client.log_file_path, "Client log file path is None or empty"
+
+        return make_log_range_response(client.log_file_path, offset, length)
+
+    except AssertionError as err:
+        return JSONResponse(content={"error": str(err)}, status_code=400)
+    except Exception as ex:
+        LOGGER.exception(ex)
+        return JSONResponse({"error": str(ex)}, status_code=500)
+
+
+@app.get("/api/client/tail_log/{uuid}", dependencies=[Depends(check_default_user_token)])
+async def tail_log(uuid: str, request: Request, offset: int = 0) -> Response:
+    """
+    Stream the lines appended to the logs for the given client uuid as server-sent events.
+
+    The stream stays open until the connection is closed. See `florist.api.monitoring.logs.tail_log_file`
+    for the format of the events.
+
+    :param uuid: (str) the uuid of the client.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+        Ignored if the `Last-Event-ID` header is set.
+
+    :return: (Response) If successful, returns a StreamingResponse with the server-sent events.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        client = await ClientDAO.find_async(uuid)
 
         assert client.log_file_path, "Client log file path is None or empty"
 
-        with open(client.log_file_path, "r") as f:
-            content = f.read()
-            return JSONResponse(content)
+        tail_offset = get_log_tail_offset(offset, request.headers.get("Last-Event-ID"))
+        return make_log_tail_response(client.log_file_path, tail_offset)
 
     except AssertionError as err:
         return JSONResponse(content={"error": str(err)}, status_code=400)
@@ -167,7 +313,7 @@ def get_log(uuid: str) -> JSONResponse:
 
 
 @app.get("/api/client/stop/{uuid}", dependencies=[Depends(check_default_user_token)])
-def stop(uuid: str) -> JSONResponse:
+async def stop(uuid: str) -> JSONResponse:
     """
     Stop the client with given UUID.
 
@@ -179,7 +325,7 @@ def stop(uuid: str) -> JSONResponse:
     """
     try:
         assert uuid, "UUID is empty or None."
-        client = ClientDAO.find(uuid)
+        client = await ClientDAO.find_async(uuid)
         assert client.pid, "PID is empty or None."
 
         os.kill(client.pid, signal.SIGTERM)
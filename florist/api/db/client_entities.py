@@ -1,21 +1,99 @@
 """Definitions for the SQLIte database entities (client database)."""
 
+import asyncio
+import copy
 import json
 import secrets
 import sqlite3
+import threading
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
 
 from typing_extensions import Self
 
 from florist.api.db.config import DatabaseConfig
 
 
+# The SQLite connections, one per database path and thread, keyed by (db_path, thread_id)
+CONNECTIONS: Dict[Tuple[str, int], sqlite3.Connection] = {}
+# The tables that have already been created, keyed by (db_path, table_name)
+CREATED_TABLES: Set[Tuple[str, str]] = set()
+CONNECTIONS_LOCK = threading.Lock()
+
+# Single-thread executors to run the async database operations in, keyed by db_path. Each database is then
+# accessed through a single connection, without taking threads from the web server's threadpool.
+SQLITE_EXECUTORS: Dict[str, ThreadPoolExecutor] = {}
+SQLITE_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_sqlite_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Return the current thread's SQLite connection to the given database, creating it if it doesn't exist yet.
+
+    The connections are kept open to be reused, and are set to use write-ahead logging (WAL) so reads
+    are not blocked by writes.
+
+    :param db_path: (str) the path to the SQLite database file.
+    :return: (sqlite3.Connection) The SQLite connection object.
+    """
+    key = (db_path, threading.get_ident())
+    with CONNECTIONS_LOCK:
+        connection = CONNECTIONS.get(key)
+        if connection is None:
+            # check_same_thread is disabled so close_connections can close it from another thread
+            connection = sqlite3.connect(db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            CONNECTIONS[key] = connection
+        return connection
+
+
+def close_connections() -> None:
+    """Close all the SQLite connections. Must be called on shutdown and before deleting a database file."""
+    with CONNECTIONS_LOCK:
+        for connection in CONNECTIONS.values():
+            connection.close()
+        CONNECTIONS.clear()
+        CREATED_TABLES.clear()
+
+
+def get_sqlite_executor(db_path: str) -> ThreadPoolExecutor:
+    """
+    Return the executor to run the async operations on the given database in, creating it if it doesn't exist yet.
+
+    :param db_path: (str) the path to the SQLite database file.
+    :return: (ThreadPoolExecutor) the single-thread executor for the database.
+    """
+    with SQLITE_EXECUTORS_LOCK:
+        executor = SQLITE_EXECUTORS.get(db_path)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="florist-sqlite")
+            SQLITE_EXECUTORS[db_path] = executor
+        return executor
+
+
+def shutdown_sqlite_executors() -> None:
+    """Shut down the executors of the async database operations, waiting for the pending operations to finish."""
+    with SQLITE_EXECUTORS_LOCK:
+        for executor in SQLITE_EXECUTORS.values():
+            executor.shutdown(wait=True)
+        SQLITE_EXECUTORS.clear()
+
+
+def create_schema() -> None:
+    """Create the tables of all the entities in the database if they don't exist."""
+    for entity_class in EntityDAO.__subclasses__():
+        entity_class.create_table()
+
+
 class EntityDAO(ABC):
     """Base Data Access Object (DAO) for SQLite entities."""
 
     table_name = "Entity"
     db_path = DatabaseConfig.get_sqlite_db_path()
+    # Columns of the entity's table besides `uuid`, `data` and the timestamps, mapped to their SQLite types
+    columns: Dict[str, str] = {}
 
     @abstractmethod
     def __init__(self, uuid: str):
@@ -33,14 +111,84 @@ class EntityDAO(ABC):
         """
         Return the SQLite connection object.
 
-        Will create the table of the entity in the DB if it doesn't exist.
+        Will create the table of the entity in the DB if it hasn't been created yet.
 
         :return: (sqlite3.Connection) The SQLite connection object
         """
-        sqlite_db = sqlite3.connect(cls.db_path)
-        sqlite_db.execute(f"CREATE TABLE IF NOT EXISTS {cls.table_name} (uuid TEXT, data TEXT)")
+        if (cls.db_path, cls.table_name) not in CREATED_TABLES:
+            cls.create_table()
+        return get_sqlite_connection(cls.db_path)
+
+    @classmethod
+    def create_table(cls) -> None:
+        """
+        Create the table of the entity in the DB if it doesn't exist.
+
+        The table has a primary key on the `uuid` column, a `data` column with the entity as a JSON string,
+        `created_at` and `updated_at` timestamp columns and the entity's `columns`. Tables created with
+        a previous schema are migrated to this one.
+        """
+        sqlite_db = get_sqlite_connection(cls.db_path)
+        table_info = sqlite_db.execute(f"PRAGMA table_info({cls.table_name})").fetchall()
+        # table_info rows are (cid, name, type, notnull, dflt_value, pk)
+        existing_columns = {column[1]: column for column in table_info}
+
+        if len(existing_columns) > 0 and existing_columns["uuid"][5] == 0:
+            try:
+                cls._migrate_table_without_primary_key(sqlite_db)
+            except Exception:
+                sqlite_db.rollback()
+                raise
+        elif len(existing_columns) > 0:
+            for name, column_type in cls.get_all_columns().items():
+                if name not in existing_columns:
+                    sqlite_db.execute(f"ALTER TABLE {cls.table_name} ADD COLUMN {name} {column_type}")
+        else:
+            sqlite_db.execute(cls._get_create_table_statement(cls.table_name))
+
         sqlite_db.commit()
-        return sqlite_db
+        with CONNECTIONS_LOCK:
+            CREATED_TABLES.add((cls.db_path, cls.table_name))
+
+    @classmethod
+    def get_all_columns(cls) -> Dict[str, str]:
+        """
+        Return the columns of the entity's table besides `uuid` and `data`.
+
+        :return: (Dict[str, str]) the timestamp columns and the entity's `columns`, mapped to their SQLite types.
+        """
+        return {"created_at": "TEXT", "updated_at": "TEXT", **cls.columns}
+
+    @classmethod
+    def _get_create_table_statement(cls, table_name: str) -> str:
+        """
+        Return the statement to create the entity's table.
+
+        :param table_name: (str) the name of the table to create.
+        :return: (str) the CREATE TABLE statement, which does nothing if the table already exists.
+        """
+        columns = "".join(f", {name} {column_type}" for name, column_type in cls.get_all_columns().items())
+        return f"CREATE TABLE IF NOT EXISTS {table_name} (uuid TEXT PRIMARY KEY, data TEXT{columns})"
+
+    @classmethod
+    def _migrate_table_without_primary_key(cls, sqlite_db: sqlite3.Connection) -> None:
+        """
+        Migrate the entity's table from the `(uuid TEXT, data TEXT)` schema to the current schema.
+
+        The rows are copied into a new table with the current schema, which then replaces the old table.
+        If there are repeated UUIDs, the last row is kept.
+
+        :param sqlite_db: (sqlite3.Connection) the SQLite connection to run the migration with.
+        """
+        new_table_name = f"{cls.table_name}_migration"
+        # Running all the statements in a single transaction so a failed migration leaves the old table intact
+        sqlite_db.execute("BEGIN")
+        sqlite_db.execute(f"DROP TABLE IF EXISTS {new_table_name}")
+        sqlite_db.execute(cls._get_create_table_statement(new_table_name))
+        for (data,) in sqlite_db.execute(f"SELECT data FROM {cls.table_name} ORDER BY rowid").fetchall():
+            cls.from_json(data)._upsert(sqlite_db, new_table_name)
+        sqlite_db.execute(f"DROP TABLE {cls.table_name}")
+        sqlite_db.execute(f"ALTER TABLE {new_table_name} RENAME TO {cls.table_name}")
 
     @classmethod
     def find(cls, uuid: str) -> Self:
@@ -52,9 +200,9 @@ class EntityDAO(ABC):
         :raises ValueError: if no such entity exists in the database with given UUID.
         """
         sqlite_db = cls.get_connection()
-        results = sqlite_db.execute(f"SELECT * FROM {cls.table_name} WHERE uuid=? LIMIT 1", (uuid,))
+        results = sqlite_db.execute(f"SELECT data FROM {cls.table_name} WHERE uuid=? LIMIT 1", (uuid,))
         for result in results:
-            return cls.from_json(result[1])
+            return cls.from_json(result[0])
 
         raise ValueError(f"{cls.table_name} with uuid '{uuid}' not found.")
 
@@ -81,16 +229,64 @@ class EntityDAO(ABC):
             will update the database entity at self.uuid otherwise.
         """
         sqlite_db = self.__class__.get_connection()
-        if self.__class__.exists(self.uuid):
-            sqlite_db.execute(
-                f"UPDATE {self.__class__.table_name} SET data=? WHERE uuid=?", (self.to_json(), self.uuid)
-            )
-        else:
-            sqlite_db.execute(
-                f"INSERT INTO {self.__class__.table_name} (uuid, data) VALUES(?, ?)", (self.uuid, self.to_json())
-            )
+        self._upsert(sqlite_db, self.__class__.table_name)
         sqlite_db.commit()
 
+    def _upsert(self, sqlite_db: sqlite3.Connection, table_name: str) -> None:
+        """
+        Insert the entity into the given table, or update it if a record with self.uuid already exists.
+
+        :param sqlite_db: (sqlite3.Connection) the SQLite connection to run the statement with.
+        :param table_name: (str) the name of the table to insert the entity into.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        values = {"uuid": self.uuid, "data": self.to_json(), "created_at": now, "updated_at": now, **self.to_columns()}
+        names = ", ".join(values.keys())
+        placeholders = ", ".join("?" for _ in values)
+        updates = ", ".join(f"{name}=excluded.{name}" for name in values if name not in ["uuid", "created_at"])
+        sqlite_db.execute(
+            f"INSERT INTO {table_name} ({names}) VALUES({placeholders}) ON CONFLICT(uuid) DO UPDATE SET {updates}",
+            tuple(values.values()),
+        )
+
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Return the values of the entity's `columns`.
+
+        To be overridden by the child classes that define `columns`.
+
+        :return: (Dict[str, Any]) the values of the entity's `columns`, by column name.
+        """
+        return {}
+
+    @classmethod
+    async def find_async(cls, uuid: str) -> Self:
+        """
+        Find the entity in the database with the given UUID without blocking the event loop.
+
+        :param uuid: (str) the UUID of the entity.
+        :return: (Self) an instance of the entity.
+        :raises ValueError: if no such entity exists in the database with given UUID.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sqlite_executor(cls.db_path), cls.find, uuid)
+
+    @classmethod
+    async def exists_async(cls, uuid: str) -> bool:
+        """
+        Check if an entity with the given UUID exists in the database without blocking the event loop.
+
+        :param uuid: (str) the UUID of the entity.
+        :return: (bool) True if the entity exists, False otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sqlite_executor(cls.db_path), cls.exists, uuid)
+
+    async def save_async(self) -> None:
+        """Save the current entity to the database without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_sqlite_executor(self.__class__.db_path), self.save)
+
     def __eq__(self, other: object) -> bool:
         """
         Check if two instances of this entity have the same values for the same attributes.
@@ -139,6 +335,7 @@ class ClientDAO(EntityDAO):
     """Data Access Object (DAO) for the Client SQLite entity."""
 
     table_name = "Client"
+    columns = {"log_file_path": "TEXT", "pid": "INTEGER"}
 
     def __init__(self, uuid: str, log_file_path: Optional[str] = None, pid: Optional[int] = None):
         """
@@ -163,6 +360,14 @@ class ClientDAO(EntityDAO):
         data = json.loads(json_data)
         return cls(data["uuid"], data["log_file_path"], data["pid"])
 
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Return the values of the client's columns.
+
+        :return: (Dict[str, Any]) the client's log file path and PID, by column name.
+        """
+        return {"log_file_path": self.log_file_path, "pid": self.pid}
+
     def to_json(self) -> str:
         """
         Convert the client data into a JSON string.
@@ -179,9 +384,18 @@ class ClientDAO(EntityDAO):
 
 
 class UserDAO(EntityDAO):
-    """Data Access Object (DAO) for the User SQLite entity."""
+    """
+    Data Access Object (DAO) for the User SQLite entity.
+
+    The users found are cached in memory, so authenticating requests does not need to read from the database.
+    The cache is keyed by database path and UUID, and a user is removed from it when it is saved.
+    """
 
     table_name = "User"
+    cache: Dict[Tuple[str, str], "UserDAO"] = {}
+    # Number of times each user has been saved, so a user read before a save is not cached after it
+    cache_versions: Dict[Tuple[str, str], int] = {}
+    cache_lock = threading.Lock()
 
     def __init__(self, username: str, hashed_password: str):
         """
@@ -199,6 +413,44 @@ class UserDAO(EntityDAO):
         # always create a new random secret key
         self.secret_key = secrets.token_hex(32)
 
+    @classmethod
+    def find(cls, uuid: str) -> Self:
+        """
+        Find the user with the given UUID in the cache, or in the database if it is not cached.
+
+        :param uuid: (str) the UUID of the user.
+        :return: (Self) a copy of the cached instance of the user, so changes to it are only cached once saved.
+        :raises ValueError: if no such user exists in the database with given UUID.
+        """
+        key = (cls.db_path, uuid)
+        with cls.cache_lock:
+            user = cls.cache.get(key)
+            version = cls.cache_versions.get(key, 0)
+
+        if user is None:
+            user = super().find(uuid)
+            with cls.cache_lock:
+                # Not caching the user if it has been saved while it was being read, as it may be outdated
+                if cls.cache_versions.get(key, 0) == version:
+                    cls.cache[key] = user
+
+        return copy.copy(user)  # type: ignore[return-value]
+
+    def save(self) -> None:
+        """Save the current user to the database and remove it from the cache."""
+        super().save()
+        key = (self.__class__.db_path, self.uuid)
+        with self.__class__.cache_lock:
+            self.__class__.cache.pop(key, None)
+            self.__class__.cache_versions[key] = self.__class__.cache_versions.get(key, 0) + 1
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Remove all the users from the cache."""
+        with cls.cache_lock:
+            cls.cache.clear()
+            cls.cache_versions.clear()
+
     @classmethod
     def from_json(cls, json_data: str) -> Self:
         """
@@ -1,26 +1,38 @@
 """Definitions for the MongoDB database entities (server database)."""
 
+import base64
+import binascii
 import json
+import logging
 import secrets
 import uuid
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Annotated, Any, Dict, List, Optional
+from typing import Annotated, Any, ClassVar, Dict, List, NamedTuple, Optional, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
 from pymongo.results import UpdateResult
 from typing_extensions import Self
 
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
 from florist.api.models.models import Model
+from florist.api.monitoring.events import JOB_EVENTS
+from florist.api.monitoring.metrics import make_metrics_delta
 from florist.api.servers.strategies import Strategy
 
 
 JOB_COLLECTION_NAME = "job"
 USER_COLLECTION_NAME = "user"
+METRICS_COLLECTION_NAME = "metrics"
 MAX_RECORDS_TO_FETCH = 1000
+JOB_SUMMARIES_PAGE_SIZE = 100
+
+LOGGER = logging.getLogger("uvicorn.error")
 
 
 class User(BaseModel):
@@ -31,6 +43,11 @@ class User(BaseModel):
     hashed_password: str = Field(...)
     secret_key: str = Field(default_factory=lambda: secrets.token_hex(32))
 
+    # Indexes of the user collection, created at startup by `ensure_indexes`
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ]
+
     @classmethod
     async def find_by_username(cls, username: str, database: AsyncIOMotorDatabase[Any]) -> Optional[Self]:
         """
@@ -116,7 +133,18 @@ class ClientInfo(BaseModel):
     redis_address: str = Field(...)
     hashed_password: str = Field(...)
     uuid: Optional[Annotated[str, Field(...)]]
-    metrics: Optional[Annotated[str, Field(...)]]
+    metrics: Optional[Annotated[Dict[str, Any], Field(...)]]
+
+    @validator("metrics", pre=True)
+    @classmethod
+    def parse_metrics(cls, metrics: Any) -> Any:
+        """
+        Parse the metrics if they have been saved as a JSON string.
+
+        :param metrics: (Any) the metrics.
+        :return: (Any) the parsed metrics.
+        """
+        return _parse_metrics_json(metrics)
 
     class Config:
         """MongoDB config for the ClientInfo DB entity."""
@@ -129,23 +157,251 @@ class ClientInfo(BaseModel):
                 "redis_address": "localhost:6380",
                 "hashed_password": "LQv3c1yqBWVHxkd0LHAkCOYz6T",
                 "uuid": "0c316680-1375-4e07-84c3-a732a2e6d03f",
-                "metrics": '{"host_type": "client", "initialized": "2024-03-25 11:20:56.819569", "rounds": {"1": {"fit_start": "2024-03-25 11:20:56.827081"}}}',
+                "metrics": {
+                    "host_type": "client",
+                    "initialized": "2024-03-25 11:20:56.819569",
+                    "rounds": {"1": {"fit_start": "2024-03-25 11:20:56.827081"}},
+                },
+            },
+        }
+
+
+class ClientInfoSummary(BaseModel):
+    """Define the summary of the information of an FL client, as listed in `JobSummary`."""
+
+    service_address: Optional[Annotated[str, Field(...)]]
+
+
+class JobSummary(BaseModel):
+    """
+    Define the summary of a job, with only the attributes needed to list it.
+
+    It leaves out the job's metrics, configs and clients' passwords, so listing jobs stays
+    lightweight no matter how far they have progressed.
+    """
+
+    id: str = Field(..., alias="_id")
+    status: JobStatus = Field(default=JobStatus.NOT_STARTED)
+    created_at: Optional[Annotated[datetime, Field(...)]]
+    model: Optional[Annotated[Model, Field(...)]]
+    strategy: Optional[Annotated[Strategy, Field(...)]]
+    server_address: Optional[Annotated[str, Field(...)]]
+    clients_info: Optional[Annotated[List[ClientInfoSummary], Field(...)]]
+
+    class Config:
+        """MongoDB config for the JobSummary DB projection."""
+
+        allow_population_by_field_name = True
+
+    @validator("created_at")
+    @classmethod
+    def parse_created_at(cls, created_at: Optional[datetime]) -> Optional[datetime]:
+        """
+        Set the time zone of the creation time, which is read from the database without one.
+
+        :param created_at: (Optional[datetime]) the creation time.
+        :return: (Optional[datetime]) the creation time in UTC.
+        """
+        return _as_utc(created_at)
+
+
+class JobSummaryPage(BaseModel):
+    """Define a page of job summaries."""
+
+    jobs: List[JobSummary] = Field(...)
+    # Token to fetch the next page with, or None if this is the last page.
+    # See `make_job_summaries_token`
+    next: Optional[Annotated[str, Field(...)]]
+
+
+# Projection of the Job collection's fields that are part of a JobSummary
+JOB_SUMMARY_PROJECTION = {
+    "_id": 1,
+    "status": 1,
+    "created_at": 1,
+    "model": 1,
+    "strategy": 1,
+    "server_address": 1,
+    "clients_info.service_address": 1,
+}
+
+
+class HostType(Enum):
+    """Enumeration of the types of hosts that report metrics."""
+
+    SERVER = "server"
+    CLIENT = "client"
+
+
+class RoundMetrics(BaseModel):
+    """
+    Define the RoundMetrics DB entity, a measurement of the metrics of one round of a job's server or client.
+
+    The rounds are stored in their own collection instead of in the job's metrics, so jobs don't grow with
+    every round. A round is written again every time its metrics change, and the latest measurement of each
+    round is the current one. See `ensure_metrics_collection`.
+    """
+
+    job_id: str = Field(...)
+    host_type: HostType = Field(...)
+    host_uuid: Optional[Annotated[str, Field(...)]]
+    round: int = Field(...)
+    metrics: Dict[str, Any] = Field(...)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Indexes of the metrics collection, created at startup by `ensure_indexes`
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel(
+            [
+                ("meta.job_id", ASCENDING),
+                ("meta.host_uuid", ASCENDING),
+                ("meta.round", ASCENDING),
+                ("timestamp", ASCENDING),
+            ],
+            name="job_id_host_uuid_round_timestamp",
+        ),
+    ]
+
+    @classmethod
+    async def find_latest(
+        cls,
+        job_id: str,
+        database: AsyncIOMotorDatabase[Any],
+        host_uuid: Optional[str] = None,
+        rounds: Optional[List[int]] = None,
+        start_round: Optional[int] = None,
+        end_round: Optional[int] = None,
+    ) -> List[Self]:
+        """
+        Find the latest measurement of the rounds of a job in the database.
+
+        :param job_id: (str) the job's id.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the metrics collection
+            is stored.
+        :param host_uuid: (Optional[str]) if set, only the rounds of the server or client with this uuid are returned.
+        :param rounds: (Optional[List[int]]) if set, only these rounds are returned.
+        :param start_round: (Optional[int]) if set, only the rounds greater than or equal to it are returned.
+        :param end_round: (Optional[int]) if set, only the rounds less than or equal to it are returned.
+        :return: (List[RoundMetrics]) the latest measurement of each round, sorted by host and round.
+        """
+        query: Dict[str, Any] = {"meta.job_id": job_id}
+        if host_uuid is not None:
+            query["meta.host_uuid"] = host_uuid
+        round_query: Dict[str, Any] = {}
+        if rounds is not None:
+            round_query["$in"] = rounds
+        if start_round is not None:
+            round_query["$gte"] = start_round
+        if end_round is not None:
+            round_query["$lte"] = end_round
+        if len(round_query) > 0:
+            query["meta.round"] = round_query
+
+        pipeline = [
+            {"$match": query},
+            # Measurements taken in the same millisecond are ordered by their insertion
+            {"$sort": {"timestamp": ASCENDING, "_id": ASCENDING}},
+            {
+                "$group": {
+                    "_id": {"host_type": "$meta.host_type", "host_uuid": "$meta.host_uuid", "round": "$meta.round"},
+                    "latest": {"$last": "$$ROOT"},
+                },
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "job_id": "$latest.meta.job_id",
+                    "host_type": "$latest.meta.host_type",
+                    "host_uuid": "$latest.meta.host_uuid",
+                    "round": "$latest.meta.round",
+                    "metrics": "$latest.metrics",
+                    "timestamp": "$latest.timestamp",
+                },
+            },
+            {"$sort": {"host_type": DESCENDING, "host_uuid": ASCENDING, "round": ASCENDING}},
+        ]
+
+        metrics_collection = database[METRICS_COLLECTION_NAME]
+        results = await metrics_collection.aggregate(pipeline).to_list(None)
+        return [cls(**result) for result in results]
+
+    @classmethod
+    async def insert_many(cls, round_metrics: List[Self], database: AsyncIOMotorDatabase[Any]) -> None:
+        """
+        Save measurements of rounds in the database.
+
+        :param round_metrics: (List[RoundMetrics]) the measurements to be saved.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the metrics collection
+            is stored.
+        """
+        if len(round_metrics) == 0:
+            return
+
+        documents = [
+            {
+                # The fields that identify the round are grouped in the time series' meta field
+                "meta": {
+                    "job_id": r.job_id,
+                    "host_type": r.host_type.value,
+                    "host_uuid": r.host_uuid,
+                    "round": r.round,
+                },
+                "metrics": jsonable_encoder(r.metrics),
+                "timestamp": r.timestamp,
+            }
+            for r in round_metrics
+        ]
+        await database[METRICS_COLLECTION_NAME].insert_many(documents)
+
+    class Config:
+        """MongoDB config for the RoundMetrics DB entity."""
+
+        schema_extra = {
+            "example": {
+                "job_id": "066de609-b04a-4b30-b46c-32537c7f1f6e",
+                "host_type": "server",
+                "host_uuid": "d73243cf-8b89-473b-9607-8cd0253a101d",
+                "round": 1,
+                "metrics": {"fit_round_start": "2024-04-23 15:33:12.869001"},
+                "timestamp": "2024-04-23T15:33:13.002000",
             },
         }
 
 
+class ClientMetrics(BaseModel):
+    """Define the metrics of an FL client, as returned in `JobMetrics`."""
+
+    uuid: Optional[Annotated[str, Field(...)]]
+    metrics: Optional[Annotated[Dict[str, Any], Field(...)]]
+
+
+class JobMetrics(BaseModel):
+    """Define the metrics of a job's server and clients, with only the requested rounds and metrics."""
+
+    id: str = Field(..., alias="_id")
+    server_metrics: Optional[Annotated[Dict[str, Any], Field(...)]]
+    clients_info: Optional[Annotated[List[ClientMetrics], Field(...)]]
+
+    class Config:
+        """MongoDB config for the JobMetrics DB projection."""
+
+        allow_population_by_field_name = True
+
+
 class Job(BaseModel):
     """Define the Job DB entity."""
 
     id: str = Field(default_factory=uuid.uuid4, alias="_id")
     status: JobStatus = Field(default=JobStatus.NOT_STARTED)
+    # Set by `create`. Jobs created by previous versions don't have it
+    created_at: Optional[Annotated[datetime, Field(...)]]
     model: Optional[Annotated[Model, Field(...)]]
     strategy: Optional[Annotated[Strategy, Field(...)]]
     optimizer: Optional[Annotated[Optimizer, Field(...)]]
     server_address: Optional[Annotated[str, Field(...)]]
     server_config: Optional[Annotated[str, Field(...)]]
     server_uuid: Optional[Annotated[str, Field(...)]]
-    server_metrics: Optional[Annotated[str, Field(...)]]
+    server_metrics: Optional[Annotated[Dict[str, Any], Field(...)]]
     server_log_file_path: Optional[Annotated[str, Field(...)]]
     server_pid: Optional[Annotated[str, Field(...)]]
     redis_address: Optional[Annotated[str, Field(...)]]
@@ -153,6 +409,38 @@ class Job(BaseModel):
     clients_info: Optional[Annotated[List[ClientInfo], Field(...)]]
     error_message: Optional[Annotated[str, Field(...)]]
 
+    # Indexes of the job collection, created at startup by `ensure_indexes`.
+    # The status index has the same sort as the job summary listing, so it covers it
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel(
+            [("status", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="status_created_at_id"
+        ),
+        IndexModel([("server_uuid", ASCENDING)], name="server_uuid"),
+        IndexModel([("clients_info.uuid", ASCENDING)], name="clients_info_uuid"),
+    ]
+
+    @validator("server_metrics", pre=True)
+    @classmethod
+    def parse_server_metrics(cls, server_metrics: Any) -> Any:
+        """
+        Parse the server metrics if they have been saved as a JSON string.
+
+        :param server_metrics: (Any) the server metrics.
+        :return: (Any) the parsed server metrics.
+        """
+        return _parse_metrics_json(server_metrics)
+
+    @validator("created_at")
+    @classmethod
+    def parse_created_at(cls, created_at: Optional[datetime]) -> Optional[datetime]:
+        """
+        Set the time zone of the creation time, which is read from the database without one.
+
+        :param created_at: (Optional[datetime]) the creation time.
+        :return: (Optional[datetime]) the creation time in UTC.
+        """
+        return _as_utc(created_at)
+
     @classmethod
     async def find_by_id(cls, job_id: str, database: AsyncIOMotorDatabase[Any]) -> Optional[Self]:
         """
@@ -168,6 +456,72 @@ class Job(BaseModel):
             return result
         return cls(**result)
 
+    @classmethod
+    async def find_status_by_id(cls, job_id: str, database: AsyncIOMotorDatabase[Any]) -> Optional[JobStatus]:
+        """
+        Find the status of a job in the database by its id.
+
+        Only the status is fetched from the database.
+
+        :param job_id: (str) the job's id.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+        :return: (Optional[JobStatus]) The status of the job with the given ID, or `None` if it can't be found.
+        """
+        job_collection = database[JOB_COLLECTION_NAME]
+        result = await job_collection.find_one({"_id": job_id}, {"status": 1})
+        if result is None:
+            return result
+        return JobStatus(result["status"])
+
+    @classmethod
+    async def find_metrics_by_id(
+        cls,
+        job_id: str,
+        database: AsyncIOMotorDatabase[Any],
+        rounds: Optional[List[str]] = None,
+        keys: Optional[List[str]] = None,
+    ) -> Optional[JobMetrics]:
+        """
+        Find the metrics of a job's server and clients in the database by the job's id.
+
+        Only the requested rounds and top level metrics are fetched from the database. If neither
+        are given, the whole metrics are returned.
+
+        :param job_id: (str) the job's id.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+        :param rounds: (Optional[List[str]]) the rounds to be returned. If None, no rounds are returned
+            unless `rounds` is in `keys`.
+        :param keys: (Optional[List[str]]) the top level metrics to be returned. If None, no top level
+            metrics are returned.
+        :return: (Optional[JobMetrics]) the metrics of the job with the given ID, or `None` if it can't be found.
+        """
+        for key in keys or []:
+            assert _is_valid_path_key(key), f"Invalid metrics key: '{key}'"
+        for round_key in rounds or []:
+            assert _is_round_key(round_key), f"Invalid round: '{round_key}'"
+
+        projection = {
+            "_id": 1,
+            "clients_info.uuid": 1,
+            **_make_metrics_projection("server_metrics", rounds, keys),
+            **_make_metrics_projection("clients_info.metrics", rounds, keys),
+        }
+
+        job_collection = database[JOB_COLLECTION_NAME]
+        result = await job_collection.find_one({"_id": job_id}, projection)
+        if result is None:
+            return None
+        job_metrics = JobMetrics(**result)
+
+        # The rounds are stored in the metrics collection
+        if (rounds is None and keys is None) or "rounds" in (keys or []):
+            round_metrics = await RoundMetrics.find_latest(job_id, database)
+            _merge_round_metrics(job_metrics, round_metrics)
+        elif rounds is not None:
+            round_metrics = await RoundMetrics.find_latest(job_id, database, rounds=[int(r) for r in rounds])
+            _merge_round_metrics(job_metrics, round_metrics)
+        return job_metrics
+
     @classmethod
     async def find_by_status(cls, status: JobStatus, limit: int, database: AsyncIOMotorDatabase[Any]) -> List[Self]:
         """
@@ -185,6 +539,55 @@ class Job(BaseModel):
         assert isinstance(result, list)
         return [cls(**r) for r in result]
 
+    @classmethod
+    async def find_summaries_by_status(
+        cls,
+        status: JobStatus,
+        limit: int,
+        database: AsyncIOMotorDatabase[Any],
+        next_token: Optional[str] = None,
+    ) -> JobSummaryPage:
+        """
+        Return a page of the summaries of the jobs with the given status.
+
+        Only the fields in `JOB_SUMMARY_PROJECTION` are fetched from the database. The jobs are
+        sorted by creation time and then by ID, and the page's `next` token points at its last job,
+        from where the next page starts. Jobs without a creation time come first.
+
+        :param status: (JobStatus) The status of the jobs to be returned.
+        :param limit: (int) the maximum amount of job summaries in the page.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+        :param next_token: (Optional[str]) the `next` token of the previous page, or None to get the first page.
+        :return: (JobSummaryPage) The page of job summaries, with the token for the next page if there are more.
+        :raise AssertionError: if the `next` token is invalid.
+        """
+        query: Dict[str, Any] = {"status": jsonable_encoder(status)}
+        if next_token is not None:
+            created_at, job_id = parse_job_summaries_token(next_token)
+            if created_at is None:
+                # Null sorts before any date, so the jobs with a creation time all come after
+                query["$or"] = [{"created_at": None, "_id": {"$gt": job_id}}, {"created_at": {"$ne": None}}]
+            else:
+                query["$or"] = [
+                    {"created_at": {"$gt": created_at}},
+                    {"created_at": created_at, "_id": {"$gt": job_id}},
+                ]
+
+        job_collection = database[JOB_COLLECTION_NAME]
+        # Fetching one more than the limit to know if there is a next page.
+        # The sort matches the status index so it doesn't need to be done in memory
+        cursor = (
+            job_collection.find(query, JOB_SUMMARY_PROJECTION)
+            .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit + 1)
+        )
+        result = await cursor.to_list(limit + 1)
+        assert isinstance(result, list)
+
+        jobs = [JobSummary(**r) for r in result[:limit]]
+        next_page_token = make_job_summaries_token(jobs[-1]) if len(result) > limit else None
+        return JobSummaryPage(jobs=jobs, next=next_page_token)
+
     async def create(self, database: AsyncIOMotorDatabase[Any]) -> str:
         """
         Save this instance under a new record in the database.
@@ -192,11 +595,67 @@ class Job(BaseModel):
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         :return: (str) the new job record's id.
         """
+        # MongoDB stores dates with millisecond precision
+        now = datetime.now(timezone.utc)
+        self.created_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
         json_job = jsonable_encoder(self)
+        # Saving the creation time as a date instead of a string so it sorts chronologically
+        json_job["created_at"] = self.created_at
         result = await database[JOB_COLLECTION_NAME].insert_one(json_job)
         assert isinstance(result.inserted_id, str)
+        JOB_EVENTS.publish_status(result.inserted_id, json_job["status"])
         return result.inserted_id
 
+    async def update_fields(
+        self,
+        fields: Dict[str, Any],
+        database: AsyncIOMotorDatabase[Any],
+        clients_fields: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Save several attributes of this job and its clients in the database with a single update.
+
+        The attributes are also set in this instance. If the status is one of them, a status event is published.
+
+        :param fields: (Dict[str, Any]) the values of the Job attributes to be saved, by attribute name.
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+        :param clients_fields: (Optional[List[Dict[str, Any]]]) the values of the ClientInfo attributes to be saved,
+            by attribute name, for each one of the clients in `clients_info`. Must have the same length as
+            `clients_info`.
+        """
+        assert "id" not in fields, "The job's id cannot be updated."
+        for name in fields:
+            assert name in Job.__fields__, f"{name} is not a Job attribute."
+
+        updates = {Job.__fields__[name].alias: jsonable_encoder(value) for name, value in fields.items()}
+
+        if clients_fields is not None:
+            assert self.clients_info is not None and len(self.clients_info) == len(clients_fields), (
+                "self.clients_info and clients_fields must have the same length "
+                f"({'None' if self.clients_info is None else len(self.clients_info)}!={len(clients_fields)})."
+            )
+            for i, client_fields in enumerate(clients_fields):
+                for name, value in client_fields.items():
+                    assert name in ClientInfo.__fields__ and name != "id", f"{name} is not a ClientInfo attribute."
+                    updates[f"clients_info.{i}.{ClientInfo.__fields__[name].alias}"] = jsonable_encoder(value)
+
+        if len(updates) == 0:
+            return
+
+        job_collection = database[JOB_COLLECTION_NAME]
+        update_result = await job_collection.update_one({"_id": self.id}, {"$set": updates})
+        assert_updated_successfully(update_result)
+
+        for name, value in fields.items():
+            setattr(self, name, value)
+        if clients_fields is not None and self.clients_info is not None:
+            for client_info, client_fields in zip(self.clients_info, clients_fields):
+                for name, value in client_fields.items():
+                    setattr(client_info, name, value)
+
+        if "status" in fields:
+            JOB_EVENTS.publish_status(self.id, jsonable_encoder(fields["status"]))
+
     async def set_uuids(self, server_uuid: str, client_uuids: List[str], database: AsyncIOMotorDatabase[Any]) -> None:
         """
         Save the server and clients' UUIDs in the database under the current job's id.
@@ -209,19 +668,11 @@ class Job(BaseModel):
             "self.clients_info and client_uuids must have the same length "
             f"({'None' if self.clients_info is None else len(self.clients_info)}!={len(client_uuids)})."
         )
-
-        job_collection = database[JOB_COLLECTION_NAME]
-
-        self.server_uuid = server_uuid
-        update_result = await job_collection.update_one({"_id": self.id}, {"$set": {"server_uuid": server_uuid}})
-        assert_updated_successfully(update_result)
-
-        for i in range(len(client_uuids)):
-            self.clients_info[i].uuid = client_uuids[i]
-            update_result = await job_collection.update_one(
-                {"_id": self.id}, {"$set": {f"clients_info.{i}.uuid": client_uuids[i]}}
-            )
-            assert_updated_successfully(update_result)
+        await self.update_fields(
+            {"server_uuid": server_uuid},
+            database,
+            clients_fields=[{"uuid": client_uuid} for client_uuid in client_uuids],
+        )
 
     async def set_status(self, status: JobStatus, database: AsyncIOMotorDatabase[Any]) -> None:
         """
@@ -230,10 +681,17 @@ class Job(BaseModel):
         :param status: (JobStatus) the status to be saved in the database.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         """
-        job_collection = database[JOB_COLLECTION_NAME]
-        self.status = status
-        update_result = await job_collection.update_one({"_id": self.id}, {"$set": {"status": status.value}})
-        assert_updated_successfully(update_result)
+        await self.update_fields({"status": status}, database)
+
+    async def load_round_metrics(self, database: AsyncIOMotorDatabase[Any]) -> None:
+        """
+        Load the rounds of the server and clients metrics from the metrics collection into this job.
+
+        :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the metrics collection
+            is stored.
+        """
+        round_metrics = await RoundMetrics.find_latest(self.id, database)
+        _merge_round_metrics(self, round_metrics)
 
     async def set_server_metrics(
         self,
@@ -243,17 +701,25 @@ class Job(BaseModel):
         """
         Save the server's metrics in the database under the current job's id.
 
+        The rounds that have changed are saved in the metrics collection, and only the top level
+        metrics that have changed are written to the job.
+
         :param server_metrics: (Dict[str, Any]) the server metrics to be saved.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         """
-        job_collection = database[JOB_COLLECTION_NAME]
+        previous_server_metrics = self.server_metrics
+        delta = make_metrics_delta(previous_server_metrics or {}, server_metrics)
+        self.server_metrics = server_metrics
 
-        self.server_metrics = json.dumps(server_metrics)
-        update_result = await job_collection.update_one(
-            {"_id": self.id},
-            {"$set": {"server_metrics": self.server_metrics}},
-        )
-        assert_updated_successfully(update_result)
+        round_metrics = _make_round_metrics(self.id, HostType.SERVER, self.server_uuid, delta)
+        await RoundMetrics.insert_many(round_metrics, database)
+
+        updates = _make_metrics_updates("server_metrics", previous_server_metrics, server_metrics, delta)
+        if len(updates) > 0:
+            job_collection = database[JOB_COLLECTION_NAME]
+            update_result = await job_collection.update_one({"_id": self.id}, {"$set": updates})
+            assert_updated_successfully(update_result)
+        JOB_EVENTS.publish_server_metrics(self.id, delta)
 
     async def set_client_metrics(
         self,
@@ -264,6 +730,9 @@ class Job(BaseModel):
         """
         Save a client's metrics in the database under the current job's id.
 
+        The rounds that have changed are saved in the metrics collection, and only the top level
+        metrics that have changed are written to the job.
+
         :param client_uuid: (str) the client's uuid whose produced the metrics.
         :param client_metrics: (Dict[str, Any]) the client's metrics to be saved.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
@@ -272,16 +741,24 @@ class Job(BaseModel):
             f"client uuid {client_uuid} is not in clients_info ({[c.uuid for c in self.clients_info] if self.clients_info is not None else None})"
         )
 
-        job_collection = database[JOB_COLLECTION_NAME]
+        client_info = next(c for c in self.clients_info if c.uuid == client_uuid)
+        previous_client_metrics = client_info.metrics
+        delta = make_metrics_delta(previous_client_metrics or {}, client_metrics)
+        client_info.metrics = client_metrics
 
-        for i in range(len(self.clients_info)):
-            if client_uuid == self.clients_info[i].uuid:
-                self.clients_info[i].metrics = json.dumps(client_metrics)
-                update_result = await job_collection.update_one(
-                    {"_id": self.id},
-                    {"$set": {f"clients_info.{i}.metrics": self.clients_info[i].metrics}},
-                )
-                assert_updated_successfully(update_result)
+        round_metrics = _make_round_metrics(self.id, HostType.CLIENT, client_uuid, delta)
+        await RoundMetrics.insert_many(round_metrics, database)
+
+        # Updating the client's metrics in place with the positional operator
+        updates = _make_metrics_updates("clients_info.$.metrics", previous_client_metrics, client_metrics, delta)
+        if len(updates) > 0:
+            job_collection = database[JOB_COLLECTION_NAME]
+            update_result = await job_collection.update_one(
+                {"_id": self.id, "clients_info.uuid": client_uuid},
+                {"$set": updates},
+            )
+            assert_updated_successfully(update_result)
+        JOB_EVENTS.publish_client_metrics(self.id, client_uuid, delta)
 
     async def set_server_log_file_path(self, log_file_path: str, database: AsyncIOMotorDatabase[Any]) -> None:
         """
@@ -290,12 +767,7 @@ class Job(BaseModel):
         :param log_file_path: (str) the file path to be saved in the database.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         """
-        job_collection = database[JOB_COLLECTION_NAME]
-        self.server_log_file_path = log_file_path
-        update_result = await job_collection.update_one(
-            {"_id": self.id}, {"$set": {"server_log_file_path": log_file_path}}
-        )
-        assert_updated_successfully(update_result)
+        await self.update_fields({"server_log_file_path": log_file_path}, database)
 
     async def set_client_log_file_path(
         self,
@@ -328,11 +800,7 @@ class Job(BaseModel):
         :param server_pid: [str] the server PID to be saved in the database.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         """
-        job_collection = database[JOB_COLLECTION_NAME]
-
-        self.server_pid = server_pid
-        update_result = await job_collection.update_one({"_id": self.id}, {"$set": {"server_pid": server_pid}})
-        assert_updated_successfully(update_result)
+        await self.update_fields({"server_pid": server_pid}, database)
 
     async def set_error_message(self, error_message: str, database: AsyncIOMotorDatabase[Any]) -> None:
         """
@@ -341,10 +809,7 @@ class Job(BaseModel):
         :param error_message: (str) the error message to be saved in the database.
         :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
         """
-        job_collection = database[JOB_COLLECTION_NAME]
-        self.error_message = error_message
-        update_result = await job_collection.update_one({"_id": self.id}, {"$set": {"error_message": error_message}})
-        assert_updated_successfully(update_result)
+        await self.update_fields({"error_message": error_message}, database)
 
     def obscure_hashed_passwords(self) -> None:
         """Obscure the clients' hashed passwords so it is not returned in the API's response."""
@@ -368,7 +833,11 @@ class Job(BaseModel):
                 "server_address": "localhost:8000",
                 "server_config": '{"n_server_rounds": 3, "batch_size": 8, "local_epochs": 1}',
                 "server_uuid": "d73243cf-8b89-473b-9607-8cd0253a101d",
-                "server_metrics": '{"host_type": "server", "fit_start": "2024-04-23 15:33:12.865604", "rounds": {"1": {"fit_start": "2024-04-23 15:33:12.869001"}}}',
+                "server_metrics": {
+                    "host_type": "server",
+                    "fit_start": "2024-04-23 15:33:12.865604",
+                    "rounds": {"1": {"fit_start": "2024-04-23 15:33:12.869001"}},
+                },
                 "server_log_file_path": "/Users/foo/server/logfile.log",
                 "server_pid": "123",
                 "redis_addresst": "localhost:6379",
@@ -387,6 +856,197 @@ class Job(BaseModel):
         }
 
 
+# Entities with declared indexes, by the name of their collection
+INDEXED_ENTITIES: Dict[str, Any] = {
+    USER_COLLECTION_NAME: User,
+    JOB_COLLECTION_NAME: Job,
+    METRICS_COLLECTION_NAME: RoundMetrics,
+}
+
+
+class IndexReport(NamedTuple):
+    """Report of the state of the indexes of the database, with lists of index names by collection name."""
+
+    # Indexes declared by the entities that are not in the database, e.g. because their creation failed
+    missing: Dict[str, List[str]]
+    # Indexes in the database that are not declared by the entities
+    undeclared: Dict[str, List[str]]
+    # Indexes in the database that have not been used since the database started
+    unused: Dict[str, List[str]]
+
+
+async def ensure_metrics_collection(database: AsyncIOMotorDatabase[Any]) -> None:
+    """
+    Create the metrics collection as a time series collection if it does not exist.
+
+    Time series collections store the measurements with the same meta field together, so the rounds of
+    a job's host are stored and read in bulk. If the database doesn't support time series collections,
+    the failure is logged and the metrics collection is created as a regular collection instead.
+
+    Must be called before `ensure_indexes`, which would otherwise create the metrics collection as a
+    regular collection.
+
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database to create the metrics collection in.
+    """
+    if METRICS_COLLECTION_NAME in await database.list_collection_names():
+        return
+
+    try:
+        await database.create_collection(
+            METRICS_COLLECTION_NAME,
+            timeseries={"timeField": "timestamp", "metaField": "meta", "granularity": "seconds"},
+        )
+    except PyMongoError as e:
+        LOGGER.warning(f"Could not create '{METRICS_COLLECTION_NAME}' as a time series collection: {e}")
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase[Any]) -> IndexReport:
+    """
+    Create the indexes declared by the entities and report on the state of the database's indexes.
+
+    Creating an index that already exists is a no-op, so this is safe to call on every startup.
+    Failures to create an index are logged instead of raised so they don't prevent the server
+    from starting, and the index is reported as missing.
+
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database to create the indexes in.
+    :return: (IndexReport) the missing, undeclared and unused indexes of the database.
+    """
+    report = IndexReport(missing={}, undeclared={}, unused={})
+    for collection_name, entity in INDEXED_ENTITIES.items():
+        collection = database[collection_name]
+        declared_keys = {index.document["name"]: list(index.document["key"].items()) for index in entity.indexes}
+
+        # Creating one at a time so a failure doesn't prevent the other ones from being created
+        for index in entity.indexes:
+            try:
+                await collection.create_indexes([index])
+            except PyMongoError as e:
+                LOGGER.exception(f"Failed to create index '{index.document['name']}' on '{collection_name}': {e}")
+
+        index_information = await collection.index_information()
+        # Indexes with the declared name but a different key also count as missing
+        missing = [
+            name
+            for name, key in declared_keys.items()
+            if name not in index_information or index_information[name]["key"] != key
+        ]
+        undeclared = [name for name in index_information if name not in declared_keys and name != "_id_"]
+        unused = await _find_unused_indexes(collection_name, database)
+
+        if len(missing) > 0:
+            report.missing[collection_name] = missing
+            LOGGER.warning(f"Missing indexes on '{collection_name}': {missing}")
+        if len(undeclared) > 0:
+            report.undeclared[collection_name] = undeclared
+            LOGGER.info(f"Undeclared indexes on '{collection_name}': {undeclared}")
+        if len(unused) > 0:
+            report.unused[collection_name] = unused
+            LOGGER.info(f"Unused indexes on '{collection_name}': {unused}")
+
+    return report
+
+
+async def convert_metrics_to_documents(database: AsyncIOMotorDatabase[Any]) -> int:
+    """
+    Convert the metrics saved as JSON strings into documents, so they can be updated one metric at a time.
+
+    Only the jobs that still have metrics saved as JSON strings are updated, so this is safe to call on every
+    startup. Jobs that fail to be converted are logged and left as they are.
+
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+    :return: (int) the amount of jobs converted.
+    """
+    job_collection = database[JOB_COLLECTION_NAME]
+    query = {"$or": [{"server_metrics": {"$type": "string"}}, {"clients_info.metrics": {"$type": "string"}}]}
+
+    converted = 0
+    async for result in job_collection.find(query):
+        try:
+            # The JSON strings are parsed by the entities' validators
+            job = Job(**result)
+            updates: Dict[str, Any] = {"server_metrics": job.server_metrics}
+            for i, client_info in enumerate(job.clients_info or []):
+                updates[f"clients_info.{i}.metrics"] = client_info.metrics
+            await job_collection.update_one({"_id": job.id}, {"$set": updates})
+            converted += 1
+        except Exception as e:
+            LOGGER.exception(f"Failed to convert the metrics of job {result['_id']} into documents: {e}")
+
+    if converted > 0:
+        LOGGER.info(f"Converted the metrics of {converted} jobs into documents.")
+    return converted
+
+
+async def move_rounds_to_metrics_collection(database: AsyncIOMotorDatabase[Any]) -> int:
+    """
+    Move the rounds saved in the jobs' metrics by previous versions into the metrics collection.
+
+    Only the jobs that still have rounds in their metrics are updated, so this is safe to call on every
+    startup. Jobs that fail to be moved are logged and left as they are.
+
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job and metrics
+        collections are stored.
+    :return: (int) the amount of jobs moved.
+    """
+    job_collection = database[JOB_COLLECTION_NAME]
+    query = {"$or": [{"server_metrics.rounds": {"$exists": True}}, {"clients_info.metrics.rounds": {"$exists": True}}]}
+
+    moved = 0
+    async for result in job_collection.find(query):
+        try:
+            job = Job(**result)
+            round_metrics = []
+            unsets = {}
+            if job.server_metrics is not None and "rounds" in job.server_metrics:
+                round_metrics += _make_round_metrics(job.id, HostType.SERVER, job.server_uuid, job.server_metrics)
+                unsets["server_metrics.rounds"] = ""
+            for i, client_info in enumerate(job.clients_info or []):
+                if client_info.metrics is not None and "rounds" in client_info.metrics:
+                    round_metrics += _make_round_metrics(
+                        job.id, HostType.CLIENT, client_info.uuid, client_info.metrics
+                    )
+                    unsets[f"clients_info.{i}.metrics.rounds"] = ""
+
+            # If the unset fails the rounds are moved again on the next startup, which is harmless
+            # since only the latest measurement of each round is read
+            await RoundMetrics.insert_many(round_metrics, database)
+            await job_collection.update_one({"_id": job.id}, {"$unset": unsets})
+            moved += 1
+        except Exception as e:
+            LOGGER.exception(f"Failed to move the rounds of job {result['_id']} to the metrics collection: {e}")
+
+    if moved > 0:
+        LOGGER.info(f"Moved the rounds of {moved} jobs to the metrics collection.")
+    return moved
+
+
+def make_job_summaries_token(job_summary: JobSummary) -> str:
+    """
+    Make the token to fetch the page of job summaries that starts after the given job.
+
+    :param job_summary: (JobSummary) the last job summary of the current page.
+    :return: (str) the token, which encodes the job's creation time and ID.
+    """
+    created_at = job_summary.created_at.isoformat() if job_summary.created_at is not None else None
+    return base64.urlsafe_b64encode(json.dumps([created_at, job_summary.id]).encode()).decode()
+
+
+def parse_job_summaries_token(token: str) -> Tuple[Optional[datetime], str]:
+    """
+    Parse a token made by `make_job_summaries_token`.
+
+    :param token: (str) the token.
+    :return: (Tuple[Optional[datetime], str]) the creation time and ID of the job the token points at.
+    :raise AssertionError: if the token is invalid.
+    """
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        assert isinstance(job_id, str)
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), job_id
+    except (AssertionError, binascii.Error, TypeError, ValueError) as err:
+        raise AssertionError(f"Invalid next token: {token}") from err
+
+
 def assert_updated_successfully(update_result: UpdateResult) -> None:
     """
     Assert an update result has updated exactly one record.
@@ -398,3 +1058,203 @@ def assert_updated_successfully(update_result: UpdateResult) -> None:
     assert raw_result["n"] == 1, f"UpdateResult's 'n' is not 1 ({update_result})"
     assert raw_result["nModified"] in [1, 0], f"UpdateResult's 'nModified' is not 1 or 0 ({update_result})"
     assert raw_result["ok"] == 1, f"UpdateResult's 'ok' is not 1 ({update_result})"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Set the time zone of a datetime read from the database, where they are stored in UTC without one.
+
+    :param value: (Optional[datetime]) the datetime.
+    :return: (Optional[datetime]) the datetime in UTC.
+    """
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _parse_metrics_json(metrics: Any) -> Any:
+    """
+    Parse metrics saved as a JSON string, as they were before being saved as documents.
+
+    :param metrics: (Any) the metrics.
+    :return: (Any) the parsed metrics if they are a JSON string, or the metrics unchanged otherwise.
+        An empty string is parsed as None.
+    """
+    if not isinstance(metrics, str):
+        return metrics
+    if metrics == "":
+        return None
+    return json.loads(metrics)
+
+
+def _make_metrics_updates(
+    path: str,
+    previous_metrics: Optional[Dict[str, Any]],
+    metrics: Dict[str, Any],
+    delta: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Make the `$set` updates that write the changes in the top level metrics of a metrics document.
+
+    Each changed top level metric is set under its own path, so the size of the write is proportional
+    to what has changed. The rounds are left out, they are saved in the metrics collection.
+
+    :param path: (str) the path of the metrics document.
+    :param previous_metrics: (Optional[Dict[str, Any]]) the metrics currently in the database.
+    :param metrics: (Dict[str, Any]) the new metrics.
+    :param delta: (Dict[str, Any]) the changes between the two.
+        See `florist.api.monitoring.metrics.make_metrics_delta`.
+    :return: (Dict[str, Any]) the values to be set, by path. Sets the whole document if there are no
+        metrics in the database yet, if metrics have been removed or if any of the changed keys can't
+        be used in a path.
+    """
+    document = {key: value for key, value in metrics.items() if key != "rounds"}
+    if previous_metrics is None:
+        return {path: document}
+
+    if any(key not in metrics for key in previous_metrics):
+        # Metrics are only ever added, but if some have been removed the whole document is replaced
+        return {path: document}
+
+    updates = {}
+    for key, value in delta.items():
+        if key == "rounds":
+            continue
+        if not _is_valid_path_key(key):
+            return {path: document}
+        updates[f"{path}.{key}"] = value
+    return updates
+
+
+def _make_round_metrics(
+    job_id: str,
+    host_type: HostType,
+    host_uuid: Optional[str],
+    delta: Dict[str, Any],
+) -> List[RoundMetrics]:
+    """
+    Make the measurements of the rounds that have changed in the metrics of a job's server or client.
+
+    :param job_id: (str) the job's id.
+    :param host_type: (HostType) the type of host that reported the metrics.
+    :param host_uuid: (Optional[str]) the uuid of the host that reported the metrics.
+    :param delta: (Dict[str, Any]) the changes in the host's metrics.
+        See `florist.api.monitoring.metrics.make_metrics_delta`.
+    :return: (List[RoundMetrics]) the measurements of the changed rounds. Rounds that are not numbered
+        or whose metrics are not a dictionary are logged and left out.
+    """
+    rounds = delta.get("rounds")
+    if not isinstance(rounds, dict):
+        return []
+
+    round_metrics = []
+    for round_key, metrics in rounds.items():
+        if not _is_round_key(round_key) or not isinstance(metrics, dict):
+            LOGGER.warning(f"Ignoring invalid round '{round_key}' in the {host_type.value} metrics of job {job_id}.")
+            continue
+        round_metrics.append(
+            RoundMetrics(
+                job_id=job_id,
+                host_type=host_type,
+                host_uuid=host_uuid,
+                round=int(round_key),
+                metrics=metrics,
+            )
+        )
+    return round_metrics
+
+
+def _merge_round_metrics(job: Union[Job, JobMetrics], round_metrics: List[RoundMetrics]) -> None:
+    """
+    Merge the rounds from the metrics collection into the metrics of a job's server and clients.
+
+    :param job: (Union[Job, JobMetrics]) the job, or its metrics.
+    :param round_metrics: (List[RoundMetrics]) the latest measurement of the job's rounds.
+        See `RoundMetrics.find_latest`.
+    """
+    server_rounds = [r for r in round_metrics if r.host_type == HostType.SERVER]
+    job.server_metrics = _merge_rounds(job.server_metrics, server_rounds)
+
+    for client_info in job.clients_info or []:
+        client_rounds = [
+            r for r in round_metrics if r.host_type == HostType.CLIENT and r.host_uuid == client_info.uuid
+        ]
+        client_info.metrics = _merge_rounds(client_info.metrics, client_rounds)
+
+
+def _merge_rounds(metrics: Optional[Dict[str, Any]], round_metrics: List[RoundMetrics]) -> Optional[Dict[str, Any]]:
+    """
+    Merge rounds into the `rounds` of a host's metrics, as they are reported.
+
+    :param metrics: (Optional[Dict[str, Any]]) the host's metrics.
+    :param round_metrics: (List[RoundMetrics]) the rounds of the host.
+    :return: (Optional[Dict[str, Any]]) a copy of the metrics with the rounds merged in, or the metrics
+        unchanged if there are no rounds.
+    """
+    if len(round_metrics) == 0:
+        return metrics
+
+    rounds = dict((metrics or {}).get("rounds") or {})
+    rounds.update({str(r.round): r.metrics for r in round_metrics})
+    return {**(metrics or {}), "rounds": rounds}
+
+
+def _make_metrics_projection(path: str, rounds: Optional[List[str]], keys: Optional[List[str]]) -> Dict[str, int]:
+    """
+    Make the projection of the requested top level metrics of a metrics document.
+
+    The rounds are not part of the metrics document, they are fetched from the metrics collection.
+
+    :param path: (str) the path of the metrics document.
+    :param rounds: (Optional[List[str]]) the rounds requested.
+    :param keys: (Optional[List[str]]) the top level metrics to be projected.
+    :return: (Dict[str, int]) the projection. Projects the whole document if neither rounds nor keys are given.
+    """
+    if rounds is None and keys is None:
+        return {path: 1}
+
+    return {f"{path}.{key}": 1 for key in keys or [] if key != "rounds"}
+
+
+def _is_valid_path_key(key: Any) -> bool:
+    """
+    Check if a key can be used as part of a MongoDB path.
+
+    :param key: (Any) the key.
+    :return: (bool) True if the key is a non-empty string with no dots that doesn't start with `$`.
+    """
+    return isinstance(key, str) and key != "" and "." not in key and not key.startswith("$")
+
+
+def _is_round_key(key: Any) -> bool:
+    """
+    Check if a key is the number of a round.
+
+    :param key: (Any) the key.
+    :return: (bool) True if the key is an int or a string of decimal digits.
+    """
+    if isinstance(key, str):
+        return key.isascii() and key.isdigit()
+    return isinstance(key, int) and not isinstance(key, bool)
+
+
+async def _find_unused_indexes(collection_name: str, database: AsyncIOMotorDatabase[Any]) -> List[str]:
+    """
+    Find the indexes of a collection that have not been used since the database started.
+
+    :param collection_name: (str) the name of the collection.
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the collection is stored.
+    :return: (List[str]) the names of the unused indexes, or an empty list if the index usage
+        statistics can't be read.
+    """
+    try:
+        index_stats = await database[collection_name].aggregate([{"$indexStats": {}}]).to_list(None)
+    except PyMongoError as e:
+        LOGGER.warning(f"Could not read the index usage statistics of '{collection_name}': {e}")
+        return []
+
+    return [
+        index_stat["name"]
+        for index_stat in index_stats
+        if index_stat["name"] != "_id_" and index_stat["accesses"]["ops"] == 0
+    ]
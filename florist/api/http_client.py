@@ -0,0 +1,51 @@
+"""Shared asynchronous HTTP client for the requests the server makes to the clients."""
+
+import importlib.util
+
+import httpx
+
+
+# Seconds to wait for each HTTP operation (connect, read, write and acquiring a pooled connection)
+HTTP_TIMEOUT_SECONDS = 30.0
+# Seconds to wait to establish a connection
+HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+# Amount of times a request is retried if it fails to connect
+HTTP_CONNECT_RETRIES = 3
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create an asynchronous HTTP client with a connection pool to be shared by the whole app.
+
+    Connections are kept alive and reused between requests, and HTTP/2 is enabled if the `h2` package
+    is installed. Requests that fail to connect are retried up to `HTTP_CONNECT_RETRIES` times. Requests
+    that have already been sent are not retried, as they may not be idempotent.
+
+    :return: (httpx.AsyncClient) the asynchronous HTTP client. Must be closed with `aclose` when no
+        longer needed.
+    """
+    http2 = is_http2_available()
+    transport = httpx.AsyncHTTPTransport(
+        retries=HTTP_CONNECT_RETRIES,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        http2=http2,
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+    )
+
+
+def is_http2_available() -> bool:
+    """
+    Return whether HTTP/2 can be used by the HTTP client.
+
+    :return: (bool) True if the `h2` package required by httpx for HTTP/2 is installed, False otherwise.
+    """
+    return importlib.util.find_spec("h2") is not None
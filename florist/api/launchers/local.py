@@ -14,6 +14,7 @@ from fl4health.servers.base_server import FlServer
 from flwr.common import Scalar
 from flwr.server import ServerConfig
 
+from florist.api.monitoring.config import MetricsConfig
 from florist.api.monitoring.logs import get_server_log_file_path
 from florist.api.monitoring.metrics import RedisMetricsReporter, get_host_and_port_from_address
 from florist.api.servers.strategies import ServerFactory
@@ -165,7 +166,17 @@ def launch_local_server(
     server_uuid = str(uuid.uuid4())
 
     redis_host, redis_port = get_host_and_port_from_address(redis_address)
-    metrics_reporter = RedisMetricsReporter(host=redis_host, port=str(redis_port), run_id=server_uuid)
+    metrics_reporter = RedisMetricsReporter(
+        host=redis_host,
+        port=str(redis_port),
+        run_id=server_uuid,
+        publish_deltas=MetricsConfig.get_publish_deltas(),
+        flush_interval_seconds=MetricsConfig.get_flush_interval_seconds(),
+        flush_every_n_reports=MetricsConfig.get_flush_every_n_reports(),
+        background_flush=MetricsConfig.get_background_flush(),
+        publish_payload=MetricsConfig.get_publish_payload(),
+        use_streams=MetricsConfig.get_use_streams(),
+    )
     server_constructor = server_factory.get_server_constructor(
         model=model,
         n_clients=n_clients,
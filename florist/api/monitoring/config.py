@@ -0,0 +1,112 @@
+"""Metrics reporting configuration parameters."""
+
+import os
+from typing import Optional
+
+
+class MetricsConfig:
+    """Metrics reporting configuration parameters."""
+
+    publish_deltas = False
+    flush_interval_seconds: Optional[float] = None
+    flush_every_n_reports: Optional[int] = None
+    background_flush = False
+    publish_payload = False
+    use_streams = False
+    redis_pool_max_connections = 100
+    redis_health_check_interval = 30
+
+    @classmethod
+    def get_publish_deltas(cls) -> bool:
+        """
+        Return whether metrics reporters should publish only the changed entries (deltas) to Redis.
+
+        :return: (bool) True if reporters should run in delta publishing mode, False otherwise.
+        """
+        return _get_bool_env("METRICS_PUBLISH_DELTAS", cls.publish_deltas)
+
+    @classmethod
+    def get_flush_interval_seconds(cls) -> Optional[float]:
+        """
+        Return the minimum amount of seconds between metrics reporter flushes to Redis.
+
+        :return: (Optional[float]) the amount of seconds, or None if reporters should not batch by time.
+        """
+        if os.getenv("METRICS_FLUSH_INTERVAL_SECONDS"):
+            return float(str(os.getenv("METRICS_FLUSH_INTERVAL_SECONDS")))
+        return cls.flush_interval_seconds
+
+    @classmethod
+    def get_flush_every_n_reports(cls) -> Optional[int]:
+        """
+        Return the amount of reports with changes metrics reporters should batch between flushes to Redis.
+
+        :return: (Optional[int]) the amount of reports, or None if reporters should not batch by count.
+        """
+        if os.getenv("METRICS_FLUSH_EVERY_N_REPORTS"):
+            return int(str(os.getenv("METRICS_FLUSH_EVERY_N_REPORTS")))
+        return cls.flush_every_n_reports
+
+    @classmethod
+    def get_background_flush(cls) -> bool:
+        """
+        Return whether metrics reporters should flush their changes to Redis in a background thread.
+
+        :return: (bool) True if reporters should flush in the background, False if they should flush inline.
+        """
+        return _get_bool_env("METRICS_BACKGROUND_FLUSH", cls.background_flush)
+
+    @classmethod
+    def get_publish_payload(cls) -> bool:
+        """
+        Return whether metrics reporters should publish the whole metrics instead of an "update" message.
+
+        :return: (bool) True if reporters should run in payload publishing mode, False otherwise.
+        """
+        return _get_bool_env("METRICS_PUBLISH_PAYLOAD", cls.publish_payload)
+
+    @classmethod
+    def get_use_streams(cls) -> bool:
+        """
+        Return whether metrics should be sent through Redis Streams instead of pub/sub channels.
+
+        :return: (bool) True if reporters and listeners should use streams, False otherwise.
+        """
+        return _get_bool_env("METRICS_USE_STREAMS", cls.use_streams)
+
+    @classmethod
+    def get_redis_pool_max_connections(cls) -> int:
+        """
+        Return the maximum number of connections of each Redis connection pool.
+
+        :return: (int) the maximum number of connections per pool.
+        """
+        if os.getenv("REDIS_POOL_MAX_CONNECTIONS"):
+            return int(str(os.getenv("REDIS_POOL_MAX_CONNECTIONS")))
+        return cls.redis_pool_max_connections
+
+    @classmethod
+    def get_redis_health_check_interval(cls) -> int:
+        """
+        Return the interval in seconds for health checks of idle pooled Redis connections.
+
+        :return: (int) the health check interval in seconds. If 0, health checks are disabled.
+        """
+        if os.getenv("REDIS_HEALTH_CHECK_INTERVAL"):
+            return int(str(os.getenv("REDIS_HEALTH_CHECK_INTERVAL")))
+        return cls.redis_health_check_interval
+
+
+def _get_bool_env(name: str, default: bool) -> bool:
+    """
+    Return the boolean value of an environment variable.
+
+    :param name: (str) the name of the environment variable.
+    :param default: (bool) the value to return if the environment variable is not set.
+    :return: (bool) True if the variable is set to "1", "true" or "yes" (case insensitive), False if it is set
+        to anything else, and `default` if it is not set.
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.lower() in ["1", "true", "yes"]
@@ -0,0 +1,156 @@
+"""Broadcasting of the jobs' status and metrics updates to the server's event streams."""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+LOGGER = logging.getLogger("uvicorn.error")
+
+# Maximum amount of events waiting to be sent to a subscriber. If a subscriber falls behind by more
+# than that, its pending events are dropped and it is sent a resync event instead
+JOB_EVENTS_QUEUE_SIZE = 1000
+# How long to wait without events before sending a keepalive comment, in seconds
+JOB_EVENTS_KEEPALIVE_SECONDS = 15.0
+JOB_EVENTS_KEEPALIVE = ": keepalive\n\n"
+
+STATUS_EVENT = "status"
+SERVER_METRICS_EVENT = "server_metrics"
+CLIENT_METRICS_EVENT = "client_metrics"
+RESYNC_EVENT = "resync"
+CONNECTED_EVENT = "connected"
+
+
+class JobEventsBroadcaster:
+    """
+    Broadcast the updates of the jobs to the subscribers of the server's event streams.
+
+    Every subscriber has its own queue, so publishing never waits for a slow subscriber.
+    """
+
+    def __init__(self, queue_size: int = JOB_EVENTS_QUEUE_SIZE):
+        """
+        Initialize a JobEventsBroadcaster.
+
+        :param queue_size: (int) the maximum amount of events waiting to be sent to each subscriber.
+        """
+        self.queue_size = queue_size
+        self.subscribers: List[asyncio.Queue[Dict[str, Any]]] = []
+
+    def subscribe(self) -> asyncio.Queue[Dict[str, Any]]:
+        """
+        Subscribe to the events published from now on.
+
+        :return: (asyncio.Queue[Dict[str, Any]]) the queue the events will be put in. It must be
+            unsubscribed with `unsubscribe` when no longer needed.
+        """
+        queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Dict[str, Any]]) -> None:
+        """
+        Stop putting events in a subscriber's queue.
+
+        :param queue: (asyncio.Queue[Dict[str, Any]]) the queue returned by `subscribe`.
+        """
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """
+        Publish an event to all the subscribers.
+
+        :param event: (Dict[str, Any]) the event. Must have a `type` and be JSON serializable.
+        """
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                LOGGER.warning("Job events: subscriber is falling behind, sending a resync event.")
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": RESYNC_EVENT})
+
+    def publish_status(self, job_id: str, status: str) -> None:
+        """
+        Publish the status transition of a job.
+
+        :param job_id: (str) the ID of the job.
+        :param status: (str) the new status of the job.
+        """
+        self.publish({"type": STATUS_EVENT, "job_id": job_id, "status": status})
+
+    def publish_server_metrics(self, job_id: str, delta: Dict[str, Any]) -> None:
+        """
+        Publish the change in the server metrics of a job.
+
+        :param job_id: (str) the ID of the job.
+        :param delta: (Dict[str, Any]) the metrics that changed.
+            See `florist.api.monitoring.metrics.make_metrics_delta`.
+        """
+        if len(delta) > 0:
+            self.publish({"type": SERVER_METRICS_EVENT, "job_id": job_id, "delta": delta})
+
+    def publish_client_metrics(self, job_id: str, client_uuid: str, delta: Dict[str, Any]) -> None:
+        """
+        Publish the change in the metrics of a client of a job.
+
+        :param job_id: (str) the ID of the job.
+        :param client_uuid: (str) the UUID of the client.
+        :param delta: (Dict[str, Any]) the metrics that changed.
+            See `florist.api.monitoring.metrics.make_metrics_delta`.
+        """
+        if len(delta) > 0:
+            self.publish({"type": CLIENT_METRICS_EVENT, "job_id": job_id, "client_uuid": client_uuid, "delta": delta})
+
+
+# Broadcaster of the events of the jobs of this process, published to by the Job entity on every update
+JOB_EVENTS = JobEventsBroadcaster()
+
+
+async def stream_job_events(
+    broadcaster: JobEventsBroadcaster,
+    job_id: Optional[str] = None,
+    keepalive_interval: float = JOB_EVENTS_KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Stream the events published to a broadcaster as server-sent events until the connection is closed.
+
+    Each event is sent with its type as the event name and the event JSON encoded as its data.
+    A `connected` event is sent first, once subscribed, after which no update is missed, so it is
+    safe to fetch the current state of the jobs on receiving it. Comment events are sent to keep
+    the connection alive while there are no events.
+
+    :param broadcaster: (JobEventsBroadcaster) the broadcaster to subscribe to.
+    :param job_id: (Optional[str]) if set, only the events of this job (and resync events) are sent.
+    :param keepalive_interval: (float) how long to wait without events before sending a keepalive, in seconds.
+    :return: (AsyncIterator[str]) the server-sent events.
+    """
+    queue = broadcaster.subscribe()
+    try:
+        yield _make_event({"type": CONNECTED_EVENT})
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=keepalive_interval)
+            except asyncio.TimeoutError:
+                yield JOB_EVENTS_KEEPALIVE
+                continue
+
+            if job_id is not None and event.get("job_id", job_id) != job_id:
+                continue
+
+            yield _make_event(event)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+def _make_event(event: Dict[str, Any]) -> str:
+    """
+    Make a server-sent event from a job event.
+
+    :param event: (Dict[str, Any]) the job event.
+    :return: (str) the server-sent event, named after the job event's type.
+    """
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
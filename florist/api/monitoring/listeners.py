@@ -0,0 +1,391 @@
+"""Asyncio manager for the listeners of the metrics reported to Redis."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import redis.asyncio
+from redis.asyncio.client import PubSub
+from redis.exceptions import ResponseError
+
+from florist.api.monitoring.metrics import (
+    STREAM_NAME_SUFFIX,
+    STREAM_PAYLOAD_FIELD,
+    apply_metrics_delta,
+    decode_metrics_message,
+    get_async_redis_connection,
+    get_host_and_port_from_address,
+    get_stream_name,
+    read_metrics_async,
+)
+
+
+LOGGER = logging.getLogger("uvicorn.error")
+
+# Seconds to wait for a new message before checking if there are still channels to listen to
+READ_MESSAGE_TIMEOUT = 1.0
+
+# Consumer group and consumer reading the metrics streams. The consumer name is fixed so a restarted
+# server picks up the entries it had received but not yet acknowledged before stopping
+STREAM_CONSUMER_GROUP = "florist"
+STREAM_CONSUMER_NAME = "florist-server"
+# Maximum number of entries to read from each stream at a time
+STREAM_READ_COUNT = 100
+# Stream ID to read the entries delivered to the consumer but not yet acknowledged
+STREAM_PENDING_ID = "0"
+# Stream ID to read the entries never delivered to the consumer group
+STREAM_NEW_ID = ">"
+
+MetricsHandler = Callable[..., Awaitable[bool]]
+
+
+class ChannelListener:
+    """Holds the handler and the latest metrics of a channel being listened to."""
+
+    def __init__(self, handler: MetricsHandler, handler_args: Tuple[Any, ...]):
+        """
+        Initialize a ChannelListener.
+
+        :param handler: (MetricsHandler) the coroutine function to be called with the latest metrics.
+        :param handler_args: (Tuple[Any, ...]) the arguments to be passed to the handler before the metrics.
+        """
+        self.handler = handler
+        self.handler_args = handler_args
+        self.metrics: Optional[Dict[str, Any]] = None
+        # Sequence number of the last message received, to detect missed messages
+        self.sequence: Optional[int] = None
+        # ID to read the channel's stream from, in streams mode
+        self.stream_id = STREAM_PENDING_ID
+        # Serializes the updates of the channel so the handler always sees them in order
+        self.lock = asyncio.Lock()
+
+
+class MetricsListenerManager:
+    """
+    Listen to the metrics channels of all running jobs on a single event loop.
+
+    Keeps one asyncio Redis connection and one pub/sub subscriber per Redis address, multiplexing
+    all the channels of that address onto it, and a single reader task per address that dispatches
+    the updates of each channel to its handler.
+
+    In streams mode, the updates are read from the channels' Redis Streams (see `get_stream_name`)
+    with a consumer group instead, so no update is lost while the server is not listening: all the
+    streams of an address are read with a single blocking XREADGROUP call, and entries are only
+    acknowledged after they have been handled.
+    """
+
+    def __init__(self, use_streams: bool = False) -> None:
+        """
+        Initialize a MetricsListenerManager.
+
+        :param use_streams: (bool) whether to read the updates from the channels' Redis Streams
+            instead of subscribing to them. Optional, default is False.
+        """
+        self.use_streams = use_streams
+        self.redis_connections: Dict[str, redis.asyncio.Redis] = {}
+        self.subscribers: Dict[str, PubSub] = {}
+        self.reader_tasks: Dict[str, asyncio.Task[None]] = {}
+        self.listeners: Dict[str, Dict[str, ChannelListener]] = {}
+
+    async def listen(self, redis_address: str, channel: str, handler: MetricsHandler, *handler_args: Any) -> None:
+        """
+        Start listening to the metrics updates of a channel.
+
+        The handler is called as `await handler(*handler_args, metrics)` with the current metrics of the
+        channel every time they change, and should return True once there is no need to listen to more
+        updates (e.g. when the training is finished), at which point the channel is unsubscribed.
+
+        The channel is subscribed to before fetching its current metrics so no updates are missed in between.
+        In streams mode, the stream is read from the start instead, so there is no need to fetch the metrics.
+
+        :param redis_address: (str) the address of the Redis instance the metrics are reported to.
+        :param channel: (str) the channel to listen to, which is also the name the metrics are saved under.
+        :param handler: (MetricsHandler) the coroutine function to be called with the latest metrics.
+        :param handler_args: (Any) the arguments to be passed to the handler before the metrics.
+        """
+        LOGGER.info(f"Listener manager: Start listening to channel {channel} at {redis_address}")
+
+        listener = ChannelListener(handler, handler_args)
+        self.listeners.setdefault(redis_address, {})[channel] = listener
+
+        redis_connection = self.get_redis_connection(redis_address)
+
+        if self.use_streams:
+            await self.create_consumer_group(redis_connection, channel)
+            reader_task = self.reader_tasks.get(redis_address)
+            if reader_task is None or reader_task.done():
+                self.reader_tasks[redis_address] = asyncio.create_task(self.read_streams(redis_address))
+            return
+
+        subscriber = self.subscribers.get(redis_address)
+        if subscriber is None:
+            subscriber = redis_connection.pubsub()
+            self.subscribers[redis_address] = subscriber
+        await subscriber.subscribe(channel)
+
+        reader_task = self.reader_tasks.get(redis_address)
+        if reader_task is None or reader_task.done():
+            self.reader_tasks[redis_address] = asyncio.create_task(self.read_messages(redis_address))
+
+        # check if training has already finished before start listening
+        async with listener.lock:
+            metrics = await read_metrics_async(redis_connection, channel)
+            if metrics is not None:
+                await self.dispatch(redis_address, channel, listener, metrics)
+
+    async def read_messages(self, redis_address: str) -> None:
+        """
+        Read the messages of all the channels subscribed to at a Redis address and dispatch them.
+
+        Runs until there are no more channels being listened to at the address, then closes its subscriber
+        and connection.
+
+        :param redis_address: (str) the address of the Redis instance to read the messages from.
+        """
+        subscriber = self.subscribers[redis_address]
+        while len(self.listeners.get(redis_address, {})) > 0:
+            try:
+                message = await subscriber.get_message(ignore_subscribe_messages=True, timeout=READ_MESSAGE_TIMEOUT)
+                if message is not None and message["type"] == "message":
+                    await self.handle_message(redis_address, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                LOGGER.exception(f"Listener manager: Error reading messages from {redis_address}: {err}")
+                await asyncio.sleep(READ_MESSAGE_TIMEOUT)
+
+        await self.close_address(redis_address)
+
+    async def create_consumer_group(self, redis_connection: redis.asyncio.Redis, channel: str) -> None:
+        """
+        Create the consumer group for the stream of a channel if it does not exist yet.
+
+        New consumer groups read the stream from its first entry.
+
+        :param redis_connection: (redis.asyncio.Redis) the asyncio connection to the Redis instance.
+        :param channel: (str) the channel whose stream should be read.
+        """
+        try:
+            await redis_connection.xgroup_create(
+                get_stream_name(channel),
+                STREAM_CONSUMER_GROUP,
+                id="0",
+                mkstream=True,
+            )
+        except ResponseError as err:
+            if not str(err).startswith("BUSYGROUP"):
+                raise
+
+    async def read_streams(self, redis_address: str) -> None:
+        """
+        Read the entries of the streams of all the channels listened to at a Redis address and dispatch them.
+
+        First reads the entries delivered to this consumer but never acknowledged (e.g. if the server
+        stopped while handling them), then the new ones. Runs until there are no more channels being
+        listened to at the address, then closes its connection.
+
+        :param redis_address: (str) the address of the Redis instance to read the streams from.
+        """
+        redis_connection = self.get_redis_connection(redis_address)
+        while len(self.listeners.get(redis_address, {})) > 0:
+            try:
+                listeners = self.listeners[redis_address]
+                streams = {get_stream_name(channel): listener.stream_id for channel, listener in listeners.items()}
+                response = await redis_connection.xreadgroup(
+                    STREAM_CONSUMER_GROUP,
+                    STREAM_CONSUMER_NAME,
+                    streams,  # type: ignore[arg-type]
+                    count=STREAM_READ_COUNT,
+                    block=int(READ_MESSAGE_TIMEOUT * 1000),
+                )
+                for stream_name, entries in response or []:
+                    await self.handle_stream_entries(redis_address, stream_name, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                LOGGER.exception(f"Listener manager: Error reading streams from {redis_address}: {err}")
+                await asyncio.sleep(READ_MESSAGE_TIMEOUT)
+
+        await self.close_address(redis_address)
+
+    async def handle_stream_entries(
+        self,
+        redis_address: str,
+        stream_name: Union[str, bytes],
+        entries: List[Tuple[bytes, Dict[bytes, bytes]]],
+    ) -> None:
+        """
+        Dispatch the entries read from the stream of a channel and acknowledge them.
+
+        :param redis_address: (str) the address of the Redis instance the entries were read from.
+        :param stream_name: (Union[str, bytes]) the name of the stream the entries were read from.
+        :param entries: (List[Tuple[bytes, Dict[bytes, bytes]]]) the IDs and fields of the entries.
+        """
+        if isinstance(stream_name, bytes):
+            stream_name = stream_name.decode("utf8")
+        channel = stream_name.removesuffix(STREAM_NAME_SUFFIX)
+
+        listener = self.listeners.get(redis_address, {}).get(channel)
+        if listener is None:
+            return
+
+        if len(entries) == 0 and listener.stream_id == STREAM_PENDING_ID:
+            # No more pending entries, start reading the new ones
+            listener.stream_id = STREAM_NEW_ID
+            return
+
+        redis_connection = self.get_redis_connection(redis_address)
+        for entry_id, fields in entries:
+            await self.handle_update(
+                redis_address, channel, listener, {"data": fields.get(STREAM_PAYLOAD_FIELD.encode("utf8"))}
+            )
+            await redis_connection.xack(stream_name, STREAM_CONSUMER_GROUP, entry_id)
+            if channel not in self.listeners.get(redis_address, {}):
+                # stopped listening to the channel while handling the entry
+                return
+
+    async def handle_message(self, redis_address: str, message: Dict[str, Any]) -> None:
+        """
+        Update the metrics of the channel a message was received from and dispatch them to its handler.
+
+        :param redis_address: (str) the address of the Redis instance the message was received from.
+        :param message: (Dict[str, Any]) the message received from the subscriber.
+        """
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf8")
+
+        listener = self.listeners.get(redis_address, {}).get(channel)
+        if listener is None:
+            return
+
+        await self.handle_update(redis_address, channel, listener, message)
+
+    async def handle_update(
+        self,
+        redis_address: str,
+        channel: str,
+        listener: ChannelListener,
+        message: Dict[str, Any],
+    ) -> None:
+        """
+        Update the metrics of a channel with a message and dispatch them to its handler.
+
+        :param redis_address: (str) the address of the Redis instance the message was received from.
+        :param channel: (str) the channel the message belongs to.
+        :param listener: (ChannelListener) the listener of the channel.
+        :param message: (Dict[str, Any]) the message with the update, with its payload under "data".
+        """
+        async with listener.lock:
+            payload = decode_metrics_message(message) or {}
+            sequence = payload.get("sequence")
+            missed_messages = (
+                isinstance(sequence, int) and listener.sequence is not None and sequence != listener.sequence + 1
+            )
+            listener.sequence = sequence if isinstance(sequence, int) else None
+
+            # Use the metrics or apply the delta carried by the message if there is one. Otherwise,
+            # or if a message was missed and the delta can't be applied, fetch the full metrics
+            metrics: Optional[Dict[str, Any]]
+            if isinstance(payload.get("metrics"), dict):
+                metrics = payload["metrics"]
+            elif isinstance(payload.get("delta"), dict) and listener.metrics is not None and not missed_messages:
+                metrics = apply_metrics_delta(listener.metrics, payload["delta"])
+            else:
+                if missed_messages:
+                    LOGGER.info(f"Listener manager: Missed messages on channel {channel}, fetching the metrics.")
+                metrics = await read_metrics_async(self.get_redis_connection(redis_address), channel)
+
+            if metrics is not None:
+                await self.dispatch(redis_address, channel, listener, metrics)
+
+    async def dispatch(
+        self,
+        redis_address: str,
+        channel: str,
+        listener: ChannelListener,
+        metrics: Dict[str, Any],
+    ) -> None:
+        """
+        Call the handler of a channel with its latest metrics and stop listening to it if it is done.
+
+        :param redis_address: (str) the address of the Redis instance of the channel.
+        :param channel: (str) the channel the metrics belong to.
+        :param listener: (ChannelListener) the listener of the channel.
+        :param metrics: (Dict[str, Any]) the latest metrics of the channel.
+        """
+        listener.metrics = metrics
+        try:
+            finished = await listener.handler(*listener.handler_args, metrics)
+        except Exception as err:
+            LOGGER.exception(f"Listener manager: Error handling metrics of channel {channel}: {err}")
+            return
+
+        if finished:
+            await self.stop_listening(redis_address, channel)
+
+    async def stop_listening(self, redis_address: str, channel: str) -> None:
+        """
+        Stop listening to a channel.
+
+        In streams mode, the channel's stream is deleted along with its consumer group, so finished
+        runs don't keep their entries in Redis.
+
+        :param redis_address: (str) the address of the Redis instance of the channel.
+        :param channel: (str) the channel to stop listening to.
+        """
+        LOGGER.info(f"Listener manager: Stop listening to channel {channel} at {redis_address}")
+        self.listeners.get(redis_address, {}).pop(channel, None)
+        subscriber = self.subscribers.get(redis_address)
+        if subscriber is not None:
+            await subscriber.unsubscribe(channel)
+
+        if self.use_streams:
+            try:
+                await self.get_redis_connection(redis_address).delete(get_stream_name(channel))
+            except Exception as err:
+                LOGGER.warning(f"Listener manager: Could not delete the stream of channel {channel}: {err}")
+
+    def get_redis_connection(self, redis_address: str) -> redis.asyncio.Redis:
+        """
+        Return the asyncio Redis connection for an address, creating it if it does not exist yet.
+
+        The connection is backed by the shared asyncio connection pool of the address, which is closed
+        with `close_async_connection_pools`.
+
+        :param redis_address: (str) the address of the Redis instance.
+        :return: (redis.asyncio.Redis) the asyncio connection to the Redis instance.
+        """
+        redis_connection = self.redis_connections.get(redis_address)
+        if redis_connection is None:
+            redis_host, redis_port = get_host_and_port_from_address(redis_address)
+            redis_connection = get_async_redis_connection(redis_host, redis_port)
+            self.redis_connections[redis_address] = redis_connection
+        return redis_connection
+
+    async def close_address(self, redis_address: str) -> None:
+        """
+        Close the subscriber and connection of a Redis address.
+
+        :param redis_address: (str) the address of the Redis instance.
+        """
+        # Removing everything before awaiting so a concurrent `listen` starts from scratch
+        subscriber = self.subscribers.pop(redis_address, None)
+        redis_connection = self.redis_connections.pop(redis_address, None)
+        self.reader_tasks.pop(redis_address, None)
+        self.listeners.pop(redis_address, None)
+
+        if subscriber is not None:
+            await subscriber.aclose()  # type: ignore[no-untyped-call]
+        if redis_connection is not None:
+            await redis_connection.aclose()
+
+    async def close(self) -> None:
+        """Stop listening to all the channels and close all the subscribers and connections."""
+        reader_tasks = list(self.reader_tasks.values())
+        for reader_task in reader_tasks:
+            reader_task.cancel()
+        await asyncio.gather(*reader_tasks, return_exceptions=True)
+
+        for redis_address in list(self.redis_connections.keys()):
+            await self.close_address(redis_address)
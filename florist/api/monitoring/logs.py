@@ -1,11 +1,55 @@
 """General functions and definitions for monitoring."""
 
+import asyncio
+import json
+import os
+import time
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from fastapi.responses import StreamingResponse
 
 
 CLIENT_LOG_FOLDER = Path("logs/client/")
 SERVER_LOG_FOLDER = Path("logs/server/")
 
+# Size of the chunks log files are streamed in
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Response headers describing which part of the log file has been returned
+LOG_OFFSET_HEADER = "X-Log-Offset"
+LOG_NEXT_OFFSET_HEADER = "X-Log-Next-Offset"
+LOG_SIZE_HEADER = "X-Log-Size"
+LOG_RANGE_HEADERS = [LOG_OFFSET_HEADER, LOG_NEXT_OFFSET_HEADER, LOG_SIZE_HEADER]
+
+# How often to check log files for new content while tailing them, in seconds
+LOG_TAIL_POLL_INTERVAL_SECONDS = 1.0
+# How long to wait without new content before sending a keepalive comment while tailing a log file, in seconds
+LOG_TAIL_KEEPALIVE_SECONDS = 15.0
+LOG_TAIL_KEEPALIVE_EVENT = ": keepalive\n\n"
+LOG_TAIL_END_EVENT = "event: end\ndata: \n\n"
+
+
+class LogFileRange(NamedTuple):
+    """Define a range of bytes of a log file."""
+
+    start: int
+    end: int
+    size: int
+
+    def headers(self) -> Dict[str, str]:
+        """
+        Make the response headers describing this range.
+
+        :return: (Dict[str, str]) the byte offset the range starts at, the byte offset to request next
+            to tail the file and the size of the file at the time the range was calculated.
+        """
+        return {
+            LOG_OFFSET_HEADER: str(self.start),
+            LOG_NEXT_OFFSET_HEADER: str(self.end),
+            LOG_SIZE_HEADER: str(self.size),
+        }
+
 
 def get_client_log_file_path(client_uuid: str) -> Path:
     """
@@ -31,3 +75,205 @@ def get_server_log_file_path(server_uuid: str) -> Path:
     """
     SERVER_LOG_FOLDER.mkdir(parents=True, exist_ok=True)
     return SERVER_LOG_FOLDER / f"{server_uuid}.out"
+
+
+async def read_log_file(log_file_path: str) -> str:
+    """
+    Read the contents of a log file in a worker thread so it does not block the event loop.
+
+    :param log_file_path: (str) the path to the log file.
+    :return: (str) the contents of the log file.
+    """
+    return await asyncio.to_thread(_read_file, log_file_path)
+
+
+def _read_file(file_path: str) -> str:
+    """
+    Read the contents of a file.
+
+    :param file_path: (str) the path to the file.
+    :return: (str) the contents of the file.
+    """
+    with open(file_path, "r") as f:
+        return f.read()
+
+
+def get_log_file_range(log_file_path: str, offset: int = 0, length: Optional[int] = None) -> LogFileRange:
+    """
+    Calculate the range of bytes of a log file to be returned.
+
+    :param log_file_path: (str) the path to the log file.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file,
+        so -1000 returns the last 1000 bytes. Offsets past the end of the file return an empty range.
+    :param length: (Optional[int]) the maximum number of bytes to return. If None, returns up to the end of the file.
+    :return: (LogFileRange) the range of bytes to be returned.
+    :raise AssertionError: if the length is negative.
+    """
+    assert length is None or length >= 0, f"Length must be a positive integer, got {length}"
+
+    size = os.path.getsize(log_file_path)
+    start = max(size + offset, 0) if offset < 0 else min(offset, size)
+    end = size if length is None else min(start + length, size)
+    return LogFileRange(start=start, end=end, size=size)
+
+
+async def stream_log_file(
+    log_file_path: str,
+    log_file_range: LogFileRange,
+    chunk_size: int = LOG_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a range of bytes of a log file in chunks, reading them in a worker thread.
+
+    Content appended to the file after the range has been calculated is not returned, so it can be
+    fetched from `log_file_range.end` on the next request.
+
+    :param log_file_path: (str) the path to the log file.
+    :param log_file_range: (LogFileRange) the range of bytes to stream.
+    :param chunk_size: (int) the maximum size of each chunk, in bytes.
+    :return: (AsyncIterator[bytes]) the chunks of the log file.
+    """
+    with open(log_file_path, "rb") as f:
+        f.seek(log_file_range.start)
+        remaining = log_file_range.end - log_file_range.start
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def make_log_range_response(log_file_path: str, offset: int = 0, length: Optional[int] = None) -> StreamingResponse:
+    """
+    Make a response streaming a range of bytes of a log file.
+
+    :param log_file_path: (str) the path to the log file.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param length: (Optional[int]) the maximum number of bytes to return. If None, returns up to the end of the file.
+    :return: (StreamingResponse) the response streaming the log file contents as plain text, with the
+        range returned described in the `X-Log-Offset`, `X-Log-Next-Offset` and `X-Log-Size` headers.
+    :raise AssertionError: if the length is negative.
+    """
+    log_file_range = get_log_file_range(log_file_path, offset, length)
+    return StreamingResponse(
+        stream_log_file(log_file_path, log_file_range),
+        media_type="text/plain",
+        headers=log_file_range.headers(),
+    )
+
+
+async def tail_log_file(
+    log_file_path: str,
+    offset: int = 0,
+    is_finished: Optional[Callable[[], Awaitable[bool]]] = None,
+    poll_interval: float = LOG_TAIL_POLL_INTERVAL_SECONDS,
+    keepalive_interval: float = LOG_TAIL_KEEPALIVE_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Tail a log file, yielding the lines appended to it as server-sent events.
+
+    The file is polled for new content every `poll_interval` seconds. Complete lines are sent in `log`
+    events, with their text JSON encoded in the event data and the byte offset right after them as the
+    event id, so a dropped connection can resume from the `Last-Event-ID` header. Comment events
+    are sent to keep the connection alive while there is no new content.
+
+    :param log_file_path: (str) the path to the log file.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param is_finished: (Optional[Callable[[], Awaitable[bool]]]) called when there is no new content to
+        check if the log file will not be written to anymore. When it returns True, the rest of the file is
+        sent followed by an `end` event. If None, tails the file until the connection is closed.
+    :param poll_interval: (float) how often to check the file for new content, in seconds.
+    :param keepalive_interval: (float) how long to wait without new content before sending a keepalive, in seconds.
+    :return: (AsyncIterator[str]) the server-sent events.
+    """
+    log_file_range = await asyncio.to_thread(get_log_file_range, log_file_path, offset)
+    offset = log_file_range.start
+    buffer = b""
+    finished = False
+    last_event_time = time.monotonic()
+
+    while True:
+        log_file_range = await asyncio.to_thread(get_log_file_range, log_file_path, offset + len(buffer))
+        if log_file_range.size < offset + len(buffer):
+            # the file has been truncated, starting over
+            offset = 0
+            buffer = b""
+            continue
+
+        has_new_content = log_file_range.end > log_file_range.start
+        async for chunk in stream_log_file(log_file_path, log_file_range):
+            buffer += chunk
+            line_end = buffer.rfind(b"\n") + 1
+            if line_end == 0 and len(buffer) >= LOG_CHUNK_SIZE:
+                # lines too long to be buffered are sent in parts
+                line_end = len(buffer)
+            if line_end > 0:
+                offset += line_end
+                yield _make_log_event(buffer[:line_end], offset)
+                buffer = buffer[line_end:]
+                last_event_time = time.monotonic()
+
+        if finished:
+            if len(buffer) > 0:
+                yield _make_log_event(buffer, offset + len(buffer))
+            yield LOG_TAIL_END_EVENT
+            return
+
+        if not has_new_content:
+            # checking after reading so the content written before it finished is sent on the next iteration
+            finished = is_finished is not None and await is_finished()
+            if not finished:
+                if time.monotonic() - last_event_time >= keepalive_interval:
+                    yield LOG_TAIL_KEEPALIVE_EVENT
+                    last_event_time = time.monotonic()
+                await asyncio.sleep(poll_interval)
+
+
+def _make_log_event(content: bytes, next_offset: int) -> str:
+    """
+    Make a server-sent event with lines of a log file.
+
+    :param content: (bytes) the lines of the log file.
+    :param next_offset: (int) the byte offset right after the lines, used as the event id.
+    :return: (str) the server-sent event.
+    """
+    data = json.dumps(content.decode("utf-8", errors="replace"))
+    return f"id: {next_offset}\nevent: log\ndata: {data}\n\n"
+
+
+def make_log_tail_response(
+    log_file_path: str,
+    offset: int = 0,
+    is_finished: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> StreamingResponse:
+    """
+    Make a response tailing a log file as server-sent events.
+
+    :param log_file_path: (str) the path to the log file.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param is_finished: (Optional[Callable[[], Awaitable[bool]]]) called to check if the log file will not be
+        written to anymore. See `tail_log_file`.
+    :return: (StreamingResponse) the response streaming the server-sent events.
+    """
+    return StreamingResponse(
+        tail_log_file(log_file_path, offset, is_finished),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def get_log_tail_offset(offset: int, last_event_id: Optional[str]) -> int:
+    """
+    Return the byte offset to start tailing a log file from.
+
+    :param offset: (int) the byte offset requested.
+    :param last_event_id: (Optional[str]) the value of the `Last-Event-ID` header, sent when resuming a
+        dropped connection. Takes precedence over `offset` if it is set.
+    :return: (int) the byte offset to start tailing from.
+    :raise AssertionError: if the `Last-Event-ID` header is not a valid offset.
+    """
+    if last_event_id is None or last_event_id == "":
+        return offset
+    assert last_event_id.isdigit(), f"Invalid Last-Event-ID header: '{last_event_id}'"
+    return int(last_event_id)
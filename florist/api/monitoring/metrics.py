@@ -1,17 +1,44 @@
 """Classes for the instrumentation of metrics reporting from clients and servers."""
 
+import asyncio
 import datetime
 import json
+import threading
 import time
 import urllib
 import uuid
-from logging import DEBUG, Logger
-from typing import Any, Dict, Optional
+from logging import DEBUG, ERROR, Logger
+from typing import Any, Dict, Optional, Set, Tuple, Union
 
 import redis
+import redis.asyncio
 from fl4health.reporting.base_reporter import BaseReporter
 from flwr.common.logger import log
-from redis.client import PubSub
+from redis.client import Pipeline
+from redis.exceptions import ResponseError
+
+from florist.api.monitoring.config import MetricsConfig
+
+
+UPDATE_MESSAGE = "update"
+ROUND_FIELD_PREFIX = "rounds."
+# Metrics that mark the milestones of a run, which are always flushed immediately
+FLUSH_IMMEDIATELY_METRICS = ["fit_start", "fit_end", "shutdown"]
+FLUSH_MAX_RETRIES = 5
+FLUSH_RETRY_BACKOFF_SECONDS = 0.5
+# Suffix of the name of the Redis Stream of a run, in streams mode
+STREAM_NAME_SUFFIX = ":stream"
+# Field of the stream entries holding the message payload
+STREAM_PAYLOAD_FIELD = "payload"
+# Approximate maximum amount of entries kept in each stream
+STREAM_MAX_LENGTH = 10000
+
+# Process-wide registry of Redis connection pools, keyed by (host, port)
+CONNECTION_POOLS: Dict[Tuple[str, int], redis.ConnectionPool] = {}
+CONNECTION_POOLS_LOCK = threading.Lock()
+# Registry of asyncio Redis connection pools, keyed by (host, port). Asyncio connections are bound to
+# the event loop they were created in, so these must only be used from the app's event loop.
+ASYNC_CONNECTION_POOLS: Dict[Tuple[str, int], redis.asyncio.ConnectionPool] = {}
 
 
 class DateTimeEncoder(json.JSONEncoder):
@@ -33,9 +60,50 @@ class RedisMetricsReporter(BaseReporter):  # type: ignore
     Save the metrics to a Redis instance while it records them.
 
     Lazily instantiates a Redis connection when the first metrics are recorded.
+
+    By default, the whole metrics dictionary is saved as a JSON string under the run_id key and
+    an "update" message is published to the run_id channel. In delta publishing mode, the metrics are
+    saved as a Redis hash under the run_id key instead, with one field per top level metric and one field
+    per round (prefixed with `ROUND_FIELD_PREFIX`), and only the fields that changed since the last dump
+    are written. The changed entries are also published to the run_id channel as a JSON string in the
+    format `{"delta": <changed metrics>, "sequence": <sequence number>}` so listeners can apply them
+    with `apply_metrics_delta`.
+
+    In payload publishing mode (only relevant when not in delta publishing mode), the message published
+    to the run_id channel carries the whole metrics instead of "update", in the format
+    `{"metrics": <metrics>, "sequence": <sequence number>}`, so listeners don't need to fetch them.
+
+    The sequence number in the published messages increases by one on every dump, so listeners can detect
+    messages they have missed and fetch the full metrics only in that case.
+
+    In streams mode, instead of being published to the run_id channel, the messages are appended to the
+    run's Redis Stream (see `get_stream_name`), so listeners can read every update in order even if they
+    were not listening at the moment it was reported. The messages always carry a payload in this mode.
+
+    Changes to the metrics are tracked locally, so reports that don't change anything (e.g. the ones
+    made every epoch or step) don't make any requests to Redis. Changes can also be batched by setting
+    a time window and/or a maximum number of changed reports between flushes. Reports containing any
+    of the `FLUSH_IMMEDIATELY_METRICS` and the reporter's shutdown always flush the pending changes.
+
+    In background flush mode, the changes are flushed to Redis by a background thread instead of inline
+    in the report calls. The background thread coalesces all the changes pending by the time it runs
+    into a single dump and retries failed dumps with exponential backoff. Reports containing any of the
+    `FLUSH_IMMEDIATELY_METRICS` and the reporter's shutdown still flush synchronously so those are
+    always in Redis by the time the report or shutdown call returns.
     """
 
-    def __init__(self, host: str, port: str, run_id: Optional[str] = None):
+    def __init__(
+        self,
+        host: str,
+        port: str,
+        run_id: Optional[str] = None,
+        publish_deltas: bool = False,
+        flush_interval_seconds: Optional[float] = None,
+        flush_every_n_reports: Optional[int] = None,
+        background_flush: bool = False,
+        publish_payload: bool = False,
+        use_streams: bool = False,
+    ):
         """
         Init an instance of RedisMetricsReporter.
 
@@ -43,14 +111,75 @@ class RedisMetricsReporter(BaseReporter):  # type: ignore
         :param port: (str) The port where the Redis instance is running on the host.
         :param run_id: (Optional[str]) the identifier for the run which these metrics are from.
             It will be used as the name of the object in Redis. Optional, default is a random UUID.
+        :param publish_deltas: (bool) whether to save and publish only the metrics entries that have changed
+            since the last dump. Optional, default is False.
+        :param flush_interval_seconds: (Optional[float]) if set, changes will only be flushed to Redis if
+            this amount of seconds have passed since the last flush. Optional, default is None.
+        :param flush_every_n_reports: (Optional[int]) if set, changes will only be flushed to Redis after
+            this amount of reports with changes. Optional, default is None. If both this and
+            `flush_interval_seconds` are set, changes are flushed when either of them is reached.
+        :param background_flush: (bool) whether to flush the changes to Redis in a background thread.
+            Optional, default is False.
+        :param publish_payload: (bool) whether to publish the whole metrics to the run_id channel instead
+            of an "update" message. Ignored in delta publishing mode, where the changes are always published.
+            Optional, default is False.
+        :param use_streams: (bool) whether to append the messages to the run's Redis Stream instead of
+            publishing them to the run_id channel. Optional, default is False.
         """
         self.host = host
         self.port = port
         self.run_id = run_id
+        self.publish_deltas = publish_deltas
+        self.flush_interval_seconds = flush_interval_seconds
+        self.flush_every_n_reports = flush_every_n_reports
+        self.background_flush = background_flush
+        self.publish_payload = publish_payload
+        self.use_streams = use_streams
         self.initialized = False
 
         self.redis_connection: Optional[redis.Redis] = None
         self.metrics: Dict[str, Any] = {}
+        self.changed_keys: Set[str] = set()
+        self.changed_rounds: Set[int] = set()
+        self.reports_since_flush = 0
+        self.last_flush_time = time.monotonic()
+        self.sequence = 0
+
+        self.init_flush_state()
+
+    def init_flush_state(self) -> None:
+        """Initialize the locks and the state of the background flusher thread."""
+        # Guards the metrics and the changes tracking
+        self.metrics_lock = threading.Lock()
+        # Serializes the dumps so they reach Redis in the same order they were taken
+        self.dump_lock = threading.Lock()
+        self.flush_event = threading.Event()
+        self.flusher_thread: Optional[threading.Thread] = None
+        self.stop_flusher = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Return the state of this instance to be pickled.
+
+        Locks, threads and connections can't be pickled, so they are removed from the state
+        and re-created when it is unpickled (e.g. when the reporter is sent to a spawned process).
+
+        :return: (Dict[str, Any]) the state of this instance.
+        """
+        state = self.__dict__.copy()
+        for attribute in ["metrics_lock", "dump_lock", "flush_event", "flusher_thread", "stop_flusher"]:
+            del state[attribute]
+        state["redis_connection"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the state of this instance after being unpickled.
+
+        :param state: (Dict[str, Any]) the state of the instance as returned by `__getstate__`.
+        """
+        self.__dict__.update(state)
+        self.init_flush_state()
 
     def initialize(self, **kwargs: Any) -> None:
         """
@@ -92,46 +221,258 @@ class RedisMetricsReporter(BaseReporter):  # type: ignore
         if not self.initialized:
             self.initialize()
 
-        if round is None:  # Reports outside of a fit round
-            self.metrics.update(data)
         # Ensure we don't report for each epoch or step
-        elif epoch is None and step is None:
-            if "rounds" not in self.metrics:
-                self.metrics["rounds"] = {}
-            if round not in self.metrics["rounds"]:
-                self.metrics["rounds"][round] = {}
+        if round is not None and (epoch is not None or step is not None):
+            return
+
+        with self.metrics_lock:
+            if not self.record(data, round):
+                # Nothing to flush, also not logging here to avoid spamming the logs
+                return
+
+            self.reports_since_flush += 1
+            should_flush = self.should_flush(data)
+
+        if not should_flush:
+            return
+
+        if not self.background_flush:
+            self.dump()
+        elif any(metric in data for metric in FLUSH_IMMEDIATELY_METRICS):
+            self.dump_with_retries()
+        else:
+            self.start_flusher()
+            self.flush_event.set()
 
-            self.metrics["rounds"][round].update(data)
+    def record(self, data: Dict[str, Any], round: Optional[int]) -> bool:  # noqa: A002
+        """
+        Record the data into the metrics, keeping track of what has changed.
+
+        :param data: (Dict[str, Any]) the data to record.
+        :param round: (Optional[int]) the FL round the data is from, or None if it's from outside of a round.
+        :return: (bool) True if the metrics have changed, False otherwise.
+        """
+        changed = False
+        if round is None:  # Reports outside of a fit round
+            for key, value in data.items():
+                if key not in self.metrics or self.metrics[key] != value:
+                    self.metrics[key] = value
+                    self.changed_keys.add(key)
+                    changed = True
+            return changed
+
+        if "rounds" not in self.metrics:
+            self.metrics["rounds"] = {}
+        if round not in self.metrics["rounds"]:
+            self.metrics["rounds"][round] = {}
+            changed = True
+
+        round_metrics = self.metrics["rounds"][round]
+        for key, value in data.items():
+            if key not in round_metrics or round_metrics[key] != value:
+                round_metrics[key] = value
+                changed = True
+        if changed:
+            self.changed_rounds.add(round)
+        return changed
+
+    def shutdown(self) -> None:
+        """Flush any pending changes to Redis on shutdown, stopping the background flusher if it is running."""
+        if self.flusher_thread is not None:
+            self.stop_flusher = True
+            self.flush_event.set()
+            self.flusher_thread.join()
+            self.flusher_thread = None
+
+        if self.is_dirty():
+            if self.background_flush:
+                self.dump_with_retries()
+            else:
+                self.dump()
+
+    def is_dirty(self) -> bool:
+        """
+        Return whether the metrics have changed since the last dump.
 
-        self.dump()
+        :return: (bool) True if there are changes that have not been dumped to Redis yet, False otherwise.
+        """
+        return len(self.changed_keys) > 0 or len(self.changed_rounds) > 0
+
+    def should_flush(self, data: Dict[str, Any]) -> bool:
+        """
+        Return whether the pending changes should be flushed to Redis after reporting the given data.
+
+        :param data: (Dict[str, Any]) the data that has just been reported.
+        :return: (bool) True if the changes should be dumped to Redis now, False if they should wait for
+            the batching window.
+        """
+        if not self.is_dirty():
+            return False
+        if any(metric in data for metric in FLUSH_IMMEDIATELY_METRICS):
+            return True
+        if self.flush_interval_seconds is None and self.flush_every_n_reports is None:
+            return True
+        if self.flush_every_n_reports is not None and self.reports_since_flush >= self.flush_every_n_reports:
+            return True
+        return (
+            self.flush_interval_seconds is not None
+            and time.monotonic() - self.last_flush_time >= self.flush_interval_seconds
+        )
+
+    def start_flusher(self) -> None:
+        """Start the background flusher thread if it's not running yet."""
+        if self.flusher_thread is not None:
+            return
+        self.stop_flusher = False
+        self.flusher_thread = threading.Thread(target=self.run_flusher, daemon=True)
+        self.flusher_thread.start()
+
+    def run_flusher(self) -> None:
+        """
+        Run the background flusher loop.
+
+        Waits to be notified of pending changes and dumps all of them at once, until it is stopped.
+        """
+        while True:
+            self.flush_event.wait()
+            self.flush_event.clear()
+            if self.stop_flusher:
+                return
+            if self.is_dirty():
+                try:
+                    self.dump_with_retries()
+                except Exception as err:
+                    # The changes are kept as pending, so they will be retried on the next flush
+                    log(ERROR, f"Failed to flush metrics to redis at key '{self.run_id}': {err}")
+
+    def dump_with_retries(self) -> None:
+        """
+        Dump the current metrics to Redis, retrying with exponential backoff if it fails.
+
+        :raises Exception: the last exception raised by the dump if it fails after `FLUSH_MAX_RETRIES` retries.
+        """
+        retry = 0
+        while True:
+            try:
+                self.dump()
+                return
+            except Exception as err:
+                if retry >= FLUSH_MAX_RETRIES:
+                    raise
+                seconds_to_sleep = FLUSH_RETRY_BACKOFF_SECONDS * (2**retry)
+                log(DEBUG, f"Failed to dump metrics to redis ({err}), retrying in {seconds_to_sleep}s.")
+                time.sleep(seconds_to_sleep)
+                retry += 1
 
     def dump(self) -> None:
         """
         Dump the current metrics to Redis under the run_id name.
 
         Will instantiate a Redis connection if it's the first time it runs for this instance.
+        If the dump fails, the changes are kept as pending so they can be dumped again.
+        """
+        with self.dump_lock:
+            if self.redis_connection is None:
+                self.redis_connection = get_redis_connection(self.host, self.port)
+
+            assert self.run_id is not None, "Run ID is None, ensure reporter is initialized prior to dumping metrics."
+
+            with self.metrics_lock:
+                changed_keys = set(self.changed_keys)
+                changed_rounds = set(self.changed_rounds)
+                # A failed dump still consumes its sequence number so listeners see the gap
+                self.sequence += 1
+                sequence = self.sequence
+                if self.publish_deltas:
+                    delta = self.get_delta()
+                else:
+                    encoded_metrics = json.dumps(self.metrics, cls=DateTimeEncoder)
+                self.changed_keys.clear()
+                self.changed_rounds.clear()
+                self.reports_since_flush = 0
+                self.last_flush_time = time.monotonic()
+
+            try:
+                if self.publish_deltas:
+                    self.dump_delta(delta, sequence)
+                else:
+                    log(DEBUG, f"Dumping metrics to redis at key '{self.run_id}': {encoded_metrics}")
+                    self.redis_connection.set(self.run_id, encoded_metrics)
+                    if self.publish_payload or self.use_streams:
+                        # Wrapping the already encoded metrics instead of encoding them again
+                        message = f'{{"metrics": {encoded_metrics}, "sequence": {sequence}}}'
+                    else:
+                        message = UPDATE_MESSAGE
+                    self.notify(self.redis_connection, message)
+            except Exception:
+                with self.metrics_lock:
+                    self.changed_keys.update(changed_keys)
+                    self.changed_rounds.update(changed_rounds)
+                raise
+
+    def dump_delta(self, delta: Dict[str, Any], sequence: Optional[int] = None) -> None:
+        """
+        Dump the given metrics delta to Redis under the run_id name.
+
+        The changed entries are written as fields of the hash under the run_id key and published as a delta
+        to the run_id channel in a single pipelined request. Does nothing if the delta is empty.
+
+        :param delta: (Dict[str, Any]) the metrics delta, as returned by `get_delta`.
+        :param sequence: (Optional[int]) the sequence number of this dump, to be published with the delta.
         """
-        if self.redis_connection is None:
-            self.redis_connection = redis.Redis(host=self.host, port=self.port)
+        assert self.redis_connection is not None, "Redis connection is None."
+        assert self.run_id is not None, "Run ID is None, ensure reporter is initialized prior to dumping metrics."
+
+        if len(delta) == 0:
+            return
+
+        fields = {key: json.dumps(value, cls=DateTimeEncoder) for key, value in delta.items() if key != "rounds"}
+        for round_key, round_metrics in delta.get("rounds", {}).items():
+            fields[f"{ROUND_FIELD_PREFIX}{round_key}"] = json.dumps(round_metrics, cls=DateTimeEncoder)
+
+        encoded_delta = json.dumps({"delta": delta, "sequence": sequence}, cls=DateTimeEncoder)
+        log(DEBUG, f"Dumping metrics delta to redis at key '{self.run_id}' and notifying channel: {encoded_delta}")
+        pipeline = self.redis_connection.pipeline()
+        pipeline.hset(self.run_id, mapping=fields)
+        self.notify(pipeline, encoded_delta)
+        pipeline.execute()
 
+    def notify(self, redis_client: Union[redis.Redis, Pipeline], message: str) -> None:
+        """
+        Notify the listeners of the run with a message.
+
+        Publishes the message to the run_id channel or, in streams mode, appends it to the run's stream.
+
+        :param redis_client: (Union[redis.Redis, redis.client.Pipeline]) the connection or pipeline to use.
+        :param message: (str) the message to notify the listeners with.
+        """
         assert self.run_id is not None, "Run ID is None, ensure reporter is initialized prior to dumping metrics."
 
-        encoded_metrics = json.dumps(self.metrics, cls=DateTimeEncoder)
+        if self.use_streams:
+            log(DEBUG, f"Appending to redis stream '{get_stream_name(self.run_id)}'")
+            redis_client.xadd(
+                get_stream_name(self.run_id),
+                {STREAM_PAYLOAD_FIELD: message},
+                maxlen=STREAM_MAX_LENGTH,
+                approximate=True,
+            )
+        else:
+            log(DEBUG, f"Notifying redis channel '{self.run_id}'")
+            redis_client.publish(self.run_id, message)
 
-        previous_metrics_blob = self.redis_connection.get(self.run_id)
-        if previous_metrics_blob is not None and isinstance(previous_metrics_blob, bytes):
-            previous_metrics = json.loads(previous_metrics_blob)
-            current_metrics = json.loads(encoded_metrics)
-            if current_metrics == previous_metrics:
-                # Skipping dumping here because previous metrics are the same as current metrics.
-                # This is necessary in this class because we are calling dump within the report method,
-                # which is called for every input of the model. Also not logging here to avoid spamming the logs.
-                return
+    def get_delta(self) -> Dict[str, Any]:
+        """
+        Return the metrics entries that changed since the last dump.
 
-        log(DEBUG, f"Dumping metrics to redis at key '{self.run_id}': {encoded_metrics}")
-        self.redis_connection.set(self.run_id, encoded_metrics)
-        log(DEBUG, f"Notifying redis channel '{self.run_id}'")
-        self.redis_connection.publish(self.run_id, "update")
+        The rounds are copied so they can be serialized safely while the reporter keeps recording metrics.
+
+        :return: (Dict[str, Any]) a dictionary in the same format as the metrics, containing only the
+            top level metrics and the rounds that have changed. Changed rounds are returned in full.
+        """
+        delta = {key: self.metrics[key] for key in self.changed_keys if key != "rounds"}
+        if len(self.changed_rounds) > 0:
+            delta["rounds"] = {str(r): dict(self.metrics["rounds"][r]) for r in self.changed_rounds}
+        return delta
 
     def __eq__(self, other: object) -> bool:
         """
@@ -163,6 +504,82 @@ class RedisMetricsReporter(BaseReporter):  # type: ignore
         return hash(str(self.host) + str(self.port) + str(self.run_id))
 
 
+def get_redis_connection(host: str, port: Union[str, int]) -> redis.Redis:
+    """
+    Return a Redis client backed by the shared connection pool for the given address.
+
+    The connection pools are created on first use and shared by the whole process, so
+    connections are reused across calls instead of being opened for every request.
+
+    :param host: (str) the host of the redis instance.
+    :param port: (Union[str, int]) the port of the redis instance.
+    :return: (redis.Redis) a Redis client using the pool for the given address.
+    """
+    key = (host, int(port))
+    with CONNECTION_POOLS_LOCK:
+        connection_pool = CONNECTION_POOLS.get(key)
+        if connection_pool is None:
+            connection_pool = redis.ConnectionPool(
+                host=key[0],
+                port=key[1],
+                max_connections=MetricsConfig.get_redis_pool_max_connections(),
+                health_check_interval=MetricsConfig.get_redis_health_check_interval(),
+                socket_keepalive=True,
+            )
+            CONNECTION_POOLS[key] = connection_pool
+    return redis.Redis(connection_pool=connection_pool)
+
+
+def close_connection_pools() -> None:
+    """Disconnect and remove all the shared Redis connection pools."""
+    with CONNECTION_POOLS_LOCK:
+        for connection_pool in CONNECTION_POOLS.values():
+            connection_pool.disconnect()
+        CONNECTION_POOLS.clear()
+
+
+def get_async_redis_connection(host: str, port: Union[str, int]) -> redis.asyncio.Redis:
+    """
+    Return an asyncio Redis client backed by the shared asyncio connection pool for the given address.
+
+    Asyncio counterpart of `get_redis_connection`.
+
+    :param host: (str) the host of the redis instance.
+    :param port: (Union[str, int]) the port of the redis instance.
+    :return: (redis.asyncio.Redis) an asyncio Redis client using the pool for the given address.
+    """
+    key = (host, int(port))
+    connection_pool = ASYNC_CONNECTION_POOLS.get(key)
+    if connection_pool is None:
+        connection_pool = redis.asyncio.ConnectionPool(
+            host=key[0],
+            port=key[1],
+            max_connections=MetricsConfig.get_redis_pool_max_connections(),
+            health_check_interval=MetricsConfig.get_redis_health_check_interval(),
+            socket_keepalive=True,
+        )
+        ASYNC_CONNECTION_POOLS[key] = connection_pool
+    return redis.asyncio.Redis(connection_pool=connection_pool)
+
+
+async def close_async_connection_pools() -> None:
+    """Disconnect and remove all the shared asyncio Redis connection pools."""
+    connection_pools = list(ASYNC_CONNECTION_POOLS.values())
+    ASYNC_CONNECTION_POOLS.clear()
+    for connection_pool in connection_pools:
+        await connection_pool.disconnect()
+
+
+def get_stream_name(run_id: str) -> str:
+    """
+    Return the name of the Redis Stream the metrics messages of a run are appended to in streams mode.
+
+    :param run_id: (str) the identifier of the run.
+    :return: (str) the name of the run's stream.
+    """
+    return f"{run_id}{STREAM_NAME_SUFFIX}"
+
+
 def get_host_and_port_from_address(address: str) -> tuple[str, int]:
     """
     Split an address into host and port. The address must be in the format `<host>:<port>`.
@@ -202,15 +619,13 @@ def wait_for_metric(
     :raises Exception: If it retries `max_retries` times and the right metrics have not been found.
     """
     redis_host, redis_port = get_host_and_port_from_address(redis_address)
-    redis_connection = redis.Redis(host=redis_host, port=redis_port)
+    redis_connection = get_redis_connection(redis_host, redis_port)
 
     retry = 0
     while retry < max_retries:
-        result = redis_connection.get(uuid)
+        json_result = read_metrics(redis_connection, uuid)
 
-        if result is not None:
-            assert isinstance(result, bytes)
-            json_result = json.loads(result.decode("utf8"))
+        if json_result is not None:
             if metric in json_result:
                 logger.debug(f"Metric '{metric}' has been found. Result: {json_result}")
                 return
@@ -230,19 +645,111 @@ def wait_for_metric(
     raise Exception(f"Metric '{metric}' not been found after {max_retries} retries.")
 
 
-def get_subscriber(channel: str, redis_address: str) -> PubSub:
+async def wait_for_metric_async(
+    uuid: str,
+    metric: str,
+    redis_address: str,
+    logger: Logger,
+    timeout_seconds: float = 20,
+    use_streams: bool = False,
+) -> None:
     """
-    Return a PubSub instance with a subscription to the given channel.
+    Wait until the metric appears in the metrics on Redis under the given UUID without blocking the event loop.
 
-    :param channel: (str) The name of the channel to add a subscriber to.
-    :param redis_address: (str) the address of the redis instance.
-    :return: (redis.client.PubSub) The PubSub instance subscribed to the given channel.
+    Subscribes to the UUID's channel before checking the current metrics, so it resolves as soon as the
+    metric is reported instead of polling. In streams mode, reads the UUID's stream from the start instead.
+
+    :param uuid: (str) The UUID to pull the metrics from Redis.
+    :param metric: (str) The metric to look for.
+    :param redis_address: (str) The address of the Redis instance the metrics are being reported to.
+    :param logger: (logging.Logger) A logger instance to write logs to.
+    :param timeout_seconds: (float) The maximum amount of seconds to wait for. Optional, default is 20.
+    :param use_streams: (bool) whether the metrics are reported through Redis Streams instead of pub/sub
+        channels. Optional, default is False.
+    :raises Exception: If the metric has not been found after `timeout_seconds`.
     """
     redis_host, redis_port = get_host_and_port_from_address(redis_address)
-    redis_connection = redis.Redis(host=redis_host, port=redis_port)
-    pubsub: PubSub = redis_connection.pubsub()
-    pubsub.subscribe(channel)  # type: ignore[no-untyped-call]
-    return pubsub
+    redis_connection = get_async_redis_connection(redis_host, redis_port)
+
+    try:
+        if use_streams:
+            wait = _wait_for_metric_in_stream(redis_connection, uuid, metric, logger)
+        else:
+            wait = _wait_for_metric_in_channel(redis_connection, uuid, metric, logger)
+        await asyncio.wait_for(wait, timeout=timeout_seconds)
+    except asyncio.TimeoutError as err:
+        raise Exception(f"Metric '{metric}' has not been found after {timeout_seconds} seconds.") from err
+    finally:
+        await redis_connection.aclose()
+
+
+async def _wait_for_metric_in_channel(
+    redis_connection: redis.asyncio.Redis,
+    uuid: str,
+    metric: str,
+    logger: Logger,
+) -> None:
+    """
+    Wait until the metric appears in the metrics under the given UUID, listening to the UUID's channel.
+
+    :param redis_connection: (redis.asyncio.Redis) the asyncio connection to the redis instance.
+    :param uuid: (str) The UUID to pull the metrics from Redis.
+    :param metric: (str) The metric to look for.
+    :param logger: (logging.Logger) A logger instance to write logs to.
+    """
+    subscriber = redis_connection.pubsub()
+    try:
+        # subscribing before fetching the current metrics so no updates are missed in between
+        await subscriber.subscribe(uuid)
+        metrics = await read_metrics_async(redis_connection, uuid)
+
+        while metrics is None or metric not in metrics:
+            logger.debug(f"Metric '{metric}' has not been found yet, waiting for updates. Result: {metrics}")
+            message = await subscriber.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message is None or message["type"] != "message":
+                continue
+
+            payload = decode_metrics_message(message) or {}
+            if isinstance(payload.get("metrics"), dict):
+                metrics = payload["metrics"]
+            elif isinstance(payload.get("delta"), dict):
+                # the metric is reported in the delta of the update that adds it
+                metrics = payload["delta"]
+            else:
+                metrics = await read_metrics_async(redis_connection, uuid)
+
+        logger.debug(f"Metric '{metric}' has been found. Result: {metrics}")
+    finally:
+        await subscriber.aclose()  # type: ignore[no-untyped-call]
+
+
+async def _wait_for_metric_in_stream(
+    redis_connection: redis.asyncio.Redis,
+    uuid: str,
+    metric: str,
+    logger: Logger,
+) -> None:
+    """
+    Wait until the metric appears in the metrics under the given UUID, reading the UUID's stream.
+
+    :param redis_connection: (redis.asyncio.Redis) the asyncio connection to the redis instance.
+    :param uuid: (str) The UUID to pull the metrics from Redis.
+    :param metric: (str) The metric to look for.
+    :param logger: (logging.Logger) A logger instance to write logs to.
+    """
+    stream_name = get_stream_name(uuid)
+    last_id: Union[str, bytes] = "0"
+    while True:
+        response = await redis_connection.xread({stream_name: last_id}, block=0)
+        for _, entries in response or []:
+            for entry_id, fields in entries:
+                last_id = entry_id
+                payload = decode_metrics_message({"data": fields.get(STREAM_PAYLOAD_FIELD.encode("utf8"))}) or {}
+                metrics = payload.get("metrics") or payload.get("delta") or {}
+                if metric in metrics:
+                    logger.debug(f"Metric '{metric}' has been found. Result: {metrics}")
+                    return
+        logger.debug(f"Metric '{metric}' has not been found yet, waiting for updates.")
 
 
 def get_from_redis(name: str, redis_address: str) -> Optional[Dict[str, Any]]:
@@ -254,9 +761,74 @@ def get_from_redis(name: str, redis_address: str) -> Optional[Dict[str, Any]]:
     :return: (Optional[Dict[str, Any]]) the contents under the name.
     """
     redis_host, redis_port = get_host_and_port_from_address(redis_address)
-    redis_connection = redis.Redis(host=redis_host, port=redis_port)
+    redis_connection = get_redis_connection(redis_host, redis_port)
+    return read_metrics(redis_connection, name)
+
+
+async def get_from_redis_async(name: str, redis_address: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the contents of what's saved on Redis under the name without blocking the event loop.
+
+    Asyncio counterpart of `get_from_redis`.
+
+    :param name: (str) the name to look into Redis.
+    :param redis_address: (str) the address of the redis instance.
+    :return: (Optional[Dict[str, Any]]) the contents under the name.
+    """
+    redis_host, redis_port = get_host_and_port_from_address(redis_address)
+    redis_connection = get_async_redis_connection(redis_host, redis_port)
+    return await read_metrics_async(redis_connection, name)
+
+
+def read_metrics(redis_connection: redis.Redis, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the metrics saved on Redis under the name using the given connection.
+
+    Supports both the metrics saved as a JSON string and the metrics saved as a hash by reporters
+    in delta publishing mode.
+
+    :param redis_connection: (redis.Redis) the connection to the redis instance.
+    :param name: (str) the name to look into Redis.
+    :return: (Optional[Dict[str, Any]]) the metrics under the name, or None if there is nothing saved under it.
+    """
+    try:
+        result = redis_connection.get(name)
+    except ResponseError as err:
+        if not str(err).startswith("WRONGTYPE"):
+            raise
+        # Metrics saved in delta publishing mode are stored as a hash
+        fields = redis_connection.hgetall(name)
+        assert isinstance(fields, dict)
+        return metrics_from_hash(fields)
 
-    result = redis_connection.get(name)
+    if result is None:
+        return result
+
+    assert isinstance(result, bytes)
+    result_dict = json.loads(result)
+    assert isinstance(result_dict, dict)
+    return result_dict
+
+
+async def read_metrics_async(redis_connection: redis.asyncio.Redis, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the metrics saved on Redis under the name using the given asyncio connection.
+
+    Asyncio counterpart of `read_metrics`, supporting the same storage formats.
+
+    :param redis_connection: (redis.asyncio.Redis) the asyncio connection to the redis instance.
+    :param name: (str) the name to look into Redis.
+    :return: (Optional[Dict[str, Any]]) the metrics under the name, or None if there is nothing saved under it.
+    """
+    try:
+        result = await redis_connection.get(name)
+    except ResponseError as err:
+        if not str(err).startswith("WRONGTYPE"):
+            raise
+        # Metrics saved in delta publishing mode are stored as a hash
+        fields = await redis_connection.hgetall(name)  # type: ignore[misc]
+        assert isinstance(fields, dict)
+        return metrics_from_hash(fields)
 
     if result is None:
         return result
@@ -265,3 +837,94 @@ def get_from_redis(name: str, redis_address: str) -> Optional[Dict[str, Any]]:
     result_dict = json.loads(result)
     assert isinstance(result_dict, dict)
     return result_dict
+
+
+def metrics_from_hash(fields: Dict[bytes, bytes]) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild a metrics dictionary from the fields of a hash saved by a reporter in delta publishing mode.
+
+    :param fields: (Dict[bytes, bytes]) the fields of the hash as returned by Redis' HGETALL.
+    :return: (Optional[Dict[str, Any]]) the metrics dictionary, or None if the hash has no fields.
+    """
+    if len(fields) == 0:
+        return None
+
+    metrics: Dict[str, Any] = {}
+    for field, value in fields.items():
+        key = field.decode("utf8")
+        if key.startswith(ROUND_FIELD_PREFIX):
+            if "rounds" not in metrics:
+                metrics["rounds"] = {}
+            metrics["rounds"][key[len(ROUND_FIELD_PREFIX) :]] = json.loads(value)
+        else:
+            metrics[key] = json.loads(value)
+    return metrics
+
+
+def decode_metrics_message(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Decode the payload of a message received from a metrics channel.
+
+    :param message: (Dict[str, Any]) the message received from the PubSub subscriber.
+    :return: (Optional[Dict[str, Any]]) the decoded payload in the format `{"delta": <changed metrics>}`
+        or `{"metrics": <metrics>}`, plus a "sequence" number if the reporter sent one. None if the message
+        does not carry a payload (e.g. it is a plain "update" notification).
+    """
+    data = message.get("data")
+    if isinstance(data, bytes):
+        data = data.decode("utf8")
+    if not isinstance(data, str) or data == UPDATE_MESSAGE:
+        return None
+
+    try:
+        payload = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(payload, dict):
+        return None
+    return payload
+
+
+def apply_metrics_delta(metrics: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a metrics delta published by a reporter in delta publishing mode to a metrics dictionary.
+
+    Top level metrics in the delta replace the ones in the metrics dictionary, and rounds in the delta
+    replace the respective rounds in the metrics dictionary.
+
+    The metrics dictionary is not modified, so whoever already holds it keeps the metrics as they
+    were before the delta.
+
+    :param metrics: (Dict[str, Any]) the metrics dictionary to apply the delta to.
+    :param delta: (Dict[str, Any]) the metrics delta.
+    :return: (Dict[str, Any]) a new metrics dictionary with the delta applied.
+    """
+    updated_metrics = dict(metrics)
+    for key, value in delta.items():
+        if key == "rounds":
+            updated_metrics["rounds"] = {**updated_metrics.get("rounds", {}), **value}
+        else:
+            updated_metrics[key] = value
+    return updated_metrics
+
+
+def make_metrics_delta(previous_metrics: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Make the metrics delta that turns a metrics dictionary into another when applied with `apply_metrics_delta`.
+
+    :param previous_metrics: (Dict[str, Any]) the metrics before the change.
+    :param metrics: (Dict[str, Any]) the metrics after the change.
+    :return: (Dict[str, Any]) the top level metrics and the rounds that are new or have changed.
+        Metrics removed from the dictionary are not included.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in metrics.items():
+        if key == "rounds" and isinstance(value, dict):
+            previous_rounds = previous_metrics.get("rounds") or {}
+            rounds_delta = {r: v for r, v in value.items() if previous_rounds.get(r) != v}
+            if len(rounds_delta) > 0:
+                delta["rounds"] = rounds_delta
+        elif previous_metrics.get(key) != value:
+            delta[key] = value
+    return delta
@@ -13,11 +13,12 @@ from florist.api.auth.token import (
     AuthUser,
     OAuth2ChangePasswordRequestForm,
     Token,
-    _password_hash,
     _simple_hash,
     create_access_token,
     decode_access_token,
-    verify_password,
+    is_default_password_async,
+    password_hash_async,
+    verify_password_async,
 )
 from florist.api.db.client_entities import UserDAO
 
@@ -45,7 +46,7 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
 
     try:
         user = UserDAO.find(form_data.username)
-        if not verify_password(form_data.password, user.hashed_password):
+        if not await verify_password_async(form_data.password, user.hashed_password):
             raise credentials_exception
 
         access_token = create_access_token(data={"sub": user.username}, secret_key=user.secret_key)
@@ -80,7 +81,7 @@ async def check_default_user_token(token: Annotated[str, Depends(oauth2_scheme)]
         if username is None or username != user.username:
             raise credentials_exception
 
-        if verify_password(_simple_hash(DEFAULT_PASSWORD), user.hashed_password):
+        if await is_default_password_async(user.hashed_password):
             # Fails if the user's password is the default, it must be changed
             raise credentials_exception
 
@@ -110,7 +111,7 @@ async def change_password(form_data: Annotated[OAuth2ChangePasswordRequestForm,
     try:
         user = UserDAO.find(form_data.username)
 
-        if not verify_password(form_data.current_password, user.hashed_password):
+        if not await verify_password_async(form_data.current_password, user.hashed_password):
             raise credentials_exception
 
         if form_data.new_password == _simple_hash(DEFAULT_PASSWORD):
@@ -118,7 +119,7 @@ async def change_password(form_data: Annotated[OAuth2ChangePasswordRequestForm,
             credentials_exception.detail = "New password cannot be the default password."
             raise credentials_exception
 
-        user.hashed_password = _password_hash(form_data.new_password)
+        user.hashed_password = await password_hash_async(form_data.new_password)
         user.save()
 
         access_token = create_access_token(data={"sub": user.username}, secret_key=user.secret_key)
@@ -1,9 +1,11 @@
 """FastAPI server routes for authentication."""
 
+import asyncio
 import logging
-from typing import Annotated, cast
+from datetime import timedelta
+from typing import Annotated, Any, Optional, cast
 
-import requests
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
@@ -12,13 +14,16 @@ from florist.api.auth.token import (
     DEFAULT_PASSWORD,
     DEFAULT_USERNAME,
     AuthUser,
+    CachedClientToken,
     OAuth2ChangePasswordRequestForm,
     Token,
-    _password_hash,
     _simple_hash,
     create_access_token,
     decode_access_token,
-    verify_password,
+    get_access_token_expiration,
+    is_default_password_async,
+    password_hash_async,
+    verify_password_async,
 )
 from florist.api.db.server_entities import ClientInfo, User
 
@@ -26,8 +31,9 @@ from florist.api.db.server_entities import ClientInfo, User
 LOGGER = logging.getLogger("uvicorn.error")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/server/auth/token")
 
-CONNECT_CLIENT_API = "api/client/connect"
 AUTH_TOKEN_CLIENT_API = "api/client/auth/token"
+# How long before their expiration time the clients' tokens are refreshed
+CLIENT_TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
 
 router = APIRouter()
 
@@ -57,7 +63,7 @@ async def login_for_access_token(
     if user is None:
         raise credentials_exception
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise credentials_exception
 
     access_token = create_access_token(data={"sub": user.username}, secret_key=user.secret_key)
@@ -90,7 +96,7 @@ async def change_password(
     if user is None:
         raise credentials_exception
 
-    if not verify_password(form_data.current_password, user.hashed_password):
+    if not await verify_password_async(form_data.current_password, user.hashed_password):
         raise credentials_exception
 
     if form_data.new_password == _simple_hash(DEFAULT_PASSWORD):
@@ -98,7 +104,9 @@ async def change_password(
         credentials_exception.detail = "New password cannot be the default password."
         raise credentials_exception
 
-    await user.change_password(_password_hash(form_data.new_password), request.app.database)
+    await user.change_password(await password_hash_async(form_data.new_password), request.app.database)
+    # the cached user has the old password, so it needs to be fetched again
+    request.app.users_cache.pop(user.username, None)
 
     access_token = create_access_token(data={"sub": user.username}, secret_key=user.secret_key)
     return Token(access_token=access_token, token_type="bearer", should_change_password=False)
@@ -121,11 +129,11 @@ async def check_default_user_token(token: Annotated[str, Depends(oauth2_scheme)]
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        user = await User.find_by_username(DEFAULT_USERNAME, request.app.database)
+        user = await get_cached_user(DEFAULT_USERNAME, request)
         if user is None:
             raise credentials_exception
 
-        if verify_password(_simple_hash(DEFAULT_PASSWORD), user.hashed_password):
+        if await is_default_password_async(user.hashed_password):
             # Fail if the user's password is the default, it must be changed
             raise credentials_exception
 
@@ -140,49 +148,162 @@ async def check_default_user_token(token: Annotated[str, Depends(oauth2_scheme)]
         raise credentials_exception from err
 
 
-def get_client_token(client_info: ClientInfo, request: Request) -> Token:
+async def get_cached_user(username: str, request: Request) -> Optional[User]:
+    """
+    Return a user from the request.app.users_cache dictionary, fetching it from the database if it's not there.
+
+    The cached user must be removed from the dictionary when it changes in the database.
+
+    :param username: (str) the username of the user.
+    :param request: (Request) The FastAPI request object.
+
+    :return: (Optional[User]) the user with the given username, or None if it can't be found.
+    """
+    if username in request.app.users_cache:
+        return cast(User, request.app.users_cache[username])
+
+    user = await User.find_by_username(username, request.app.database)
+    if user is not None:
+        request.app.users_cache[username] = user
+
+    return user
+
+
+async def get_client_token(
+    client_info: ClientInfo,
+    request: Request,
+    invalid_token: Optional[Token] = None,
+) -> Token:
     """
     Retrieve a valid client token.
 
-    Checks if the client has a valid token in the request.app.clients_auth_tokens dictionary by checking it
-    against the connect client endpoint. If it does, then it returns the token. If it does not, then it will
-    call the authentication endpoint for the client to get a valid token, store it in the
-    request.app.clients_auth_tokens dictionary, and then return the token.
+    Returns the client's token from the request.app.clients_auth_tokens dictionary if it is not expiring in
+    the next `CLIENT_TOKEN_REFRESH_MARGIN`. Otherwise, it will call the authentication endpoint for the client
+    to get a new token, store it in the request.app.clients_auth_tokens dictionary along with its expiration
+    time, and then return the token.
+
+    The new tokens are requested while holding the client's lock in the request.app.clients_auth_tokens_locks
+    dictionary, so concurrent requests to the same client only request one new token.
 
     :param client_info: (ClientInfo) The client information object.
     :param request: (Request) The FastAPI request object.
+    :param invalid_token: (Optional[Token]) A token that has been rejected by the client. If it is the
+        cached token, a new token will be requested even if it hasn't expired.
 
     :return: (Token) A valid client token.
     """
-    try:
-        if client_info.id in request.app.clients_auth_tokens:
-            token = request.app.clients_auth_tokens[client_info.id]
-            assert isinstance(token, Token)
-
-            response = requests.get(
-                f"http://{client_info.service_address}/{CONNECT_CLIENT_API}",
-                headers={"Authorization": f"Bearer {token.access_token}"},
+    cached_token = _get_cached_client_token(client_info, request, invalid_token)
+    if cached_token is not None:
+        return cached_token
+
+    lock = request.app.clients_auth_tokens_locks.setdefault(client_info.id, asyncio.Lock())
+    async with lock:
+        # Another request may have refreshed the token while this one was waiting for the lock
+        cached_token = _get_cached_client_token(client_info, request, invalid_token)
+        if cached_token is not None:
+            return cached_token
+
+        try:
+            response = await request.app.http_client.post(
+                f"http://{client_info.service_address}/{AUTH_TOKEN_CLIENT_API}",
+                data={"grant_type": "password", "username": DEFAULT_USERNAME, "password": client_info.hashed_password},
             )
+
             if response.status_code == 200:
+                token = Token(**response.json())
+                expires_at = get_access_token_expiration(token.access_token)
+                request.app.clients_auth_tokens[client_info.id] = CachedClientToken(token=token, expires_at=expires_at)
                 return token
 
-        response = requests.post(
-            f"http://{client_info.service_address}/{AUTH_TOKEN_CLIENT_API}",
-            data={"grant_type": "password", "username": DEFAULT_USERNAME, "password": client_info.hashed_password},
-        )
-
-        if response.status_code == 200:
-            token = Token(**response.json())
-            request.app.clients_auth_tokens[client_info.id] = token
-            return cast(Token, token)  # for some reason mypy does not understand that the token var type is Token
-
-    except Exception as err:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not connect to client with id {client_info.id}",
-        ) from err
+        except Exception as err:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Could not connect to client with id {client_info.id}",
+            ) from err
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail=f"Unable to issue client token for client with id {client_info.id}",
     )
+
+
+async def get_from_client(
+    client_info: ClientInfo,
+    request: Request,
+    url: str,
+    stream: bool = False,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Make an authenticated GET request to a client.
+
+    If the client responds with 401, the request is retried once with a new token.
+
+    :param client_info: (ClientInfo) The client information object.
+    :param request: (Request) The FastAPI request object.
+    :param url: (str) The URL to make the request to.
+    :param stream: (bool) If True, returns before reading the response body so it can be streamed.
+        The caller is then responsible for closing the response with `aclose()`.
+    :param kwargs: (Any) Additional arguments for the request, such as `params` and `timeout`.
+
+    :return: (httpx.Response) The client's response.
+    """
+    token = await get_client_token(client_info, request)
+    response = await _get_with_token(request.app.http_client, token, url, stream, **kwargs)
+
+    if response.status_code == status.HTTP_401_UNAUTHORIZED:
+        if stream:
+            await response.aclose()
+        token = await get_client_token(client_info, request, invalid_token=token)
+        response = await _get_with_token(request.app.http_client, token, url, stream, **kwargs)
+
+    return response
+
+
+async def _get_with_token(
+    http_client: httpx.AsyncClient,
+    token: Token,
+    url: str,
+    stream: bool,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Make a GET request authenticated with the given token.
+
+    :param http_client: (httpx.AsyncClient) The HTTP client to make the request with.
+    :param token: (Token) The token to authenticate the request with.
+    :param url: (str) The URL to make the request to.
+    :param stream: (bool) If True, returns before reading the response body.
+    :param kwargs: (Any) Additional arguments for the request, such as `params` and `timeout`.
+
+    :return: (httpx.Response) The response.
+    """
+    headers = {"Authorization": f"Bearer {token.access_token}"}
+    if stream:
+        client_request = http_client.build_request("GET", url, headers=headers, **kwargs)
+        return await http_client.send(client_request, stream=True)
+    return await http_client.get(url=url, headers=headers, **kwargs)
+
+
+def _get_cached_client_token(
+    client_info: ClientInfo, request: Request, invalid_token: Optional[Token]
+) -> Optional[Token]:
+    """
+    Return the client's cached token if it can still be used.
+
+    :param client_info: (ClientInfo) The client information object.
+    :param request: (Request) The FastAPI request object.
+    :param invalid_token: (Optional[Token]) A token that has been rejected by the client.
+
+    :return: (Optional[Token]) The cached token, or None if there is no cached token, it is expiring
+        or it is `invalid_token`.
+    """
+    cached_token = request.app.clients_auth_tokens.get(client_info.id)
+    if cached_token is None:
+        return None
+
+    assert isinstance(cached_token, CachedClientToken)
+    if cached_token.is_expiring(CLIENT_TOKEN_REFRESH_MARGIN) or cached_token.token == invalid_token:
+        return None
+
+    return cached_token.token
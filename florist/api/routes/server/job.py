@@ -4,14 +4,33 @@ import logging
 import os
 import signal
 from datetime import datetime
-from typing import List, Union
-
-import requests
-from fastapi import APIRouter, Body, Depends, Request, status
-from fastapi.responses import JSONResponse
-
-from florist.api.db.server_entities import MAX_RECORDS_TO_FETCH, Job, JobStatus
-from florist.api.routes.server.auth import check_default_user_token, get_client_token
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+import httpx
+from fastapi import APIRouter, Body, Depends, Query, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from florist.api.db.server_entities import (
+    JOB_SUMMARIES_PAGE_SIZE,
+    MAX_RECORDS_TO_FETCH,
+    Job,
+    JobMetrics,
+    JobStatus,
+    JobSummaryPage,
+    RoundMetrics,
+)
+from florist.api.monitoring.events import JOB_EVENTS, stream_job_events
+from florist.api.monitoring.logs import (
+    LOG_RANGE_HEADERS,
+    LOG_TAIL_END_EVENT,
+    LOG_TAIL_KEEPALIVE_EVENT,
+    get_log_tail_offset,
+    make_log_range_response,
+    make_log_tail_response,
+    read_log_file,
+)
+from florist.api.routes.server.auth import check_default_user_token, get_from_client
 
 
 router = APIRouter()
@@ -40,11 +59,96 @@ async def get_job(job_id: str, request: Request) -> Union[Job, JSONResponse]:
     if job is None:
         return JSONResponse(content={"error": f"Job with ID {job_id} does not exist."}, status_code=400)
 
+    await job.load_round_metrics(request.app.database)
+
     # Obscuring the clients' hashed passwords so they are not returned in the response
     job.obscure_hashed_passwords()
     return job
 
 
+@router.get(
+    path="/{job_id}/metrics",
+    response_description="Retrieves the metrics of a job by ID",
+    status_code=status.HTTP_200_OK,
+    response_model=JobMetrics,
+    dependencies=[Depends(check_default_user_token)],
+)
+async def get_job_metrics(
+    job_id: str,
+    request: Request,
+    rounds: Optional[List[str]] = Query(default=None),  # noqa: B008
+    keys: Optional[List[str]] = Query(default=None),  # noqa: B008
+) -> Union[JobMetrics, JSONResponse]:
+    """
+    Retrieve the metrics of a training job's server and clients by the job's ID.
+
+    Only the requested rounds and top level metrics are returned. If neither are given, the whole metrics
+    are returned.
+
+    :param job_id: (str) The ID of the job.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param rounds: (Optional[List[str]]) the rounds to be returned, e.g. `?rounds=1&rounds=2`.
+    :param keys: (Optional[List[str]]) the top level metrics to be returned, e.g. `?keys=fit_start&keys=fit_end`.
+        Pass in `rounds` to get all the rounds.
+
+    :return: (Union[JobMetrics, JSONResponse]) The metrics of the job with the given ID, or a 400 JSONResponse
+        if it hasn't been found or the rounds or keys are invalid.
+    """
+    try:
+        job_metrics = await Job.find_metrics_by_id(job_id, request.app.database, rounds, keys)
+        assert job_metrics is not None, f"Job with ID {job_id} does not exist."
+        return job_metrics
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+@router.get(
+    path="/{job_id}/metrics/rounds",
+    response_description="Retrieves the metrics of a range of rounds of a job by ID",
+    status_code=status.HTTP_200_OK,
+    response_model=List[RoundMetrics],
+    dependencies=[Depends(check_default_user_token)],
+)
+async def get_job_round_metrics(
+    job_id: str,
+    request: Request,
+    host_uuid: Optional[str] = None,
+    start_round: Optional[int] = None,
+    end_round: Optional[int] = None,
+) -> Union[List[RoundMetrics], JSONResponse]:
+    """
+    Retrieve the metrics of a range of rounds of a training job's server and clients by the job's ID.
+
+    :param job_id: (str) The ID of the job.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param host_uuid: (Optional[str]) if set, only the rounds of the server or client with this uuid are returned.
+    :param start_round: (Optional[int]) if set, only the rounds greater than or equal to it are returned.
+    :param end_round: (Optional[int]) if set, only the rounds less than or equal to it are returned.
+
+    :return: (Union[List[RoundMetrics], JSONResponse]) The latest metrics of each round in the range, sorted by
+        host and round, or a 400 JSONResponse if the range is invalid.
+    """
+    try:
+        assert start_round is None or end_round is None or start_round <= end_round, (
+            f"start_round ({start_round}) must be less than or equal to end_round ({end_round})"
+        )
+        return await RoundMetrics.find_latest(
+            job_id,
+            request.app.database,
+            host_uuid=host_uuid,
+            start_round=start_round,
+            end_round=end_round,
+        )
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
 @router.post(
     path="",
     response_description="Create a new job",
@@ -97,6 +201,42 @@ async def list_jobs_with_status(status: JobStatus, request: Request) -> List[Job
     return jobs
 
 
+@router.get(
+    path="/status/{status}/summary",
+    response_description="List the summaries of the jobs with the specified status, one page at a time",
+    response_model=JobSummaryPage,
+    dependencies=[Depends(check_default_user_token)],
+)
+async def list_job_summaries_with_status(
+    status: JobStatus,
+    request: Request,
+    limit: int = JOB_SUMMARIES_PAGE_SIZE,
+    next_token: Optional[str] = Query(default=None, alias="next"),  # noqa: B008
+) -> Union[JobSummaryPage, JSONResponse]:
+    """
+    List the summaries of the jobs with specified status, one page at a time.
+
+    The summaries only have the attributes needed to list the jobs, leaving out their metrics
+    and configs. See `florist.api.db.server_entities.JobSummary`.
+
+    :param status: (JobStatus) The status of jobs to query the Job DB for.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param limit: (int) the maximum amount of jobs in the page. Must be between 1 and MAX_RECORDS_TO_FETCH.
+    :param next_token: (Optional[str]) the `next` token returned with the previous page, or None for the
+        first page. Passed in as the `next` query parameter.
+    :return: (Union[JobSummaryPage, JSONResponse]) The page of job summaries and the `next` token to get
+        the following page, which is None on the last page. Returns a 400 JSONResponse if the limit is invalid.
+    """
+    try:
+        assert 0 < limit <= MAX_RECORDS_TO_FETCH, f"limit must be between 1 and {MAX_RECORDS_TO_FETCH}"
+        return await Job.find_summaries_by_status(status, limit, request.app.database, next_token)
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
 @router.post(
     path="/change_status",
     response_description="Change job to the specified status",
@@ -145,10 +285,10 @@ async def stop_job(job_id: str, request: Request) -> JSONResponse:
 
         user_error_message = ""
         for client_info in job.clients_info:
-            token = get_client_token(client_info, request)
-            response = requests.get(
+            response = await get_from_client(
+                client_info,
+                request,
                 url=f"http://{client_info.service_address}/api/client/stop/{client_info.uuid}",
-                headers={"Authorization": f"Bearer {token.access_token}"},
             )
             status_code = response.status_code
             if status_code != 200:
@@ -178,6 +318,25 @@ async def stop_job(job_id: str, request: Request) -> JSONResponse:
         return JSONResponse(content={"error": str(general_e)}, status_code=500)
 
 
+@router.get("/events/stream", dependencies=[Depends(check_default_user_token)])
+async def stream_events(job_id: Optional[str] = None) -> StreamingResponse:
+    """
+    Stream the status transitions and metrics updates of the jobs as server-sent events.
+
+    The events are pushed as the jobs are updated, so there is no need to poll the jobs. See
+    `florist.api.monitoring.events.stream_job_events` for the format of the events.
+
+    :param job_id: (Optional[str]) if set, only the events of this job are sent.
+
+    :return: (StreamingResponse) the response streaming the server-sent events.
+    """
+    return StreamingResponse(
+        stream_job_events(JOB_EVENTS, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/get_server_log/{job_id}", dependencies=[Depends(check_default_user_token)])
 async def get_server_log(job_id: str, request: Request) -> JSONResponse:
     """
@@ -198,9 +357,8 @@ async def get_server_log(job_id: str, request: Request) -> JSONResponse:
             "Log file path is None or empty"
         )
 
-        with open(job.server_log_file_path, "r") as f:
-            content = f.read()
-            return JSONResponse(content)
+        content = await read_log_file(job.server_log_file_path)
+        return JSONResponse(content)
 
     except AssertionError as assertion_e:
         return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
@@ -233,10 +391,10 @@ async def get_client_log(job_id: str, client_index: int, request: Request) -> JS
 
         client_info = job.clients_info[client_index]
 
-        token = get_client_token(client_info, request)
-        response = requests.get(
+        response = await get_from_client(
+            client_info,
+            request,
             url=f"http://{client_info.service_address}/api/client/get_log/{client_info.uuid}",
-            headers={"Authorization": f"Bearer {token.access_token}"},
         )
         json_response = response.json()
 
@@ -252,3 +410,259 @@ async def get_client_log(job_id: str, client_index: int, request: Request) -> JS
     except Exception as general_e:
         LOGGER.exception(general_e)
         return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+@router.get("/get_server_log_range/{job_id}", dependencies=[Depends(check_default_user_token)])
+async def get_server_log_range(
+    job_id: str,
+    request: Request,
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> Response:
+    """
+    Stream a range of bytes of the server's log file for the given job id.
+
+    To tail the logs, call it again with the offset returned in the `X-Log-Next-Offset` header.
+
+    :param job_id: (str) the ID of the job to get the server logs for.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param length: (Optional[int]) the maximum number of bytes to return. If None, returns up to the end of the file.
+
+    :return: (Response) if successful, returns a StreamingResponse with the requested range of the file
+        as plain text, described by the `X-Log-Offset`, `X-Log-Next-Offset` and `X-Log-Size` headers.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        job = await Job.find_by_id(job_id, request.app.database)
+
+        assert job is not None, f"Job {job_id} not found"
+        assert job.server_log_file_path is not None and job.server_log_file_path != "", (
+            "Log file path is None or empty"
+        )
+
+        return make_log_range_response(job.server_log_file_path, offset, length)
+
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+@router.get("/get_client_log_range/{job_id}/{client_index}", dependencies=[Depends(check_default_user_token)])
+async def get_client_log_range(
+    job_id: str,
+    client_index: int,
+    request: Request,
+    offset: int = 0,
+    length: Optional[int] = None,
+) -> Response:
+    """
+    Stream a range of bytes of the log file for the client with given index under given job id.
+
+    The client's response is relayed as it is received, without being loaded into memory.
+    To tail the logs, call it again with the offset returned in the `X-Log-Next-Offset` header.
+
+    :param job_id: (str) the ID of the job to get the client logs for.
+    :param client_index: (int) the index of the client within the job.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+    :param length: (Optional[int]) the maximum number of bytes to return. If None, returns up to the end of the file.
+
+    :return: (Response) if successful, returns a StreamingResponse with the requested range of the file
+        as plain text, described by the `X-Log-Offset`, `X-Log-Next-Offset` and `X-Log-Size` headers.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        job = await Job.find_by_id(job_id, request.app.database)
+
+        assert job is not None, f"Job {job_id} not found"
+        assert job.clients_info is not None, "Job has no clients."
+        assert 0 <= client_index < len(job.clients_info), (
+            f"Client index {client_index} is invalid (total: {len(job.clients_info)})"
+        )
+
+        client_info = job.clients_info[client_index]
+
+        params: dict[str, int] = {"offset": offset}
+        if length is not None:
+            params["length"] = length
+
+        response = await get_from_client(
+            client_info,
+            request,
+            url=f"http://{client_info.service_address}/api/client/get_log_range/{client_info.uuid}",
+            stream=True,
+            params=params,
+        )
+
+        if response.status_code != 200:
+            try:
+                await response.aread()
+                json_response = response.json()
+            finally:
+                await response.aclose()
+            if response.status_code == 400:
+                raise AssertionError(f"Client responded with code 400: '{json_response}'")
+            raise Exception(f"Client response with code != 200: '{json_response}'")
+
+        return StreamingResponse(
+            response.aiter_raw(),
+            media_type="text/plain",
+            headers={header: response.headers[header] for header in LOG_RANGE_HEADERS if header in response.headers},
+            background=BackgroundTask(response.aclose),
+        )
+
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+@router.get("/tail_server_log/{job_id}", dependencies=[Depends(check_default_user_token)])
+async def tail_server_log(job_id: str, request: Request, offset: int = 0) -> Response:
+    """
+    Stream the lines appended to the server's log file for the given job id as server-sent events.
+
+    The stream ends with an `end` event once the job has finished. See
+    `florist.api.monitoring.logs.tail_log_file` for the format of the events.
+
+    :param job_id: (str) the ID of the job to tail the server logs for.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+        Ignored if the `Last-Event-ID` header is set.
+
+    :return: (Response) if successful, returns a StreamingResponse with the server-sent events.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        job = await Job.find_by_id(job_id, request.app.database)
+
+        assert job is not None, f"Job {job_id} not found"
+        assert job.server_log_file_path is not None and job.server_log_file_path != "", (
+            "Log file path is None or empty"
+        )
+
+        tail_offset = get_log_tail_offset(offset, request.headers.get("Last-Event-ID"))
+        return make_log_tail_response(job.server_log_file_path, tail_offset, _make_is_job_finished(job_id, request))
+
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+@router.get("/tail_client_log/{job_id}/{client_index}", dependencies=[Depends(check_default_user_token)])
+async def tail_client_log(job_id: str, client_index: int, request: Request, offset: int = 0) -> Response:
+    """
+    Stream the lines appended to the log file of the client with given index under given job id as server-sent events.
+
+    The events are relayed from the client's `tail_log` endpoint. The stream ends with an `end` event
+    once the job has finished. See `florist.api.monitoring.logs.tail_log_file` for the format of the events.
+
+    :param job_id: (str) the ID of the job to tail the client logs for.
+    :param client_index: (int) the index of the client within the job.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :param offset: (int) the byte offset to start from. If negative, it is counted from the end of the file.
+        Ignored if the `Last-Event-ID` header is set.
+
+    :return: (Response) if successful, returns a StreamingResponse with the server-sent events.
+        If not successful, returns the appropriate error code with a JSON with the format below:
+            {"error": <error message>}
+    """
+    try:
+        job = await Job.find_by_id(job_id, request.app.database)
+
+        assert job is not None, f"Job {job_id} not found"
+        assert job.clients_info is not None, "Job has no clients."
+        assert 0 <= client_index < len(job.clients_info), (
+            f"Client index {client_index} is invalid (total: {len(job.clients_info)})"
+        )
+
+        client_info = job.clients_info[client_index]
+        tail_offset = get_log_tail_offset(offset, request.headers.get("Last-Event-ID"))
+
+        response = await get_from_client(
+            client_info,
+            request,
+            url=f"http://{client_info.service_address}/api/client/tail_log/{client_info.uuid}",
+            stream=True,
+            params={"offset": tail_offset},
+        )
+
+        if response.status_code != 200:
+            try:
+                await response.aread()
+                json_response = response.json()
+            finally:
+                await response.aclose()
+            if response.status_code == 400:
+                raise AssertionError(f"Client responded with code 400: '{json_response}'")
+            raise Exception(f"Client response with code != 200: '{json_response}'")
+
+        return StreamingResponse(
+            _relay_log_events(response, _make_is_job_finished(job_id, request)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except AssertionError as assertion_e:
+        return JSONResponse(content={"error": str(assertion_e)}, status_code=400)
+    except Exception as general_e:
+        LOGGER.exception(general_e)
+        return JSONResponse(content={"error": str(general_e)}, status_code=500)
+
+
+def _make_is_job_finished(job_id: str, request: Request) -> Callable[[], Awaitable[bool]]:
+    """
+    Make a function that checks if a job has finished.
+
+    :param job_id: (str) the ID of the job.
+    :param request: (fastapi.Request) the FastAPI request object.
+    :return: (Callable[[], Awaitable[bool]]) a function returning True if the job has finished
+        or does not exist anymore, False otherwise.
+    """
+
+    async def is_job_finished() -> bool:
+        status = await Job.find_status_by_id(job_id, request.app.database)
+        return status is None or status in [JobStatus.FINISHED_SUCCESSFULLY, JobStatus.FINISHED_WITH_ERROR]
+
+    return is_job_finished
+
+
+async def _relay_log_events(
+    response: httpx.Response,
+    is_finished: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """
+    Relay the server-sent events of a client's log tail stream.
+
+    Events are relayed whole. The client only sends keepalives when there is no new content in its logs,
+    so on every keepalive the job is checked and the stream is ended if the job has finished.
+
+    :param response: (httpx.Response) the streaming response from the client's `tail_log` endpoint.
+        It is closed when the relay ends.
+    :param is_finished: (Callable[[], Awaitable[bool]]) checks if the job has finished.
+    :return: (AsyncIterator[str]) the server-sent events.
+    """
+    try:
+        event_lines: List[str] = []
+        async for line in response.aiter_lines():
+            if line != "":
+                event_lines.append(line)
+                continue
+
+            event = "\n".join(event_lines) + "\n\n"
+            event_lines = []
+            if event == LOG_TAIL_KEEPALIVE_EVENT and await is_finished():
+                yield LOG_TAIL_END_EVENT
+                return
+            yield event
+    finally:
+        await response.aclose()
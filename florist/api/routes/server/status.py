@@ -1,12 +1,11 @@
 """FastAPI routes for checking server status."""
 
-import json
 import logging
 
-import redis
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 
+from florist.api.monitoring.metrics import get_redis_connection, read_metrics
 from florist.api.routes.server.auth import check_default_user_token
 
 
@@ -33,13 +32,12 @@ def check_status(server_uuid: str, redis_host: str, redis_port: str) -> JSONResp
             {"error": <error message>}
     """
     try:
-        redis_connection = redis.Redis(host=redis_host, port=redis_port)
+        redis_connection = get_redis_connection(redis_host, redis_port)
 
-        result = redis_connection.get(server_uuid)
+        result = read_metrics(redis_connection, server_uuid)
 
         if result is not None:
-            assert isinstance(result, bytes)
-            return JSONResponse(json.loads(result))
+            return JSONResponse(result)
 
         return JSONResponse({"error": f"Server {server_uuid} Not Found"}, status_code=404)
 
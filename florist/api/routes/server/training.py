@@ -3,22 +3,21 @@
 import asyncio
 import logging
 from json import JSONDecodeError
-from threading import Thread
-from typing import Any, List
+from typing import Any, Dict, List
 
-import requests
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
-from florist.api.db.config import DatabaseConfig
-from florist.api.db.server_entities import ClientInfo, Job, JobStatus
+from florist.api.db.server_entities import MAX_RECORDS_TO_FETCH, ClientInfo, Job, JobStatus
 from florist.api.launchers.local import launch_local_server
 from florist.api.models.models import Model
-from florist.api.monitoring.metrics import get_from_redis, get_subscriber, wait_for_metric
-from florist.api.routes.server.auth import check_default_user_token, get_client_token
+from florist.api.monitoring.config import MetricsConfig
+from florist.api.monitoring.listeners import MetricsListenerManager
+from florist.api.monitoring.metrics import wait_for_metric_async
+from florist.api.routes.server.auth import check_default_user_token, get_from_client
 from florist.api.servers.config_parsers import ConfigParser
 
 
@@ -29,6 +28,11 @@ LOGGER = logging.getLogger("uvicorn.error")
 START_CLIENT_API = "api/client/start"
 CHECK_CLIENT_STATUS_API = "api/client/check_status"
 
+# Maximum amount of clients being started at the same time
+START_CLIENTS_MAX_CONCURRENCY = 20
+# Maximum amount of seconds to wait for each request to start a client
+START_CLIENT_TIMEOUT_SECONDS = 60
+
 
 @router.post("/start", dependencies=[Depends(check_default_user_token)])
 async def start(job_id: str, request: Request) -> JSONResponse:
@@ -90,27 +94,46 @@ async def start(job_id: str, request: Request) -> JSONResponse:
 
         await job.set_server_log_file_path(server_log_file_path, request.app.database)
 
-        wait_for_metric(server_uuid, "fit_start", job.redis_address, logger=LOGGER)
+        await wait_for_metric_async(
+            server_uuid,
+            "fit_start",
+            job.redis_address,
+            logger=LOGGER,
+            use_streams=MetricsConfig.get_use_streams(),
+        )
 
         # Start the clients
-        client_uuids: List[str] = []
-        for i in range(len(job.clients_info)):
-            client_info = job.clients_info[i]
-            uuid = _start_client(job.server_address, job.client, job.model, job.optimizer, client_info, request)
-            client_uuids.append(uuid)
-
-        await job.set_uuids(server_uuid, client_uuids, request.app.database)
-        await job.set_server_pid(str(server_process.pid), request.app.database)
-
-        # Start the server training listener and client training listeners as threads to update
-        # the job's metrics and status once the training is done
-        server_listener_thread = Thread(target=asyncio.run, args=(server_training_listener(job),))
-        server_listener_thread.daemon = True
-        server_listener_thread.start()
-        for client_info in job.clients_info:
-            client_listener_thread = Thread(target=asyncio.run, args=(client_training_listener(job, client_info),))
-            client_listener_thread.daemon = True
-            client_listener_thread.start()
+        client_uuids = await _start_clients(
+            job.server_address,
+            job.client,
+            job.model,
+            job.optimizer,
+            job.clients_info,
+            request,
+        )
+
+        # Saving the server and clients' information in a single write
+        await job.update_fields(
+            {"server_uuid": server_uuid, "server_pid": str(server_process.pid)},
+            request.app.database,
+            clients_fields=[{"uuid": client_uuid} for client_uuid in client_uuids],
+        )
+
+        # Listen to the server and clients' metrics channels to update the job's metrics
+        # and status once the training is done
+        listener_manager: MetricsListenerManager = request.app.listener_manager
+        await listener_manager.listen(
+            job.redis_address, server_uuid, server_training_listener, job, request.app.database
+        )
+        for client_info, client_uuid in zip(job.clients_info, client_uuids):
+            await listener_manager.listen(
+                client_info.redis_address,
+                client_uuid,
+                client_training_listener,
+                job,
+                client_info,
+                request.app.database,
+            )
 
         # Return the UUIDs
         return JSONResponse({"server_uuid": server_uuid, "client_uuids": client_uuids})
@@ -129,109 +152,153 @@ async def start(job_id: str, request: Request) -> JSONResponse:
         return JSONResponse({"error": str(ex)}, status_code=500)
 
 
-async def client_training_listener(job: Job, client_info: ClientInfo) -> None:
+async def resume_training_listeners(
+    listener_manager: MetricsListenerManager,
+    database: AsyncIOMotorDatabase[Any],
+) -> None:
     """
-    Listen to the Redis' channel that reports updates on the training process of a FL client.
+    Start listening again to the metrics of the jobs that are still in progress.
 
-    Keeps consuming updates to the channel until it finds `shutdown` in the client metrics.
+    Meant to be called at startup so the jobs that were in progress when the server stopped catch
+    up with the updates reported in the meantime and are closed once their training is done.
 
-    :param job: (Job) The job that has this client's metrics.
-    :param client_info: (ClientInfo) The ClientInfo with the client_uuid to listen to.
+    :param listener_manager: (MetricsListenerManager) the app's listener manager.
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
     """
-    LOGGER.info(f"Starting listener for client messages from job {job.id} at channel {client_info.uuid}")
+    jobs = await Job.find_by_status(JobStatus.IN_PROGRESS, MAX_RECORDS_TO_FETCH, database)
+    for job in jobs:
+        if job.server_uuid is None or job.redis_address is None:
+            # the job did not finish starting, so there is nothing to listen to
+            continue
 
-    assert client_info.uuid is not None, "client_info.uuid is None."
+        LOGGER.info(f"Resuming listeners for job {job.id}")
+        try:
+            # Loading the rounds so the ones that haven't changed are not saved again
+            await job.load_round_metrics(database)
+            await listener_manager.listen(job.redis_address, job.server_uuid, server_training_listener, job, database)
+            for client_info in job.clients_info or []:
+                if client_info.uuid is not None:
+                    await listener_manager.listen(
+                        client_info.redis_address,
+                        client_info.uuid,
+                        client_training_listener,
+                        job,
+                        client_info,
+                        database,
+                    )
+        except Exception as err:
+            LOGGER.exception(f"Error resuming listeners for job {job.id}: {err}")
+
+
+async def client_training_listener(
+    job: Job,
+    client_info: ClientInfo,
+    database: AsyncIOMotorDatabase[Any],
+    client_metrics: Dict[str, Any],
+) -> bool:
+    """
+    Handle an update on the training process of a FL client reported to its Redis channel.
 
-    db_client: AsyncIOMotorClient[Any] = AsyncIOMotorClient(DatabaseConfig.get_mongodb_uri())
-    database = db_client[DatabaseConfig.get_mongodb_db_name()]
+    Called by the app's MetricsListenerManager every time the client metrics change. Saves them
+    to the job in the database and signals the manager to stop listening once it finds `shutdown`
+    in the client metrics.
 
-    # check if training has already finished before start listening
-    client_metrics = get_from_redis(client_info.uuid, client_info.redis_address)
-    LOGGER.debug(f"Client listener: Current metrics for client {client_info.uuid}: {client_metrics}")
-    if client_metrics is not None:
-        LOGGER.info(f"Client listener: Updating client metrics for client {client_info.uuid} on job {job.id}")
-        await job.set_client_metrics(client_info.uuid, client_metrics, database)
-        LOGGER.info(f"Client listener: Client metrics for client {client_info.uuid} on {job.id} have been updated.")
-        if "shutdown" in client_metrics:
-            db_client.close()
-            return
-
-    subscriber = get_subscriber(client_info.uuid, client_info.redis_address)
-    # TODO add a max retries mechanism, maybe?
-    for message in subscriber.listen():  # type: ignore[no-untyped-call]
-        if message["type"] == "message":
-            # The contents of the message do not matter, we just use it to get notified
-            client_metrics = get_from_redis(client_info.uuid, client_info.redis_address)
-            LOGGER.debug(f"Client listener: Current metrics for client {client_info.uuid}: {client_metrics}")
-
-            if client_metrics is not None:
-                LOGGER.info(f"Client listener: Updating client metrics for client {client_info.uuid} on job {job.id}")
-                await job.set_client_metrics(client_info.uuid, client_metrics, database)
-                LOGGER.info(
-                    f"Client listener: Client metrics for client {client_info.uuid} on {job.id} have been updated."
-                )
-                if "shutdown" in client_metrics:
-                    db_client.close()
-                    return
-
-    db_client.close()
-
-
-async def server_training_listener(job: Job) -> None:
+    :param job: (Job) The job that has this client's metrics.
+    :param client_info: (ClientInfo) The ClientInfo with the client_uuid being listened to.
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+    :param client_metrics: (Dict[str, Any]) The current metrics of the client.
+    :return: (bool) True if the client has finished training and there is no need to listen to it anymore,
+        False otherwise.
     """
-    Listen to the Redis' channel that reports updates on the training process of a FL server.
+    assert client_info.uuid is not None, "client_info.uuid is None."
+
+    LOGGER.debug(f"Client listener: Current metrics for client {client_info.uuid}: {client_metrics}")
+    LOGGER.info(f"Client listener: Updating client metrics for client {client_info.uuid} on job {job.id}")
+    await job.set_client_metrics(client_info.uuid, client_metrics, database)
+    LOGGER.info(f"Client listener: Client metrics for client {client_info.uuid} on {job.id} have been updated.")
+
+    return "shutdown" in client_metrics
 
-    Keeps consuming updates to the channel until it finds `fit_end` in the server metrics,
-    then closes the job with FINISHED_SUCCESSFULLY and saves both the clients and server's metrics
-    to the job in the database.
 
-    :param job: (Job) The job with the server_uuid to listen to.
+async def server_training_listener(
+    job: Job,
+    database: AsyncIOMotorDatabase[Any],
+    server_metrics: Dict[str, Any],
+) -> bool:
     """
-    LOGGER.info(f"Starting listener for server messages from job {job.id} at channel {job.server_uuid}")
+    Handle an update on the training process of a FL server reported to its Redis channel.
 
-    assert job.server_uuid is not None, "job.server_uuid is None."
-    assert job.redis_address is not None, "job.redis_address is None."
+    Called by the app's MetricsListenerManager every time the server metrics change. Saves them
+    to the job in the database and, once it finds `fit_end` in the server metrics, closes the job
+    with FINISHED_SUCCESSFULLY and signals the manager to stop listening.
 
-    db_client: AsyncIOMotorClient[Any] = AsyncIOMotorClient(DatabaseConfig.get_mongodb_uri())
-    database = db_client[DatabaseConfig.get_mongodb_db_name()]
+    :param job: (Job) The job with the server_uuid being listened to.
+    :param database: (motor.motor_asyncio.AsyncIOMotorDatabase) The database where the job collection is stored.
+    :param server_metrics: (Dict[str, Any]) The current metrics of the server.
+    :return: (bool) True if the training has finished and there is no need to listen to the server anymore,
+        False otherwise.
+    """
+    assert job.server_uuid is not None, "job.server_uuid is None."
 
-    # check if training has already finished before start listening
-    server_metrics = get_from_redis(job.server_uuid, job.redis_address)
     LOGGER.debug(f"Server listener: Current metrics for job {job.id}: {server_metrics}")
-    if server_metrics is not None:
-        LOGGER.info(f"Server listener: Updating server metrics for job {job.id}")
-        await job.set_server_metrics(server_metrics, database)
-        LOGGER.info(f"Server listener: Server metrics for {job.id} have been updated.")
-        if "fit_end" in server_metrics:
-            LOGGER.info(f"Server listener: Training finished for job {job.id}")
-            await job.set_status(JobStatus.FINISHED_SUCCESSFULLY, database)
-            LOGGER.info(f"Server listener: Job {job.id} status have been set to {job.status.value}.")
-            db_client.close()
-            return
-
-    subscriber = get_subscriber(job.server_uuid, job.redis_address)
-    # TODO add a max retries mechanism, maybe?
-    for message in subscriber.listen():  # type: ignore[no-untyped-call]
-        if message["type"] == "message":
-            # The contents of the message do not matter, we just use it to get notified
-            server_metrics = get_from_redis(job.server_uuid, job.redis_address)
-            LOGGER.debug(f"Server listener: Message received for job {job.id}. Metrics: {server_metrics}")
-
-            if server_metrics is not None:
-                LOGGER.info(f"Server listener: Updating server metrics for job {job.id}")
-                await job.set_server_metrics(server_metrics, database)
-                LOGGER.info(f"Server listener: Server metrics for {job.id} have been updated.")
-                if "fit_end" in server_metrics:
-                    LOGGER.info(f"Server listener: Training finished for job {job.id}")
-                    await job.set_status(JobStatus.FINISHED_SUCCESSFULLY, database)
-                    LOGGER.info(f"Server listener: Job {job.id} status have been set to {job.status.value}.")
-                    db_client.close()
-                    return
-
-    db_client.close()
-
-
-def _start_client(
+    LOGGER.info(f"Server listener: Updating server metrics for job {job.id}")
+    await job.set_server_metrics(server_metrics, database)
+    LOGGER.info(f"Server listener: Server metrics for {job.id} have been updated.")
+
+    if "fit_end" in server_metrics:
+        LOGGER.info(f"Server listener: Training finished for job {job.id}")
+        await job.set_status(JobStatus.FINISHED_SUCCESSFULLY, database)
+        LOGGER.info(f"Server listener: Job {job.id} status have been set to {job.status.value}.")
+        return True
+
+    return False
+
+
+async def _start_clients(
+    server_address: str,
+    client: Client,
+    model: Model,
+    optimizer: Optimizer,
+    clients_info: List[ClientInfo],
+    request: Request,
+) -> List[str]:
+    """
+    Start all the clients concurrently.
+
+    At most `START_CLIENTS_MAX_CONCURRENCY` clients are started at the same time. All the clients are
+    attempted even if some of them fail to start, and the failures are reported together.
+
+    :param server_address: (str) the address of the server the clients need to report to
+    :param client: (Client) the client to be started
+    :param model: (Model) the model to be trained by the clients
+    :param optimizer: (Optimizer) the optimizer to be used by the clients
+    :param clients_info: (List[ClientInfo]) the information needed to start each one of the clients
+    :param request: (fastapi.Request) the FastAPI request object.
+    :return: (List[str]) The clients' UUIDs, in the same order as `clients_info`.
+    :raises Exception: If any of the clients fail to start, with the errors of all the clients that failed.
+    """
+    semaphore = asyncio.Semaphore(START_CLIENTS_MAX_CONCURRENCY)
+
+    async def start_client(client_info: ClientInfo) -> str:
+        async with semaphore:
+            return await _start_client(server_address, client, model, optimizer, client_info, request)
+
+    results = await asyncio.gather(
+        *[start_client(client_info) for client_info in clients_info], return_exceptions=True
+    )
+
+    errors = [
+        f"{client_info.service_address}: {result}"
+        for client_info, result in zip(clients_info, results)
+        if isinstance(result, BaseException)
+    ]
+    if len(errors) > 0:
+        raise Exception(f"Failed to start {len(errors)} of {len(clients_info)} clients. " + " | ".join(errors))
+
+    return [result for result in results if isinstance(result, str)]
+
+
+async def _start_client(
     server_address: str,
     client: Client,
     model: Model,
@@ -254,11 +321,12 @@ def _start_client(
         "data_path": client_info.data_path,
         "redis_address": client_info.redis_address,
     }
-    token = get_client_token(client_info, request)
-    response = requests.get(
+    response = await get_from_client(
+        client_info,
+        request,
         url=f"http://{client_info.service_address}/{START_CLIENT_API}",
         params=parameters,
-        headers={"Authorization": f"Bearer {token.access_token}"},
+        timeout=START_CLIENT_TIMEOUT_SECONDS,
     )
     json_response = response.json()
 
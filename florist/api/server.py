@@ -1,5 +1,6 @@
 """FLorist server FastAPI endpoints and routes."""
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator
 
@@ -7,16 +8,32 @@ from fastapi import Depends, FastAPI
 from fastapi.responses import JSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 
-from florist.api.auth.token import DEFAULT_USERNAME, Token, make_default_server_user
+from florist.api.auth.token import (
+    DEFAULT_USERNAME,
+    CachedClientToken,
+    make_default_server_user,
+    shutdown_password_hash_executor,
+)
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
 from florist.api.db.config import DatabaseConfig
-from florist.api.db.server_entities import User
+from florist.api.db.server_entities import (
+    User,
+    convert_metrics_to_documents,
+    ensure_indexes,
+    ensure_metrics_collection,
+    move_rounds_to_metrics_collection,
+)
+from florist.api.http_client import create_http_client
 from florist.api.models.models import Model
+from florist.api.monitoring.config import MetricsConfig
+from florist.api.monitoring.listeners import MetricsListenerManager
+from florist.api.monitoring.metrics import close_async_connection_pools, close_connection_pools
 from florist.api.routes.server.auth import check_default_user_token
 from florist.api.routes.server.auth import router as auth_router
 from florist.api.routes.server.job import router as job_router
 from florist.api.routes.server.status import router as status_router
+from florist.api.routes.server.training import resume_training_listeners
 from florist.api.routes.server.training import router as training_router
 from florist.api.servers.strategies import Strategy
 
@@ -28,20 +45,57 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     app.db_client = AsyncIOMotorClient(DatabaseConfig.get_mongodb_uri())  # type: ignore[attr-defined]
     app.database = app.db_client[DatabaseConfig.get_mongodb_db_name()]  # type: ignore[attr-defined]
 
+    # Create the metrics time series collection and the indexes of the entities if they do not exist
+    await ensure_metrics_collection(app.database)  # type: ignore[attr-defined]
+    await ensure_indexes(app.database)  # type: ignore[attr-defined]
+
+    # Convert the metrics saved as JSON strings by previous versions
+    await convert_metrics_to_documents(app.database)  # type: ignore[attr-defined]
+
+    # Move the rounds saved in the jobs by previous versions to the metrics collection
+    await move_rounds_to_metrics_collection(app.database)  # type: ignore[attr-defined]
+
     # Create default user if it does not exist
     user = await User.find_by_username(DEFAULT_USERNAME, app.database)  # type: ignore[attr-defined]
     if user is None:
         await make_default_server_user(app.database)  # type: ignore[attr-defined]
 
-    # Making a dictionary to hold the authentication tokens of the clients
-    # this server is connected to
-    app.clients_auth_tokens: dict[str, Token] = {}  # type: ignore[attr-defined, misc]
+    # Making dictionaries to hold the authentication tokens of the clients
+    # this server is connected to, and the locks to refresh them
+    app.clients_auth_tokens: dict[str, CachedClientToken] = {}  # type: ignore[attr-defined, misc]
+    app.clients_auth_tokens_locks: dict[str, asyncio.Lock] = {}  # type: ignore[attr-defined, misc]
+
+    # Making a dictionary to cache the users by username so they are not fetched
+    # from the database on every authenticated request
+    app.users_cache: dict[str, User] = {}  # type: ignore[attr-defined, misc]
+
+    # Set up the HTTP client shared by all the requests made to the clients
+    app.http_client = create_http_client()  # type: ignore[attr-defined]
+
+    # Set up the listener manager for the metrics of the jobs' servers and clients
+    # and resume listening to the jobs that are still in progress
+    use_streams = MetricsConfig.get_use_streams()
+    app.listener_manager = MetricsListenerManager(use_streams=use_streams)  # type: ignore[attr-defined]
+    await resume_training_listeners(app.listener_manager, app.database)  # type: ignore[attr-defined]
 
     yield
 
+    # Stop listening to metrics
+    await app.listener_manager.close()  # type: ignore[attr-defined]
+
+    # Close the connections of the shared HTTP client
+    await app.http_client.aclose()  # type: ignore[attr-defined]
+
     # Shut down mongodb
     app.db_client.close()  # type: ignore[attr-defined]
 
+    # Disconnect the shared redis connection pools
+    close_connection_pools()
+    await close_async_connection_pools()
+
+    # Stop the password hashing threads
+    shutdown_password_hash_executor()
+
 
 app = FastAPI(lifespan=lifespan)
 app.include_router(training_router, tags=["training"], prefix="/api/server/training")
@@ -29,7 +29,7 @@ export interface ClientInfo {
     data_path: string;
     redis_address: string;
     hashed_password: string;
-    metrics?: string;
+    metrics?: Metrics;
 }
 
 export interface Metrics {
@@ -3,10 +3,10 @@
 import { useSearchParams } from "next/navigation";
 import Image from "next/image";
 
-import { useState } from "react";
+import { useEffect, useMemo, useState } from "react";
 import type { ReactElement } from "react";
 
-import { useGetJob, getServerLogsKey, getClientLogsKey, useSWRWithKey } from "../hooks";
+import { useGetJob, getServerLogTailKey, getClientLogTailKey, useLogTail } from "../hooks";
 import { validStatuses, ClientInfo, Metrics, RoundMetrics, JobDetailsProperties } from "../definitions";
 import loading_gif from "../../../assets/img/loading.gif";
 
@@ -220,7 +220,7 @@ export function JobProgressBar({
     jobId,
     clientIndex,
 }: {
-    metrics: string;
+    metrics?: Metrics | null;
     totalEpochs: number;
     jobStatus: keyof typeof validStatuses;
     jobId: string;
@@ -232,22 +232,20 @@ export function JobProgressBar({
         return <></>;
     }
 
-    const metricsJson = JSON.parse(metrics);
-
     let endRoundKey;
-    if (metricsJson.host_type === "server") {
+    if (metrics.host_type === "server") {
         endRoundKey = "eval_round_end";
-    } else if (metricsJson.host_type === "client") {
+    } else if (metrics.host_type === "client") {
         endRoundKey = "round_end";
     } else {
-        console.error(`JobProgressBar: Host type '${metricsJson.host_type}' not supported.`);
+        console.error(`JobProgressBar: Host type '${metrics.host_type}' not supported.`);
         return <></>;
     }
 
     let progressPercent = 0;
-    if ("rounds" in metricsJson && Object.keys(metricsJson.rounds).length > 0) {
-        const lastRound = Math.max(...Object.keys(metricsJson.rounds).map(Number));
-        const lastCompletedRound = endRoundKey in metricsJson.rounds[lastRound] ? lastRound : lastRound - 1;
+    if ("rounds" in metrics && Object.keys(metrics.rounds).length > 0) {
+        const lastRound = Math.max(...Object.keys(metrics.rounds).map(Number));
+        const lastCompletedRound = endRoundKey in metrics.rounds[lastRound] ? lastRound : lastRound - 1;
         progressPercent = (lastCompletedRound * 100) / totalEpochs;
     }
     const progressWidth = progressPercent === 0 ? "100%" : `${progressPercent}%`;
@@ -255,7 +253,7 @@ export function JobProgressBar({
     // Clients will not have a status, so we need to set one based on
     // the server status and progress percent
     let status = jobStatus as keyof typeof validStatuses;
-    if (metricsJson.host_type === "client") {
+    if (metrics.host_type === "client") {
         if (
             validStatuses[status] !== validStatuses.FINISHED_SUCCESSFULLY &&
             validStatuses[status] !== validStatuses.FINISHED_WITH_ERROR
@@ -326,7 +324,7 @@ export function JobProgressBar({
                     <div className="row pb-2">
                         {!collapsed ? (
                             <JobProgressDetails
-                                metrics={metricsJson}
+                                metrics={metrics}
                                 jobId={jobId}
                                 clientIndex={clientIndex}
                                 status={status}
@@ -780,7 +778,7 @@ export function JobDetailsClientsInfoTable({
                                 <div className="d-flex flex-column justify-content-center">
                                     <span className="ps-3 text-secondary text-sm">
                                         <JobProgressBar
-                                            metrics={clientInfo.metrics ?? ""}
+                                            metrics={clientInfo.metrics}
                                             totalEpochs={properties.totalEpochs ?? 0}
                                             jobId={properties.jobId ?? "unknown"}
                                             jobStatus={properties.jobStatus ?? "NOT_STARTED"}
@@ -812,19 +810,25 @@ export function JobLogsModal({
     let fileName: string = "";
 
     if (hostType === "server") {
-        apiKey = getServerLogsKey(jobId);
+        apiKey = getServerLogTailKey(jobId);
         fileName = "server.log";
     } else if (hostType === "client") {
-        apiKey = getClientLogsKey(jobId, clientIndex ?? -1);
+        apiKey = getClientLogTailKey(jobId, clientIndex ?? -1);
         fileName = `client-${clientIndex}.log`;
     }
 
-    const { data, error, isLoading, isValidating, mutate } = useSWRWithKey(apiKey);
+    // The logs are streamed as they are written, so only the new lines are downloaded
+    const { data, error, isLoading, restart } = useLogTail(apiKey);
 
-    let dataURL = "";
-    if (data) {
-        dataURL = window.URL.createObjectURL(new Blob([data]));
-    }
+    // Only making a new download URL when the logs change, and releasing the previous one
+    const dataURL = useMemo(() => (data ? window.URL.createObjectURL(new Blob([data])) : ""), [data]);
+    useEffect(() => {
+        return () => {
+            if (dataURL) {
+                window.URL.revokeObjectURL(dataURL);
+            }
+        };
+    }, [dataURL]);
 
     return (
         <div className="log-viewer modal show" tabIndex={-1}>
@@ -832,7 +836,7 @@ export function JobLogsModal({
                 <div className="modal-content">
                     <div className="modal-header">
                         <h1 className="modal-title fs-5">Log Viewer</h1>
-                        <a className="refresh-button" onClick={() => mutate(apiKey)}>
+                        <a className="refresh-button" onClick={() => restart()}>
                             <i className="material-icons">refresh</i>
                         </a>
                         <a className="download-button" title="Download" href={dataURL} download={fileName}>
@@ -844,11 +848,11 @@ export function JobLogsModal({
                     </div>
 
                     <div className="modal-body">
-                        {isLoading || isValidating ? (
+                        {isLoading ? (
                             <div className="loading-container">
                                 <Image src={loading_gif} alt="Loading Logs" height={64} width={64} />
                             </div>
-                        ) : error ? (
+                        ) : error && !data ? (
                             "Error loading logs"
                         ) : (
                             data
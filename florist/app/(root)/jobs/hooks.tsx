@@ -1,22 +1,299 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import useSWR, { mutate } from "swr";
+import useSWRInfinite, { unstable_serialize } from "swr/infinite";
 
 import { fetcher } from "../../client_imports";
+import { getAuthHeaders } from "../../auth";
+
+const JOB_EVENTS_URL = "/api/server/job/events/stream";
+// Time to wait before reconnecting to the job events stream after it has been disconnected
+const JOB_EVENTS_RECONNECT_DELAY_MS = 3000;
+// Polling interval used while the job events stream is not connected
+const POLLING_INTERVAL_MS = 1000;
+// Polling interval used while the job events stream is connected. The events are published by the server
+// process that made the update, so when the server runs with multiple workers some may not be received
+const CONNECTED_POLLING_INTERVAL_MS = 10000;
+// Amount of job summaries fetched per page when listing the jobs by status
+const JOB_SUMMARIES_PAGE_SIZE = 100;
+// Time to wait before reconnecting to a log tail stream after it has been disconnected
+const LOG_TAIL_RECONNECT_DELAY_MS = 3000;
+
+export interface JobEvent {
+    type: string;
+    job_id?: string;
+    status?: string;
+    client_uuid?: string;
+    delta?: MetricsDelta;
+}
+
+interface MetricsDelta {
+    rounds?: { [round: string]: object };
+    [key: string]: unknown;
+}
+
+export interface ServerSentEvent {
+    id: string | null;
+    event: string;
+    data: string;
+}
+
+export interface LogTail {
+    data: string;
+    error: boolean;
+    isLoading: boolean;
+    restart: () => void;
+}
+
+interface JobEventsListener {
+    onEvent: (event: JobEvent) => void;
+    onConnectionChange: (connected: boolean) => void;
+}
+
+// A single connection to the job events stream is shared by all the components listening to it
+const jobEventsListeners = new Set<JobEventsListener>();
+let jobEventsController: AbortController | null = null;
+let jobEventsConnected = false;
+
+function setJobEventsConnected(controller: AbortController, connected: boolean) {
+    if (controller !== jobEventsController) {
+        return;
+    }
+    jobEventsConnected = connected;
+    jobEventsListeners.forEach((listener) => listener.onConnectionChange(connected));
+}
+
+// Read a stream of server-sent events, calling onMessage with each raw event message until the stream ends.
+// Throws if the request fails or the stream is interrupted.
+async function readServerSentEvents(
+    url: string,
+    signal: AbortSignal,
+    onMessage: (message: string) => void,
+    { headers = {}, onOpen }: { headers?: Record<string, string>; onOpen?: () => void } = {},
+) {
+    const response = await fetch(url, {
+        headers: { ...Object.fromEntries(getAuthHeaders()), ...headers },
+        signal,
+    });
+    if (response.status !== 200 || !response.body) {
+        throw new Error(response.status.toString());
+    }
+    onOpen?.();
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        let eventEnd = buffer.indexOf("\n\n");
+        while (eventEnd >= 0) {
+            const message = buffer.slice(0, eventEnd);
+            buffer = buffer.slice(eventEnd + 2);
+            onMessage(message);
+            eventEnd = buffer.indexOf("\n\n");
+        }
+    }
+}
+
+async function readJobEvents(controller: AbortController) {
+    while (!controller.signal.aborted) {
+        try {
+            await readServerSentEvents(JOB_EVENTS_URL, controller.signal, (message) => {
+                const event = parseJobEvent(message);
+                if (event) {
+                    if (event.type === "connected") {
+                        setJobEventsConnected(controller, true);
+                    }
+                    jobEventsListeners.forEach((listener) => listener.onEvent(event));
+                }
+            });
+        } catch {
+            // The components fall back to polling until the stream is reconnected
+        }
+        setJobEventsConnected(controller, false);
+        if (!controller.signal.aborted) {
+            await new Promise((resolve) => setTimeout(resolve, JOB_EVENTS_RECONNECT_DELAY_MS));
+        }
+    }
+}
+
+export function parseServerSentEvent(message: string): ServerSentEvent | null {
+    const event: ServerSentEvent = { id: null, event: "message", data: "" };
+    const data: Array<string> = [];
+    let hasFields = false;
+    for (const line of message.split("\n")) {
+        const separator = line.indexOf(":");
+        if (separator === 0) {
+            // Comments such as keepalives are ignored
+            continue;
+        }
+        const field = separator > 0 ? line.slice(0, separator) : line;
+        const value = separator > 0 ? line.slice(separator + 1).replace(/^ /, "") : "";
+        if (field === "id") {
+            event.id = value;
+        } else if (field === "event") {
+            event.event = value;
+        } else if (field === "data") {
+            data.push(value);
+        } else {
+            continue;
+        }
+        hasFields = true;
+    }
+    if (!hasFields) {
+        return null;
+    }
+    event.data = data.join("\n");
+    return event;
+}
+
+export function parseJobEvent(message: string): JobEvent | null {
+    const data = parseServerSentEvent(message)?.data.trim();
+    if (!data) {
+        // Comments such as keepalives have no data
+        return null;
+    }
+    try {
+        return JSON.parse(data);
+    } catch {
+        return null;
+    }
+}
+
+export function applyMetricsDelta(metrics: MetricsDelta | null | undefined, delta: MetricsDelta): MetricsDelta {
+    const updatedMetrics: MetricsDelta = { ...(metrics ?? {}) };
+    for (const [key, value] of Object.entries(delta)) {
+        if (key === "rounds") {
+            updatedMetrics.rounds = { ...(updatedMetrics.rounds ?? {}), ...(value as object) };
+        } else {
+            updatedMetrics[key] = value;
+        }
+    }
+    return updatedMetrics;
+}
+
+export function useJobEvents(onEvent: (event: JobEvent) => void): boolean {
+    const [connected, setConnected] = useState(jobEventsConnected);
+    const onEventRef = useRef(onEvent);
+    useEffect(() => {
+        onEventRef.current = onEvent;
+    }, [onEvent]);
+
+    useEffect(() => {
+        const listener = {
+            onEvent: (event: JobEvent) => onEventRef.current(event),
+            onConnectionChange: setConnected,
+        };
+        jobEventsListeners.add(listener);
+        if (jobEventsController === null) {
+            jobEventsController = new AbortController();
+            readJobEvents(jobEventsController);
+        }
+        return () => {
+            jobEventsListeners.delete(listener);
+            if (jobEventsListeners.size === 0 && jobEventsController !== null) {
+                jobEventsController.abort();
+                jobEventsController = null;
+                jobEventsConnected = false;
+            }
+        };
+    }, []);
+
+    return connected;
+}
+
+interface JobSummaryPage {
+    jobs: Array<object>;
+    next: string | null;
+}
+
+function getJobSummariesKey(status: string) {
+    return (pageIndex: number, previousPage: JobSummaryPage | null) => {
+        const endpoint = `/api/server/job/status/${status}/summary?limit=${JOB_SUMMARIES_PAGE_SIZE}`;
+        if (pageIndex === 0) {
+            return endpoint;
+        }
+        if (!previousPage?.next) {
+            // Reached the last page
+            return null;
+        }
+        return `${endpoint}&next=${encodeURIComponent(previousPage.next)}`;
+    };
+}
 
 export function useGetJobsByJobStatus(status: string) {
-    const endpoint = `/api/server/job/status/${status}`;
-    const { data, error, isLoading } = useSWR(endpoint, fetcher, {
-        refreshInterval: 1000,
+    const connected = useJobEvents((event: JobEvent) => {
+        // Status events are also published for new jobs. Refetching when connecting
+        // in case there were updates while disconnected
+        if (event.type === "status" || event.type === "connected" || event.type === "resync") {
+            mutatePages();
+        }
     });
-    return { data, error, isLoading };
+    // Fetching the job summaries a page at a time, so polling only transfers the fields listed in the table
+    const {
+        data: pages,
+        error,
+        isLoading,
+        size,
+        setSize,
+        mutate: mutatePages,
+    } = useSWRInfinite<JobSummaryPage>(getJobSummariesKey(status), fetcher, {
+        // Only polling often while the job events stream is not connected
+        refreshInterval: connected ? CONNECTED_POLLING_INTERVAL_MS : POLLING_INTERVAL_MS,
+    });
+    const data = pages?.flatMap((page) => page.jobs);
+    const hasMore = Boolean(pages && pages[pages.length - 1]?.next);
+    const loadMore = () => setSize(size + 1);
+    return { data, error, isLoading, hasMore, loadMore };
 }
 
 export function useGetJob(jobId: string | null) {
-    const { data, error, isLoading } = useSWR(jobId ? `/api/server/job/${jobId}` : null, fetcher, {
+    const connected = useJobEvents((event: JobEvent) => {
+        if (!jobId) {
+            return;
+        }
+        if (event.type === "connected" || event.type === "resync") {
+            mutateJob();
+        } else if (event.job_id !== jobId) {
+            return;
+        } else if (event.type === "status") {
+            mutateJob();
+        } else if (event.type === "server_metrics" && event.delta) {
+            const delta = event.delta;
+            mutateJob((job) => job && { ...job, server_metrics: applyMetricsDelta(job.server_metrics, delta) }, {
+                revalidate: false,
+            });
+        } else if (event.type === "client_metrics" && event.delta) {
+            const delta = event.delta;
+            mutateJob(
+                (job) =>
+                    job && {
+                        ...job,
+                        clients_info: job.clients_info?.map(
+                            (clientInfo: { uuid?: string; metrics?: MetricsDelta | null }) =>
+                                clientInfo.uuid === event.client_uuid
+                                    ? { ...clientInfo, metrics: applyMetricsDelta(clientInfo.metrics, delta) }
+                                    : clientInfo,
+                        ),
+                    },
+                { revalidate: false },
+            );
+        }
+    });
+
+    const {
+        data,
+        error,
+        isLoading,
+        mutate: mutateJob,
+    } = useSWR(jobId ? `/api/server/job/${jobId}` : null, fetcher, {
         refreshInterval: (data) => {
             if (data?.status === "IN_PROGRESS") {
-                // Force refetching every second for in-progress jobs
-                return 1000;
+                // Force refetching every second for in-progress jobs while the job events stream is not connected
+                return connected ? CONNECTED_POLLING_INTERVAL_MS : POLLING_INTERVAL_MS;
             }
             return 0;
         },
@@ -51,18 +328,81 @@ export function useGetClients({ strategy }: { strategy: string }) {
     return useSWR(strategy ? `/api/server/clients/${strategy}` : null, fetcher);
 }
 
-export function getServerLogsKey(jobId: string) {
-    return `/api/server/job/get_server_log/${jobId}`;
+export function getServerLogTailKey(jobId: string) {
+    return `/api/server/job/tail_server_log/${jobId}`;
 }
 
-export function getClientLogsKey(jobId: string, clientIndex: number) {
-    return `/api/server/job/get_client_log/${jobId}/${clientIndex}`;
+export function getClientLogTailKey(jobId: string, clientIndex: number) {
+    return `/api/server/job/tail_client_log/${jobId}/${clientIndex}`;
 }
 
-export function useSWRWithKey(key: string) {
-    return useSWR(key, fetcher);
+// Read a log tail stream, calling onLines with the text of each log event until the stream sends
+// its end event. Reconnects when disconnected, resuming after the last lines received.
+async function readLogTail(
+    url: string,
+    signal: AbortSignal,
+    onLines: (lines: string) => void,
+    onConnectionChange: (connected: boolean) => void,
+) {
+    let lastEventId: string | null = null;
+    let ended = false;
+    while (!ended && !signal.aborted) {
+        try {
+            await readServerSentEvents(
+                url,
+                signal,
+                (message) => {
+                    const event = parseServerSentEvent(message);
+                    if (event?.event === "log") {
+                        lastEventId = event.id ?? lastEventId;
+                        onLines(JSON.parse(event.data));
+                    } else if (event?.event === "end") {
+                        ended = true;
+                    }
+                },
+                {
+                    // The server resumes the stream from the offset in the ID of the last event received
+                    headers: lastEventId !== null ? { "Last-Event-ID": lastEventId } : {},
+                    onOpen: () => onConnectionChange(true),
+                },
+            );
+        } catch {
+            if (!signal.aborted) {
+                onConnectionChange(false);
+            }
+        }
+        if (!ended && !signal.aborted) {
+            await new Promise((resolve) => setTimeout(resolve, LOG_TAIL_RECONNECT_DELAY_MS));
+        }
+    }
+}
+
+export function useLogTail(url: string): LogTail {
+    const [data, setData] = useState("");
+    const [error, setError] = useState(false);
+    const [isLoading, setIsLoading] = useState(true);
+    const [restarts, setRestarts] = useState(0);
+
+    useEffect(() => {
+        const controller = new AbortController();
+        setData("");
+        setError(false);
+        setIsLoading(true);
+        readLogTail(
+            url,
+            controller.signal,
+            (lines) => setData((previousData) => previousData + lines),
+            (connected) => {
+                setError(!connected);
+                setIsLoading(false);
+            },
+        );
+        return () => controller.abort();
+    }, [url, restarts]);
+
+    return { data, error, isLoading, restart: () => setRestarts((previousRestarts) => previousRestarts + 1) };
 }
 
 export function refreshJobsByJobStatus(statuses: Array<string>) {
-    statuses.forEach((status: string) => mutate(`/api/server/job/status/${status}`));
+    statuses.forEach((status: string) => mutate(unstable_serialize(getJobSummariesKey(status))));
 }
@@ -36,8 +36,8 @@ export default function Page(): ReactElement {
         );
     }
 
-    const statusComponents = statusDataFetches.map(({ data }, i) => (
-        <Status key={i} status={statusKeys[i] as StatusProp} data={data} />
+    const statusComponents = statusDataFetches.map(({ data, hasMore, loadMore }, i) => (
+        <Status key={i} status={statusKeys[i] as StatusProp} data={data} hasMore={hasMore} loadMore={loadMore} />
     ));
     return (
         <div>
@@ -180,7 +180,17 @@ export function StopJobButton({ rowId, jobId }: { rowId: number; jobId: string }
     );
 }
 
-export function Status({ status, data }: { status: StatusProp; data: Array<Job> }): ReactElement {
+export function Status({
+    status,
+    data,
+    hasMore,
+    loadMore,
+}: {
+    status: StatusProp;
+    data: Array<Job>;
+    hasMore?: boolean;
+    loadMore?: () => void;
+}): ReactElement {
     return (
         <div className="row">
             <div className="col-12">
@@ -193,12 +203,27 @@ export function Status({ status, data }: { status: StatusProp; data: Array<Job>
                         </div>
                     </div>
                     <StatusTable data={data} status={status} />
+                    {hasMore && loadMore ? <LoadMoreButton status={status} loadMore={loadMore} /> : null}
                 </div>
             </div>
         </div>
     );
 }
 
+export function LoadMoreButton({ status, loadMore }: { status: StatusProp; loadMore: () => void }): ReactElement {
+    return (
+        <div className="card-footer text-center pt-0">
+            <button
+                data-testid={`load-more-button-${status}`}
+                className="btn btn-outline-primary btn-sm mb-0"
+                onClick={loadMore}
+            >
+                Load more
+            </button>
+        </div>
+    );
+}
+
 export function StatusTable({ status, data }: { status: StatusProp; data: Array<Job> }): ReactElement {
     if (data.length > 0) {
         return (
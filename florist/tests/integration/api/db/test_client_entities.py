@@ -1,7 +1,10 @@
 import json
+import sqlite3
+import threading
 import pytest
+from unittest.mock import patch
 
-from florist.api.db.client_entities import ClientDAO, UserDAO
+from florist.api.db.client_entities import ClientDAO, EntityDAO, UserDAO, close_connections, create_schema
 
 from florist.tests.integration.api.utils import mock_request
 
@@ -10,6 +13,53 @@ def test_get_connection(mock_request):
     db_connection = ClientDAO.get_connection()
     assert db_connection
 
+
+def test_get_connection_is_reused(mock_request):
+    db_connection = ClientDAO.get_connection()
+
+    assert ClientDAO.get_connection() is db_connection
+    assert UserDAO.get_connection() is db_connection
+    assert db_connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_get_connection_per_thread(mock_request):
+    db_connection = ClientDAO.get_connection()
+
+    thread_connections = []
+    thread = threading.Thread(target=lambda: thread_connections.append(ClientDAO.get_connection()))
+    thread.start()
+    thread.join()
+
+    assert thread_connections[0] is not db_connection
+
+
+def test_close_connections(mock_request):
+    db_connection = ClientDAO.get_connection()
+
+    close_connections()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        db_connection.execute("SELECT 1")
+    assert ClientDAO.get_connection() is not db_connection
+
+
+def test_create_schema(mock_request):
+    create_schema()
+
+    db_connection = ClientDAO.get_connection()
+    tables = db_connection.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+    assert {table[0] for table in tables} == {ClientDAO.table_name, UserDAO.table_name}
+
+def test_create_table_statement_when_table_exists(mock_request):
+    create_schema()
+
+    # Another thread may create the table after create_table has checked that it doesn't exist
+    db_connection = ClientDAO.get_connection()
+    db_connection.execute(ClientDAO._get_create_table_statement(ClientDAO.table_name))
+
+    assert db_connection.execute(f"PRAGMA table_info({ClientDAO.table_name})").fetchall()[0][5] == 1
+
+
 def test_eq(mock_request):
     client_1 = ClientDAO(uuid="test-uuid-1", log_file_path="test-log-file-path-1", pid=1234)
     client_2 = ClientDAO(uuid="test-uuid-2", log_file_path="test-log-file-path-2", pid=5678)
@@ -28,6 +78,16 @@ def test_save_and_find(mock_request):
 
     assert ClientDAO.find(test_uuid) == client
 
+def test_find_when_data_is_not_the_second_column(mock_request):
+    client = ClientDAO(uuid="test-uuid", log_file_path="test-log-file-path", pid=1234)
+    db_connection = ClientDAO.get_connection()
+    db_connection.execute("DROP TABLE Client")
+    db_connection.execute("CREATE TABLE Client (uuid TEXT PRIMARY KEY, pid INTEGER, data TEXT)")
+    db_connection.execute("INSERT INTO Client (uuid, pid, data) VALUES(?, ?, ?)", (client.uuid, client.pid, client.to_json()))
+
+    assert ClientDAO.find(client.uuid) == client
+
+
 def test_saving_a_second_time_should_update(mock_request):
     test_uuid = "test-uuid"
     client = ClientDAO(uuid=test_uuid, log_file_path="test-log-file-path", pid=1234)
@@ -109,3 +169,115 @@ def test_user_to_and_from_json(mock_request):
     user = UserDAO.from_json(json_data)
 
     assert user.to_json() == json_data
+
+
+def test_user_find_is_cached(mock_request):
+    user = UserDAO(username="test-username", hashed_password="test-hashed-password")
+    user.save()
+
+    assert UserDAO.find(user.uuid) == user
+
+    with patch.object(EntityDAO, "get_connection") as mock_get_connection:
+        found_user = UserDAO.find(user.uuid)
+        mock_get_connection.assert_not_called()
+
+    assert found_user == user
+    # changing the returned user should not change the cached user
+    found_user.hashed_password = "test-other-hashed-password"
+    assert UserDAO.find(user.uuid) == user
+
+
+def test_user_save_invalidates_cache(mock_request):
+    user = UserDAO(username="test-username", hashed_password="test-hashed-password")
+    user.save()
+    assert UserDAO.find(user.uuid) == user
+
+    user.hashed_password = "test-new-hashed-password"
+    user.save()
+
+    assert UserDAO.find(user.uuid).hashed_password == "test-new-hashed-password"
+
+
+def test_user_find_does_not_cache_user_saved_while_reading(mock_request):
+    user = UserDAO(username="test-username", hashed_password="test-hashed-password")
+    user.save()
+    old_user = UserDAO.from_json(user.to_json())
+    UserDAO.clear_cache()
+
+    def find_and_save(uuid):
+        # the user is saved after its old row has been read
+        user.hashed_password = "test-new-hashed-password"
+        user.save()
+        return old_user
+
+    with patch.object(EntityDAO, "find", side_effect=find_and_save):
+        assert UserDAO.find(user.uuid).hashed_password == "test-hashed-password"
+
+    assert UserDAO.find(user.uuid).hashed_password == "test-new-hashed-password"
+
+
+def test_save_writes_columns_and_timestamps(mock_request):
+    client = ClientDAO(uuid="test-uuid", log_file_path="test-log-file-path", pid=1234)
+    client.save()
+
+    db_connection = ClientDAO.get_connection()
+    query = "SELECT log_file_path, pid, created_at, updated_at FROM Client WHERE uuid=?"
+    log_file_path, pid, created_at, updated_at = db_connection.execute(query, (client.uuid,)).fetchone()
+    assert log_file_path == client.log_file_path
+    assert pid == client.pid
+    assert created_at == updated_at
+
+    client.pid = 5678
+    client.save()
+
+    pid, new_created_at, new_updated_at = db_connection.execute(
+        "SELECT pid, created_at, updated_at FROM Client WHERE uuid=?", (client.uuid,)
+    ).fetchone()
+    assert pid == 5678
+    assert new_created_at == created_at
+    assert new_updated_at > updated_at
+    assert db_connection.execute("SELECT COUNT(*) FROM Client").fetchone()[0] == 1
+
+
+def test_create_table_migrates_table_without_primary_key(mock_request):
+    client_1 = ClientDAO(uuid="test-uuid-1", log_file_path="test-log-file-path-1", pid=1234)
+    client_1_updated = ClientDAO(uuid="test-uuid-1", log_file_path="test-log-file-path-1", pid=5678)
+    client_2 = ClientDAO(uuid="test-uuid-2", log_file_path="test-log-file-path-2", pid=9012)
+    old_db_connection = sqlite3.connect(ClientDAO.db_path)
+    old_db_connection.execute("CREATE TABLE Client (uuid TEXT, data TEXT)")
+    for client in [client_1, client_1_updated, client_2]:
+        old_db_connection.execute("INSERT INTO Client (uuid, data) VALUES(?, ?)", (client.uuid, client.to_json()))
+    old_db_connection.commit()
+    old_db_connection.close()
+
+    ClientDAO.create_table()
+
+    db_connection = ClientDAO.get_connection()
+    columns = db_connection.execute("PRAGMA table_info(Client)").fetchall()
+    assert [(column[1], column[5]) for column in columns] == [
+        ("uuid", 1),
+        ("data", 0),
+        ("created_at", 0),
+        ("updated_at", 0),
+        ("log_file_path", 0),
+        ("pid", 0),
+    ]
+    assert ClientDAO.find(client_1.uuid) == client_1_updated
+    assert ClientDAO.find(client_2.uuid) == client_2
+    rows = db_connection.execute("SELECT uuid, log_file_path, pid FROM Client ORDER BY uuid").fetchall()
+    assert rows == [
+        (client_1.uuid, client_1_updated.log_file_path, client_1_updated.pid),
+        (client_2.uuid, client_2.log_file_path, client_2.pid),
+    ]
+
+
+async def test_save_and_find_async(mock_request):
+    test_uuid = "test-uuid"
+    client = ClientDAO(uuid=test_uuid, log_file_path="test-log-file-path", pid=1234)
+
+    assert not await ClientDAO.exists_async(test_uuid)
+
+    await client.save_async()
+
+    assert await ClientDAO.exists_async(test_uuid)
+    assert await ClientDAO.find_async(test_uuid) == client
@@ -1,13 +1,36 @@
+import asyncio
 import json
 import re
+from datetime import datetime, timezone
 from unittest.mock import ANY
+from pymongo.errors import DuplicateKeyError
 from pytest import raises
 
 from florist.api.auth.token import DEFAULT_PASSWORD, _simple_hash
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
-from florist.api.db.server_entities import Job, JobStatus, User
+from florist.api.db.server_entities import (
+    JOB_COLLECTION_NAME,
+    METRICS_COLLECTION_NAME,
+    USER_COLLECTION_NAME,
+    ClientInfoSummary,
+    ClientMetrics,
+    HostType,
+    Job,
+    JobMetrics,
+    JobStatus,
+    JobSummary,
+    RoundMetrics,
+    User,
+    convert_metrics_to_documents,
+    ensure_indexes,
+    ensure_metrics_collection,
+    make_job_summaries_token,
+    move_rounds_to_metrics_collection,
+    parse_job_summaries_token,
+)
 from florist.api.models.models import Model
+from florist.api.monitoring.events import JOB_EVENTS
 from florist.api.servers.strategies import Strategy
 from florist.tests.integration.api.utils import mock_request
 
@@ -18,6 +41,9 @@ async def test_job_create_success(mock_request) -> None:
     result_id = await test_job.create(mock_request.app.database)
 
     assert isinstance(result_id, str)
+    assert test_job.created_at is not None
+    result_job = await Job.find_by_id(result_id, mock_request.app.database)
+    assert result_job.created_at == test_job.created_at
 
 
 async def test_job_find_by_id_success(mock_request) -> None:
@@ -38,6 +64,14 @@ async def test_job_find_by_id_not_found(mock_request) -> None:
     assert result_job is None
 
 
+async def test_job_find_status_by_id(mock_request) -> None:
+    test_job = get_test_job()
+    result_id = await test_job.create(mock_request.app.database)
+
+    assert await Job.find_status_by_id(result_id, mock_request.app.database) == test_job.status
+    assert await Job.find_status_by_id("does-not-exist", mock_request.app.database) is None
+
+
 async def test_job_find_by_status_success(mock_request) -> None:
     test_job = get_test_job()
     test_job.status = JobStatus.FINISHED_SUCCESSFULLY
@@ -64,6 +98,106 @@ async def test_job_find_by_status_with_limit_success(mock_request) -> None:
     assert len(result_jobs) == 3
 
 
+async def test_job_find_summaries_by_status_success(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.status = JobStatus.FINISHED_SUCCESSFULLY
+    result_id = await test_job.create(mock_request.app.database)
+
+    result_page = await Job.find_summaries_by_status(JobStatus.FINISHED_SUCCESSFULLY, 10, mock_request.app.database)
+    assert result_page.next is None
+    assert result_page.jobs == [
+        JobSummary(
+            id=result_id,
+            status=JobStatus.FINISHED_SUCCESSFULLY,
+            created_at=test_job.created_at,
+            model=test_job.model,
+            strategy=test_job.strategy,
+            server_address=test_job.server_address,
+            clients_info=[
+                ClientInfoSummary(service_address=test_job.clients_info[0].service_address),
+                ClientInfoSummary(service_address=test_job.clients_info[1].service_address),
+            ],
+        ),
+    ]
+
+    result_page = await Job.find_summaries_by_status(JobStatus.NOT_STARTED, 10, mock_request.app.database)
+    assert result_page.jobs == []
+    assert result_page.next is None
+
+
+async def test_job_find_summaries_by_status_pagination(mock_request) -> None:
+    result_ids = []
+    for i in range(5):
+        test_job = get_test_job()
+        # IDs in the reverse order of creation, so the jobs are not sorted by ID
+        test_job.id = f"test-id{4 - i}"
+        test_job.status = JobStatus.FINISHED_SUCCESSFULLY
+        result_ids.append(await test_job.create(mock_request.app.database))
+        # Making sure the creation times are different
+        await asyncio.sleep(0.002)
+
+    result_page = await Job.find_summaries_by_status(JobStatus.FINISHED_SUCCESSFULLY, 2, mock_request.app.database)
+    assert [job.id for job in result_page.jobs] == result_ids[:2]
+    assert result_page.next == make_job_summaries_token(result_page.jobs[-1])
+
+    # A job created after the first page was loaded shows up at the end
+    test_job = get_test_job()
+    test_job.id = "test-id-new"
+    test_job.status = JobStatus.FINISHED_SUCCESSFULLY
+    result_ids.append(await test_job.create(mock_request.app.database))
+
+    result_page = await Job.find_summaries_by_status(
+        JobStatus.FINISHED_SUCCESSFULLY, 2, mock_request.app.database, result_page.next,
+    )
+    assert [job.id for job in result_page.jobs] == result_ids[2:4]
+    assert result_page.next == make_job_summaries_token(result_page.jobs[-1])
+
+    result_page = await Job.find_summaries_by_status(
+        JobStatus.FINISHED_SUCCESSFULLY, 2, mock_request.app.database, result_page.next,
+    )
+    assert [job.id for job in result_page.jobs] == result_ids[4:]
+    assert result_page.next is None
+
+
+async def test_job_find_summaries_by_status_pagination_without_created_at(mock_request) -> None:
+    # Jobs created by previous versions don't have a creation time
+    for test_id in ["test-id2", "test-id1"]:
+        await mock_request.app.database[JOB_COLLECTION_NAME].insert_one(
+            {"_id": test_id, "status": JobStatus.FINISHED_SUCCESSFULLY.value},
+        )
+    test_job = get_test_job()
+    test_job.id = "test-id0"
+    test_job.status = JobStatus.FINISHED_SUCCESSFULLY
+    await test_job.create(mock_request.app.database)
+
+    result_ids = []
+    next_token = None
+    for _ in range(3):
+        result_page = await Job.find_summaries_by_status(
+            JobStatus.FINISHED_SUCCESSFULLY, 1, mock_request.app.database, next_token,
+        )
+        result_ids += [job.id for job in result_page.jobs]
+        next_token = result_page.next
+
+    assert result_ids == ["test-id1", "test-id2", "test-id0"]
+    assert next_token is None
+
+
+async def test_job_find_summaries_by_status_fail_invalid_next_token(mock_request) -> None:
+    with raises(AssertionError, match="Invalid next token: not-a-token"):
+        await Job.find_summaries_by_status(JobStatus.FINISHED_SUCCESSFULLY, 1, mock_request.app.database, "not-a-token")
+
+
+async def test_make_and_parse_job_summaries_token(mock_request) -> None:
+    test_created_at = datetime(2024, 4, 23, 15, 33, 13, 2000, tzinfo=timezone.utc)
+
+    token = make_job_summaries_token(JobSummary(id="test-id", created_at=test_created_at))
+    assert parse_job_summaries_token(token) == (test_created_at, "test-id")
+
+    token = make_job_summaries_token(JobSummary(id="test-id"))
+    assert parse_job_summaries_token(token) == (None, "test-id")
+
+
 async def test_set_uuids_success(mock_request) -> None:
     test_job = get_test_job()
     result_id = await test_job.create(mock_request.app.database)
@@ -124,6 +258,51 @@ async def test_set_uuids_fail_update_result(mock_request) -> None:
         await test_job.set_uuids(test_server_uuid, test_client_uuids, mock_request.app.database)
 
 
+async def test_update_fields_success(mock_request) -> None:
+    test_job = get_test_job()
+    result_id = await test_job.create(mock_request.app.database)
+    test_job.id = result_id
+    test_job.clients_info[0].id = ANY
+    test_job.clients_info[1].id = ANY
+    events_queue = JOB_EVENTS.subscribe()
+
+    await test_job.update_fields(
+        {"status": JobStatus.IN_PROGRESS, "server_uuid": "a-different-server-uuid", "server_pid": "1234"},
+        mock_request.app.database,
+        clients_fields=[{"uuid": "a-different-client-uuid-1"}, {"uuid": "a-different-client-uuid-2"}],
+    )
+
+    JOB_EVENTS.unsubscribe(events_queue)
+    assert test_job.status == JobStatus.IN_PROGRESS
+    assert test_job.server_uuid == "a-different-server-uuid"
+    assert test_job.server_pid == "1234"
+    assert test_job.clients_info[0].uuid == "a-different-client-uuid-1"
+    assert test_job.clients_info[1].uuid == "a-different-client-uuid-2"
+    result_job = await Job.find_by_id(result_id, mock_request.app.database)
+    assert result_job == test_job
+    assert events_queue.get_nowait() == {"type": "status", "job_id": result_id, "status": JobStatus.IN_PROGRESS.value}
+    assert events_queue.empty()
+
+
+async def test_update_fields_fail_invalid_attribute(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+
+    with raises(AssertionError, match=re.escape("not-an-attribute is not a Job attribute.")):
+        await test_job.update_fields({"not-an-attribute": "test-value"}, mock_request.app.database)
+
+    with raises(AssertionError, match=re.escape("not-an-attribute is not a ClientInfo attribute.")):
+        await test_job.update_fields(
+            {},
+            mock_request.app.database,
+            clients_fields=[{"not-an-attribute": "test-value"}, {}],
+        )
+
+    error_msg = "self.clients_info and clients_fields must have the same length (2!=1)."
+    with raises(AssertionError, match=re.escape(error_msg)):
+        await test_job.update_fields({}, mock_request.app.database, clients_fields=[{"uuid": "test-uuid"}])
+
+
 async def test_set_status_success(mock_request) -> None:
     test_job = get_test_job()
     result_id = await test_job.create(mock_request.app.database)
@@ -161,7 +340,7 @@ async def test_set_server_metrics_success(mock_request) -> None:
     await test_job.set_server_metrics(test_server_metrics, mock_request.app.database)
 
     result_job = await Job.find_by_id(result_id, mock_request.app.database)
-    test_job.server_metrics = json.dumps(test_server_metrics)
+    test_job.server_metrics = test_server_metrics
     assert result_job == test_job
 
 
@@ -183,22 +362,198 @@ async def test_set_client_metrics_success(mock_request) -> None:
     test_job.clients_info[0].id = ANY
     test_job.clients_info[1].id = ANY
 
-    test_client_metrics = [{"test-metric-1": 456}, {"test-metric-2": 789}]
+    test_client_metrics = {"test-metric-1": 456, "test-metric-2": 789}
 
     await test_job.set_client_metrics(test_job.clients_info[1].uuid, test_client_metrics, mock_request.app.database)
 
     result_job = await Job.find_by_id(result_id, mock_request.app.database)
-    test_job.clients_info[1].metrics = json.dumps(test_client_metrics)
+    test_job.clients_info[1].metrics = test_client_metrics
     assert result_job == test_job
 
 
+async def test_set_metrics_saves_the_rounds_in_the_metrics_collection(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_client_uuid = test_job.clients_info[0].uuid
+    test_metrics = {"host_type": "server", "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}}
+    await test_job.set_server_metrics(test_metrics, mock_request.app.database)
+    await test_job.set_client_metrics(test_client_uuid, test_metrics, mock_request.app.database)
+
+    test_new_metrics = {
+        "host_type": "server",
+        "fit_end": "2022-02-02 03:03:03",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}, "2": {"fit_start": "2022-02-02 02:03:03"}},
+    }
+    await test_job.set_server_metrics(test_new_metrics, mock_request.app.database)
+    await test_job.set_client_metrics(test_client_uuid, test_new_metrics, mock_request.app.database)
+
+    # The rounds are not saved in the job, and only the rounds that changed are saved again
+    result = await mock_request.app.database[JOB_COLLECTION_NAME].find_one({"_id": test_job.id})
+    assert result["server_metrics"] == {"host_type": "server", "fit_end": "2022-02-02 03:03:03"}
+    assert result["clients_info"][0]["metrics"] == {"host_type": "server", "fit_end": "2022-02-02 03:03:03"}
+    assert await mock_request.app.database[METRICS_COLLECTION_NAME].count_documents({}) == 4
+
+    result_job = await Job.find_by_id(test_job.id, mock_request.app.database)
+    await result_job.load_round_metrics(mock_request.app.database)
+    assert result_job.server_metrics == test_new_metrics
+    assert result_job.clients_info[0].metrics == test_new_metrics
+    assert result_job.clients_info[1].metrics == test_job.clients_info[1].metrics
+
+
+async def test_round_metrics_find_latest(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_client_uuid = test_job.clients_info[0].uuid
+    test_rounds = {str(r): {"fit_start": f"2022-02-02 02:0{r}:02"} for r in range(1, 5)}
+    await test_job.set_server_metrics({"rounds": test_rounds}, mock_request.app.database)
+    await test_job.set_client_metrics(test_client_uuid, {"rounds": test_rounds}, mock_request.app.database)
+    test_new_round = {"fit_start": "2022-02-02 02:02:02", "fit_end": "2022-02-02 02:02:03"}
+    await test_job.set_client_metrics(
+        test_client_uuid,
+        {"rounds": {**test_rounds, "2": test_new_round}},
+        mock_request.app.database,
+    )
+
+    result = await RoundMetrics.find_latest(test_job.id, mock_request.app.database)
+    assert [(r.host_type, r.host_uuid, r.round) for r in result] == [
+        *[(HostType.SERVER, test_job.server_uuid, r) for r in range(1, 5)],
+        *[(HostType.CLIENT, test_client_uuid, r) for r in range(1, 5)],
+    ]
+
+    result = await RoundMetrics.find_latest(
+        test_job.id, mock_request.app.database, host_uuid=test_client_uuid, start_round=2, end_round=3,
+    )
+    assert [(r.round, r.metrics) for r in result] == [(2, test_new_round), (3, test_rounds["3"])]
+
+    result = await RoundMetrics.find_latest(
+        test_job.id, mock_request.app.database, host_uuid=test_job.server_uuid, rounds=[1, 4],
+    )
+    assert [(r.round, r.metrics) for r in result] == [(1, test_rounds["1"]), (4, test_rounds["4"])]
+
+    assert await RoundMetrics.find_latest("does-not-exist", mock_request.app.database) == []
+
+
+async def test_find_metrics_by_id(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_metrics = {
+        "host_type": "server",
+        "fit_start": "2022-02-02 02:02:02",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}, "2": {"fit_start": "2022-02-02 02:03:03"}},
+    }
+    await test_job.set_server_metrics(test_metrics, mock_request.app.database)
+    await test_job.set_client_metrics(test_job.clients_info[0].uuid, test_metrics, mock_request.app.database)
+
+    result_metrics = await Job.find_metrics_by_id(test_job.id, mock_request.app.database)
+    assert result_metrics == JobMetrics(
+        id=test_job.id,
+        server_metrics=test_metrics,
+        clients_info=[
+            ClientMetrics(uuid=test_job.clients_info[0].uuid, metrics=test_metrics),
+            ClientMetrics(uuid=test_job.clients_info[1].uuid, metrics=test_job.clients_info[1].metrics),
+        ],
+    )
+
+    result_metrics = await Job.find_metrics_by_id(
+        test_job.id, mock_request.app.database, rounds=["2"], keys=["host_type"],
+    )
+    expected_metrics = {"host_type": "server", "rounds": {"2": {"fit_start": "2022-02-02 02:03:03"}}}
+    assert result_metrics.server_metrics == expected_metrics
+    assert result_metrics.clients_info[0].metrics == expected_metrics
+
+    result_metrics = await Job.find_metrics_by_id(
+        test_job.id, mock_request.app.database, rounds=["2"], keys=["rounds"],
+    )
+    assert result_metrics.server_metrics == {"rounds": test_metrics["rounds"]}
+
+    assert await Job.find_metrics_by_id("does-not-exist", mock_request.app.database) is None
+
+    with raises(AssertionError, match=re.escape("Invalid metrics key: 'rounds.1'")):
+        await Job.find_metrics_by_id(test_job.id, mock_request.app.database, keys=["rounds.1"])
+
+    with raises(AssertionError, match=re.escape("Invalid round: 'one'")):
+        await Job.find_metrics_by_id(test_job.id, mock_request.app.database, rounds=["one"])
+
+
+async def test_convert_metrics_to_documents(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_server_metrics = {"host_type": "server", "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}}
+    test_client_metrics = {"host_type": "client", "rounds": {}}
+    await mock_request.app.database[JOB_COLLECTION_NAME].update_one(
+        {"_id": test_job.id},
+        {"$set": {"server_metrics": json.dumps(test_server_metrics), "clients_info.1.metrics": json.dumps(test_client_metrics)}},
+    )
+
+    assert await convert_metrics_to_documents(mock_request.app.database) == 1
+    assert await convert_metrics_to_documents(mock_request.app.database) == 0
+
+    result = await mock_request.app.database[JOB_COLLECTION_NAME].find_one({"_id": test_job.id})
+    assert result["server_metrics"] == test_server_metrics
+    assert result["clients_info"][0]["metrics"] == test_job.clients_info[0].metrics
+    assert result["clients_info"][1]["metrics"] == test_client_metrics
+
+
+async def test_move_rounds_to_metrics_collection(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_server_metrics = {"host_type": "server", "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}}
+    test_client_metrics = {"host_type": "client", "rounds": {"2": {"fit_start": "2022-02-02 02:03:03"}}}
+    await mock_request.app.database[JOB_COLLECTION_NAME].update_one(
+        {"_id": test_job.id},
+        {"$set": {"server_metrics": test_server_metrics, "clients_info.1.metrics": test_client_metrics}},
+    )
+
+    assert await move_rounds_to_metrics_collection(mock_request.app.database) == 1
+    assert await move_rounds_to_metrics_collection(mock_request.app.database) == 0
+
+    result = await mock_request.app.database[JOB_COLLECTION_NAME].find_one({"_id": test_job.id})
+    assert result["server_metrics"] == {"host_type": "server"}
+    assert result["clients_info"][0]["metrics"] == test_job.clients_info[0].metrics
+    assert result["clients_info"][1]["metrics"] == {"host_type": "client"}
+
+    result_job = await Job.find_by_id(test_job.id, mock_request.app.database)
+    await result_job.load_round_metrics(mock_request.app.database)
+    assert result_job.server_metrics == test_server_metrics
+    assert result_job.clients_info[0].metrics == test_job.clients_info[0].metrics
+    assert result_job.clients_info[1].metrics == test_client_metrics
+
+
+async def test_set_status_and_metrics_publish_events(mock_request) -> None:
+    test_job = get_test_job()
+    test_job.id = await test_job.create(mock_request.app.database)
+    test_client_uuid = test_job.clients_info[0].uuid
+    events_queue = JOB_EVENTS.subscribe()
+
+    await test_job.set_status(JobStatus.IN_PROGRESS, mock_request.app.database)
+    await test_job.set_server_metrics({"fit_start": "2022-02-02 02:02:02"}, mock_request.app.database)
+    await test_job.set_server_metrics(
+        {"fit_start": "2022-02-02 02:02:02", "rounds": {"1": {"loss": 0.1}}},
+        mock_request.app.database,
+    )
+    await test_job.set_client_metrics(test_client_uuid, {"shutdown": "2022-02-02 03:03:03"}, mock_request.app.database)
+
+    JOB_EVENTS.unsubscribe(events_queue)
+    assert [events_queue.get_nowait() for _ in range(events_queue.qsize())] == [
+        {"type": "status", "job_id": test_job.id, "status": JobStatus.IN_PROGRESS.value},
+        {"type": "server_metrics", "job_id": test_job.id, "delta": {"fit_start": "2022-02-02 02:02:02"}},
+        {"type": "server_metrics", "job_id": test_job.id, "delta": {"rounds": {"1": {"loss": 0.1}}}},
+        {
+            "type": "client_metrics",
+            "job_id": test_job.id,
+            "client_uuid": test_client_uuid,
+            "delta": {"shutdown": "2022-02-02 03:03:03"},
+        },
+    ]
+
+
 async def test_set_metrics_fail_clients_info_is_none(mock_request) -> None:
     test_job = get_test_job()
     result_id = await test_job.create(mock_request.app.database)
     test_job.id = result_id
 
     test_wrong_client_uuid = "client-id-that-does-not-exist"
-    test_client_metrics = [{"test-metric-1": 456}, {"test-metric-2": 789}]
+    test_client_metrics = {"test-metric-1": 456, "test-metric-2": 789}
 
     error_msg = f"client uuid {test_wrong_client_uuid} is not in clients_info (['{test_job.clients_info[0].uuid}', '{test_job.clients_info[1].uuid}'])"
     with raises(AssertionError, match=re.escape(error_msg)):
@@ -209,7 +564,7 @@ async def test_set_client_metrics_fail_update_result(mock_request) -> None:
     test_job = get_test_job()
     test_job.id = str(test_job.id)
 
-    test_client_metrics = [{"test-metric-1": 456}, {"test-metric-2": 789}]
+    test_client_metrics = {"test-metric-1": 456, "test-metric-2": 789}
 
     error_msg = "UpdateResult's 'n' is not 1"
     with raises(AssertionError, match=re.escape(error_msg)):
@@ -284,7 +639,7 @@ def get_test_job() -> Job:
         "redis_host": "test-redis-host",
         "redis_port": "1234",
         "server_uuid": "test-server-uuid",
-        "server_metrics": "test-server-metrics",
+        "server_metrics": {"test-metric": "test-server-metrics"},
         "server_pid": "test-server-pid-1",
         "error_message": "test-error-message",
         "client": Client.FEDAVG.value,
@@ -294,7 +649,7 @@ def get_test_job() -> Job:
                 "data_path": "test-data-path-1",
                 "redis_address": "test-redis-address-1",
                 "uuid": "test-client-uuids-1",
-                "metrics": "test-client-metrics-1",
+                "metrics": {"test-metric": "test-client-metrics-1"},
                 "pid": "test-client-pid-1",
                 "hashed_password": _simple_hash(DEFAULT_PASSWORD),
             },
@@ -303,7 +658,7 @@ def get_test_job() -> Job:
                 "data_path": "test-data-path-2",
                 "redis_address": "test-redis-address-2",
                 "uuid": "test-client-uuids-2",
-                "metrics": "test-client-metrics-2",
+                "metrics": {"test-metric": "test-client-metrics-2"},
                 "pid": "test-client-pid-2",
                 "hashed_password": _simple_hash(DEFAULT_PASSWORD),
             },
@@ -361,3 +716,61 @@ async def test_user_change_password(mock_request):
 
     result_user = await User.find_by_username(user.username, mock_request.app.database)
     assert result_user.hashed_password == test_new_password
+
+
+async def test_ensure_indexes(mock_request):
+    report = await ensure_indexes(mock_request.app.database)
+
+    user_indexes = await mock_request.app.database[USER_COLLECTION_NAME].index_information()
+    job_indexes = await mock_request.app.database[JOB_COLLECTION_NAME].index_information()
+    assert user_indexes["username_unique"]["key"] == [("username", 1)]
+    assert user_indexes["username_unique"]["unique"] is True
+    assert job_indexes["status_created_at_id"]["key"] == [("status", 1), ("created_at", 1), ("_id", 1)]
+    assert job_indexes["server_uuid"]["key"] == [("server_uuid", 1)]
+    assert job_indexes["clients_info_uuid"]["key"] == [("clients_info.uuid", 1)]
+    metrics_indexes = await mock_request.app.database[METRICS_COLLECTION_NAME].index_information()
+    assert metrics_indexes["job_id_host_uuid_round_timestamp"]["key"] == [
+        ("meta.job_id", 1), ("meta.host_uuid", 1), ("meta.round", 1), ("timestamp", 1),
+    ]
+    assert report.missing == {}
+    assert report.undeclared == {}
+    assert report.unused == {
+        USER_COLLECTION_NAME: ["username_unique"],
+        JOB_COLLECTION_NAME: ANY,
+        METRICS_COLLECTION_NAME: ["job_id_host_uuid_round_timestamp"],
+    }
+    assert sorted(report.unused[JOB_COLLECTION_NAME]) == ["clients_info_uuid", "server_uuid", "status_created_at_id"]
+
+    # Should be idempotent
+    await ensure_indexes(mock_request.app.database)
+    assert await mock_request.app.database[JOB_COLLECTION_NAME].index_information() == job_indexes
+
+    # Should enforce unique usernames
+    await User(username="test-username", hashed_password="test-password").create(mock_request.app.database)
+    with raises(DuplicateKeyError):
+        await mock_request.app.database[USER_COLLECTION_NAME].insert_one(
+            {"_id": "test-id", "username": "test-username", "hashed_password": "test-password"},
+        )
+
+
+async def test_ensure_indexes_missing_and_undeclared(mock_request):
+    job_collection = mock_request.app.database[JOB_COLLECTION_NAME]
+    await job_collection.create_index("status", name="status_1")
+    await job_collection.create_index("error_message", name="server_uuid")
+
+    report = await ensure_indexes(mock_request.app.database)
+
+    assert report.missing == {JOB_COLLECTION_NAME: ["server_uuid"]}
+    assert report.undeclared == {JOB_COLLECTION_NAME: ["status_1"]}
+
+
+async def test_ensure_metrics_collection(mock_request):
+    await ensure_metrics_collection(mock_request.app.database)
+    # Should be idempotent
+    await ensure_metrics_collection(mock_request.app.database)
+
+    collections = await mock_request.app.database.list_collections(filter={"name": METRICS_COLLECTION_NAME}).to_list(None)
+    assert len(collections) == 1
+    assert collections[0]["type"] == "timeseries"
+    assert collections[0]["options"]["timeseries"]["timeField"] == "timestamp"
+    assert collections[0]["options"]["timeseries"]["metaField"] == "meta"
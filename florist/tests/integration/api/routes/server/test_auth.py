@@ -15,6 +15,7 @@ from florist.api.auth.token import (
     decode_access_token,
     create_access_token,
     Token,
+    CachedClientToken,
     OAuth2ChangePasswordRequestForm,
     verify_password,
 )
@@ -105,6 +106,32 @@ async def test_check_token_success(mock_request):
     assert auth_user.uuid == user.id
 
 
+async def test_check_token_uses_cached_user(mock_request):
+    await make_default_server_user(mock_request.app.database)
+    user = await User.find_by_username(DEFAULT_USERNAME, mock_request.app.database)
+    await user.change_password(_password_hash(_simple_hash("new_password")), mock_request.app.database)
+    token = create_access_token({"sub": user.username}, user.secret_key)
+
+    await check_default_user_token(token, mock_request)
+
+    assert mock_request.app.users_cache[DEFAULT_USERNAME].id == user.id
+
+
+async def test_change_password_invalidates_cached_user(mock_request):
+    await make_default_server_user(mock_request.app.database)
+    user = await User.find_by_username(DEFAULT_USERNAME, mock_request.app.database)
+    mock_request.app.users_cache[DEFAULT_USERNAME] = user
+
+    form_data = OAuth2ChangePasswordRequestForm(
+        username=DEFAULT_USERNAME,
+        current_password=_simple_hash(DEFAULT_PASSWORD),
+        new_password=_simple_hash("new_password"),
+    )
+    await change_password(form_data, mock_request)
+
+    assert DEFAULT_USERNAME not in mock_request.app.users_cache
+
+
 async def test_check_token_failure_user_not_found(mock_request):
     token = create_access_token({"sub": "some_username"}, "some_key")
 
@@ -159,7 +186,7 @@ async def test_get_client_token_success(mock_request):
     client_service = TestUvicornServer(config=client_config)
     with client_service.run_in_thread():
         change_default_password(test_client_info.service_address, test_client_info.hashed_password, "client")
-        client_token = get_client_token(test_client_info, mock_request)
+        client_token = await get_client_token(test_client_info, mock_request)
 
     client_user = UserDAO.find(DEFAULT_USERNAME)
     token_data = decode_access_token(client_token.access_token, client_user.secret_key)
@@ -194,9 +221,9 @@ async def test_get_client_token_success_existing_valid_token(mock_request):
             data={"grant_type": "password", "username": DEFAULT_USERNAME, "password": test_client_info.hashed_password},
         )
         test_valid_token = Token(**response.json())
-        mock_request.app.clients_auth_tokens[test_client_info.id] = test_valid_token
+        mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_valid_token)
 
-        client_token = get_client_token(test_client_info, mock_request)
+        client_token = await get_client_token(test_client_info, mock_request)
 
         assert client_token == test_valid_token
 
@@ -215,15 +242,16 @@ async def test_get_client_token_success_existing_invalid_token(mock_request):
     )
     await make_default_server_user(mock_request.app.database)
     test_invalid_token = Token(access_token="invalid_token", token_type="bearer")
-    mock_request.app.clients_auth_tokens[test_client_info.id] = test_invalid_token
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_invalid_token)
 
     client_config = uvicorn.Config("florist.api.client:app", host=test_client_host, port=test_client_port, log_level="debug")
     client_service = TestUvicornServer(config=client_config)
     with client_service.run_in_thread():
         change_default_password(test_client_info.service_address, test_client_info.hashed_password, "client")
-        client_token = get_client_token(test_client_info, mock_request)
+        client_token = await get_client_token(test_client_info, mock_request, invalid_token=test_invalid_token)
 
-    assert mock_request.app.clients_auth_tokens[test_client_info.id] != test_invalid_token
+    assert mock_request.app.clients_auth_tokens[test_client_info.id].token != test_invalid_token
+    assert mock_request.app.clients_auth_tokens[test_client_info.id].expires_at is not None
 
     client_user = UserDAO.find(DEFAULT_USERNAME)
     token_data = decode_access_token(client_token.access_token, client_user.secret_key)
@@ -245,7 +273,7 @@ async def test_get_client_token_failure_unable_to_connect(mock_request):
     await make_default_server_user(mock_request.app.database)
 
     with raises(HTTPException) as err:
-        get_client_token(test_client_info, mock_request)
+        await get_client_token(test_client_info, mock_request)
 
     assert err.value.status_code == 401
     assert err.value.detail == f"Could not connect to client with id {test_client_info.id}"
@@ -9,9 +9,20 @@ from florist.api.auth.token import DEFAULT_PASSWORD, _simple_hash
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
 from florist.api.db.client_entities import ClientDAO
-from florist.api.db.server_entities import ClientInfo, Job, JobStatus
+from florist.api.db.server_entities import ClientInfo, Job, JobStatus, make_job_summaries_token
 from florist.api.monitoring.logs import get_server_log_file_path, get_client_log_file_path
-from florist.api.routes.server.job import list_jobs_with_status, new_job, get_server_log, get_client_log
+from florist.api.routes.server.job import (
+    get_job_metrics,
+    get_job_round_metrics,
+    list_jobs_with_status,
+    list_job_summaries_with_status,
+    new_job,
+    get_server_log,
+    get_client_log,
+    get_server_log_range,
+    get_client_log_range,
+    tail_server_log,
+)
 from florist.api.models.models import Model
 from florist.api.servers.strategies import Strategy
 from florist.tests.integration.api.utils import mock_request, TestUvicornServer, change_default_password
@@ -48,7 +59,7 @@ async def test_new_job(mock_request) -> None:
         server_address="test-server-address",
         server_config="{\"test-server-info\": 123}",
         redis_address="test-redis-address",
-        server_metrics="test-server-metrics",
+        server_metrics={"test-metric": "test-server-metrics"},
         server_uuid="test-server-uuid",
         server_log_file_path="test-server-log-file-path",
         server_pid="test-server-pid",
@@ -59,7 +70,7 @@ async def test_new_job(mock_request) -> None:
                 service_address="test-addr-1",
                 data_path="test/data/path-1",
                 redis_address="test-redis-address-1",
-                metrics="test-client-metrics-1",
+                metrics={"test-metric": "test-client-metrics-1"},
                 uuid="test-client-uuid-1",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -67,7 +78,7 @@ async def test_new_job(mock_request) -> None:
                 service_address="test-addr-2",
                 data_path="test/data/path-2",
                 redis_address="test-redis-address-2",
-                metrics="test-client-metrics-2",
+                metrics={"test-metric": "test-client-metrics-2"},
                 uuid="test-client-uuid-2",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -112,6 +123,74 @@ async def test_new_job(mock_request) -> None:
     }
 
 
+async def test_get_job_metrics(mock_request) -> None:
+    test_job = Job(
+        server_uuid="test-server-uuid",
+        clients_info=[
+            ClientInfo(
+                service_address="test-addr-1",
+                data_path="test/data/path-1",
+                redis_address="test-redis-address-1",
+                uuid="test-client-uuid-1",
+                hashed_password=_simple_hash(DEFAULT_PASSWORD),
+            ),
+        ],
+    )
+    result_job = await new_job(mock_request, test_job)
+    await result_job.set_server_metrics(
+        {"host_type": "server", "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}},
+        mock_request.app.database,
+    )
+    await result_job.set_client_metrics(
+        "test-client-uuid-1",
+        {"host_type": "client", "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}},
+        mock_request.app.database,
+    )
+
+    result = await get_job_metrics(result_job.id, mock_request, rounds=["1"], keys=None)
+
+    assert jsonable_encoder(result) == {
+        "_id": result_job.id,
+        "server_metrics": {"rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}},
+        "clients_info": [
+            {"uuid": "test-client-uuid-1", "metrics": {"rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}}}},
+        ],
+    }
+
+
+async def test_get_job_metrics_not_found(mock_request) -> None:
+    result = await get_job_metrics("does-not-exist", mock_request, rounds=None, keys=None)
+
+    assert result.status_code == 400
+    assert json.loads(result.body.decode()) == {"error": "Job with ID does-not-exist does not exist."}
+
+
+async def test_get_job_round_metrics(mock_request) -> None:
+    test_job = Job(server_uuid="test-server-uuid")
+    result_job = await new_job(mock_request, test_job)
+    test_rounds = {str(r): {"fit_start": f"2022-02-02 02:0{r}:02"} for r in range(1, 5)}
+    await result_job.set_server_metrics({"host_type": "server", "rounds": test_rounds}, mock_request.app.database)
+
+    result = await get_job_round_metrics(result_job.id, mock_request, host_uuid=None, start_round=2, end_round=3)
+
+    assert jsonable_encoder(result) == [
+        {
+            "job_id": result_job.id,
+            "host_type": "server",
+            "host_uuid": "test-server-uuid",
+            "round": r,
+            "metrics": test_rounds[str(r)],
+            "timestamp": ANY,
+        }
+        for r in [2, 3]
+    ]
+
+    result = await get_job_round_metrics(result_job.id, mock_request, host_uuid=None, start_round=3, end_round=2)
+
+    assert result.status_code == 400
+    assert json.loads(result.body.decode()) == {"error": "start_round (3) must be less than or equal to end_round (2)"}
+
+
 async def test_list_jobs_with_status(mock_request) -> None:
     test_job1 = Job(
         id="test-id1",
@@ -122,7 +201,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
         server_address="test-server-address1",
         server_config="{\"test-server-info\": 123}",
         redis_address="test-redis-address1",
-        server_metrics="test-server-metrics1",
+        server_metrics={"test-metric": "test-server-metrics1"},
         server_uuid="test-server-uuid1",
         server_log_file_path="test-server-log-file-path1",
         server_pid="test-server-pid1",
@@ -133,7 +212,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-1-1",
                 data_path="test/data/path-1-1",
                 redis_address="test-redis-address-1-1",
-                metrics="test-client-metrics-1-1",
+                metrics={"test-metric": "test-client-metrics-1-1"},
                 uuid="test-client-uuid-1-1",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -141,7 +220,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-2-1",
                 data_path="test/data/path-2-1",
                 redis_address="test-redis-address-2-1",
-                metrics="test-client-metrics-2-1",
+                metrics={"test-metric": "test-client-metrics-2-1"},
                 uuid="test-client-uuid-2-1",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -157,7 +236,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
         server_address="test-server-address2",
         server_config="{\"test-server-info\": 123}",
         redis_address="test-redis-address2",
-        server_metrics="test-server-metrics2",
+        server_metrics={"test-metric": "test-server-metrics2"},
         server_uuid="test-server-uuid2",
         server_log_file_path="test-server-log-file-path2",
         server_pid="test-server-pid2",
@@ -168,7 +247,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-1-2",
                 data_path="test/data/path-1-2",
                 redis_address="test-redis-address-1-2",
-                metrics="test-client-metrics-1-2",
+                metrics={"test-metric": "test-client-metrics-1-2"},
                 uuid="test-client-uuid-1-2",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -176,7 +255,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-2-2",
                 data_path="test/data/path-2-2",
                 redis_address="test-redis-address-2-2",
-                metrics="test-client-metrics-2-2",
+                metrics={"test-metric": "test-client-metrics-2-2"},
                 uuid="test-client-uuid-2-2",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -192,7 +271,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
         server_address="test-server-address3",
         server_config="{\"test-server-info\": 123}",
         redis_address="test-redis-address3",
-        server_metrics="test-server-metrics3",
+        server_metrics={"test-metric": "test-server-metrics3"},
         server_uuid="test-server-uuid3",
         server_log_file_path="test-server-log-file-path3",
         server_pid="test-server-pid3",
@@ -203,7 +282,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-1-3",
                 data_path="test/data/path-1-3",
                 redis_address="test-redis-address-1-3",
-                metrics="test-client-metrics-1-3",
+                metrics={"test-metric": "test-client-metrics-1-3"},
                 uuid="test-client-uuid-1-3",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -211,7 +290,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-2-3",
                 data_path="test/data/path-2-3",
                 redis_address="test-redis-address-2-3",
-                metrics="test-client-metrics-2-3",
+                metrics={"test-metric": "test-client-metrics-2-3"},
                 uuid="test-client-uuid-2-3",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -227,7 +306,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
         server_address="test-server-address4",
         server_config="{\"test-server-info\": 123}",
         redis_address="test-redis-address4",
-        server_metrics="test-server-metrics4",
+        server_metrics={"test-metric": "test-server-metrics4"},
         server_uuid="test-server-uuid4",
         server_log_file_path="test-server-log-file-path4",
         server_pid="test-server-pid4",
@@ -238,7 +317,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-1-4",
                 data_path="test/data/path-1-4",
                 redis_address="test-redis-address-1-4",
-                metrics="test-client-metrics-1-4",
+                metrics={"test-metric": "test-client-metrics-1-4"},
                 uuid="test-client-uuid-1-4",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -246,7 +325,7 @@ async def test_list_jobs_with_status(mock_request) -> None:
                 service_address="test-addr-2-4",
                 data_path="test/data/path-2-4",
                 redis_address="test-redis-address-2-4",
-                metrics="test-client-metrics-2-4",
+                metrics={"test-metric": "test-client-metrics-2-4"},
                 uuid="test-client-uuid-2-4",
                 hashed_password=_simple_hash(DEFAULT_PASSWORD),
             ),
@@ -412,6 +491,65 @@ async def test_list_jobs_with_status(mock_request) -> None:
     }
 
 
+async def test_list_job_summaries_with_status(mock_request) -> None:
+    for i in range(3):
+        test_job = Job(
+            id=f"test-id{i}",
+            status=JobStatus.IN_PROGRESS,
+            model=Model.MNIST,
+            strategy=Strategy.FEDAVG,
+            server_address=f"test-server-address{i}",
+            server_metrics={"test-metric": f"test-server-metrics{i}"},
+            clients_info=[
+                ClientInfo(
+                    service_address=f"test-addr-{i}",
+                    data_path=f"test/data/path-{i}",
+                    redis_address=f"test-redis-address-{i}",
+                    metrics={"test-metric": f"test-client-metrics-{i}"},
+                    hashed_password=_simple_hash(DEFAULT_PASSWORD),
+                ),
+            ],
+        )
+        await new_job(mock_request, test_job)
+
+    result_first_page = await list_job_summaries_with_status(JobStatus.IN_PROGRESS, mock_request, limit=2)
+    result_last_page = await list_job_summaries_with_status(
+        JobStatus.IN_PROGRESS, mock_request, limit=2, next_token=result_first_page.next,
+    )
+
+    assert jsonable_encoder(result_first_page) == {
+        "jobs": [
+            {
+                "_id": f"test-id{i}",
+                "status": JobStatus.IN_PROGRESS.value,
+                "created_at": ANY,
+                "model": Model.MNIST.value,
+                "strategy": Strategy.FEDAVG.value,
+                "server_address": f"test-server-address{i}",
+                "clients_info": [{"service_address": f"test-addr-{i}"}],
+            }
+            for i in range(2)
+        ],
+        "next": make_job_summaries_token(result_first_page.jobs[-1]),
+    }
+    assert [job.id for job in result_last_page.jobs] == ["test-id2"]
+    assert result_last_page.next is None
+
+
+async def test_list_job_summaries_with_status_invalid_next_token(mock_request) -> None:
+    response = await list_job_summaries_with_status(JobStatus.IN_PROGRESS, mock_request, next_token="not-a-token")
+
+    assert response.status_code == 400
+    assert json.loads(response.body.decode()) == {"error": "Invalid next token: not-a-token"}
+
+
+async def test_list_job_summaries_with_status_invalid_limit(mock_request) -> None:
+    response = await list_job_summaries_with_status(JobStatus.IN_PROGRESS, mock_request, limit=0)
+
+    assert response.status_code == 400
+    assert json.loads(response.body.decode()) == {"error": "limit must be between 1 and 1000"}
+
+
 async def test_get_server_log_success(mock_request):
     test_log_file_name = "test-log-file-name"
     test_log_file_content = "this is a test log file content"
@@ -448,6 +586,61 @@ async def test_get_server_log_error_no_log_path(mock_request):
     assert json.loads(result.body.decode()) == {"error": f"Log file path is None or empty"}
 
 
+async def test_get_server_log_range_success(mock_request):
+    test_log_file_name = "test-log-file-name"
+    test_log_file_content = "this is a test log file content"
+    test_log_file_path = str(get_server_log_file_path(test_log_file_name))
+
+    with open(test_log_file_path, "w") as f:
+        f.write(test_log_file_content)
+
+    result_job = await new_job(mock_request, Job(server_log_file_path=test_log_file_path))
+
+    result = await get_server_log_range(result_job.id, mock_request, offset=-7)
+
+    assert result.status_code == 200
+    assert result.headers["X-Log-Offset"] == str(len(test_log_file_content) - 7)
+    assert result.headers["X-Log-Next-Offset"] == str(len(test_log_file_content))
+    assert b"".join([chunk async for chunk in result.body_iterator]).decode() == "content"
+
+    os.remove(test_log_file_path)
+
+
+async def test_get_server_log_range_error_no_job(mock_request):
+    test_job_id = "inexistent-job-id"
+
+    result = await get_server_log_range(test_job_id, mock_request)
+
+    assert result.status_code == 400
+    assert json.loads(result.body.decode()) == {"error": f"Job {test_job_id} not found"}
+
+
+async def test_tail_server_log_finished_job(mock_request):
+    test_log_file_name = "test-log-file-name"
+    test_log_file_content = "this is a test log file content\nwith two lines\n"
+    test_log_file_path = str(get_server_log_file_path(test_log_file_name))
+
+    with open(test_log_file_path, "w") as f:
+        f.write(test_log_file_content)
+
+    result_job = await new_job(
+        mock_request,
+        Job(server_log_file_path=test_log_file_path, status=JobStatus.FINISHED_SUCCESSFULLY),
+    )
+
+    result = await tail_server_log(result_job.id, mock_request)
+
+    assert result.status_code == 200
+    assert result.media_type == "text/event-stream"
+    events = [event async for event in result.body_iterator]
+    assert events == [
+        f"id: {len(test_log_file_content)}\nevent: log\ndata: {json.dumps(test_log_file_content)}\n\n",
+        "event: end\ndata: \n\n",
+    ]
+
+    os.remove(test_log_file_path)
+
+
 async def test_get_client_log_success(mock_request):
     test_log_file_name = "test-log-file-name"
     test_log_file_content = "this is a test log file content"
@@ -560,3 +753,47 @@ async def test_get_client_log_error_log_file_path_is_none(mock_request):
     assert result.status_code == 400
     json_body = json.loads(result.body.decode())
     assert "Client responded with code 400:" in json_body["error"]
+
+
+async def test_get_client_log_range_success(mock_request):
+    test_log_file_name = "test-log-file-name"
+    test_log_file_content = "this is a test log file content"
+    test_log_file_path = str(get_client_log_file_path(test_log_file_name))
+
+    with open(test_log_file_path, "w") as f:
+        f.write(test_log_file_content)
+
+    test_client_host = "localhost"
+    test_client_port = 8001
+    test_client_password = _simple_hash("test_client_password")
+
+    result_job = await new_job(mock_request, Job(
+        clients_info=[
+            ClientInfo(
+                uuid="test-client-uuid-1",
+                service_address=f"{test_client_host}:{test_client_port}",
+                data_path="test/data/path-1",
+                redis_address="test-redis-address-1",
+                hashed_password=test_client_password,
+            ),
+        ],
+    ))
+
+    client = ClientDAO(uuid=result_job.clients_info[0].uuid, log_file_path=test_log_file_path)
+    client.save()
+
+    client_config = uvicorn.Config("florist.api.client:app", host=test_client_host, port=test_client_port, log_level="debug")
+    client_service = TestUvicornServer(config=client_config)
+    with client_service.run_in_thread():
+        change_default_password(result_job.clients_info[0].service_address, test_client_password, "client")
+        result = await get_client_log_range(result_job.id, 0, mock_request, offset=5, length=7)
+        content = b"".join([chunk async for chunk in result.body_iterator])
+        await result.background()
+
+    assert result.status_code == 200
+    assert result.headers["X-Log-Offset"] == "5"
+    assert result.headers["X-Log-Next-Offset"] == "12"
+    assert result.headers["X-Log-Size"] == str(len(test_log_file_content))
+    assert content.decode() == test_log_file_content[5:12]
+
+    os.remove(test_log_file_path)
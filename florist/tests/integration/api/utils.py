@@ -11,8 +11,9 @@ import requests
 from motor.motor_asyncio import AsyncIOMotorClient
 from starlette.requests import Request
 
-from florist.api.db.client_entities import EntityDAO
+from florist.api.db.client_entities import EntityDAO, UserDAO, close_connections, shutdown_sqlite_executors
 from florist.api.db.config import DatabaseConfig
+from florist.api.http_client import create_http_client
 from florist.api.auth.token import Token, _simple_hash, DEFAULT_USERNAME, DEFAULT_PASSWORD
 
 
@@ -38,11 +39,14 @@ class MockApp:
         self.db_client = AsyncIOMotorClient(DatabaseConfig.get_mongodb_uri())
         self.database = self.db_client[database_name]
         self.clients_auth_tokens = {}
+        self.clients_auth_tokens_locks = {}
+        self.users_cache = {}
+        self.http_client = create_http_client()
 
 
 class MockRequest(Request):
     def __init__(self, app: MockApp):
-        super().__init__({"type": "http"})
+        super().__init__({"type": "http", "headers": []})
         self._app = app
 
     @property
@@ -69,10 +73,15 @@ async def mock_request() -> MockRequest:
 
     yield request
 
+    await app.http_client.aclose()
+
     print(f"Deleting test detabase '{TEST_DATABASE_NAME}'")
     await app.db_client.drop_database(TEST_DATABASE_NAME)
 
     EntityDAO.db_path = real_db_path
+    UserDAO.clear_cache()
+    shutdown_sqlite_executors()
+    close_connections()
     if os.path.exists(TEST_SQLITE_DB_PATH):
         print(f"Deleting test detabase '{TEST_SQLITE_DB_PATH}'")
         os.remove(TEST_SQLITE_DB_PATH)
@@ -98,6 +107,9 @@ async def use_test_database() -> None:
     db_client = AsyncIOMotorClient(DatabaseConfig.get_mongodb_uri())
     await db_client.drop_database(TEST_DATABASE_NAME)
 
+    UserDAO.clear_cache()
+    shutdown_sqlite_executors()
+    close_connections()
     if os.path.exists(TEST_SQLITE_DB_PATH):
         print(f"Deleting test detabase '{TEST_SQLITE_DB_PATH}'")
         os.remove(TEST_SQLITE_DB_PATH)
@@ -1,6 +1,9 @@
 from datetime import timedelta, datetime, timezone
 from copy import deepcopy
 from pytest import raises
+from unittest.mock import Mock, patch
+
+import bcrypt
 
 import freezegun
 from freezegun import freeze_time
@@ -14,6 +17,16 @@ from florist.api.auth.token import (
     create_access_token,
     decode_access_token,
     _check_valid_word,
+    clear_default_password_checks,
+    is_default_password,
+    is_default_password_async,
+    password_hash_async,
+    verify_password_async,
+    get_password_hash_executor,
+    shutdown_password_hash_executor,
+    get_access_token_expiration,
+    CachedClientToken,
+    Token,
 )
 
 
@@ -29,6 +42,108 @@ def test_verify_password():
     assert not verify_password(_simple_hash("some other password"), secure_hashed_password)
 
 
+def test_is_default_password():
+    clear_default_password_checks()
+    default_hashed_password = _password_hash(_simple_hash(DEFAULT_PASSWORD))
+    other_hashed_password = _password_hash(_simple_hash("some other password"))
+
+    assert is_default_password(default_hashed_password)
+    assert not is_default_password(other_hashed_password)
+
+
+@patch("florist.api.auth.token.verify_password")
+def test_is_default_password_is_cached(mock_verify_password):
+    clear_default_password_checks()
+    mock_verify_password.return_value = True
+
+    assert is_default_password("test-hashed-password")
+    assert is_default_password("test-hashed-password")
+    mock_verify_password.assert_called_once_with(_simple_hash(DEFAULT_PASSWORD), "test-hashed-password")
+
+    mock_verify_password.return_value = False
+    assert not is_default_password("test-new-hashed-password")
+    assert mock_verify_password.call_count == 2
+
+    clear_default_password_checks()
+
+
+@patch("florist.api.auth.token.DEFAULT_PASSWORD_CHECK_CACHE_SIZE", 2)
+@patch("florist.api.auth.token.verify_password")
+def test_is_default_password_cache_size(mock_verify_password):
+    clear_default_password_checks()
+    mock_verify_password.return_value = True
+
+    is_default_password("test-hashed-password-1")
+    is_default_password("test-hashed-password-2")
+    is_default_password("test-hashed-password-3")
+    assert mock_verify_password.call_count == 3
+
+    # the oldest result has been evicted
+    is_default_password("test-hashed-password-3")
+    assert mock_verify_password.call_count == 3
+    is_default_password("test-hashed-password-1")
+    assert mock_verify_password.call_count == 4
+
+    clear_default_password_checks()
+
+
+@patch("florist.api.auth.token.get_password_hash_executor")
+@patch("florist.api.auth.token.verify_password")
+async def test_is_default_password_async_is_cached(mock_verify_password: Mock, mock_get_password_hash_executor: Mock):
+    clear_default_password_checks()
+    mock_verify_password.return_value = True
+    mock_get_password_hash_executor.return_value = None  # runs in the event loop's default executor
+
+    assert await is_default_password_async("test-hashed-password")
+    assert mock_get_password_hash_executor.call_count == 1
+
+    # cached results don't go through the password hashing thread pool
+    assert await is_default_password_async("test-hashed-password")
+    assert mock_get_password_hash_executor.call_count == 1
+    mock_verify_password.assert_called_once_with(_simple_hash(DEFAULT_PASSWORD), "test-hashed-password")
+
+    clear_default_password_checks()
+
+
+async def test_password_hash_async_and_verify_password_async():
+    simple_hashed_password = _simple_hash(DEFAULT_PASSWORD)
+    secure_hashed_password = await password_hash_async(simple_hashed_password)
+
+    assert await verify_password_async(simple_hashed_password, secure_hashed_password)
+    assert not await verify_password_async(_simple_hash("some other password"), secure_hashed_password)
+    assert await is_default_password_async(secure_hashed_password)
+
+    shutdown_password_hash_executor()
+
+
+async def test_password_hash_async_failure():
+    with raises(ValueError):
+        await password_hash_async("invalid^password")
+
+    shutdown_password_hash_executor()
+
+
+@patch.dict("os.environ", {"BCRYPT_ROUNDS": "5"})
+def test_password_hash_uses_configured_rounds():
+    hashed_password = _password_hash(_simple_hash(DEFAULT_PASSWORD))
+
+    assert hashed_password.startswith("$2b$05$")
+    assert bcrypt.checkpw(_simple_hash(DEFAULT_PASSWORD).encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+@patch.dict("os.environ", {"PASSWORD_HASH_MAX_WORKERS": "2"})
+def test_get_password_hash_executor():
+    executor = get_password_hash_executor()
+
+    assert executor._max_workers == 2
+    assert get_password_hash_executor() is executor
+
+    shutdown_password_hash_executor()
+    assert get_password_hash_executor() is not executor
+
+    shutdown_password_hash_executor()
+
+
 @freeze_time("2025-01-01 12:00:00")
 def test_access_token():
     test_data = {"sub": "test@test.com", "foo": "bar"}
@@ -103,3 +218,20 @@ def test_password_hash_failure():
 
     error_message = "Word can only contain letters, numbers, spaces, and the following symbols: !@#$%&*()_+-=[]{}|;:,.<>?"
     assert str(err.value) == error_message
+
+
+@freeze_time("2025-01-01 12:00:00")
+def test_get_access_token_expiration():
+    test_token = create_access_token({"sub": "test@test.com"}, "super_secret_key", timedelta(hours=1))
+
+    assert get_access_token_expiration(test_token) == datetime(2025, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
+
+
+@freeze_time("2025-01-01 12:00:00")
+def test_cached_client_token_is_expiring():
+    test_token = Token(access_token="test-token", token_type="bearer")
+    test_expires_at = datetime(2025, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
+
+    assert not CachedClientToken(token=test_token, expires_at=test_expires_at).is_expiring(timedelta(minutes=5))
+    assert CachedClientToken(token=test_token, expires_at=test_expires_at).is_expiring(timedelta(hours=2))
+    assert not CachedClientToken(token=test_token).is_expiring(timedelta(hours=2))
@@ -0,0 +1,80 @@
+import json
+
+from florist.api.monitoring.events import (
+    JOB_EVENTS_KEEPALIVE,
+    JobEventsBroadcaster,
+    stream_job_events,
+)
+
+
+async def test_publish() -> None:
+    broadcaster = JobEventsBroadcaster()
+    queue_1 = broadcaster.subscribe()
+    queue_2 = broadcaster.subscribe()
+
+    broadcaster.publish_status("test-job-id", "IN_PROGRESS")
+    broadcaster.publish_server_metrics("test-job-id", {"fit_start": "2022-02-02 02:02:02"})
+    broadcaster.publish_client_metrics("test-job-id", "test-client-uuid", {"rounds": {"1": {"loss": 0.1}}})
+
+    expected_events = [
+        {"type": "status", "job_id": "test-job-id", "status": "IN_PROGRESS"},
+        {"type": "server_metrics", "job_id": "test-job-id", "delta": {"fit_start": "2022-02-02 02:02:02"}},
+        {
+            "type": "client_metrics",
+            "job_id": "test-job-id",
+            "client_uuid": "test-client-uuid",
+            "delta": {"rounds": {"1": {"loss": 0.1}}},
+        },
+    ]
+    for queue in [queue_1, queue_2]:
+        assert [queue.get_nowait() for _ in range(queue.qsize())] == expected_events
+
+
+async def test_publish_empty_metrics_delta() -> None:
+    broadcaster = JobEventsBroadcaster()
+    queue = broadcaster.subscribe()
+
+    broadcaster.publish_server_metrics("test-job-id", {})
+    broadcaster.publish_client_metrics("test-job-id", "test-client-uuid", {})
+
+    assert queue.empty()
+
+
+async def test_publish_subscriber_falling_behind() -> None:
+    broadcaster = JobEventsBroadcaster(queue_size=2)
+    queue = broadcaster.subscribe()
+
+    broadcaster.publish_status("test-job-id-1", "IN_PROGRESS")
+    broadcaster.publish_status("test-job-id-2", "IN_PROGRESS")
+    broadcaster.publish_status("test-job-id-3", "IN_PROGRESS")
+
+    assert [queue.get_nowait() for _ in range(queue.qsize())] == [{"type": "resync"}]
+
+
+async def test_unsubscribe() -> None:
+    broadcaster = JobEventsBroadcaster()
+    queue = broadcaster.subscribe()
+
+    broadcaster.unsubscribe(queue)
+    broadcaster.publish_status("test-job-id", "IN_PROGRESS")
+
+    assert queue.empty()
+    assert broadcaster.subscribers == []
+
+
+async def test_stream_job_events() -> None:
+    broadcaster = JobEventsBroadcaster()
+    events = stream_job_events(broadcaster, job_id="test-job-id-1", keepalive_interval=0.01)
+
+    assert await anext(events) == f"event: connected\ndata: {json.dumps({'type': 'connected'})}\n\n"
+    assert len(broadcaster.subscribers) == 1
+
+    broadcaster.publish_status("test-job-id-2", "IN_PROGRESS")
+    broadcaster.publish_status("test-job-id-1", "IN_PROGRESS")
+
+    test_event = {"type": "status", "job_id": "test-job-id-1", "status": "IN_PROGRESS"}
+    assert await anext(events) == f"event: status\ndata: {json.dumps(test_event)}\n\n"
+    assert await anext(events) == JOB_EVENTS_KEEPALIVE
+
+    await events.aclose()
+    assert broadcaster.subscribers == []
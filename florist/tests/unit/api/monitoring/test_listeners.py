@@ -0,0 +1,316 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, call, patch
+
+from redis.exceptions import ResponseError
+
+from florist.api.db.server_entities import JOB_COLLECTION_NAME, METRICS_COLLECTION_NAME, Job
+from florist.api.monitoring.events import JOB_EVENTS
+from florist.api.monitoring.listeners import (
+    MetricsListenerManager,
+    STREAM_CONSUMER_GROUP,
+    STREAM_NEW_ID,
+    STREAM_PENDING_ID,
+)
+from florist.api.monitoring.metrics import get_stream_name
+
+
+def _make_mock_redis(mock_get_async_redis_connection: Mock, messages=None) -> Mock:
+    mock_subscriber = Mock()
+    mock_subscriber.subscribe = AsyncMock()
+    mock_subscriber.unsubscribe = AsyncMock()
+    mock_subscriber.aclose = AsyncMock()
+
+    pending_messages = list(messages or [])
+
+    async def get_message(ignore_subscribe_messages, timeout):
+        await asyncio.sleep(0.01)
+        return pending_messages.pop(0) if len(pending_messages) > 0 else None
+
+    mock_subscriber.get_message = Mock(side_effect=get_message)
+
+    mock_redis_connection = Mock()
+    mock_redis_connection.pubsub.return_value = mock_subscriber
+    mock_redis_connection.aclose = AsyncMock()
+    mock_get_async_redis_connection.return_value = mock_redis_connection
+    return mock_redis_connection
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_already_finished(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    mock_redis_connection = _make_mock_redis(mock_get_async_redis_connection)
+    mock_subscriber = mock_redis_connection.pubsub.return_value
+    test_metrics = {"fit_start": "2022-02-02 02:02:02", "fit_end": "2022-02-02 03:03:03"}
+    mock_read_metrics_async.return_value = test_metrics
+    mock_handler = AsyncMock(return_value=True)
+    test_handler_arg = "test-arg"
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", mock_handler, test_handler_arg)
+    reader_task = listener_manager.reader_tasks["test-host:1234"]
+    await reader_task
+
+    mock_get_async_redis_connection.assert_called_once_with("test-host", 1234)
+    mock_subscriber.subscribe.assert_called_once_with("test-channel")
+    mock_read_metrics_async.assert_called_once_with(mock_redis_connection, "test-channel")
+    mock_handler.assert_called_once_with(test_handler_arg, test_metrics)
+    mock_subscriber.unsubscribe.assert_called_once_with("test-channel")
+    mock_subscriber.aclose.assert_called_once()
+    mock_redis_connection.aclose.assert_called_once()
+    assert listener_manager.listeners == {}
+    assert listener_manager.subscribers == {}
+    assert listener_manager.redis_connections == {}
+    assert listener_manager.reader_tasks == {}
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_messages(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    mock_redis_connection = _make_mock_redis(mock_get_async_redis_connection, messages=[
+        {"type": "subscribe", "channel": b"test-channel", "data": 1},
+        {"type": "message", "channel": b"other-channel", "data": b"update"},
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"rounds": {"1": {"fit_start": "2"}}}}'},
+        {"type": "message", "channel": b"test-channel", "data": b"update"},
+    ])
+    test_initial_metrics = {"fit_start": "1"}
+    test_final_metrics = {"fit_start": "1", "rounds": {"1": {"fit_start": "2"}}, "fit_end": "3"}
+    mock_read_metrics_async.side_effect = [test_initial_metrics, test_final_metrics]
+    handler_calls = []
+
+    async def handler(test_arg, metrics):
+        handler_calls.append((test_arg, metrics))
+        return "fit_end" in metrics
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", handler, "test-arg")
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    assert handler_calls == [
+        ("test-arg", {"fit_start": "1"}),
+        ("test-arg", {"fit_start": "1", "rounds": {"1": {"fit_start": "2"}}}),
+        ("test-arg", test_final_metrics),
+    ]
+    assert mock_read_metrics_async.call_args_list == [
+        call(mock_redis_connection, "test-channel"),
+        call(mock_redis_connection, "test-channel"),
+    ]
+    mock_redis_connection.pubsub.return_value.unsubscribe.assert_called_once_with("test-channel")
+    mock_redis_connection.aclose.assert_called_once()
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_handler_exception(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    _make_mock_redis(mock_get_async_redis_connection, messages=[{"type": "message", "channel": b"test-channel", "data": b"update"}])
+    mock_read_metrics_async.side_effect = [{"fit_start": "1"}, {"fit_start": "1", "fit_end": "2"}]
+    mock_handler = AsyncMock(side_effect=[Exception("test exception"), True])
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", mock_handler)
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    # the listener keeps listening after the handler fails
+    assert mock_handler.call_count == 2
+    assert listener_manager.listeners == {}
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_multiple_channels_share_subscriber(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    mock_redis_connection = _make_mock_redis(mock_get_async_redis_connection)
+    mock_read_metrics_async.return_value = None
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel-1", AsyncMock())
+    await listener_manager.listen("test-host:1234", "test-channel-2", AsyncMock())
+
+    mock_get_async_redis_connection.assert_called_once()
+    mock_redis_connection.pubsub.assert_called_once()
+    assert mock_redis_connection.pubsub.return_value.subscribe.call_args_list == [
+        call("test-channel-1"),
+        call("test-channel-2"),
+    ]
+    assert len(listener_manager.reader_tasks) == 1
+    assert list(listener_manager.listeners["test-host:1234"].keys()) == ["test-channel-1", "test-channel-2"]
+
+    await listener_manager.close()
+
+    mock_redis_connection.pubsub.return_value.aclose.assert_called_once()
+    mock_redis_connection.aclose.assert_called_once()
+    assert listener_manager.listeners == {}
+    assert listener_manager.reader_tasks == {}
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_messages_with_payload(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    _make_mock_redis(mock_get_async_redis_connection, messages=[
+        {"type": "message", "channel": b"test-channel", "data": b'{"metrics": {"fit_start": "1"}, "sequence": 1}'},
+        {"type": "message", "channel": b"test-channel", "data": b'{"metrics": {"fit_end": "2"}, "sequence": 2}'},
+    ])
+    mock_read_metrics_async.return_value = None
+    mock_handler = AsyncMock(side_effect=[False, True])
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", mock_handler)
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    assert mock_handler.call_args_list == [call({"fit_start": "1"}), call({"fit_end": "2"})]
+    # only the initial fetch, the messages carry the metrics
+    mock_read_metrics_async.assert_called_once()
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_messages_deltas_saved_to_job(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    _make_mock_redis(mock_get_async_redis_connection, messages=[
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"rounds": {"1": {"loss": 0.1}}}, "sequence": 1}'},
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"rounds": {"2": {"loss": 0.2}}, "fit_end": "3"}, "sequence": 2}'},
+    ])
+    mock_read_metrics_async.return_value = {"fit_start": "1"}
+    mock_job_collection = Mock()
+    mock_job_collection.update_one = AsyncMock()
+    mock_job_collection.update_one.return_value.raw_result = {"n": 1, "nModified": 1, "ok": 1}
+    mock_metrics_collection = Mock()
+    mock_metrics_collection.insert_many = AsyncMock()
+    mock_database = MagicMock()
+    mock_database.__getitem__.side_effect = {
+        JOB_COLLECTION_NAME: mock_job_collection,
+        METRICS_COLLECTION_NAME: mock_metrics_collection,
+    }.get
+    test_job = Job(_id="test-job-id", server_uuid="test-server-uuid")
+    events_queue = JOB_EVENTS.subscribe()
+
+    async def handler(metrics):
+        await test_job.set_server_metrics(metrics, mock_database)
+        return "fit_end" in metrics
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", handler)
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    JOB_EVENTS.unsubscribe(events_queue)
+    assert test_job.server_metrics == {"fit_start": "1", "rounds": {"1": {"loss": 0.1}, "2": {"loss": 0.2}}, "fit_end": "3"}
+    assert [c.args[0][0]["meta"]["round"] for c in mock_metrics_collection.insert_many.call_args_list] == [1, 2]
+    assert [c.args[0][0]["metrics"] for c in mock_metrics_collection.insert_many.call_args_list] == [
+        {"loss": 0.1},
+        {"loss": 0.2},
+    ]
+    assert mock_job_collection.update_one.call_args_list == [
+        call({"_id": "test-job-id"}, {"$set": {"server_metrics": {"fit_start": "1"}}}),
+        call({"_id": "test-job-id"}, {"$set": {"server_metrics.fit_end": "3"}}),
+    ]
+    assert [events_queue.get_nowait() for _ in range(events_queue.qsize())] == [
+        {"type": "server_metrics", "job_id": "test-job-id", "delta": {"fit_start": "1"}},
+        {"type": "server_metrics", "job_id": "test-job-id", "delta": {"rounds": {"1": {"loss": 0.1}}}},
+        {"type": "server_metrics", "job_id": "test-job-id", "delta": {"rounds": {"2": {"loss": 0.2}}, "fit_end": "3"}},
+    ]
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_messages_with_missed_deltas(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    mock_redis_connection = _make_mock_redis(mock_get_async_redis_connection, messages=[
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"a": "1"}, "sequence": 1}'},
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"b": "2"}, "sequence": 2}'},
+        {"type": "message", "channel": b"test-channel", "data": b'{"delta": {"fit_end": "4"}, "sequence": 4}'},
+    ])
+    test_full_metrics = {"a": "1", "b": "2", "c": "3", "fit_end": "4"}
+    mock_read_metrics_async.side_effect = [{"fit_start": "0"}, test_full_metrics]
+    handler_calls = []
+
+    async def handler(metrics):
+        handler_calls.append(metrics)
+        return "fit_end" in metrics
+
+    listener_manager = MetricsListenerManager()
+    await listener_manager.listen("test-host:1234", "test-channel", handler)
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    assert handler_calls == [
+        {"fit_start": "0"},
+        {"fit_start": "0", "a": "1"},
+        {"fit_start": "0", "a": "1", "b": "2"},
+        test_full_metrics,
+    ]
+    # the message with sequence 3 was missed, so the full metrics are fetched
+    assert mock_read_metrics_async.call_args_list == [
+        call(mock_redis_connection, "test-channel"),
+        call(mock_redis_connection, "test-channel"),
+    ]
+
+
+def _make_mock_redis_with_streams(mock_get_async_redis_connection: Mock, responses) -> Mock:
+    pending_responses = list(responses)
+
+    async def xreadgroup(group, consumer, streams, count, block):
+        await asyncio.sleep(0.01)
+        return pending_responses.pop(0) if len(pending_responses) > 0 else []
+
+    mock_redis_connection = Mock()
+    mock_redis_connection.xgroup_create = AsyncMock()
+    mock_redis_connection.xreadgroup = Mock(side_effect=xreadgroup)
+    mock_redis_connection.xack = AsyncMock()
+    mock_redis_connection.delete = AsyncMock()
+    mock_redis_connection.aclose = AsyncMock()
+    mock_get_async_redis_connection.return_value = mock_redis_connection
+    return mock_redis_connection
+
+
+@patch("florist.api.monitoring.listeners.read_metrics_async")
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_streams(mock_get_async_redis_connection: Mock, mock_read_metrics_async: Mock) -> None:
+    test_stream = get_stream_name("test-channel").encode()
+    mock_redis_connection = _make_mock_redis_with_streams(mock_get_async_redis_connection, responses=[
+        [[test_stream, [(b"1-0", {b"payload": b'{"metrics": {"fit_start": "1"}, "sequence": 1}'})]]],
+        [[test_stream, []]],
+        [[test_stream, [
+            (b"2-0", {b"payload": b'{"delta": {"a": "2"}, "sequence": 2}'}),
+            (b"3-0", {b"payload": b'{"delta": {"fit_end": "3"}, "sequence": 3}'}),
+        ]]],
+    ])
+    handler_calls = []
+
+    async def handler(metrics):
+        handler_calls.append(metrics)
+        return "fit_end" in metrics
+
+    listener_manager = MetricsListenerManager(use_streams=True)
+    await listener_manager.listen("test-host:1234", "test-channel", handler)
+    await listener_manager.reader_tasks["test-host:1234"]
+
+    mock_redis_connection.xgroup_create.assert_called_once_with(
+        get_stream_name("test-channel"), STREAM_CONSUMER_GROUP, id="0", mkstream=True,
+    )
+    streams_read = [c[0][2] for c in mock_redis_connection.xreadgroup.call_args_list]
+    assert streams_read == [
+        {get_stream_name("test-channel"): STREAM_PENDING_ID},
+        {get_stream_name("test-channel"): STREAM_PENDING_ID},
+        {get_stream_name("test-channel"): STREAM_NEW_ID},
+    ]
+    assert handler_calls == [{"fit_start": "1"}, {"fit_start": "1", "a": "2"}, {"fit_start": "1", "a": "2", "fit_end": "3"}]
+    assert mock_redis_connection.xack.call_args_list == [
+        call(get_stream_name("test-channel"), STREAM_CONSUMER_GROUP, b"1-0"),
+        call(get_stream_name("test-channel"), STREAM_CONSUMER_GROUP, b"2-0"),
+        call(get_stream_name("test-channel"), STREAM_CONSUMER_GROUP, b"3-0"),
+    ]
+    # the stream carries all the updates, so the metrics are never fetched
+    mock_read_metrics_async.assert_not_called()
+    # the stream is deleted once the channel is done
+    mock_redis_connection.delete.assert_called_once_with(get_stream_name("test-channel"))
+    mock_redis_connection.aclose.assert_called_once()
+
+
+@patch("florist.api.monitoring.listeners.get_async_redis_connection")
+async def test_listen_streams_existing_consumer_group(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = _make_mock_redis_with_streams(mock_get_async_redis_connection, responses=[])
+    mock_redis_connection.xgroup_create.side_effect = ResponseError("BUSYGROUP Consumer Group name already exists")
+
+    listener_manager = MetricsListenerManager(use_streams=True)
+    await listener_manager.listen("test-host:1234", "test-channel", AsyncMock())
+
+    assert "test-channel" in listener_manager.listeners["test-host:1234"]
+    await listener_manager.close()
+
+    # the streams of the channels that are not done are kept when closing
+    mock_redis_connection.delete.assert_not_called()
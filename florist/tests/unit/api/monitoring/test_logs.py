@@ -0,0 +1,169 @@
+import json
+import os
+from unittest.mock import AsyncMock
+
+from pytest import raises
+
+from florist.api.monitoring.logs import (
+    LOG_NEXT_OFFSET_HEADER,
+    LOG_OFFSET_HEADER,
+    LOG_SIZE_HEADER,
+    LOG_TAIL_END_EVENT,
+    LOG_TAIL_KEEPALIVE_EVENT,
+    LogFileRange,
+    get_client_log_file_path,
+    get_log_file_range,
+    get_log_tail_offset,
+    make_log_range_response,
+    read_log_file,
+    stream_log_file,
+    tail_log_file,
+)
+
+
+async def test_read_log_file() -> None:
+    test_log_file_content = "this is a test log file content\nwith two lines"
+    test_log_file_path = str(get_client_log_file_path("test-client-uuid"))
+    with open(test_log_file_path, "w") as f:
+        f.write(test_log_file_content)
+
+    content = await read_log_file(test_log_file_path)
+
+    assert content == test_log_file_content
+
+    os.remove(test_log_file_path)
+
+
+def test_get_log_file_range() -> None:
+    test_log_file_path = _make_test_log_file("0123456789")
+
+    assert get_log_file_range(test_log_file_path) == LogFileRange(start=0, end=10, size=10)
+    assert get_log_file_range(test_log_file_path, offset=3) == LogFileRange(start=3, end=10, size=10)
+    assert get_log_file_range(test_log_file_path, offset=3, length=4) == LogFileRange(start=3, end=7, size=10)
+    assert get_log_file_range(test_log_file_path, offset=3, length=100) == LogFileRange(start=3, end=10, size=10)
+    assert get_log_file_range(test_log_file_path, offset=-4) == LogFileRange(start=6, end=10, size=10)
+    assert get_log_file_range(test_log_file_path, offset=-100) == LogFileRange(start=0, end=10, size=10)
+    assert get_log_file_range(test_log_file_path, offset=100) == LogFileRange(start=10, end=10, size=10)
+
+    os.remove(test_log_file_path)
+
+
+def test_get_log_file_range_fail_negative_length() -> None:
+    test_log_file_path = _make_test_log_file("0123456789")
+
+    with raises(AssertionError, match="Length must be a positive integer, got -1"):
+        get_log_file_range(test_log_file_path, length=-1)
+
+    os.remove(test_log_file_path)
+
+
+async def test_stream_log_file() -> None:
+    test_log_file_path = _make_test_log_file("0123456789")
+
+    chunks = [
+        chunk async for chunk in stream_log_file(test_log_file_path, LogFileRange(start=2, end=9, size=10), chunk_size=3)
+    ]
+
+    assert chunks == [b"234", b"567", b"8"]
+
+    os.remove(test_log_file_path)
+
+
+async def test_stream_log_file_ignores_appended_content() -> None:
+    test_log_file_path = _make_test_log_file("0123456789")
+    log_file_range = get_log_file_range(test_log_file_path, offset=5)
+
+    with open(test_log_file_path, "a") as f:
+        f.write("appended")
+
+    chunks = [chunk async for chunk in stream_log_file(test_log_file_path, log_file_range)]
+
+    assert b"".join(chunks) == b"56789"
+
+    os.remove(test_log_file_path)
+
+
+async def test_make_log_range_response() -> None:
+    test_log_file_path = _make_test_log_file("0123456789")
+
+    response = make_log_range_response(test_log_file_path, offset=-4, length=2)
+
+    assert response.media_type == "text/plain"
+    assert response.headers[LOG_OFFSET_HEADER] == "6"
+    assert response.headers[LOG_NEXT_OFFSET_HEADER] == "8"
+    assert response.headers[LOG_SIZE_HEADER] == "10"
+    assert b"".join([chunk async for chunk in response.body_iterator]) == b"67"
+
+    os.remove(test_log_file_path)
+
+
+def _make_test_log_file(content: str) -> str:
+    test_log_file_path = str(get_client_log_file_path("test-client-uuid"))
+    with open(test_log_file_path, "w") as f:
+        f.write(content)
+    return test_log_file_path
+
+
+async def test_tail_log_file() -> None:
+    test_log_file_path = _make_test_log_file("line 1\nline 2\npartial")
+    mock_is_finished = AsyncMock(return_value=True)
+
+    events = [
+        event async for event in tail_log_file(test_log_file_path, is_finished=mock_is_finished, poll_interval=0)
+    ]
+
+    assert events == [
+        f"id: 14\nevent: log\ndata: {json.dumps('line 1' + chr(10) + 'line 2' + chr(10))}\n\n",
+        f"id: 21\nevent: log\ndata: {json.dumps('partial')}\n\n",
+        LOG_TAIL_END_EVENT,
+    ]
+    mock_is_finished.assert_called_once()
+
+    os.remove(test_log_file_path)
+
+
+async def test_tail_log_file_from_offset_with_appended_content() -> None:
+    test_log_file_path = _make_test_log_file("line 1\nline 2\n")
+
+    async def append_to_log_file() -> bool:
+        with open(test_log_file_path, "a") as f:
+            f.write("line 3\n")
+        return True
+
+    events = [
+        event async for event in tail_log_file(
+            test_log_file_path, offset=-7, is_finished=append_to_log_file, poll_interval=0,
+        )
+    ]
+
+    assert events == [
+        f"id: 14\nevent: log\ndata: {json.dumps('line 2' + chr(10))}\n\n",
+        f"id: 21\nevent: log\ndata: {json.dumps('line 3' + chr(10))}\n\n",
+        LOG_TAIL_END_EVENT,
+    ]
+
+    os.remove(test_log_file_path)
+
+
+async def test_tail_log_file_keepalive() -> None:
+    test_log_file_path = _make_test_log_file("")
+    mock_is_finished = AsyncMock(side_effect=[False, True])
+
+    events = [
+        event async for event in tail_log_file(
+            test_log_file_path, is_finished=mock_is_finished, poll_interval=0, keepalive_interval=0,
+        )
+    ]
+
+    assert events == [LOG_TAIL_KEEPALIVE_EVENT, LOG_TAIL_END_EVENT]
+
+    os.remove(test_log_file_path)
+
+
+def test_get_log_tail_offset() -> None:
+    assert get_log_tail_offset(10, None) == 10
+    assert get_log_tail_offset(10, "") == 10
+    assert get_log_tail_offset(10, "20") == 20
+
+    with raises(AssertionError, match="Invalid Last-Event-ID header: 'test'"):
+        get_log_tail_offset(10, "test")
@@ -1,27 +1,52 @@
+import asyncio
 import datetime
 import json
 import logging
-from pytest import raises
-from unittest.mock import Mock, call, patch
+import pickle
+from pytest import fixture, raises
+from unittest.mock import ANY, AsyncMock, Mock, call, patch
 
 import freezegun
 from freezegun import freeze_time
 
+from redis.exceptions import ResponseError
+
+from florist.api.monitoring.config import MetricsConfig
 from florist.api.monitoring.metrics import (
+    apply_metrics_delta,
+    ASYNC_CONNECTION_POOLS,
+    close_async_connection_pools,
+    close_connection_pools,
+    CONNECTION_POOLS,
     DateTimeEncoder,
+    get_async_redis_connection,
     get_from_redis,
+    get_from_redis_async,
     get_host_and_port_from_address,
-    get_subscriber,
+    get_redis_connection,
+    get_stream_name,
+    make_metrics_delta,
+    read_metrics_async,
     RedisMetricsReporter,
+    STREAM_MAX_LENGTH,
+    STREAM_PAYLOAD_FIELD,
     wait_for_metric,
+    wait_for_metric_async,
 )
 
 
 freezegun.configure(extend_ignore_list=["transformers"])  # type: ignore
 
 
+@fixture(autouse=True)
+def reset_connection_pools():
+    close_connection_pools()
+    yield
+    close_connection_pools()
+
+
 @freeze_time("2012-12-11 10:09:08")
-@patch("florist.api.monitoring.metrics.redis.Redis")
+@patch("florist.api.monitoring.metrics.get_redis_connection")
 def test_report(mock_redis: Mock) -> None:
     mock_redis_connection = Mock()
     mock_redis.return_value = mock_redis_connection
@@ -34,12 +59,12 @@ def test_report(mock_redis: Mock) -> None:
     redis_metric_reporter = RedisMetricsReporter(test_host, test_port, test_run_id)
     redis_metric_reporter.report(test_data)
 
-    mock_redis.assert_called_once_with(host=test_host, port=test_port)
+    mock_redis.assert_called_once_with(test_host, test_port)
     mock_redis_connection.set.assert_called_once_with(test_run_id, json.dumps(test_data, cls=DateTimeEncoder))
 
 
 @freeze_time("2012-12-11 10:09:08")
-@patch("florist.api.monitoring.metrics.redis.Redis")
+@patch("florist.api.monitoring.metrics.get_redis_connection")
 def test_report_at_round(mock_redis: Mock) -> None:
     mock_redis_connection = Mock()
     mock_redis.return_value = mock_redis_connection
@@ -53,7 +78,7 @@ def test_report_at_round(mock_redis: Mock) -> None:
     redis_metric_reporter = RedisMetricsReporter(test_host, test_port, test_run_id)
     redis_metric_reporter.report(test_data, test_round)
 
-    mock_redis.assert_called_once_with(host=test_host, port=test_port)
+    mock_redis.assert_called_once_with(test_host, test_port)
     expected_data = {
         "rounds": {
             str(test_round): test_data,
@@ -63,7 +88,7 @@ def test_report_at_round(mock_redis: Mock) -> None:
 
 
 @freeze_time("2012-12-11 10:09:08")
-@patch("florist.api.monitoring.metrics.redis.Redis")
+@patch("florist.api.monitoring.metrics.get_redis_connection")
 def test_dump_without_existing_connection(mock_redis: Mock) -> None:
     mock_redis_connection = Mock()
     mock_redis.return_value = mock_redis_connection
@@ -79,7 +104,7 @@ def test_dump_without_existing_connection(mock_redis: Mock) -> None:
     redis_metric_reporter.report(test_data, test_round)
     redis_metric_reporter.dump()
 
-    mock_redis.assert_called_once_with(host=test_host, port=test_port)
+    mock_redis.assert_called_once_with(test_host, test_port)
     expected_data = {
         **test_data,
         "rounds": {
@@ -90,33 +115,89 @@ def test_dump_without_existing_connection(mock_redis: Mock) -> None:
     assert mock_redis_connection.set.call_args_list[2][0][1] == json.dumps(expected_data, cls=DateTimeEncoder)
 
 @freeze_time("2012-12-11 10:09:08")
-@patch("florist.api.monitoring.metrics.redis.Redis")
-def test_dump_does_not_save_duplicate(mock_redis: Mock) -> None:
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_does_not_save_duplicate(mock_redis: Mock) -> None:
     mock_redis_connection = Mock()
     mock_redis.return_value = mock_redis_connection
 
-    test_host = "test host"
-    test_port = "test port"
     test_run_id = "123"
     test_data = {"test": "data", "date": datetime.datetime.now()}
     test_round = 2
 
-    redis_metric_reporter = RedisMetricsReporter(test_host, test_port, test_run_id)
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", test_run_id)
     redis_metric_reporter.report(test_data, test_round)
-
     saved_data = json.dumps(redis_metric_reporter.metrics, cls=DateTimeEncoder)
-    mock_redis_connection.get.return_value = saved_data.encode("utf-8")
 
-    redis_metric_reporter.dump()
+    redis_metric_reporter.report(test_data, test_round)
+    redis_metric_reporter.report({"loss": 0.1}, test_round, epoch=1)
+    redis_metric_reporter.report({"loss": 0.1}, test_round, step=1)
 
-    # assert this set has been called by the report only once and not called again by dump
+    # assert set has been called only once and redis has not been read to check for changes
+    mock_redis_connection.get.assert_not_called()
     assert mock_redis_connection.set.call_count == 1
     assert mock_redis_connection.set.call_args_list[0][0][0] == test_run_id
     assert mock_redis_connection.set.call_args_list[0][0][1] == saved_data
+    assert not redis_metric_reporter.is_dirty()
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_flush_every_n_reports(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis.return_value = mock_redis_connection
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", flush_every_n_reports=3)
+    redis_metric_reporter.report({"loss": 0.1}, 1)
+    redis_metric_reporter.report({"loss": 0.2}, 1)
+    assert mock_redis_connection.set.call_count == 0
+    assert redis_metric_reporter.is_dirty()
+
+    redis_metric_reporter.report({"loss": 0.3}, 1)
+    assert mock_redis_connection.set.call_count == 1
+
+    redis_metric_reporter.report({"loss": 0.4}, 1)
+    assert mock_redis_connection.set.call_count == 1
+
+    # milestones are flushed immediately
+    redis_metric_reporter.report({"fit_end": "2022-02-02 03:03:03"})
+    assert mock_redis_connection.set.call_count == 2
+    assert json.loads(mock_redis_connection.set.call_args_list[1][0][1]) == {
+        "rounds": {"1": {"loss": 0.4}},
+        "fit_end": "2022-02-02 03:03:03",
+    }
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+@patch("florist.api.monitoring.metrics.time")
+def test_report_flush_interval_seconds(mock_time: Mock, mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis.return_value = mock_redis_connection
+    mock_time.monotonic.return_value = 100
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", flush_interval_seconds=5)
+    redis_metric_reporter.report({"loss": 0.1}, 1)
+    mock_time.monotonic.return_value = 104
+    redis_metric_reporter.report({"loss": 0.2}, 1)
+    assert mock_redis_connection.set.call_count == 0
+
+    mock_time.monotonic.return_value = 105
+    redis_metric_reporter.report({"loss": 0.3}, 1)
+    assert mock_redis_connection.set.call_count == 1
+
+    mock_time.monotonic.return_value = 106
+    redis_metric_reporter.report({"loss": 0.4}, 1)
+    assert mock_redis_connection.set.call_count == 1
+
+    # pending changes are flushed on shutdown
+    redis_metric_reporter.shutdown()
+    assert mock_redis_connection.set.call_count == 2
+    assert json.loads(mock_redis_connection.set.call_args_list[1][0][1]) == {"rounds": {"1": {"loss": 0.4}}}
+
+    redis_metric_reporter.shutdown()
+    assert mock_redis_connection.set.call_count == 2
 
 
 @freeze_time("2012-12-11 10:09:08")
-@patch("florist.api.monitoring.metrics.redis.Redis")
+@patch("florist.api.monitoring.metrics.get_redis_connection")
 def test_dump_with_existing_connection(mock_redis: Mock) -> None:
     mock_redis_connection = Mock()
 
@@ -133,6 +214,235 @@ def test_dump_with_existing_connection(mock_redis: Mock) -> None:
     assert mock_redis_connection.set.call_args_list[0][0][1] == json.dumps(test_data, cls=DateTimeEncoder)
 
 
+@freeze_time("2012-12-11 10:09:08")
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_with_deltas(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_pipeline = Mock()
+    mock_redis_connection.pipeline.return_value = mock_pipeline
+    mock_redis.return_value = mock_redis_connection
+
+    test_run_id = "123"
+    test_date = datetime.datetime.now()
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", test_run_id, publish_deltas=True)
+    redis_metric_reporter.report({"fit_start": test_date})
+    redis_metric_reporter.report({"fit_start": test_date}, 1)
+    redis_metric_reporter.report({"loss": 0.1}, 1, epoch=1)
+    redis_metric_reporter.report({"loss": 0.2}, 1)
+    redis_metric_reporter.report({"fit_start": test_date}, 2)
+
+    mock_redis_connection.get.assert_not_called()
+    mock_redis_connection.set.assert_not_called()
+    assert mock_pipeline.execute.call_count == 4
+    mock_pipeline.hset.assert_has_calls([
+        call(test_run_id, mapping={"fit_start": json.dumps(str(test_date))}),
+        call(test_run_id, mapping={"rounds.1": json.dumps({"fit_start": str(test_date)})}),
+        call(test_run_id, mapping={"rounds.1": json.dumps({"fit_start": str(test_date), "loss": 0.2})}),
+        call(test_run_id, mapping={"rounds.2": json.dumps({"fit_start": str(test_date)})}),
+    ])
+    mock_pipeline.publish.assert_has_calls([
+        call(test_run_id, json.dumps({"delta": {"fit_start": str(test_date)}, "sequence": 1})),
+        call(test_run_id, json.dumps({"delta": {"rounds": {"1": {"fit_start": str(test_date)}}}, "sequence": 2})),
+        call(
+            test_run_id,
+            json.dumps({"delta": {"rounds": {"1": {"fit_start": str(test_date), "loss": 0.2}}}, "sequence": 3}),
+        ),
+        call(test_run_id, json.dumps({"delta": {"rounds": {"2": {"fit_start": str(test_date)}}}, "sequence": 4})),
+    ])
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_with_payload(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis.return_value = mock_redis_connection
+
+    test_run_id = "123"
+    test_date = datetime.datetime.now()
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", test_run_id, publish_payload=True)
+    redis_metric_reporter.report({"fit_start": test_date})
+    redis_metric_reporter.report({"fit_start": test_date}, 1)
+
+    expected_metrics = [
+        {"fit_start": str(test_date)},
+        {"fit_start": str(test_date), "rounds": {"1": {"fit_start": str(test_date)}}},
+    ]
+    published_messages = [json.loads(c[0][1]) for c in mock_redis_connection.publish.call_args_list]
+    assert published_messages == [
+        {"metrics": expected_metrics[0], "sequence": 1},
+        {"metrics": expected_metrics[1], "sequence": 2},
+    ]
+    assert [json.loads(c[0][1]) for c in mock_redis_connection.set.call_args_list] == expected_metrics
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_with_streams(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis.return_value = mock_redis_connection
+
+    test_run_id = "123"
+    test_date = datetime.datetime.now()
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", test_run_id, use_streams=True)
+    redis_metric_reporter.report({"fit_start": test_date})
+
+    mock_redis_connection.publish.assert_not_called()
+    mock_redis_connection.set.assert_called_once_with(test_run_id, json.dumps({"fit_start": str(test_date)}))
+    mock_redis_connection.xadd.assert_called_once_with(
+        get_stream_name(test_run_id),
+        {STREAM_PAYLOAD_FIELD: ANY},
+        maxlen=STREAM_MAX_LENGTH,
+        approximate=True,
+    )
+    message = mock_redis_connection.xadd.call_args[0][1][STREAM_PAYLOAD_FIELD]
+    assert json.loads(message) == {"metrics": {"fit_start": str(test_date)}, "sequence": 1}
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_with_deltas_and_streams(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_pipeline = Mock()
+    mock_redis_connection.pipeline.return_value = mock_pipeline
+    mock_redis.return_value = mock_redis_connection
+
+    test_run_id = "123"
+    test_date = datetime.datetime.now()
+
+    redis_metric_reporter = RedisMetricsReporter(
+        "test host", "test port", test_run_id, publish_deltas=True, use_streams=True,
+    )
+    redis_metric_reporter.report({"fit_start": test_date})
+
+    mock_pipeline.publish.assert_not_called()
+    mock_pipeline.hset.assert_called_once_with(test_run_id, mapping={"fit_start": json.dumps(str(test_date))})
+    mock_pipeline.xadd.assert_called_once_with(
+        get_stream_name(test_run_id),
+        {STREAM_PAYLOAD_FIELD: json.dumps({"delta": {"fit_start": str(test_date)}, "sequence": 1})},
+        maxlen=STREAM_MAX_LENGTH,
+        approximate=True,
+    )
+    mock_pipeline.execute.assert_called_once()
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+def test_report_background_flush(mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis.return_value = mock_redis_connection
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", background_flush=True)
+    redis_metric_reporter.report({"fit_start": "2022-02-02 02:02:02"})
+    # milestones are flushed synchronously
+    assert mock_redis_connection.set.call_count == 1
+    assert redis_metric_reporter.flusher_thread is None
+
+    for i in range(10):
+        redis_metric_reporter.report({"loss": i}, 1)
+    assert redis_metric_reporter.flusher_thread is not None
+
+    redis_metric_reporter.shutdown()
+
+    assert redis_metric_reporter.flusher_thread is None
+    assert not redis_metric_reporter.is_dirty()
+    assert json.loads(mock_redis_connection.set.call_args_list[-1][0][1]) == {
+        "fit_start": "2022-02-02 02:02:02",
+        "rounds": {"1": {"loss": 9}},
+    }
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+@patch("florist.api.monitoring.metrics.time")
+def test_dump_with_retries(mock_time: Mock, mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis_connection.set.side_effect = [Exception("test exception"), Exception("test exception"), None]
+    mock_redis.return_value = mock_redis_connection
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", background_flush=True)
+    redis_metric_reporter.report({"fit_start": "2022-02-02 02:02:02"})
+
+    assert mock_redis_connection.set.call_count == 3
+    mock_time.sleep.assert_has_calls([call(0.5), call(1.0)])
+    assert not redis_metric_reporter.is_dirty()
+
+
+@patch("florist.api.monitoring.metrics.get_redis_connection")
+@patch("florist.api.monitoring.metrics.time")
+def test_dump_with_retries_failure_keeps_changes(mock_time: Mock, mock_redis: Mock) -> None:
+    mock_redis_connection = Mock()
+    mock_redis_connection.set.side_effect = Exception("test exception")
+    mock_redis.return_value = mock_redis_connection
+
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", background_flush=True)
+    with raises(Exception, match="test exception"):
+        redis_metric_reporter.report({"fit_start": "2022-02-02 02:02:02"})
+
+    assert mock_redis_connection.set.call_count == 6
+    assert redis_metric_reporter.is_dirty()
+
+
+def test_reporter_can_be_pickled() -> None:
+    redis_metric_reporter = RedisMetricsReporter("test host", "test port", "123", background_flush=True)
+    redis_metric_reporter.metrics = {"rounds": {1: {"loss": 0.1}}}
+    redis_metric_reporter.redis_connection = Mock()
+
+    unpickled_reporter = pickle.loads(pickle.dumps(redis_metric_reporter))
+
+    assert unpickled_reporter == redis_metric_reporter
+    assert unpickled_reporter.metrics == redis_metric_reporter.metrics
+    assert unpickled_reporter.redis_connection is None
+    assert unpickled_reporter.flusher_thread is None
+    assert not unpickled_reporter.flush_event.is_set()
+
+
+def test_apply_metrics_delta() -> None:
+    test_metrics = {
+        "fit_start": "2022-02-02 02:02:02",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}},
+    }
+    test_delta = {
+        "fit_end": "2022-02-02 03:03:03",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02", "loss": 0.1}, "2": {"fit_start": "2022-02-02 02:02:03"}},
+    }
+
+    result = apply_metrics_delta(test_metrics, test_delta)
+
+    assert result == {
+        "fit_start": "2022-02-02 02:02:02",
+        "fit_end": "2022-02-02 03:03:03",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02", "loss": 0.1}, "2": {"fit_start": "2022-02-02 02:02:03"}},
+    }
+    # the metrics the delta was applied to are left unchanged
+    assert test_metrics == {
+        "fit_start": "2022-02-02 02:02:02",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}},
+    }
+
+
+def test_make_metrics_delta() -> None:
+    test_previous_metrics = {
+        "fit_start": "2022-02-02 02:02:02",
+        "rounds": {"1": {"fit_start": "2022-02-02 02:02:02"}, "2": {"fit_start": "2022-02-02 02:02:03"}},
+    }
+    test_metrics = {
+        "fit_start": "2022-02-02 02:02:02",
+        "fit_end": "2022-02-02 03:03:03",
+        "rounds": {
+            "1": {"fit_start": "2022-02-02 02:02:02"},
+            "2": {"fit_start": "2022-02-02 02:02:03", "loss": 0.1},
+            "3": {"fit_start": "2022-02-02 02:02:04"},
+        },
+    }
+
+    result = make_metrics_delta(test_previous_metrics, test_metrics)
+
+    assert result == {
+        "fit_end": "2022-02-02 03:03:03",
+        "rounds": {"2": {"fit_start": "2022-02-02 02:02:03", "loss": 0.1}, "3": {"fit_start": "2022-02-02 02:02:04"}},
+    }
+    assert apply_metrics_delta(test_previous_metrics, result) == test_metrics
+    assert make_metrics_delta(test_metrics, test_metrics) == {}
+
+
 @patch("florist.api.monitoring.metrics.redis")
 @patch("florist.api.monitoring.metrics.time")  # just so time.sleep does not actually sleep
 def test_wait_for_metric_success(_: Mock, mock_redis: Mock) -> None:
@@ -148,7 +458,14 @@ def test_wait_for_metric_success(_: Mock, mock_redis: Mock) -> None:
 
     wait_for_metric(test_uuid, test_metric, test_redis_address, logging.getLogger(__name__))
 
-    mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.ConnectionPool.assert_called_once_with(
+        host=test_redis_host,
+        port=test_redis_port,
+        max_connections=MetricsConfig.redis_pool_max_connections,
+        health_check_interval=MetricsConfig.redis_health_check_interval,
+        socket_keepalive=True,
+    )
+    mock_redis.Redis.assert_called_once_with(connection_pool=mock_redis.ConnectionPool.return_value)
     mock_redis_connection.get.assert_called_once_with(test_uuid)
 
 
@@ -173,7 +490,14 @@ def test_wait_for_metric_success_with_retry(_: Mock, mock_redis: Mock) -> None:
 
     wait_for_metric(test_uuid, test_metric, test_redis_address, logging.getLogger(__name__))
 
-    mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.ConnectionPool.assert_called_once_with(
+        host=test_redis_host,
+        port=test_redis_port,
+        max_connections=MetricsConfig.redis_pool_max_connections,
+        health_check_interval=MetricsConfig.redis_health_check_interval,
+        socket_keepalive=True,
+    )
+    mock_redis.Redis.assert_called_once_with(connection_pool=mock_redis.ConnectionPool.return_value)
     assert mock_redis_connection.get.call_count == 4
     mock_redis_connection.get.assert_has_calls([call(test_uuid)] * 4)
 
@@ -195,24 +519,106 @@ def test_wait_for_metric_fail_max_retries(_: Mock, mock_redis: Mock) -> None:
         wait_for_metric(test_uuid, test_metric, test_redis_address, logging.getLogger(__name__))
 
 
-@patch("florist.api.monitoring.metrics.redis")
-def test_get_subscriber(mock_redis: Mock) -> None:
-    test_channel = "test-channel"
-    test_redis_host = "test-redis-host"
-    test_redis_port = 1234
-    test_redis_address = f"{test_redis_host}:{test_redis_port}"
+def _make_mock_async_redis(mock_get_async_redis_connection: Mock, metrics, messages=None) -> Mock:
+    pending_messages = list(messages or [])
+
+    async def get_message(ignore_subscribe_messages, timeout):
+        if len(pending_messages) > 0:
+            return pending_messages.pop(0)
+        await asyncio.sleep(10)
+
+    mock_subscriber = Mock()
+    mock_subscriber.subscribe = AsyncMock()
+    mock_subscriber.aclose = AsyncMock()
+    mock_subscriber.get_message = Mock(side_effect=get_message)
 
     mock_redis_connection = Mock()
-    mock_redis_pubsub = Mock()
-    mock_redis_connection.pubsub.return_value = mock_redis_pubsub
-    mock_redis.Redis.return_value = mock_redis_connection
+    mock_redis_connection.get = AsyncMock(return_value=None if metrics is None else json.dumps(metrics).encode())
+    mock_redis_connection.pubsub.return_value = mock_subscriber
+    mock_redis_connection.aclose = AsyncMock()
+    mock_get_async_redis_connection.return_value = mock_redis_connection
+    return mock_redis_connection
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_wait_for_metric_async_already_reported(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = _make_mock_async_redis(mock_get_async_redis_connection, {"fit_start": "2022-02-02 02:02:02"})
+
+    await wait_for_metric_async("test-uuid", "fit_start", "test-redis-host:1234", logging.getLogger(__name__))
+
+    mock_get_async_redis_connection.assert_called_once_with("test-redis-host", 1234)
+    mock_redis_connection.pubsub.return_value.subscribe.assert_called_once_with("test-uuid")
+    mock_redis_connection.pubsub.return_value.get_message.assert_not_called()
+    mock_redis_connection.pubsub.return_value.aclose.assert_called_once()
+    mock_redis_connection.aclose.assert_called_once()
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_wait_for_metric_async_from_messages(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = _make_mock_async_redis(mock_get_async_redis_connection, None, messages=[
+        {"type": "subscribe", "data": 1},
+        {"type": "message", "data": b'{"delta": {"initialized": "1"}, "sequence": 1}'},
+        {"type": "message", "data": b'{"delta": {"fit_start": "2"}, "sequence": 2}'},
+    ])
+
+    await wait_for_metric_async("test-uuid", "fit_start", "test-redis-host:1234", logging.getLogger(__name__))
+
+    assert mock_redis_connection.pubsub.return_value.get_message.call_count == 3
+    # the messages carry the changes, so the metrics are only fetched once
+    mock_redis_connection.get.assert_called_once_with("test-uuid")
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_wait_for_metric_async_from_update_message(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = _make_mock_async_redis(mock_get_async_redis_connection, None, messages=[{"type": "message", "data": b"update"}])
+    mock_redis_connection.get.side_effect = [None, b'{"fit_start": "1"}']
 
-    result = get_subscriber(test_channel, test_redis_address)
+    await wait_for_metric_async("test-uuid", "fit_start", "test-redis-host:1234", logging.getLogger(__name__))
 
-    assert result == mock_redis_pubsub
-    mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
-    mock_redis_connection.pubsub.assert_called_once()
-    mock_redis_pubsub.subscribe.assert_called_once_with(test_channel)
+    assert mock_redis_connection.get.call_count == 2
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_wait_for_metric_async_timeout(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = _make_mock_async_redis(mock_get_async_redis_connection, {"foo": "bar"})
+
+    with raises(Exception, match="Metric 'fit_start' has not been found after 0.1 seconds."):
+        await wait_for_metric_async(
+            "test-uuid",
+            "fit_start",
+            "test-redis-host:1234",
+            logging.getLogger(__name__),
+            timeout_seconds=0.1,
+        )
+
+    mock_redis_connection.pubsub.return_value.aclose.assert_called_once()
+    mock_redis_connection.aclose.assert_called_once()
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_wait_for_metric_async_with_streams(mock_get_async_redis_connection: Mock) -> None:
+    test_stream = get_stream_name("test-uuid")
+    mock_redis_connection = Mock()
+    mock_redis_connection.xread = AsyncMock(side_effect=[
+        [[test_stream.encode(), [(b"1-0", {b"payload": b'{"metrics": {"initialized": "1"}, "sequence": 1}'})]]],
+        [[test_stream.encode(), [(b"2-0", {b"payload": b'{"metrics": {"fit_start": "2"}, "sequence": 2}'})]]],
+    ])
+    mock_redis_connection.aclose = AsyncMock()
+    mock_get_async_redis_connection.return_value = mock_redis_connection
+
+    await wait_for_metric_async(
+        "test-uuid",
+        "fit_start",
+        "test-redis-host:1234",
+        logging.getLogger(__name__),
+        use_streams=True,
+    )
+
+    assert mock_redis_connection.xread.call_args_list == [
+        call({test_stream: "0"}, block=0),
+        call({test_stream: b"1-0"}, block=0),
+    ]
+    mock_redis_connection.aclose.assert_called_once()
 
 
 @patch("florist.api.monitoring.metrics.redis")
@@ -230,7 +636,14 @@ def test_get_from_redis(mock_redis: Mock) -> None:
     result = get_from_redis(test_name, test_redis_address)
 
     assert result == json.loads(test_redis_result)
-    mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.ConnectionPool.assert_called_once_with(
+        host=test_redis_host,
+        port=test_redis_port,
+        max_connections=MetricsConfig.redis_pool_max_connections,
+        health_check_interval=MetricsConfig.redis_health_check_interval,
+        socket_keepalive=True,
+    )
+    mock_redis.Redis.assert_called_once_with(connection_pool=mock_redis.ConnectionPool.return_value)
     mock_redis_connection.get.assert_called_once_with(test_name)
 
 
@@ -248,10 +661,137 @@ def test_get_from_redis_empty(mock_redis: Mock) -> None:
     result = get_from_redis(test_name, test_redis_address)
 
     assert result is None
-    mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.ConnectionPool.assert_called_once_with(
+        host=test_redis_host,
+        port=test_redis_port,
+        max_connections=MetricsConfig.redis_pool_max_connections,
+        health_check_interval=MetricsConfig.redis_health_check_interval,
+        socket_keepalive=True,
+    )
+    mock_redis.Redis.assert_called_once_with(connection_pool=mock_redis.ConnectionPool.return_value)
     mock_redis_connection.get.assert_called_once_with(test_name)
 
 
+@patch("florist.api.monitoring.metrics.redis")
+def test_get_from_redis_hash(mock_redis: Mock) -> None:
+    test_name = "test-name"
+    test_redis_address = "test-redis-host:1234"
+
+    mock_redis_connection = Mock()
+    mock_redis_connection.get.side_effect = ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+    mock_redis_connection.hgetall.return_value = {
+        b"fit_start": b"\"2022-02-02 02:02:02\"",
+        b"rounds.1": b"{\"fit_start\": \"2022-02-02 02:02:03\"}",
+    }
+    mock_redis.Redis.return_value = mock_redis_connection
+
+    result = get_from_redis(test_name, test_redis_address)
+
+    assert result == {"fit_start": "2022-02-02 02:02:02", "rounds": {"1": {"fit_start": "2022-02-02 02:02:03"}}}
+    mock_redis_connection.hgetall.assert_called_once_with(test_name)
+
+
+async def test_read_metrics_async() -> None:
+    mock_redis_connection = Mock()
+    mock_redis_connection.get = AsyncMock(return_value=b"{\"fit_start\": \"2022-02-02 02:02:02\"}")
+
+    result = await read_metrics_async(mock_redis_connection, "test-name")
+
+    assert result == {"fit_start": "2022-02-02 02:02:02"}
+    mock_redis_connection.get.assert_called_once_with("test-name")
+
+
+async def test_read_metrics_async_hash() -> None:
+    mock_redis_connection = Mock()
+    mock_redis_connection.get = AsyncMock(side_effect=ResponseError("WRONGTYPE Operation against a key"))
+    mock_redis_connection.hgetall = AsyncMock(return_value={b"fit_start": b"\"2022-02-02 02:02:02\""})
+
+    result = await read_metrics_async(mock_redis_connection, "test-name")
+
+    assert result == {"fit_start": "2022-02-02 02:02:02"}
+    mock_redis_connection.hgetall.assert_called_once_with("test-name")
+
+
+@patch("florist.api.monitoring.metrics.redis")
+def test_get_redis_connection_reuses_pool(mock_redis: Mock) -> None:
+    mock_redis.ConnectionPool.side_effect = [Mock(), Mock()]
+
+    get_redis_connection("test-host", "1234")
+    get_redis_connection("test-host", 1234)
+    get_redis_connection("other-host", 1234)
+
+    assert mock_redis.ConnectionPool.call_count == 2
+    assert list(CONNECTION_POOLS.keys()) == [("test-host", 1234), ("other-host", 1234)]
+    first_pool = CONNECTION_POOLS[("test-host", 1234)]
+    assert mock_redis.Redis.call_args_list == [
+        call(connection_pool=first_pool),
+        call(connection_pool=first_pool),
+        call(connection_pool=CONNECTION_POOLS[("other-host", 1234)]),
+    ]
+
+
+@patch.dict("os.environ", {"REDIS_POOL_MAX_CONNECTIONS": "7", "REDIS_HEALTH_CHECK_INTERVAL": "3"})
+@patch("florist.api.monitoring.metrics.redis")
+def test_get_redis_connection_with_config(mock_redis: Mock) -> None:
+    get_redis_connection("test-host", 1234)
+
+    mock_redis.ConnectionPool.assert_called_once_with(
+        host="test-host",
+        port=1234,
+        max_connections=7,
+        health_check_interval=3,
+        socket_keepalive=True,
+    )
+
+
+@patch("florist.api.monitoring.metrics.redis")
+def test_close_connection_pools(mock_redis: Mock) -> None:
+    get_redis_connection("test-host", 1234)
+
+    close_connection_pools()
+
+    mock_redis.ConnectionPool.return_value.disconnect.assert_called_once()
+    assert CONNECTION_POOLS == {}
+
+
+@patch("florist.api.monitoring.metrics.redis.asyncio")
+async def test_get_async_redis_connection_reuses_pool(mock_redis_asyncio: Mock) -> None:
+    mock_redis_asyncio.ConnectionPool.side_effect = [AsyncMock(), AsyncMock()]
+
+    get_async_redis_connection("test-host", "1234")
+    get_async_redis_connection("test-host", 1234)
+    get_async_redis_connection("other-host", 1234)
+
+    assert mock_redis_asyncio.ConnectionPool.call_count == 2
+    assert list(ASYNC_CONNECTION_POOLS.keys()) == [("test-host", 1234), ("other-host", 1234)]
+    first_pool = ASYNC_CONNECTION_POOLS[("test-host", 1234)]
+    other_pool = ASYNC_CONNECTION_POOLS[("other-host", 1234)]
+    assert mock_redis_asyncio.Redis.call_args_list == [
+        call(connection_pool=first_pool),
+        call(connection_pool=first_pool),
+        call(connection_pool=other_pool),
+    ]
+
+    await close_async_connection_pools()
+
+    first_pool.disconnect.assert_awaited_once()
+    other_pool.disconnect.assert_awaited_once()
+    assert ASYNC_CONNECTION_POOLS == {}
+
+
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_get_from_redis_async(mock_get_async_redis_connection: Mock) -> None:
+    mock_redis_connection = AsyncMock()
+    mock_redis_connection.get.return_value = b"{\"info\": \"test\"}"
+    mock_get_async_redis_connection.return_value = mock_redis_connection
+
+    result = await get_from_redis_async("test-name", "test-host:1234")
+
+    assert result == {"info": "test"}
+    mock_get_async_redis_connection.assert_called_once_with("test-host", 1234)
+    mock_redis_connection.get.assert_awaited_once_with("test-name")
+
+
 def test_get_host_and_port_from_address_success():
     test_host = "test-host"
     test_port = 1234
@@ -0,0 +1,230 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+from fastapi import HTTPException
+from pytest import raises
+
+from florist.api.auth.token import CachedClientToken, Token, create_access_token
+from florist.api.db.server_entities import ClientInfo
+from florist.api.routes.server.auth import (
+    AUTH_TOKEN_CLIENT_API,
+    CLIENT_TOKEN_REFRESH_MARGIN,
+    get_client_token,
+    get_from_client,
+)
+
+
+async def test_get_client_token_cached() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_token = Token(access_token="test-token", token_type="bearer")
+    test_expires_at = datetime.now(timezone.utc) + CLIENT_TOKEN_REFRESH_MARGIN + timedelta(minutes=1)
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(
+        token=test_token, expires_at=test_expires_at
+    )
+
+    token = await get_client_token(test_client_info, mock_request)
+
+    assert token == test_token
+    mock_request.app.http_client.get.assert_not_called()
+    mock_request.app.http_client.post.assert_not_called()
+
+
+async def test_get_client_token_new_token() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+    mock_request.app.http_client.post.return_value = _make_mock_response(
+        200, {"access_token": test_access_token, "token_type": "bearer"}
+    )
+
+    token = await get_client_token(test_client_info, mock_request)
+
+    assert token.access_token == test_access_token
+    mock_request.app.http_client.post.assert_called_once_with(
+        f"http://{test_client_info.service_address}/{AUTH_TOKEN_CLIENT_API}",
+        data={"grant_type": "password", "username": "admin", "password": test_client_info.hashed_password},
+    )
+    cached_token = mock_request.app.clients_auth_tokens[test_client_info.id]
+    assert cached_token.token == token
+    assert cached_token.expires_at > datetime.now(timezone.utc) + timedelta(days=6)
+
+
+async def test_get_client_token_refreshes_expiring_token() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_expires_at = datetime.now(timezone.utc) + CLIENT_TOKEN_REFRESH_MARGIN - timedelta(minutes=1)
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(
+        token=Token(access_token="test-old-token", token_type="bearer"), expires_at=test_expires_at
+    )
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+    mock_request.app.http_client.post.return_value = _make_mock_response(
+        200, {"access_token": test_access_token, "token_type": "bearer"}
+    )
+
+    token = await get_client_token(test_client_info, mock_request)
+
+    assert token.access_token == test_access_token
+    mock_request.app.http_client.post.assert_called_once()
+
+
+async def test_get_client_token_invalid_token() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_invalid_token = Token(access_token="test-invalid-token", token_type="bearer")
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_invalid_token)
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+    mock_request.app.http_client.post.return_value = _make_mock_response(
+        200, {"access_token": test_access_token, "token_type": "bearer"}
+    )
+
+    assert await get_client_token(test_client_info, mock_request) == test_invalid_token
+    token = await get_client_token(test_client_info, mock_request, invalid_token=test_invalid_token)
+
+    assert token.access_token == test_access_token
+    mock_request.app.http_client.post.assert_called_once()
+
+
+async def test_get_client_token_concurrent_requests() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+
+    async def post(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return _make_mock_response(200, {"access_token": test_access_token, "token_type": "bearer"})
+
+    mock_request.app.http_client.post.side_effect = post
+
+    tokens = await asyncio.gather(*[get_client_token(test_client_info, mock_request) for _ in range(5)])
+
+    assert all(token.access_token == test_access_token for token in tokens)
+    mock_request.app.http_client.post.assert_called_once()
+
+
+async def test_get_client_token_failure() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    mock_request.app.http_client.post.return_value = _make_mock_response(401, {})
+
+    with raises(HTTPException) as err:
+        await get_client_token(test_client_info, mock_request)
+
+    assert err.value.status_code == 401
+    assert err.value.detail == f"Unable to issue client token for client with id {test_client_info.id}"
+
+
+async def test_get_client_token_failure_unable_to_connect() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    mock_request.app.http_client.post.side_effect = ConnectionError("test connection error")
+
+    with raises(HTTPException) as err:
+        await get_client_token(test_client_info, mock_request)
+
+    assert err.value.status_code == 401
+    assert err.value.detail == f"Could not connect to client with id {test_client_info.id}"
+
+
+async def test_get_from_client() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_token = Token(access_token="test-token", token_type="bearer")
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_token)
+    mock_response = _make_mock_response(200, {})
+    mock_request.app.http_client.get.return_value = mock_response
+    test_url = "http://test-service-address/test-api"
+
+    response = await get_from_client(test_client_info, mock_request, url=test_url, timeout=10)
+
+    assert response == mock_response
+    mock_request.app.http_client.get.assert_called_once_with(
+        url=test_url,
+        headers={"Authorization": f"Bearer {test_token.access_token}"},
+        timeout=10,
+    )
+
+
+async def test_get_from_client_retries_unauthorized() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_invalid_token = Token(access_token="test-invalid-token", token_type="bearer")
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_invalid_token)
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+    mock_request.app.http_client.post.return_value = _make_mock_response(
+        200, {"access_token": test_access_token, "token_type": "bearer"}
+    )
+    mock_response = _make_mock_response(200, {})
+    mock_request.app.http_client.get.side_effect = [_make_mock_response(401, {}), mock_response]
+    test_url = "http://test-service-address/test-api"
+
+    response = await get_from_client(test_client_info, mock_request, url=test_url)
+
+    assert response == mock_response
+    mock_request.app.http_client.post.assert_called_once()
+    assert mock_request.app.http_client.get.call_args_list[1].kwargs == {
+        "url": test_url,
+        "headers": {"Authorization": f"Bearer {test_access_token}"},
+    }
+
+
+async def test_get_from_client_stream() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_token = Token(access_token="test-token", token_type="bearer")
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_token)
+    mock_client_request = Mock()
+    mock_request.app.http_client.build_request = Mock(return_value=mock_client_request)
+    mock_response = _make_mock_response(200, {})
+    mock_request.app.http_client.send.return_value = mock_response
+    test_url = "http://test-service-address/test-api"
+    test_params = {"offset": 10}
+
+    response = await get_from_client(test_client_info, mock_request, url=test_url, stream=True, params=test_params)
+
+    assert response == mock_response
+    mock_request.app.http_client.build_request.assert_called_once_with(
+        "GET",
+        test_url,
+        headers={"Authorization": f"Bearer {test_token.access_token}"},
+        params=test_params,
+    )
+    mock_request.app.http_client.send.assert_called_once_with(mock_client_request, stream=True)
+    mock_request.app.http_client.get.assert_not_called()
+
+
+async def test_get_from_client_stream_retries_unauthorized() -> None:
+    test_client_info, mock_request = _setup_test_client_and_mocks()
+    test_invalid_token = Token(access_token="test-invalid-token", token_type="bearer")
+    mock_request.app.clients_auth_tokens[test_client_info.id] = CachedClientToken(token=test_invalid_token)
+    test_access_token = create_access_token({"sub": "admin"}, "test-secret-key")
+    mock_request.app.http_client.post.return_value = _make_mock_response(
+        200, {"access_token": test_access_token, "token_type": "bearer"}
+    )
+    mock_request.app.http_client.build_request = Mock()
+    mock_unauthorized_response = _make_mock_response(401, {})
+    mock_unauthorized_response.aclose = AsyncMock()
+    mock_response = _make_mock_response(200, {})
+    mock_request.app.http_client.send.side_effect = [mock_unauthorized_response, mock_response]
+    test_url = "http://test-service-address/test-api"
+
+    response = await get_from_client(test_client_info, mock_request, url=test_url, stream=True)
+
+    assert response == mock_response
+    mock_unauthorized_response.aclose.assert_called_once()
+    assert mock_request.app.http_client.build_request.call_args_list[1].kwargs == {
+        "headers": {"Authorization": f"Bearer {test_access_token}"},
+    }
+
+
+def _setup_test_client_and_mocks():
+    test_client_info = ClientInfo(
+        id="test-client-id",
+        service_address="test-service-address",
+        data_path="test-data-path",
+        redis_address="test-redis-address",
+        hashed_password="test-hashed-password",
+    )
+    mock_request = Mock()
+    mock_request.app.clients_auth_tokens = {}
+    mock_request.app.clients_auth_tokens_locks = {}
+    mock_request.app.http_client = AsyncMock()
+    return test_client_info, mock_request
+
+
+def _make_mock_response(status_code, json_response):
+    mock_response = Mock()
+    mock_response.status_code = status_code
+    mock_response.json.return_value = json_response
+    return mock_response
@@ -4,12 +4,23 @@ from datetime import datetime
 
 import freezegun
 from freezegun import freeze_time
-from unittest.mock import patch, Mock, AsyncMock, call
+from unittest.mock import ANY, patch, Mock, AsyncMock, call
 from fastapi.responses import JSONResponse
 
-from florist.api.auth.token import Token
+from florist.api.auth.token import CachedClientToken, Token
 from florist.api.db.server_entities import JobStatus, ClientInfo
-from florist.api.routes.server.job import change_job_status, get_job, stop_job
+from florist.api.monitoring.events import JOB_EVENTS
+from florist.api.monitoring.logs import LOG_TAIL_END_EVENT, LOG_TAIL_KEEPALIVE_EVENT
+from florist.api.routes.server.job import (
+    change_job_status,
+    get_client_log_range,
+    get_job,
+    get_job_round_metrics,
+    stop_job,
+    stream_events,
+    tail_client_log,
+    tail_server_log,
+)
 
 
 freezegun.configure(extend_ignore_list=["transformers"])  # type: ignore
@@ -18,6 +29,7 @@ freezegun.configure(extend_ignore_list=["transformers"])  # type: ignore
 @patch("florist.api.db.server_entities.Job.find_by_id")
 async def test_get_job_success(mock_find_by_id: Mock) -> None:
     mock_job = Mock()
+    mock_job.load_round_metrics = AsyncMock()
     mock_find_by_id.return_value = mock_job
 
     mock_request = Mock()
@@ -28,6 +40,8 @@ async def test_get_job_success(mock_find_by_id: Mock) -> None:
     response = await get_job(test_id, mock_request)
 
     mock_find_by_id.assert_called_once_with(test_id, mock_request.app.database)
+    mock_job.load_round_metrics.assert_called_once_with(mock_request.app.database)
+    mock_job.obscure_hashed_passwords.assert_called_once()
 
     assert response == mock_job
 
@@ -50,6 +64,46 @@ async def test_get_job_fail_none_job(mock_find_by_id: Mock) -> None:
     assert json.loads(response.body.decode("utf-8")) == {"error": f"Job with ID {test_id} does not exist."}
 
 
+@patch("florist.api.db.server_entities.RoundMetrics.find_latest")
+async def test_get_job_round_metrics_success(mock_find_latest: Mock) -> None:
+    mock_round_metrics = [Mock(), Mock()]
+    mock_find_latest.return_value = mock_round_metrics
+
+    mock_request = Mock()
+    mock_request.app.database = Mock()
+
+    test_id = "test_id"
+    test_host_uuid = "test-host-uuid"
+
+    response = await get_job_round_metrics(test_id, mock_request, test_host_uuid, 2, 5)
+
+    mock_find_latest.assert_called_once_with(
+        test_id,
+        mock_request.app.database,
+        host_uuid=test_host_uuid,
+        start_round=2,
+        end_round=5,
+    )
+
+    assert response == mock_round_metrics
+
+
+@patch("florist.api.db.server_entities.RoundMetrics.find_latest")
+async def test_get_job_round_metrics_fail_invalid_range(mock_find_latest: Mock) -> None:
+    mock_request = Mock()
+    mock_request.app.database = Mock()
+
+    response = await get_job_round_metrics("test_id", mock_request, None, 5, 2)
+
+    mock_find_latest.assert_not_called()
+
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 400
+    assert json.loads(response.body.decode("utf-8")) == {
+        "error": "start_round (5) must be less than or equal to end_round (2)",
+    }
+
+
 @patch("florist.api.db.server_entities.Job.find_by_id")
 async def test_change_job_status_success(mock_find_by_id: Mock) -> None:
     mock_job = Mock()
@@ -118,10 +172,8 @@ async def test_change_job_status_failure_in_set_status(mock_find_by_id: Mock) ->
 
 @freeze_time("2012-12-11 10:09:08")
 @patch("florist.api.db.server_entities.Job.find_by_id")
-@patch("florist.api.routes.server.job.requests")
-@patch("florist.api.routes.server.auth.requests")
 @patch("florist.api.routes.server.job.os.kill")
-async def test_stop_job_success(mock_kill: Mock, mock_auth_requests: Mock, mock_requests: Mock, mock_find_by_id: Mock) -> None:
+async def test_stop_job_success(mock_kill: Mock, mock_find_by_id: Mock) -> None:
     test_job_id = "test-job-id"
     test_server_pid = 1234
     test_clients = [
@@ -137,14 +189,14 @@ async def test_stop_job_success(mock_kill: Mock, mock_auth_requests: Mock, mock_
     mock_find_by_id.return_value = mock_job
     mock_request = Mock()
     mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
     mock_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_requests.get.return_value = mock_response
-    mock_auth_requests.get.return_value = mock_response
+    mock_request.app.http_client.get.return_value = mock_response
 
     response = await stop_job(test_job_id, mock_request)
 
@@ -155,14 +207,14 @@ async def test_stop_job_success(mock_kill: Mock, mock_auth_requests: Mock, mock_
         f"Training job terminated manually on {datetime.now()}. ",
         mock_request.app.database,
     )
-    mock_requests.get.assert_has_calls([
+    mock_request.app.http_client.get.assert_has_calls([
         call(
             url=f"http://{test_clients[0].service_address}/api/client/stop/{test_clients[0].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
         ),
         call(
             url=f"http://{test_clients[1].service_address}/api/client/stop/{test_clients[1].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].token.access_token}"},
         ),
     ])
 
@@ -173,10 +225,8 @@ async def test_stop_job_success(mock_kill: Mock, mock_auth_requests: Mock, mock_
 
 @freeze_time("2012-12-11 10:09:08")
 @patch("florist.api.db.server_entities.Job.find_by_id")
-@patch("florist.api.routes.server.job.requests")
-@patch("florist.api.routes.server.auth.requests")
 @patch("florist.api.routes.server.job.os.kill")
-async def test_stop_job_fail_stop_client(mock_kill: Mock, mock_auth_requests: Mock, mock_requests: Mock, mock_find_by_id: Mock) -> None:
+async def test_stop_job_fail_stop_client(mock_kill: Mock, mock_find_by_id: Mock) -> None:
     test_job_id = "test-job-id"
     test_server_pid = 1234
     test_clients = [
@@ -193,31 +243,29 @@ async def test_stop_job_fail_stop_client(mock_kill: Mock, mock_auth_requests: Mo
     mock_find_by_id.return_value = mock_job
     mock_request = Mock()
     mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
     mock_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
     mock_response = Mock()
     mock_response.status_code = 500
     mock_response.json.return_value = {"error": test_error}
-    mock_requests.get.return_value = mock_response
-    mock_auth_response = Mock()
-    mock_auth_response.status_code = 200
-    mock_auth_requests.get.return_value = mock_auth_response
+    mock_request.app.http_client.get.return_value = mock_response
 
     response = await stop_job(test_job_id, mock_request)
 
     mock_find_by_id.assert_called_once_with(test_job_id, mock_request.app.database)
     mock_kill.assert_called_once_with(test_server_pid, signal.SIGTERM)
     mock_job.set_status.assert_called_once_with(JobStatus.FINISHED_WITH_ERROR, mock_request.app.database)
-    mock_requests.get.assert_has_calls([
+    mock_request.app.http_client.get.assert_has_calls([
         call(
             url=f"http://{test_clients[0].service_address}/api/client/stop/{test_clients[0].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
         ),
         call(
             url=f"http://{test_clients[1].service_address}/api/client/stop/{test_clients[1].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].token.access_token}"},
         ),
     ], any_order=True)
     mock_job.set_error_message.assert_called_once_with(
@@ -234,10 +282,8 @@ async def test_stop_job_fail_stop_client(mock_kill: Mock, mock_auth_requests: Mo
 
 @freeze_time("2012-12-11 10:09:08")
 @patch("florist.api.db.server_entities.Job.find_by_id")
-@patch("florist.api.routes.server.job.requests")
-@patch("florist.api.routes.server.auth.requests")
 @patch("florist.api.routes.server.job.os.kill")
-async def test_stop_job_fail_stop_server(_: Mock, mock_auth_requests: Mock, mock_requests: Mock, mock_find_by_id: Mock) -> None:
+async def test_stop_job_fail_stop_server(_: Mock, mock_find_by_id: Mock) -> None:
     test_job_id = "test-job-id"
     test_server_uuid = "test-server-uuid"
     test_server_pid = "incorrect-pid"
@@ -255,26 +301,26 @@ async def test_stop_job_fail_stop_server(_: Mock, mock_auth_requests: Mock, mock
     mock_find_by_id.return_value = mock_job
     mock_request = Mock()
     mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
     mock_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_requests.get.return_value = mock_response
-    mock_auth_requests.get.return_value = mock_response
+    mock_request.app.http_client.get.return_value = mock_response
     response = await stop_job(test_job_id, mock_request)
 
     mock_find_by_id.assert_called_once_with(test_job_id, mock_request.app.database)
     mock_job.set_status.assert_called_once_with(JobStatus.FINISHED_WITH_ERROR, mock_request.app.database)
-    mock_requests.get.assert_has_calls([
+    mock_request.app.http_client.get.assert_has_calls([
         call(
             url=f"http://{test_clients[0].service_address}/api/client/stop/{test_clients[0].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
         ),
         call(
             url=f"http://{test_clients[1].service_address}/api/client/stop/{test_clients[1].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].token.access_token}"},
         ),
     ])
     mock_job.set_error_message.assert_called_once_with(
@@ -290,10 +336,8 @@ async def test_stop_job_fail_stop_server(_: Mock, mock_auth_requests: Mock, mock
 
 @freeze_time("2012-12-11 10:09:08")
 @patch("florist.api.db.server_entities.Job.find_by_id")
-@patch("florist.api.routes.server.job.requests")
-@patch("florist.api.routes.server.auth.requests")
 @patch("florist.api.routes.server.job.os.kill")
-async def test_stop_job_fail_no_server_pid(_: Mock, mock_auth_requests: Mock, mock_requests: Mock, mock_find_by_id: Mock) -> None:
+async def test_stop_job_fail_no_server_pid(_: Mock, mock_find_by_id: Mock) -> None:
     test_job_id = "test-job-id"
     test_server_uuid = "test-server-uuid"
     test_clients = [
@@ -310,27 +354,27 @@ async def test_stop_job_fail_no_server_pid(_: Mock, mock_auth_requests: Mock, mo
     mock_find_by_id.return_value = mock_job
     mock_request = Mock()
     mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
     mock_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_requests.get.return_value = mock_response
-    mock_auth_requests.get.return_value = mock_response
+    mock_request.app.http_client.get.return_value = mock_response
 
     response = await stop_job(test_job_id, mock_request)
 
     mock_find_by_id.assert_called_once_with(test_job_id, mock_request.app.database)
     mock_job.set_status.assert_called_once_with(JobStatus.FINISHED_WITH_ERROR, mock_request.app.database)
-    mock_requests.get.assert_has_calls([
+    mock_request.app.http_client.get.assert_has_calls([
         call(
             url=f"http://{test_clients[0].service_address}/api/client/stop/{test_clients[0].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
         ),
         call(
             url=f"http://{test_clients[1].service_address}/api/client/stop/{test_clients[1].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-2'].token.access_token}"},
         ),
     ])
     mock_job.set_error_message.assert_called_once_with(
@@ -346,9 +390,7 @@ async def test_stop_job_fail_no_server_pid(_: Mock, mock_auth_requests: Mock, mo
 
 @freeze_time("2012-12-11 10:09:08")
 @patch("florist.api.db.server_entities.Job.find_by_id")
-@patch("florist.api.routes.server.job.requests")
-@patch("florist.api.routes.server.auth.requests")
-async def test_stop_job_exception(mock_auth_requests: Mock, mock_requests: Mock, mock_find_by_id: Mock) -> None:
+async def test_stop_job_exception(mock_find_by_id: Mock) -> None:
     test_exception_message = "test-exception-message"
     test_job_id = "test-job-id"
     test_server_pid = 1234
@@ -365,23 +407,21 @@ async def test_stop_job_exception(mock_auth_requests: Mock, mock_requests: Mock,
     mock_find_by_id.return_value = mock_job
     mock_request = Mock()
     mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
     mock_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_requests.get.side_effect = Exception(test_exception_message)
-    mock_auth_requests.get.return_value = mock_response
+    mock_request.app.http_client.get.side_effect = Exception(test_exception_message)
     response = await stop_job(test_job_id, mock_request)
 
     mock_find_by_id.assert_called_once_with(test_job_id, mock_request.app.database)
     mock_job.set_status.assert_not_called()
     mock_job.set_error_message.assert_not_called()
-    mock_requests.get.assert_has_calls([
+    mock_request.app.http_client.get.assert_has_calls([
         call(
             url=f"http://{test_clients[0].service_address}/api/client/stop/{test_clients[0].uuid}",
-            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
         ),
     ])
     assert isinstance(response, JSONResponse)
@@ -403,3 +443,225 @@ async def test_stop_job_assertion_error(mock_find_by_id: Mock) -> None:
     assert isinstance(response, JSONResponse)
     assert response.status_code == 400
     assert json.loads(response.body.decode("utf-8")) == {"error": f"Job {test_job_id} not found"}
+
+
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_get_client_log_range_success(mock_find_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    test_client = ClientInfo(id="test-client-id-1", uuid="test-client-uuid-1", service_address="test-service-address-1", data_path="", redis_address="", hashed_password="test-password-1")
+    mock_request = _setup_log_range_mocks(mock_find_by_id, test_client)
+    test_headers = {"X-Log-Offset": "5", "X-Log-Next-Offset": "12", "X-Log-Size": "20"}
+
+    async def test_body_iterator():
+        yield b"test-"
+        yield b"log"
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.headers = {**test_headers, "Content-Type": "text/plain"}
+    mock_response.aiter_raw.return_value = test_body_iterator()
+    mock_response.aclose = AsyncMock()
+    mock_request.app.http_client.send.return_value = mock_response
+
+    response = await get_client_log_range(test_job_id, 0, mock_request, offset=5, length=7)
+
+    mock_request.app.http_client.build_request.assert_called_once_with(
+        "GET",
+        f"http://{test_client.service_address}/api/client/get_log_range/{test_client.uuid}",
+        headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
+        params={"offset": 5, "length": 7},
+    )
+    mock_request.app.http_client.send.assert_called_once_with(
+        mock_request.app.http_client.build_request.return_value, stream=True
+    )
+    assert response.status_code == 200
+    for header, value in test_headers.items():
+        assert response.headers[header] == value
+    assert b"".join([chunk async for chunk in response.body_iterator]) == b"test-log"
+
+    await response.background()
+    mock_response.aclose.assert_called_once()
+
+
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_get_client_log_range_fail_client_error(mock_find_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    test_client = ClientInfo(id="test-client-id-1", uuid="test-client-uuid-1", service_address="test-service-address-1", data_path="", redis_address="", hashed_password="test-password-1")
+    mock_request = _setup_log_range_mocks(mock_find_by_id, test_client)
+    test_client_error = {"error": "Client log file path is None or empty"}
+
+    mock_response = Mock()
+    mock_response.status_code = 400
+    mock_response.json.return_value = test_client_error
+    mock_response.aread = AsyncMock()
+    mock_response.aclose = AsyncMock()
+    mock_request.app.http_client.send.return_value = mock_response
+
+    response = await get_client_log_range(test_job_id, 0, mock_request)
+
+    mock_response.aclose.assert_called_once()
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 400
+    assert json.loads(response.body.decode("utf-8")) == {
+        "error": f"Client responded with code 400: '{test_client_error}'",
+    }
+
+
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_get_client_log_range_fail_invalid_client_index(mock_find_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    test_client = ClientInfo(id="test-client-id-1", uuid="test-client-uuid-1", service_address="test-service-address-1", data_path="", redis_address="", hashed_password="test-password-1")
+    mock_request = _setup_log_range_mocks(mock_find_by_id, test_client)
+
+    response = await get_client_log_range(test_job_id, 1, mock_request)
+
+    mock_request.app.http_client.send.assert_not_called()
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 400
+    assert json.loads(response.body.decode("utf-8")) == {"error": "Client index 1 is invalid (total: 1)"}
+
+
+@patch("florist.api.routes.server.job.make_log_tail_response")
+@patch("florist.api.db.server_entities.Job.find_status_by_id")
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_tail_server_log_success(
+    mock_find_by_id: Mock,
+    mock_find_status_by_id: Mock,
+    mock_make_log_tail_response: Mock,
+) -> None:
+    test_job_id = "test-job-id"
+    test_log_file_path = "test/log/file/path"
+    mock_job = Mock()
+    mock_job.server_log_file_path = test_log_file_path
+    mock_find_by_id.return_value = mock_job
+    mock_find_status_by_id.return_value = JobStatus.IN_PROGRESS
+    mock_request = Mock()
+    mock_request.app.database = Mock()
+    mock_request.headers = {}
+
+    response = await tail_server_log(test_job_id, mock_request, offset=10)
+
+    assert response == mock_make_log_tail_response.return_value
+    mock_make_log_tail_response.assert_called_once_with(test_log_file_path, 10, ANY)
+
+    is_job_finished = mock_make_log_tail_response.call_args.args[2]
+    assert not await is_job_finished()
+    mock_find_status_by_id.assert_called_with(test_job_id, mock_request.app.database)
+    mock_find_status_by_id.return_value = JobStatus.FINISHED_SUCCESSFULLY
+    assert await is_job_finished()
+    mock_find_status_by_id.return_value = None
+    assert await is_job_finished()
+
+
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_tail_server_log_fail_no_log_path(mock_find_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    mock_job = Mock()
+    mock_job.server_log_file_path = None
+    mock_find_by_id.return_value = mock_job
+    mock_request = Mock()
+    mock_request.app.database = Mock()
+
+    response = await tail_server_log(test_job_id, mock_request)
+
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 400
+    assert json.loads(response.body.decode("utf-8")) == {"error": "Log file path is None or empty"}
+
+
+@patch("florist.api.db.server_entities.Job.find_status_by_id")
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_tail_client_log_success(mock_find_by_id: Mock, mock_find_status_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    test_client = ClientInfo(id="test-client-id-1", uuid="test-client-uuid-1", service_address="test-service-address-1", data_path="", redis_address="", hashed_password="test-password-1")
+    mock_request = _setup_log_range_mocks(mock_find_by_id, test_client)
+    mock_request.headers = {"Last-Event-ID": "20"}
+    # the job finishes after the first keepalive
+    mock_find_status_by_id.side_effect = [JobStatus.IN_PROGRESS, JobStatus.FINISHED_SUCCESSFULLY]
+    test_log_event = "id: 27\nevent: log\ndata: \"line 1\\n\"\n\n"
+
+    async def test_lines_iterator():
+        test_event_lines = test_log_event.split("\n")[:-1]
+        for line in [*test_event_lines, ": keepalive", "", *test_event_lines, ": keepalive", "", *test_event_lines]:
+            yield line
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.aiter_lines.return_value = test_lines_iterator()
+    mock_response.aclose = AsyncMock()
+    mock_request.app.http_client.send.return_value = mock_response
+
+    response = await tail_client_log(test_job_id, 0, mock_request)
+
+    mock_request.app.http_client.build_request.assert_called_once_with(
+        "GET",
+        f"http://{test_client.service_address}/api/client/tail_log/{test_client.uuid}",
+        headers={"Authorization": f"Bearer {mock_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
+        params={"offset": 20},
+    )
+    assert response.media_type == "text/event-stream"
+    events = [event async for event in response.body_iterator]
+    assert events == [test_log_event, LOG_TAIL_KEEPALIVE_EVENT, test_log_event, LOG_TAIL_END_EVENT]
+    mock_response.aclose.assert_called_once()
+
+
+@patch("florist.api.db.server_entities.Job.find_by_id")
+async def test_tail_client_log_fail_client_error(mock_find_by_id: Mock) -> None:
+    test_job_id = "test-job-id"
+    test_client = ClientInfo(id="test-client-id-1", uuid="test-client-uuid-1", service_address="test-service-address-1", data_path="", redis_address="", hashed_password="test-password-1")
+    mock_request = _setup_log_range_mocks(mock_find_by_id, test_client)
+    mock_request.headers = {}
+    test_client_error = {"error": "test-error"}
+
+    mock_response = Mock()
+    mock_response.status_code = 500
+    mock_response.json.return_value = test_client_error
+    mock_response.aread = AsyncMock()
+    mock_response.aclose = AsyncMock()
+    mock_request.app.http_client.send.return_value = mock_response
+
+    response = await tail_client_log(test_job_id, 0, mock_request)
+
+    mock_response.aclose.assert_called_once()
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 500
+    assert json.loads(response.body.decode("utf-8")) == {
+        "error": f"Client response with code != 200: '{test_client_error}'",
+    }
+
+
+async def test_stream_events() -> None:
+    test_job_id = "test-job-id"
+
+    response = await stream_events(test_job_id)
+
+    assert response.media_type == "text/event-stream"
+    assert json.loads((await anext(response.body_iterator)).split("data: ")[1]) == {"type": "connected"}
+
+    JOB_EVENTS.publish_status("another-job-id", JobStatus.IN_PROGRESS.value)
+    JOB_EVENTS.publish_status(test_job_id, JobStatus.IN_PROGRESS.value)
+
+    event = await anext(response.body_iterator)
+    assert event.startswith("event: status\n")
+    assert json.loads(event.split("data: ")[1]) == {
+        "type": "status",
+        "job_id": test_job_id,
+        "status": JobStatus.IN_PROGRESS.value,
+    }
+
+    await response.body_iterator.aclose()
+    assert JOB_EVENTS.subscribers == []
+
+
+def _setup_log_range_mocks(mock_find_by_id: Mock, test_client: ClientInfo) -> Mock:
+    mock_job = Mock()
+    mock_job.clients_info = [test_client]
+    mock_find_by_id.return_value = mock_job
+    mock_request = Mock()
+    mock_request.app.database = Mock()
+    mock_request.app.http_client = AsyncMock()
+    mock_request.app.http_client.build_request = Mock()
+    mock_request.app.clients_auth_tokens = {
+        test_client.id: CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+    }
+    return mock_request
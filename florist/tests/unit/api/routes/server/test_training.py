@@ -4,17 +4,18 @@ from pytest import raises
 from typing import Dict, Any, Tuple
 from unittest.mock import Mock, AsyncMock, patch, ANY, call
 
-from florist.api.auth.token import Token
+from florist.api.auth.token import CachedClientToken, Token
 from florist.api.clients.clients import Client
 from florist.api.clients.optimizers import Optimizer
-from florist.api.db.config import DatabaseConfig
-from florist.api.db.server_entities import Job, JobStatus, JOB_COLLECTION_NAME
-from florist.api.monitoring.metrics import get_host_and_port_from_address
+from florist.api.db.server_entities import Job, JobStatus, JOB_COLLECTION_NAME, MAX_RECORDS_TO_FETCH
+from florist.api.monitoring.config import MetricsConfig
 from florist.api.models.models import Model
 from florist.api.models.mnist import MnistNet
 from florist.api.routes.server.training import (
     client_training_listener,
+    resume_training_listeners,
     start,
+    START_CLIENT_TIMEOUT_SECONDS,
     server_training_listener
 )
 from florist.api.servers.strategies import Strategy
@@ -22,21 +23,15 @@ from florist.api.servers.strategies import Strategy
 @patch("florist.api.routes.server.training.client_training_listener")
 @patch("florist.api.routes.server.training.server_training_listener")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
-@patch("florist.api.routes.server.training.requests")
-@patch("florist.api.routes.server.auth.requests")
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_status")
-@patch("florist.api.db.server_entities.Job.set_uuids")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
-@patch("florist.api.db.server_entities.Job.set_server_pid")
+@patch("florist.api.db.server_entities.Job.update_fields")
 async def test_start_success(
-    mock_set_server_pid: Mock,
+    mock_update_fields: Mock,
     mock_server_log_file_path: Mock,
-    mock_set_uuids: Mock,
     mock_set_status: Mock,
-    mock_auth_requests: Mock,
-    mock_requests: Mock,
-    mock_redis: Mock,
+    mock_wait_for_metric: Mock,
     mock_launch_local_server: Mock,
     mock_server_training_listener: Mock,
     mock_client_training_listener: Mock,
@@ -58,20 +53,13 @@ async def test_start_success(
         mock_server_process.pid = test_server_pid
         mock_launch_local_server.return_value = (test_server_uuid, mock_server_process, test_server_log_file_path)
 
-        mock_redis_connection = Mock()
-        mock_redis_connection.get.return_value = b"{\"fit_start\": null}"
-        mock_redis.Redis.return_value = mock_redis_connection
-
         mock_response = Mock()
         mock_response.status_code = 200
         test_client_1_uuid = "test-client-1-uuid"
         test_client_2_uuid = "test-client-2-uuid"
         mock_response.json.side_effect = [{"uuid": test_client_1_uuid}, {"uuid": test_client_2_uuid}]
-        mock_requests.get.return_value = mock_response
-        mock_auth_requests.get.return_value = mock_response
-
-        mock_client_training_listener.return_value = AsyncMock()
-        mock_server_training_listener.return_value = AsyncMock()
+        mock_http_client = mock_fastapi_request.app.http_client
+        mock_http_client.get.return_value = mock_response
 
         # Act
         response = await start(test_job_id, mock_fastapi_request)
@@ -94,12 +82,16 @@ async def test_start_success(
         )
         assert isinstance(mock_launch_local_server.call_args_list[0][1]["model"], MnistNet)
 
-        test_redis_host, test_redis_port = get_host_and_port_from_address(test_job["redis_address"])
-        mock_redis.Redis.assert_called_once_with(host=test_redis_host, port=test_redis_port)
-        mock_redis_connection.get.assert_called_once_with(test_server_uuid)
+        mock_wait_for_metric.assert_called_once_with(
+            test_server_uuid,
+            "fit_start",
+            test_job["redis_address"],
+            logger=ANY,
+            use_streams=MetricsConfig.use_streams,
+        )
         mock_server_log_file_path.assert_called_once_with(test_server_log_file_path, mock_fastapi_request.app.database)
 
-        mock_requests.get.assert_any_call(
+        mock_http_client.get.assert_any_call(
             url=f"http://{test_job['clients_info'][0]['service_address']}/api/client/start",
             params={
                 "server_address": test_job["server_address"],
@@ -109,9 +101,10 @@ async def test_start_success(
                 "data_path": test_job["clients_info"][0]["data_path"],
                 "redis_address": test_job["clients_info"][0]["redis_address"],
             },
-            headers={"Authorization": f"Bearer {mock_fastapi_request.app.clients_auth_tokens['test-client-id-1'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_fastapi_request.app.clients_auth_tokens['test-client-id-1'].token.access_token}"},
+            timeout=START_CLIENT_TIMEOUT_SECONDS,
         )
-        mock_requests.get.assert_any_call(
+        mock_http_client.get.assert_any_call(
             url=f"http://{test_job['clients_info'][1]['service_address']}/api/client/start",
             params={
                 "server_address": test_job["server_address"],
@@ -121,36 +114,56 @@ async def test_start_success(
                 "data_path": test_job["clients_info"][1]["data_path"],
                 "redis_address": test_job["clients_info"][1]["redis_address"],
             },
-            headers={"Authorization": f"Bearer {mock_fastapi_request.app.clients_auth_tokens['test-client-id-2'].access_token}"},
+            headers={"Authorization": f"Bearer {mock_fastapi_request.app.clients_auth_tokens['test-client-id-2'].token.access_token}"},
+            timeout=START_CLIENT_TIMEOUT_SECONDS,
         )
 
-        mock_set_uuids.assert_called_once_with(
-            test_server_uuid,
-            [test_client_1_uuid, test_client_2_uuid],
+        mock_update_fields.assert_called_once_with(
+            {"server_uuid": test_server_uuid, "server_pid": str(test_server_pid)},
             mock_fastapi_request.app.database,
+            clients_fields=[{"uuid": test_client_1_uuid}, {"uuid": test_client_2_uuid}],
         )
-        mock_set_server_pid.assert_called_once_with(str(test_server_pid), mock_fastapi_request.app.database)
 
         expected_job = Job(**test_job)
         expected_job.id = ANY
         expected_job.clients_info[0].id = ANY
         expected_job.clients_info[1].id = ANY
 
-        mock_server_training_listener.assert_called_with(expected_job)
-        mock_client_training_listener.assert_has_calls([
-            call(expected_job, expected_job.clients_info[0]),
-            call(expected_job, expected_job.clients_info[1]),
-        ])
+        mock_listener_manager = mock_fastapi_request.app.listener_manager
+        assert mock_listener_manager.listen.call_args_list == [
+            call(
+                test_job["redis_address"],
+                test_server_uuid,
+                mock_server_training_listener,
+                expected_job,
+                mock_fastapi_request.app.database,
+            ),
+            call(
+                test_job["clients_info"][0]["redis_address"],
+                test_client_1_uuid,
+                mock_client_training_listener,
+                expected_job,
+                expected_job.clients_info[0],
+                mock_fastapi_request.app.database,
+            ),
+            call(
+                test_job["clients_info"][1]["redis_address"],
+                test_client_2_uuid,
+                mock_client_training_listener,
+                expected_job,
+                expected_job.clients_info[1],
+                mock_fastapi_request.app.database,
+            ),
+        ]
 
-        mock_set_server_pid.reset_mock()
+        mock_update_fields.reset_mock()
         mock_server_log_file_path.reset_mock()
-        mock_set_uuids.reset_mock()
         mock_set_status.reset_mock()
-        mock_requests.reset_mock()
-        mock_redis.reset_mock()
+        mock_wait_for_metric.reset_mock()
         mock_launch_local_server.reset_mock()
         mock_server_training_listener.reset_mock()
         mock_client_training_listener.reset_mock()
+        mock_listener_manager.reset_mock()
 
 
 async def test_start_fail_unsupported_server_model() -> None:
@@ -324,11 +337,11 @@ async def test_start_launch_server_exception(
 @patch("florist.api.db.server_entities.Job.set_status")
 @patch("florist.api.db.server_entities.Job.set_error_message")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
 async def test_start_wait_for_metric_exception(
     mock_set_server_log_file_path: Mock,
-    mock_redis: Mock,
+    mock_wait_for_metric: Mock,
     mock_launch_local_server: Mock,
     mock_set_error_message: Mock,
     mock_set_status: Mock,
@@ -342,7 +355,7 @@ async def test_start_wait_for_metric_exception(
     mock_launch_local_server.return_value = (test_server_uuid, None, test_log_file_path)
 
     test_exception = Exception("test exception")
-    mock_redis.Redis.side_effect = test_exception
+    mock_wait_for_metric.side_effect = test_exception
 
     # Act
     response = await start(test_job_id, mock_fastapi_request)
@@ -364,13 +377,11 @@ async def test_start_wait_for_metric_exception(
 @patch("florist.api.db.server_entities.Job.set_status")
 @patch("florist.api.db.server_entities.Job.set_error_message")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
-@patch("florist.api.monitoring.metrics.time")  # just so time.sleep does not actually sleep
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
-async def test_start_wait_for_metric_timeout(
+async def test_start_fail_response(
     mock_set_server_log_file_path: Mock,
     _: Mock,
-    mock_redis: Mock,
     mock_launch_local_server: Mock,
     mock_set_error_message: Mock,
     mock_set_status: Mock,
@@ -383,17 +394,21 @@ async def test_start_wait_for_metric_timeout(
     test_log_file_path = "test-log-file-path"
     mock_launch_local_server.return_value = (test_server_uuid, None, test_log_file_path)
 
-    mock_redis_connection = Mock()
-    mock_redis_connection.get.return_value = b"{\"foo\": null}"
-    mock_redis.Redis.return_value = mock_redis_connection
-
+    mock_response = Mock()
+    mock_response.status_code = 403
+    mock_response.json.return_value = "error"
+    mock_fastapi_request.app.http_client.get.return_value = mock_response
     # Act
     response = await start(test_job_id, mock_fastapi_request)
 
     # Assert
     assert response.status_code == 500
     json_body = json.loads(response.body.decode())
-    error_message = "Metric 'fit_start' not been found after 20 retries."
+    error_message = (
+        "Failed to start 2 of 2 clients. "
+        "test-service-address-1: Client response returned 403. Response: error | "
+        "test-service-address-2: Client response returned 403. Response: error"
+    )
     assert json_body == {"error": error_message}
 
     mock_set_server_log_file_path.assert_called_once_with(test_log_file_path, mock_fastapi_request.app.database)
@@ -408,15 +423,11 @@ async def test_start_wait_for_metric_timeout(
 @patch("florist.api.db.server_entities.Job.set_status")
 @patch("florist.api.db.server_entities.Job.set_error_message")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
-@patch("florist.api.routes.server.training.requests")
-@patch("florist.api.routes.server.auth.requests")
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
-async def test_start_fail_response(
+async def test_start_no_client_uuid_in_response(
     mock_set_server_log_file_path: Mock,
-    mock_auth_requests: Mock,
-    mock_requests: Mock,
-    mock_redis: Mock,
+    _: Mock,
     mock_launch_local_server: Mock,
     mock_set_error_message: Mock,
     mock_set_status: Mock,
@@ -429,24 +440,21 @@ async def test_start_fail_response(
     test_log_file_path = "test-log-file-path"
     mock_launch_local_server.return_value = (test_server_uuid, None, test_log_file_path)
 
-    mock_redis_connection = Mock()
-    mock_redis_connection.get.return_value = b"{\"fit_start\": null}"
-    mock_redis.Redis.return_value = mock_redis_connection
-
     mock_response = Mock()
-    mock_response.status_code = 403
-    mock_response.json.return_value = "error"
-    mock_requests.get.return_value = mock_response
-    mock_auth_response = Mock()
-    mock_auth_response.status_code = 200
-    mock_auth_requests.get.return_value = mock_auth_response
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"foo": "bar"}
+    mock_fastapi_request.app.http_client.get.return_value = mock_response
     # Act
     response = await start(test_job_id, mock_fastapi_request)
 
     # Assert
     assert response.status_code == 500
     json_body = json.loads(response.body.decode())
-    error_message = f"Client response returned 403. Response: error"
+    error_message = (
+        "Failed to start 2 of 2 clients. "
+        "test-service-address-1: Client response did not return a UUID. Response: {'foo': 'bar'} | "
+        "test-service-address-2: Client response did not return a UUID. Response: {'foo': 'bar'}"
+    )
     assert json_body == {"error": error_message}
 
     mock_set_server_log_file_path.assert_called_once_with(test_log_file_path, mock_fastapi_request.app.database)
@@ -461,15 +469,11 @@ async def test_start_fail_response(
 @patch("florist.api.db.server_entities.Job.set_status")
 @patch("florist.api.db.server_entities.Job.set_error_message")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
-@patch("florist.api.routes.server.training.requests")
-@patch("florist.api.routes.server.auth.requests")
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
-async def test_start_no_client_uuid_in_response(
+async def test_start_client_uuid_in_response_is_not_a_string(
     mock_set_server_log_file_path: Mock,
-    mock_auth_requests: Mock,
-    mock_requests: Mock,
-    mock_redis: Mock,
+    _: Mock,
     mock_launch_local_server: Mock,
     mock_set_error_message: Mock,
     mock_set_status: Mock,
@@ -482,22 +486,21 @@ async def test_start_no_client_uuid_in_response(
     test_log_file_path = "test-log-file-path"
     mock_launch_local_server.return_value = (test_server_uuid, None, test_log_file_path)
 
-    mock_redis_connection = Mock()
-    mock_redis_connection.get.return_value = b"{\"fit_start\": null}"
-    mock_redis.Redis.return_value = mock_redis_connection
-
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"foo": "bar"}
-    mock_requests.get.return_value = mock_response
-    mock_auth_requests.get.return_value = mock_response
+    mock_response.json.return_value = {"uuid": 1234}
+    mock_fastapi_request.app.http_client.get.return_value = mock_response
     # Act
     response = await start(test_job_id, mock_fastapi_request)
 
     # Assert
     assert response.status_code == 500
     json_body = json.loads(response.body.decode())
-    error_message = "Client response did not return a UUID. Response: {'foo': 'bar'}"
+    error_message = (
+        "Failed to start 2 of 2 clients. "
+        "test-service-address-1: Client UUID is not a string: 1234 | "
+        "test-service-address-2: Client UUID is not a string: 1234"
+    )
     assert json_body == {"error": error_message}
 
     mock_set_server_log_file_path.assert_called_once_with(test_log_file_path, mock_fastapi_request.app.database)
@@ -508,19 +511,14 @@ async def test_start_no_client_uuid_in_response(
     ])
     mock_set_error_message.assert_called_once_with(error_message, mock_fastapi_request.app.database)
 
-
 @patch("florist.api.db.server_entities.Job.set_status")
 @patch("florist.api.db.server_entities.Job.set_error_message")
 @patch("florist.api.routes.server.training.launch_local_server")
-@patch("florist.api.monitoring.metrics.redis")
-@patch("florist.api.routes.server.training.requests")
-@patch("florist.api.routes.server.auth.requests")
+@patch("florist.api.routes.server.training.wait_for_metric_async")
 @patch("florist.api.db.server_entities.Job.set_server_log_file_path")
-async def test_start_client_uuid_in_response_is_not_a_string(
+async def test_start_partial_failure(
     mock_set_server_log_file_path: Mock,
-    mock_auth_requests: Mock,
-    mock_requests: Mock,
-    mock_redis: Mock,
+    _: Mock,
     mock_launch_local_server: Mock,
     mock_set_error_message: Mock,
     mock_set_status: Mock,
@@ -528,130 +526,70 @@ async def test_start_client_uuid_in_response_is_not_a_string(
     # Arrange
     test_job_id = "test-job-id"
     _, _, _, mock_fastapi_request = _setup_test_job_and_mocks()
+    mock_launch_local_server.return_value = ("test-server-uuid", None, "test-log-file-path")
 
-    test_server_uuid = "test-server-uuid"
-    test_log_file_path = "test-log-file-path"
-    mock_launch_local_server.return_value = (test_server_uuid, None, test_log_file_path)
+    mock_success_response = Mock()
+    mock_success_response.status_code = 200
+    mock_success_response.json.return_value = {"uuid": "test-client-uuid"}
 
-    mock_redis_connection = Mock()
-    mock_redis_connection.get.return_value = b"{\"fit_start\": null}"
-    mock_redis.Redis.return_value = mock_redis_connection
+    def get(url, **kwargs):
+        if "test-service-address-2" in url:
+            raise ConnectionError("test connection error")
+        return mock_success_response
+
+    mock_http_client = mock_fastapi_request.app.http_client
+    mock_http_client.get.side_effect = get
 
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"uuid": 1234}
-    mock_requests.get.return_value = mock_response
-    mock_auth_requests.get.return_value = mock_response
     # Act
     response = await start(test_job_id, mock_fastapi_request)
 
     # Assert
     assert response.status_code == 500
-    json_body = json.loads(response.body.decode())
-    error_message = "Client UUID is not a string: 1234"
-    assert json_body == {"error": error_message}
-
-    mock_set_server_log_file_path.assert_called_once_with(test_log_file_path, mock_fastapi_request.app.database)
-
-    mock_set_status.assert_has_calls([
-        call(JobStatus.IN_PROGRESS, mock_fastapi_request.app.database),
-        call(JobStatus.FINISHED_WITH_ERROR, mock_fastapi_request.app.database),
-    ])
+    error_message = "Failed to start 1 of 2 clients. test-service-address-2: test connection error"
+    assert json.loads(response.body.decode()) == {"error": error_message}
+    # the other client was still started
+    assert mock_http_client.get.call_count == 2
     mock_set_error_message.assert_called_once_with(error_message, mock_fastapi_request.app.database)
 
-@patch("florist.api.routes.server.training.AsyncIOMotorClient")
-@patch("florist.api.routes.server.training.get_from_redis")
-@patch("florist.api.routes.server.training.get_subscriber")
-async def test_server_training_listener(
-    mock_get_subscriber: Mock,
-    mock_get_from_redis: Mock,
-    mock_motor_client: Mock,
-) -> None:
+
+async def test_server_training_listener() -> None:
     # Setup
     test_job = Job(**{
         "server_uuid": "test-server-uuid",
         "redis_address": "test-redis-host:1234",
-        "clients_info": [
-            {
-                "service_address": "test-service-address",
-                "uuid": "test-uuid",
-                "redis_address": "test-client-redis-host:1234",
-                "data_path": "test-data-path",
-                "hashed_password": "test-password",
-            }
-        ]
     })
-    test_server_metrics = [
-        {"fit_start": "2022-02-02 02:02:02"},
-        {"fit_start": "2022-02-02 02:02:02", "rounds": []},
-        {"fit_start": "2022-02-02 02:02:02", "rounds": [], "fit_end": "2022-02-02 03:03:03"},
-    ]
-    mock_get_from_redis.side_effect = test_server_metrics
-    mock_subscriber = Mock()
-    mock_subscriber.listen.return_value = [
-        {"type": "message"},
-        {"type": "not message"},
-        {"type": "message"},
-        {"type": "message"},
-        {"type": "message"},
-    ]
-    mock_get_subscriber.return_value = mock_subscriber
-    mock_db_client = make_mock_db_client()
-    mock_motor_client.return_value = mock_db_client
+    test_server_metrics = {"fit_start": "2022-02-02 02:02:02", "rounds": {}}
+    mock_database = Mock()
 
     with patch.object(Job, "set_status", AsyncMock()) as mock_set_status:
         with patch.object(Job, "set_server_metrics", AsyncMock()) as mock_set_server_metrics:
             # Act
-            await server_training_listener(test_job)
+            finished = await server_training_listener(test_job, mock_database, test_server_metrics)
 
             # Assert
-            mock_set_status.assert_called_once_with(JobStatus.FINISHED_SUCCESSFULLY, mock_db_client[DatabaseConfig.get_mongodb_db_name()])
-
-            assert mock_set_server_metrics.call_count == 3
-            mock_set_server_metrics.assert_has_calls([
-                call(test_server_metrics[0], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
-                call(test_server_metrics[1], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
-                call(test_server_metrics[2], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
-            ])
+            assert not finished
+            mock_set_server_metrics.assert_called_once_with(test_server_metrics, mock_database)
+            mock_set_status.assert_not_called()
 
-    assert mock_get_from_redis.call_count == 3
-    mock_get_subscriber.assert_called_once_with(test_job.server_uuid, test_job.redis_address)
-    mock_db_client.close.assert_called()
 
-
-@patch("florist.api.routes.server.training.AsyncIOMotorClient")
-@patch("florist.api.routes.server.training.get_from_redis")
-async def test_server_training_listener_already_finished(mock_get_from_redis: Mock, mock_motor_client: Mock) -> None:
+async def test_server_training_listener_finished() -> None:
     # Setup
     test_job = Job(**{
         "server_uuid": "test-server-uuid",
         "redis_address": "test-redis-host:1234",
-        "clients_info": [
-            {
-                "service_address": "test-service-address",
-                "uuid": "test-uuid",
-                "redis_address": "test-client-redis-host:1234",
-                "data_path": "test-data-path",
-                "hashed_password": "test-password",
-            }
-        ]
     })
-    test_server_final_metrics = {"fit_start": "2022-02-02 02:02:02", "rounds": [], "fit_end": "2022-02-02 03:03:03"}
-    mock_get_from_redis.side_effect = [test_server_final_metrics]
-    mock_db_client = make_mock_db_client()
-    mock_motor_client.return_value = mock_db_client
+    test_server_metrics = {"fit_start": "2022-02-02 02:02:02", "rounds": {}, "fit_end": "2022-02-02 03:03:03"}
+    mock_database = Mock()
 
     with patch.object(Job, "set_status", AsyncMock()) as mock_set_status:
         with patch.object(Job, "set_server_metrics", AsyncMock()) as mock_set_server_metrics:
             # Act
-            await server_training_listener(test_job)
+            finished = await server_training_listener(test_job, mock_database, test_server_metrics)
 
             # Assert
-            mock_set_status.assert_called_once_with(JobStatus.FINISHED_SUCCESSFULLY, mock_db_client[DatabaseConfig.get_mongodb_db_name()])
-            mock_set_server_metrics.assert_called_once_with(test_server_final_metrics, mock_db_client[DatabaseConfig.get_mongodb_db_name()])
-
-    assert mock_get_from_redis.call_count == 1
-    mock_db_client.close.assert_called()
+            assert finished
+            mock_set_server_metrics.assert_called_once_with(test_server_metrics, mock_database)
+            mock_set_status.assert_called_once_with(JobStatus.FINISHED_SUCCESSFULLY, mock_database)
 
 
 async def test_server_training_listener_fail_no_server_uuid() -> None:
@@ -660,26 +598,10 @@ async def test_server_training_listener_fail_no_server_uuid() -> None:
     })
 
     with raises(AssertionError, match="job.server_uuid is None."):
-        await server_training_listener(test_job)
-
-
-async def test_server_training_listener_fail_no_redis_address() -> None:
-    test_job = Job(**{
-        "server_uuid": "test-server-uuid",
-    })
-
-    with raises(AssertionError, match="job.redis_address is None."):
-        await server_training_listener(test_job)
+        await server_training_listener(test_job, Mock(), {})
 
 
-@patch("florist.api.routes.server.training.AsyncIOMotorClient")
-@patch("florist.api.routes.server.training.get_from_redis")
-@patch("florist.api.routes.server.training.get_subscriber")
-async def test_client_training_listener(
-    mock_get_subscriber: Mock,
-    mock_get_from_redis: Mock,
-    mock_motor_client: Mock,
-) -> None:
+async def test_client_training_listener() -> None:
     # Setup
     test_client_uuid = "test-client-uuid"
     test_job = Job(**{
@@ -694,93 +616,85 @@ async def test_client_training_listener(
         ]
     })
     test_client_metrics = [
-        {"initialized": "2022-02-02 02:02:02"},
-        {"initialized": "2022-02-02 02:02:02", "rounds": []},
-        {"initialized": "2022-02-02 02:02:02", "rounds": [], "shutdown": "2022-02-02 03:03:03"},
-    ]
-    mock_get_from_redis.side_effect = test_client_metrics
-    mock_subscriber = Mock()
-    mock_subscriber.listen.return_value = [
-        {"type": "message"},
-        {"type": "not message"},
-        {"type": "message"},
-        {"type": "message"},
-        {"type": "message"},
+        {"initialized": "2022-02-02 02:02:02", "rounds": {}},
+        {"initialized": "2022-02-02 02:02:02", "rounds": {}, "shutdown": "2022-02-02 03:03:03"},
     ]
-    mock_get_subscriber.return_value = mock_subscriber
-    mock_db_client = make_mock_db_client()
-    mock_motor_client.return_value = mock_db_client
+    mock_database = Mock()
 
     with patch.object(Job, "set_client_metrics", AsyncMock()) as mock_set_client_metrics:
         # Act
-        await client_training_listener(test_job, test_job.clients_info[0])
+        finished = [
+            await client_training_listener(test_job, test_job.clients_info[0], mock_database, client_metrics)
+            for client_metrics in test_client_metrics
+        ]
 
         # Assert
-        assert mock_set_client_metrics.call_count == 3
+        assert finished == [False, True]
         mock_set_client_metrics.assert_has_calls([
-            call(test_client_uuid, test_client_metrics[0], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
-            call(test_client_uuid, test_client_metrics[1], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
-            call(test_client_uuid, test_client_metrics[2], mock_db_client[DatabaseConfig.get_mongodb_db_name()]),
+            call(test_client_uuid, test_client_metrics[0], mock_database),
+            call(test_client_uuid, test_client_metrics[1], mock_database),
         ])
 
-    assert mock_get_from_redis.call_count == 3
-    mock_get_subscriber.assert_called_once_with(
-        test_job.clients_info[0].uuid,
-        test_job.clients_info[0].redis_address,
-    )
-    mock_db_client.close.assert_called()
-
 
-@patch("florist.api.routes.server.training.AsyncIOMotorClient")
-@patch("florist.api.routes.server.training.get_from_redis")
-async def test_client_training_listener_already_finished(mock_get_from_redis: Mock, mock_motor_client: Mock) -> None:
-    # Setup
-    test_client_uuid = "test-client-uuid"
+async def test_client_training_listener_fail_no_uuid() -> None:
     test_job = Job(**{
         "clients_info": [
             {
-                "service_address": "test-service-address",
-                "uuid": test_client_uuid,
                 "redis_address": "test-client-redis-host:1234",
+                "service_address": "test-service-address",
                 "data_path": "test-data-path",
                 "hashed_password": "test-password",
-            }
-        ]
+            },
+        ],
     })
-    test_client_final_metrics = {"initialized": "2022-02-02 02:02:02", "rounds": [], "shutdown": "2022-02-02 03:03:03"}
-    mock_get_from_redis.side_effect = [test_client_final_metrics]
-    mock_db_client = make_mock_db_client()
-    mock_motor_client.return_value = mock_db_client
-
-    with patch.object(Job, "set_client_metrics", AsyncMock()) as mock_set_client_metrics:
-        # Act
-        await client_training_listener(test_job, test_job.clients_info[0])
 
-        # Assert
-        mock_set_client_metrics.assert_called_once_with(
-            test_client_uuid,
-            test_client_final_metrics,
-            mock_db_client[DatabaseConfig.get_mongodb_db_name()],
-        )
-
-    assert mock_get_from_redis.call_count == 1
-    mock_db_client.close.assert_called()
+    with raises(AssertionError, match="client_info.uuid is None."):
+        await client_training_listener(test_job, test_job.clients_info[0], Mock(), {})
 
 
-async def test_client_training_listener_fail_no_uuid() -> None:
+async def test_resume_training_listeners() -> None:
     test_job = Job(**{
+        "status": JobStatus.IN_PROGRESS.value,
+        "server_uuid": "test-server-uuid",
+        "redis_address": "test-redis-host:1234",
         "clients_info": [
             {
+                "service_address": "test-service-address-1",
+                "uuid": "test-client-uuid-1",
+                "redis_address": "test-client-redis-host:1234",
+                "data_path": "test-data-path",
+                "hashed_password": "test-password",
+            },
+            {
+                "service_address": "test-service-address-2",
                 "redis_address": "test-client-redis-host:1234",
-                "service_address": "test-service-address",
                 "data_path": "test-data-path",
                 "hashed_password": "test-password",
             },
         ],
     })
+    test_job_not_started = Job(**{"status": JobStatus.IN_PROGRESS.value})
+    mock_listener_manager = AsyncMock()
+    mock_database = Mock()
 
-    with raises(AssertionError, match="client_info.uuid is None."):
-        await client_training_listener(test_job, test_job.clients_info[0])
+    with patch.object(Job, "find_by_status", AsyncMock(return_value=[test_job, test_job_not_started])) as mock_find:
+        with patch.object(Job, "load_round_metrics", AsyncMock()) as mock_load_round_metrics:
+            await resume_training_listeners(mock_listener_manager, mock_database)
+
+            mock_find.assert_called_once_with(JobStatus.IN_PROGRESS, MAX_RECORDS_TO_FETCH, mock_database)
+            mock_load_round_metrics.assert_called_once_with(mock_database)
+
+    assert mock_listener_manager.listen.call_args_list == [
+        call("test-redis-host:1234", "test-server-uuid", server_training_listener, test_job, mock_database),
+        call(
+            "test-client-redis-host:1234",
+            "test-client-uuid-1",
+            client_training_listener,
+            test_job,
+            test_job.clients_info[0],
+            mock_database,
+        ),
+    ]
 
 
 def _setup_test_job_and_mocks() -> Tuple[Dict[str, Any], Dict[str, Any], Mock, Mock]:
@@ -796,7 +710,7 @@ def _setup_test_job_and_mocks() -> Tuple[Dict[str, Any], Dict[str, Any], Mock, M
         "config_parser": "BASIC",
         "redis_address": "test-redis-host:1234",
         "server_uuid": "test-server-uuid",
-        "server_metrics": "test-server-metrics",
+        "server_metrics": {"test-metric": "test-server-metrics"},
         "client": Client.FEDAVG.value,
         "clients_info": [
             {
@@ -805,7 +719,7 @@ def _setup_test_job_and_mocks() -> Tuple[Dict[str, Any], Dict[str, Any], Mock, M
                 "data_path": "test-data-path-1",
                 "redis_address": "test-redis-host-1:12341",
                 "uuid": "test-client-uuids-1",
-                "metrics": "test-client-metrics-1",
+                "metrics": {"test-metric": "test-client-metrics-1"},
                 "hashed_password": "test-password-1",
             },
             {
@@ -814,7 +728,7 @@ def _setup_test_job_and_mocks() -> Tuple[Dict[str, Any], Dict[str, Any], Mock, M
                 "data_path": "test-data-path-2",
                 "redis_address": "test-redis-host-2:12342",
                 "uuid": "test-client-uuids-2",
-                "metrics": "test-client-metrics-2",
+                "metrics": {"test-metric": "test-client-metrics-2"},
                 "hashed_password": "test-password-2",
             },
         ],
@@ -827,9 +741,11 @@ def _setup_test_job_and_mocks() -> Tuple[Dict[str, Any], Dict[str, Any], Mock, M
     mock_fastapi_request = Mock()
     mock_fastapi_request.app.database = {JOB_COLLECTION_NAME: mock_job_collection}
     mock_fastapi_request.app.synchronous_database = {JOB_COLLECTION_NAME: mock_job_collection}
+    mock_fastapi_request.app.listener_manager = AsyncMock()
+    mock_fastapi_request.app.http_client = AsyncMock()
     mock_fastapi_request.app.clients_auth_tokens = {
-        "test-client-id-1": Token(access_token="test-client-token-1", token_type="bearer"),
-        "test-client-id-2": Token(access_token="test-client-token-2", token_type="bearer"),
+        "test-client-id-1": CachedClientToken(token=Token(access_token="test-client-token-1", token_type="bearer")),
+        "test-client-id-2": CachedClientToken(token=Token(access_token="test-client-token-2", token_type="bearer")),
     }
 
     return test_server_config, test_job, mock_job_collection, mock_fastapi_request
@@ -857,12 +773,3 @@ def _get_test_server_config(strategy: Strategy) -> Dict[str, Any]:
         f"Strategy {strategy.value} not yet supported in tests." +
         "Please add the model's server config to _get_test_server_config function."
     )
-
-
-def make_mock_db_client() -> Mock:
-    mock_database = Mock()
-    mock_db_client = Mock()
-    mock_db_client.__getitem__ = Mock(
-        side_effect=lambda database_name: mock_database if database_name == DatabaseConfig.get_mongodb_db_name() else None
-    )
-    return mock_db_client
@@ -2,7 +2,7 @@
 import json
 import os
 import signal
-from unittest.mock import ANY, Mock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 from typing import Any, AsyncGenerator
 
 import pytest
@@ -12,7 +12,7 @@ from florist.api import client
 from florist.api.clients.clients import Client
 from florist.api.clients.clients import LocalDataClient
 from florist.api.clients.optimizers import Optimizer
-from florist.api.db.client_entities import ClientDAO
+from florist.api.db.client_entities import ClientDAO, close_connections, shutdown_sqlite_executors
 from florist.api.models.models import Model
 from florist.api.monitoring.logs import get_client_log_file_path
 from florist.api.monitoring.metrics import RedisMetricsReporter
@@ -28,15 +28,17 @@ async def mock_client_db() -> AsyncGenerator[Any, Any]:
     yield
 
     ClientDAO.db_path = real_db_path
+    shutdown_sqlite_executors()
+    close_connections()
     if os.path.exists(test_sqlite_db_path):
         print(f"Deleting test detabase '{test_sqlite_db_path}'")
         os.remove(test_sqlite_db_path)
 
 
 
-def test_connect() -> None:
+async def test_connect() -> None:
     """Tests the client's connect endpoint."""
-    response = client.connect()
+    response = await client.connect()
 
     assert response.status_code == 200
     json_body = json.loads(response.body.decode())
@@ -44,7 +46,7 @@ def test_connect() -> None:
 
 
 @patch("florist.api.client.launch_client")
-def test_start_success(mock_launch_client: Mock) -> None:
+async def test_start_success(mock_launch_client: Mock) -> None:
     test_server_address = "test-server-address"
     test_client = Client.FEDAVG
     test_model = Model.MNIST
@@ -59,7 +61,7 @@ def test_start_success(mock_launch_client: Mock) -> None:
     mock_client_process.pid = test_client_pid
     mock_launch_client.return_value = mock_client_process
 
-    response = client.start(
+    response = await client.start(
         test_server_address,
         test_client,
         test_model,
@@ -95,7 +97,7 @@ def test_start_success(mock_launch_client: Mock) -> None:
 
 
 @patch("florist.api.client.launch_client", side_effect=Exception("test exception"))
-def test_start_fail_exception(_: Mock) -> None:
+async def test_start_fail_exception(_: Mock) -> None:
     test_server_address = "test-server-address"
     test_client = Client.FEDAVG
     test_model = Model.MNIST
@@ -105,7 +107,7 @@ def test_start_fail_exception(_: Mock) -> None:
     test_redis_port = 1234
     test_redis_address = f"{test_redis_host}:{test_redis_port}"
 
-    response = client.start(
+    response = await client.start(
         test_server_address,
         test_client,
         test_model,
@@ -119,9 +121,9 @@ def test_start_fail_exception(_: Mock) -> None:
     assert json_body == {"error": "test exception"}
 
 
-@patch("florist.api.monitoring.metrics.redis")
-def test_check_status(mock_redis: Mock) -> None:
-    mock_redis_connection = Mock()
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_check_status(mock_redis: Mock) -> None:
+    mock_redis_connection = AsyncMock()
     mock_redis_connection.get.return_value = b"{\"info\": \"test\"}"
 
     test_uuid = "test_uuid"
@@ -129,17 +131,17 @@ def test_check_status(mock_redis: Mock) -> None:
     test_redis_port = 1234
     test_redis_address = f"{test_redis_host}:{test_redis_port}"
 
-    mock_redis.Redis.return_value = mock_redis_connection
+    mock_redis.return_value = mock_redis_connection
 
-    response = client.check_status(test_uuid, test_redis_address)
+    response = await client.check_status(test_uuid, test_redis_address)
 
-    mock_redis.Redis.assert_called_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.assert_called_with(test_redis_host, test_redis_port)
     assert json.loads(response.body.decode()) == {"info": "test"}
 
 
-@patch("florist.api.monitoring.metrics.redis")
-def test_check_status_not_found(mock_redis: Mock) -> None:
-    mock_redis_connection = Mock()
+@patch("florist.api.monitoring.metrics.get_async_redis_connection")
+async def test_check_status_not_found(mock_redis: Mock) -> None:
+    mock_redis_connection = AsyncMock()
     mock_redis_connection.get.return_value = None
 
     test_uuid = "test_uuid"
@@ -147,30 +149,30 @@ def test_check_status_not_found(mock_redis: Mock) -> None:
     test_redis_port = 1234
     test_redis_address = f"{test_redis_host}:{test_redis_port}"
 
-    mock_redis.Redis.return_value = mock_redis_connection
+    mock_redis.return_value = mock_redis_connection
 
-    response = client.check_status(test_uuid, test_redis_address)
+    response = await client.check_status(test_uuid, test_redis_address)
 
-    mock_redis.Redis.assert_called_with(host=test_redis_host, port=test_redis_port)
+    mock_redis.assert_called_with(test_redis_host, test_redis_port)
     assert response.status_code == 404
     assert json.loads(response.body.decode()) == {"error": f"Client {test_uuid} Not Found"}
 
 
-@patch("florist.api.monitoring.metrics.redis.Redis", side_effect=Exception("test exception"))
-def test_check_status_fail_exception(_: Mock) -> None:
+@patch("florist.api.monitoring.metrics.get_async_redis_connection", side_effect=Exception("test exception"))
+async def test_check_status_fail_exception(_: Mock) -> None:
 
     test_uuid = "test_uuid"
     test_redis_host = "localhost"
     test_redis_port = 1234
     test_redis_address = f"{test_redis_host}:{test_redis_port}"
 
-    response = client.check_status(test_uuid, test_redis_address)
+    response = await client.check_status(test_uuid, test_redis_address)
 
     assert response.status_code == 500
     assert json.loads(response.body.decode()) == {"error": "test exception"}
 
 
-def test_get_log() -> None:
+async def test_get_log() -> None:
     test_client_uuid = "test-client-uuid"
     test_log_file_content = "this is a test log file content"
     test_log_file_path = str(get_client_log_file_path(test_client_uuid))
@@ -181,7 +183,7 @@ def test_get_log() -> None:
     client_dao = ClientDAO(uuid=test_client_uuid, log_file_path=test_log_file_path)
     client_dao.save()
 
-    response = client.get_log(test_client_uuid)
+    response = await client.get_log(test_client_uuid)
 
     assert response.status_code == 200
     assert response.body.decode() == f"\"{test_log_file_content}\""
@@ -189,65 +191,139 @@ def test_get_log() -> None:
     os.remove(test_log_file_path)
 
 
-def test_get_log_no_log_file_path() -> None:
+async def test_get_log_no_log_file_path() -> None:
     test_client_uuid = "test-client-uuid"
     client_dao = ClientDAO(uuid=test_client_uuid)
     client_dao.save()
 
-    response = client.get_log(test_client_uuid)
+    response = await client.get_log(test_client_uuid)
 
     assert response.status_code == 400
     assert json.loads(response.body.decode()) == {"error": "Client log file path is None or empty"}
 
 
 @patch("florist.api.client.ClientDAO")
-def test_get_log_exception(mock_client_dao) -> None:
+async def test_get_log_exception(mock_client_dao) -> None:
     test_client_uuid = "test-client-uuid"
     test_exception_message = "test-exception-message"
-    mock_client_dao.find.side_effect = Exception(test_exception_message)
+    mock_client_dao.find_async.side_effect = Exception(test_exception_message)
 
-    response = client.get_log(test_client_uuid)
+    response = await client.get_log(test_client_uuid)
 
     assert response.status_code == 500
     assert json.loads(response.body.decode()) == {"error": test_exception_message}
 
 
+async def test_get_log_range() -> None:
+    test_client_uuid = "test-client-uuid"
+    test_log_file_content = "this is a test log file content"
+    test_log_file_path = str(get_client_log_file_path(test_client_uuid))
+
+    with open(test_log_file_path, "w") as f:
+        f.write(test_log_file_content)
+
+    client_dao = ClientDAO(uuid=test_client_uuid, log_file_path=test_log_file_path)
+    client_dao.save()
+
+    response = await client.get_log_range(test_client_uuid, offset=5, length=7)
+
+    assert response.status_code == 200
+    assert response.headers["X-Log-Offset"] == "5"
+    assert response.headers["X-Log-Next-Offset"] == "12"
+    assert response.headers["X-Log-Size"] == str(len(test_log_file_content))
+    content = b"".join([chunk async for chunk in response.body_iterator])
+    assert content.decode() == test_log_file_content[5:12]
+
+    os.remove(test_log_file_path)
+
+
+async def test_get_log_range_no_log_file_path() -> None:
+    test_client_uuid = "test-client-uuid"
+    client_dao = ClientDAO(uuid=test_client_uuid)
+    client_dao.save()
+
+    response = await client.get_log_range(test_client_uuid)
+
+    assert response.status_code == 400
+    assert json.loads(response.body.decode()) == {"error": "Client log file path is None or empty"}
+
+
+@patch("florist.api.client.ClientDAO")
+async def test_get_log_range_exception(mock_client_dao) -> None:
+    test_client_uuid = "test-client-uuid"
+    test_exception_message = "test-exception-message"
+    mock_client_dao.find_async.side_effect = Exception(test_exception_message)
+
+    response = await client.get_log_range(test_client_uuid)
+
+    assert response.status_code == 500
+    assert json.loads(response.body.decode()) == {"error": test_exception_message}
+
+
+@patch("florist.api.client.make_log_tail_response")
+async def test_tail_log(mock_make_log_tail_response: Mock) -> None:
+    test_client_uuid = "test-client-uuid"
+    test_log_file_path = str(get_client_log_file_path(test_client_uuid))
+    client_dao = ClientDAO(uuid=test_client_uuid, log_file_path=test_log_file_path)
+    client_dao.save()
+    mock_request = Mock()
+    mock_request.headers = {"Last-Event-ID": "20"}
+
+    response = await client.tail_log(test_client_uuid, mock_request, offset=10)
+
+    assert response == mock_make_log_tail_response.return_value
+    mock_make_log_tail_response.assert_called_once_with(test_log_file_path, 20)
+
+
+async def test_tail_log_no_log_file_path() -> None:
+    test_client_uuid = "test-client-uuid"
+    client_dao = ClientDAO(uuid=test_client_uuid)
+    client_dao.save()
+    mock_request = Mock()
+    mock_request.headers = {}
+
+    response = await client.tail_log(test_client_uuid, mock_request)
+
+    assert response.status_code == 400
+    assert json.loads(response.body.decode()) == {"error": "Client log file path is None or empty"}
+
+
 @patch("florist.api.client.os.kill")
-def test_stop_success(mock_kill: Mock) -> None:
+async def test_stop_success(mock_kill: Mock) -> None:
     test_client_uuid = "test-client-uuid"
     test_pid = 1234
 
     client_dao = ClientDAO(uuid=test_client_uuid, pid=test_pid)
     client_dao.save()
 
-    response = client.stop(test_client_uuid)
+    response = await client.stop(test_client_uuid)
 
     assert response.status_code == 200
     assert json.loads(response.body.decode()) == {"status": "success"}
     mock_kill.assert_called_once_with(test_pid, signal.SIGTERM)
 
 
-def test_stop_fail_no_uuid() -> None:
-    response = client.stop("")
+async def test_stop_fail_no_uuid() -> None:
+    response = await client.stop("")
 
     assert response.status_code == 400
     assert json.loads(response.body.decode()) == {"error": "UUID is empty or None."}
 
 
-def test_stop_fail_not_found() -> None:
+async def test_stop_fail_not_found() -> None:
     test_uuid = "inexistant-uuid"
 
     client_dao = ClientDAO(uuid="test-client-uuid", pid=1234)
     client_dao.save()
 
-    response = client.stop(test_uuid)
+    response = await client.stop(test_uuid)
 
     assert response.status_code == 500
     assert json.loads(response.body.decode()) == {"error": f"Client with uuid '{test_uuid}' not found."}
 
 
 @patch("florist.api.client.os.kill")
-def test_stop_fail_exception(mock_kill: Mock) -> None:
+async def test_stop_fail_exception(mock_kill: Mock) -> None:
     test_client_uuid = "test-client-uuid"
     test_pid = 1234
     test_exception_message = "test-exception-message"
@@ -256,7 +332,7 @@ def test_stop_fail_exception(mock_kill: Mock) -> None:
     client_dao = ClientDAO(uuid=test_client_uuid, pid=test_pid)
     client_dao.save()
 
-    response = client.stop(test_client_uuid)
+    response = await client.stop(test_client_uuid)
 
     assert response.status_code == 500
     assert json.loads(response.body.decode()) == {"error": test_exception_message}
@@ -0,0 +1,33 @@
+from unittest.mock import patch
+
+import httpx
+
+from florist.api.http_client import (
+    HTTP_CONNECT_RETRIES,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    create_http_client,
+    is_http2_available,
+)
+
+
+async def test_create_http_client() -> None:
+    http_client = create_http_client()
+
+    assert isinstance(http_client, httpx.AsyncClient)
+    assert http_client.timeout == httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+    assert http_client._transport._pool._retries == HTTP_CONNECT_RETRIES
+    assert http_client._transport._pool._http2 == is_http2_available()
+
+    await http_client.aclose()
+    assert http_client.is_closed
+
+
+@patch("florist.api.http_client.importlib.util.find_spec")
+def test_is_http2_available(mock_find_spec) -> None:
+    mock_find_spec.return_value = object()
+    assert is_http2_available()
+    mock_find_spec.assert_called_once_with("h2")
+
+    mock_find_spec.return_value = None
+    assert not is_http2_available()
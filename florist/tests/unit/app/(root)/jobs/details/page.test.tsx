@@ -3,7 +3,7 @@ import { render, cleanup } from "@testing-library/react";
 import { describe, it, expect, afterEach } from "@jest/globals";
 import { act } from "react-dom/test-utils";
 
-import { useGetJob, useSWRWithKey, getServerLogsKey, getClientLogsKey } from "../../../../../../app/(root)/jobs/hooks";
+import { useGetJob, useLogTail, getServerLogTailKey, getClientLogTailKey } from "../../../../../../app/(root)/jobs/hooks";
 import { validStatuses, Job } from "../../../../../../app/(root)/jobs/definitions";
 import JobDetails, { getTimeString } from "../../../../../../app/(root)/jobs/details/page";
 
@@ -27,20 +27,21 @@ function setupGetJobMock(data: Job, isLoading: boolean = false, error = null) {
     });
 }
 
-function setupUseSWRWithKeyMock({ data, isLoading = false, error = null, isValidating = false }) {
-    getServerLogsKey.mockImplementation((jobId) => `test server logs key: ${jobId}`);
-    getClientLogsKey.mockImplementation((jobId, clientIndex) => `test client logs key: ${jobId}, ${clientIndex}`);
+function setupUseLogTailMock({ data, isLoading = false, error = false }) {
+    getServerLogTailKey.mockImplementation((jobId) => `test server log tail key: ${jobId}`);
+    getClientLogTailKey.mockImplementation((jobId, clientIndex) => `test client log tail key: ${jobId}, ${clientIndex}`);
 
-    const mutateMock = jest.fn();
-    useSWRWithKey.mockImplementation((apiKey: string) => {
-        return { data, error, isLoading, isValidating, mutate: mutateMock };
+    const restartMock = jest.fn();
+    useLogTail.mockImplementation((apiKey: string) => {
+        return { data, error, isLoading, restart: restartMock };
     });
-    return mutateMock;
+    return restartMock;
 }
 
 function setupURLSpyMock(urlSpy, testURL: string = "foo") {
     urlSpy = jest.spyOn(window, "URL");
     urlSpy.createObjectURL = jest.fn((_) => testURL);
+    urlSpy.revokeObjectURL = jest.fn();
     return urlSpy;
 }
 
@@ -61,7 +62,7 @@ function makeTestJob(): Job {
             n_server_rounds: 4,
             local_epochs: 2,
         }),
-        server_metrics: JSON.stringify({
+        server_metrics: {
             host_type: "server",
             fit_start: "2020-01-01 12:07:07.0707",
             rounds: {
@@ -90,13 +91,13 @@ function makeTestJob(): Job {
             custom_property_object: {
                 custom_property_object_value: "test",
             },
-        }),
+        },
         clients_info: [
             {
                 service_address: "test-service-address-1",
                 data_path: "test-data-path-1",
                 redis_address: "test-redis-address-1",
-                metrics: JSON.stringify({
+                metrics: {
                     host_type: "client",
                     initialized: "2024-10-10 15:05:59.025693",
                     shutdown: "2024-10-10 15:12:34.888213",
@@ -130,13 +131,13 @@ function makeTestJob(): Job {
                             round_end: "2024-10-10 15:19:59.032618",
                         },
                     },
-                }),
+                },
             },
             {
                 service_address: "test-service-address-2",
                 data_path: "test-data-path-2",
                 redis_address: "test-redis-address-2",
-                metrics: JSON.stringify({
+                metrics: {
                     host_type: "client",
                     initialized: "2024-10-10 15:05:59.025693",
                     rounds: {
@@ -151,7 +152,7 @@ function makeTestJob(): Job {
                             fit_start: "2024-10-10 15:06:59.032618",
                         },
                     },
-                }),
+                },
             },
         ],
     };
@@ -284,7 +285,7 @@ describe("Job Details Page", () => {
         });
         it("Display progress bar at 0% when there are no information about rounds", () => {
             const testJob = makeTestJob();
-            testJob.server_metrics = JSON.stringify({ host_type: "server" });
+            testJob.server_metrics = { host_type: "server" };
             setupGetJobMock(testJob);
             const { container } = render(<JobDetails />);
             const progressBar = container.querySelector("div.progress-bar");
@@ -294,7 +295,7 @@ describe("Job Details Page", () => {
         });
         it("Display progress bar at 0% when rounds list is empty", () => {
             const testJob = makeTestJob();
-            testJob.server_metrics = JSON.stringify({ host_type: "server", rounds: {} });
+            testJob.server_metrics = { host_type: "server", rounds: {} };
             setupGetJobMock(testJob);
             const { container } = render(<JobDetails />);
             const progressBar = container.querySelector("div.progress-bar");
@@ -373,7 +374,7 @@ describe("Job Details Page", () => {
             it("Should render the contents correctly", () => {
                 const testJob = makeTestJob();
                 testJob.status = "IN_PROGRESS";
-                const serverMetrics = JSON.parse(testJob.server_metrics);
+                const serverMetrics = testJob.server_metrics;
                 setupGetJobMock(testJob);
                 setupURLSpyMock(urlSpy);
                 const { container } = render(<JobDetails />);
@@ -431,7 +432,7 @@ describe("Job Details Page", () => {
             describe("Rounds", () => {
                 it("Should be collapsed by default", () => {
                     const testJob = makeTestJob();
-                    const serverMetrics = JSON.parse(testJob.server_metrics);
+                    const serverMetrics = testJob.server_metrics;
                     setupGetJobMock(testJob);
                     setupURLSpyMock(urlSpy);
                     const { container } = render(<JobDetails />);
@@ -445,7 +446,7 @@ describe("Job Details Page", () => {
                 });
                 it("Should open when the toggle button is clicked", () => {
                     const testJob = makeTestJob();
-                    const serverMetrics = JSON.parse(testJob.server_metrics);
+                    const serverMetrics = testJob.server_metrics;
                     setupGetJobMock(testJob);
                     setupURLSpyMock(urlSpy);
                     const { container } = render(<JobDetails />);
@@ -466,7 +467,7 @@ describe("Job Details Page", () => {
                 });
                 it("Should render the contents correctly", () => {
                     const testJob = makeTestJob();
-                    const serverMetrics = JSON.parse(testJob.server_metrics);
+                    const serverMetrics = testJob.server_metrics;
                     setupGetJobMock(testJob);
                     setupURLSpyMock(urlSpy);
                     const { container } = render(<JobDetails />);
@@ -555,7 +556,7 @@ describe("Job Details Page", () => {
                     act(() => progressToggleButton.click());
 
                     const testLogContents = "[INFO] test log contents\n[INFO] second line";
-                    setupUseSWRWithKeyMock({ data: testLogContents });
+                    setupUseLogTailMock({ data: testLogContents });
                     const testURL = "test url";
                     urlSpy = setupURLSpyMock(urlSpy, testURL);
 
@@ -563,7 +564,7 @@ describe("Job Details Page", () => {
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(useLogTail).toHaveBeenCalledWith(getServerLogTailKey(testJob._id));
                     expect(urlSpy.createObjectURL).toHaveBeenCalledWith(new Blob([testLogContents]));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
@@ -589,7 +590,7 @@ describe("Job Details Page", () => {
                     act(() => toggleButton.click());
 
                     const testLogContents = "[INFO] test log contents\n[INFO] second line";
-                    setupUseSWRWithKeyMock({ data: testLogContents });
+                    setupUseLogTailMock({ data: testLogContents });
                     const testURL = "test url";
                     urlSpy = setupURLSpyMock(urlSpy, testURL);
 
@@ -599,7 +600,7 @@ describe("Job Details Page", () => {
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getClientLogsKey(testJob._id, testClientIndex));
+                    expect(useLogTail).toHaveBeenCalledWith(getClientLogTailKey(testJob._id, testClientIndex));
                     expect(urlSpy.createObjectURL).toHaveBeenCalledWith(new Blob([testLogContents]));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
@@ -620,41 +621,41 @@ describe("Job Details Page", () => {
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    setupUseSWRWithKeyMock({ data: null, isLoading: true });
+                    setupUseLogTailMock({ data: "", isLoading: true });
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(useLogTail).toHaveBeenCalledWith(getServerLogTailKey(testJob._id));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
                     const modalBody = logViewerComponent.querySelector(".modal-body");
                     const loadingComponent = modalBody.querySelector("div.loading-container > img");
                     expect(loadingComponent.getAttribute("alt")).toBe("Loading Logs");
                 });
-                it("Should display spinner when validating", () => {
+                it("Should display error message", () => {
                     const testJob = makeTestJob();
                     setupGetJobMock(testJob);
+                    setupURLSpyMock(urlSpy, "test url");
                     const { container } = render(<JobDetails />);
 
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    setupUseSWRWithKeyMock({ data: null, isValidating: true });
+                    setupUseLogTailMock({ data: "", error: true });
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(useLogTail).toHaveBeenCalledWith(getServerLogTailKey(testJob._id));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
                     const modalBody = logViewerComponent.querySelector(".modal-body");
-                    const loadingComponent = modalBody.querySelector("div.loading-container > img");
-                    expect(loadingComponent.getAttribute("alt")).toBe("Loading Logs");
+                    expect(modalBody).toHaveTextContent("Error loading logs");
                 });
-                it("Should display error message", () => {
+                it("Should keep displaying the logs received when disconnected", () => {
                     const testJob = makeTestJob();
                     setupGetJobMock(testJob);
                     setupURLSpyMock(urlSpy, "test url");
@@ -663,19 +664,18 @@ describe("Job Details Page", () => {
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    setupUseSWRWithKeyMock({ data: null, error: "error!" });
+                    const testLogContents = "[INFO] test log contents";
+                    setupUseLogTailMock({ data: testLogContents, error: true });
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
-
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
                     const modalBody = logViewerComponent.querySelector(".modal-body");
-                    expect(modalBody).toHaveTextContent("Error loading logs");
+                    expect(modalBody).toHaveTextContent(testLogContents);
                 });
-                it("Clicking refresh should call mutate", () => {
+                it("Clicking refresh should restart the log tail", () => {
                     const testJob = makeTestJob();
                     setupGetJobMock(testJob);
                     setupURLSpyMock(urlSpy, "test url");
@@ -684,19 +684,19 @@ describe("Job Details Page", () => {
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    const mutateMock = setupUseSWRWithKeyMock({ data: null });
+                    const restartMock = setupUseLogTailMock({ data: "" });
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(useLogTail).toHaveBeenCalledWith(getServerLogTailKey(testJob._id));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
                     const refreshButton = logViewerComponent.querySelector(".refresh-button");
                     act(() => refreshButton.click());
 
-                    expect(mutateMock).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(restartMock).toHaveBeenCalled();
                 });
                 it("Clicking close should close the modal", () => {
                     const testJob = makeTestJob();
@@ -707,13 +707,13 @@ describe("Job Details Page", () => {
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    const mutateMock = setupUseSWRWithKeyMock({ data: null });
+                    setupUseLogTailMock({ data: "" });
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
                     const showLogsButton = jobProgressDetailsComponent.querySelector(".show-logs-button");
                     act(() => showLogsButton.click());
 
-                    expect(useSWRWithKey).toHaveBeenCalledWith(getServerLogsKey(testJob._id));
+                    expect(useLogTail).toHaveBeenCalledWith(getServerLogTailKey(testJob._id));
 
                     const logViewerComponent = jobProgressDetailsComponent.querySelector(".log-viewer");
                     const closeButton = logViewerComponent.querySelector(".btn-close");
@@ -734,7 +734,7 @@ describe("Job Details Page", () => {
                     const progressToggleButton = container.querySelector(".job-details-toggle a");
                     act(() => progressToggleButton.click());
 
-                    const expectedServerMetrics = JSON.stringify(JSON.parse(testJob.server_metrics), null, 4);
+                    const expectedServerMetrics = JSON.stringify(testJob.server_metrics, null, 4);
                     expect(urlSpy.createObjectURL).toHaveBeenCalledWith(new Blob([expectedServerMetrics]));
 
                     const jobProgressDetailsComponent = container.querySelector(".job-progress-detail");
@@ -756,11 +756,7 @@ describe("Job Details Page", () => {
                     ];
                     act(() => toggleButton.click());
 
-                    const expectedClientMetrics = JSON.stringify(
-                        JSON.parse(testJob.clients_info[testClientIndex].metrics),
-                        null,
-                        4,
-                    );
+                    const expectedClientMetrics = JSON.stringify(testJob.clients_info[testClientIndex].metrics, null, 4);
                     expect(urlSpy.createObjectURL).toHaveBeenCalledWith(new Blob([expectedClientMetrics]));
 
                     const clientProgressDetailsComponent = container.querySelector(
@@ -800,7 +796,7 @@ describe("Job Details Page", () => {
                     let toggleButton = container.querySelectorAll(".job-client-progress .job-details-toggle a")[0];
                     act(() => toggleButton.click());
 
-                    let clientMetrics = JSON.parse(testJob.clients_info[0].metrics);
+                    let clientMetrics = testJob.clients_info[0].metrics;
                     let progressDetailsComponent = container.querySelectorAll(
                         ".job-client-progress .job-progress-detail",
                     )[0];
@@ -816,7 +812,7 @@ describe("Job Details Page", () => {
 
                     toggleButton = container.querySelectorAll(".job-client-progress .job-details-toggle a")[1];
                     act(() => toggleButton.click());
-                    clientMetrics = JSON.parse(testJob.clients_info[1].metrics);
+                    clientMetrics = testJob.clients_info[1].metrics;
                     progressDetailsComponent = container.querySelectorAll(
                         ".job-client-progress .job-progress-detail",
                     )[1];
@@ -0,0 +1,128 @@
+import { renderHook, act, waitFor } from "@testing-library/react";
+import { describe, it, expect, afterEach } from "@jest/globals";
+import { TextDecoder, TextEncoder } from "util";
+
+import { useLogTail, parseServerSentEvent } from "../../../../../app/(root)/jobs/hooks";
+
+// jsdom does not provide a TextDecoder, which is used to decode the streams
+Object.assign(global, { TextDecoder });
+
+const testURL = "/api/server/job/tail_server_log/test-job-id";
+const encoder = new TextEncoder();
+
+afterEach(() => {
+    jest.clearAllMocks();
+    jest.useRealTimers();
+});
+
+function makeStreamResponse() {
+    // Makes a response whose body returns the chunks pushed to it, null meaning the end of the stream
+    const chunks = [];
+    let pendingRead = null;
+    const read = () =>
+        new Promise((resolve) => {
+            if (chunks.length > 0) {
+                resolve(chunks.shift());
+            } else {
+                pendingRead = resolve;
+            }
+        });
+    const push = (chunk: string | null) => {
+        const result = chunk === null ? { done: true } : { value: encoder.encode(chunk), done: false };
+        if (pendingRead !== null) {
+            const resolve = pendingRead;
+            pendingRead = null;
+            resolve(result);
+        } else {
+            chunks.push(result);
+        }
+    };
+    return { response: { status: 200, body: { getReader: () => ({ read }) } }, push };
+}
+
+function makeLogEvent(nextOffset: number, lines: string): string {
+    return `id: ${nextOffset}\nevent: log\ndata: ${JSON.stringify(lines)}\n\n`;
+}
+
+describe("Hooks", () => {
+    describe("parseServerSentEvent", () => {
+        it("Should parse the fields of an event", () => {
+            expect(parseServerSentEvent('id: 7\nevent: log\ndata: "line 1\\n"')).toEqual({
+                id: "7",
+                event: "log",
+                data: '"line 1\\n"',
+            });
+            expect(parseServerSentEvent('data: {"type": "connected"}')).toEqual({
+                id: null,
+                event: "message",
+                data: '{"type": "connected"}',
+            });
+        });
+        it("Should ignore comments", () => {
+            expect(parseServerSentEvent(": keepalive")).toBeNull();
+        });
+    });
+    describe("useLogTail", () => {
+        it("Should append the new log lines as they are streamed", async () => {
+            const { response, push } = makeStreamResponse();
+            global.fetch = jest.fn(() => Promise.resolve(response));
+
+            const { result, unmount } = renderHook(() => useLogTail(testURL));
+            expect(result.current.isLoading).toBe(true);
+            expect(result.current.data).toBe("");
+
+            await act(async () => push(makeLogEvent(7, "line 1\n")));
+            await waitFor(() => expect(result.current.data).toBe("line 1\n"));
+            expect(result.current.isLoading).toBe(false);
+            expect(result.current.error).toBe(false);
+
+            await act(async () => push(": keepalive\n\n" + makeLogEvent(14, "line 2\nline 3\n")));
+            await waitFor(() => expect(result.current.data).toBe("line 1\nline 2\nline 3\n"));
+
+            expect(global.fetch).toHaveBeenCalledTimes(1);
+            expect(global.fetch).toHaveBeenCalledWith(testURL, { headers: {}, signal: expect.anything() });
+            unmount();
+        });
+        it("Should resume after the last event received when reconnecting", async () => {
+            jest.useFakeTimers();
+            const firstStream = makeStreamResponse();
+            const secondStream = makeStreamResponse();
+            global.fetch = jest
+                .fn()
+                .mockImplementationOnce(() => Promise.resolve(firstStream.response))
+                .mockImplementationOnce(() => Promise.resolve(secondStream.response));
+
+            const { result, unmount } = renderHook(() => useLogTail(testURL));
+
+            await act(async () => {
+                firstStream.push(makeLogEvent(7, "line 1\n"));
+                // the connection is lost
+                firstStream.push(null);
+            });
+            await waitFor(() => expect(result.current.data).toBe("line 1\n"));
+
+            await act(async () => {
+                jest.advanceTimersByTime(3000);
+            });
+            await act(async () => {
+                secondStream.push(makeLogEvent(14, "line 2\n"));
+                secondStream.push("event: end\ndata: \n\n");
+                secondStream.push(null);
+            });
+            await waitFor(() => expect(result.current.data).toBe("line 1\nline 2\n"));
+
+            expect(global.fetch).toHaveBeenCalledTimes(2);
+            expect(global.fetch).toHaveBeenNthCalledWith(2, testURL, {
+                headers: { "Last-Event-ID": "7" },
+                signal: expect.anything(),
+            });
+
+            // the stream has ended, so it doesn't reconnect
+            await act(async () => {
+                jest.advanceTimersByTime(3000);
+            });
+            expect(global.fetch).toHaveBeenCalledTimes(2);
+            unmount();
+        });
+    });
+});
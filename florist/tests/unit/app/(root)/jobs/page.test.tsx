@@ -170,6 +170,39 @@ describe("List Jobs Page", () => {
         }
     });
 
+    describe("Load more button", () => {
+        it("Is present and loads the next page when there are more jobs", () => {
+            const data = [mockJobData("MNIST", "localhost:8080", ["localhost:7080"])];
+            const loadMoreMock = jest.fn();
+            setupMock(["IN_PROGRESS"], data, false, false, false);
+            useGetJobsByJobStatus.mockImplementation((status: string) => ({
+                ...mockUseGetJobsByJobStatus(status, ["IN_PROGRESS"], data, false, false),
+                hasMore: status === "IN_PROGRESS",
+                loadMore: loadMoreMock,
+            }));
+            const { queryByTestId } = render(<Page />);
+
+            expect(queryByTestId("load-more-button-NOT_STARTED")).not.toBeInTheDocument();
+            const loadMoreButton = queryByTestId("load-more-button-IN_PROGRESS");
+            expect(loadMoreButton).toBeInTheDocument();
+
+            act(() => loadMoreButton.click());
+
+            expect(loadMoreMock).toHaveBeenCalledTimes(1);
+        });
+
+        it("Is not present when there are no more jobs", () => {
+            const data = [mockJobData("MNIST", "localhost:8080", ["localhost:7080"])];
+            const validStatusesKeys = Object.keys(validStatuses);
+            setupMock(validStatusesKeys, data, false, false, false);
+            const { queryByTestId } = render(<Page />);
+
+            for (const status of validStatusesKeys) {
+                expect(queryByTestId(`load-more-button-${status}`)).not.toBeInTheDocument();
+            }
+        });
+    });
+
     describe("Start training button", () => {
         it("Is present in NOT_STARTED jobs", () => {
             const data = [mockJobData("MNIST", "localhost:8080", ["localhost:7080"])];